@@ -11,35 +11,25 @@
 #     return config.make_wsgi_app()
 
 from pyramid.config import Configurator
-from pyramid.events import NewRequest # <--- Impor NewRequest
-from pyramid.response import Response # <--- Impor Response
-
-# Fungsi ini akan dipanggil untuk setiap request baru
-def add_cors_headers_response_callback(event):
-    def cors_headers(request, response):
-        # Tambahkan header CORS ke SETIAP respons
-        response.headers.update({
-        'Access-Control-Allow-Origin': 'http://localhost:5173', # <-- Ganti '*' dengan origin Anda
-        'Access-Control-Allow-Methods': 'POST,GET,DELETE,PUT,OPTIONS',
-        'Access-Control-Allow-Headers': 'Origin, Content-Type, Accept, Authorization',
-        'Access-Control-Allow-Credentials': 'true',
-        'Access-Control-Max-Age': '1728000',
-        })
-    # Daftarkan callback yang akan dieksekusi sebelum respons dikirim
-    event.request.add_response_callback(cors_headers)
 
 def main(global_config, **settings):
     """ This function returns a Pyramid WSGI application.
     """
     with Configurator(settings=settings) as config:
         config.include('pyramid_jinja2')
-        config.include('pyramid_beaker')
+        config.include('.sessions') # session.backend: memory | sqlite | cookie | beaker
         config.include('.models')
-        config.include('.routes') # Pastikan ini dipanggil SEBELUM subscriber jika rute ada di file lain
-
-        # --- TAMBAHKAN SUBSCRIBER INI ---
-        config.add_subscriber(add_cors_headers_response_callback, NewRequest)
-        # --------------------------------
+        config.include('.cache')
+        config.include('.autocomplete') # Bangun index judul untuk autocomplete saat startup
+        config.include('.passwords') # Pool worker bcrypt + auth.bcrypt_rounds
+        config.include('.auth') # request.user + cache profil untuk api_check_auth
+        config.include('.derivatives') # Versi kecil + WebP poster/foto profil di process pool
+        config.include('.reaper') # Hapus file upload setelah commit + sweep file yatim saat startup
+        config.include('.uploads') # Batas ukuran & tipe untuk form multipart yang di-stream
+        config.include('.export') # export.admin_ids divalidasi saat startup
+        config.include('.static_assets') # /static/: upload immutable, ETag, varian .br/.gz
+        config.include('.routes')
+        config.include('.cors') # Preflight & header CORS di tween, sebelum routing dan pyramid_tm
 
         # Pastikan Anda TIDAK punya config.scan() di sini jika 
         # Anda sudah scan di dalam routes.py
@@ -1,8 +1,8 @@
 """Pyramid bootstrap environment. """
 from alembic import context
 from pyramid.paster import get_appsettings, setup_logging
-from sqlalchemy import engine_from_config
 
+from backend.models import get_engine
 from backend.models.meta import Base
 
 config = context.config
@@ -12,6 +12,21 @@ setup_logging(config.config_file_name)
 settings = get_appsettings(config.config_file_name)
 target_metadata = Base.metadata
 
+# Objek full-text search dibuat manual di migration (FTS5 / tsvector) dan
+# tidak ada di metadata model; jangan sampai autogenerate menghapusnya.
+FTS_TABLE_PREFIX = 'movies_fts'
+FTS_COLUMNS = {('movies', 'search_vector')}
+
+
+def include_object(object_, name, type_, reflected, compare_to):
+    if type_ == 'table' and name.startswith(FTS_TABLE_PREFIX):
+        return False
+    if type_ == 'column' and (object_.table.name, name) in FTS_COLUMNS:
+        return False
+    if type_ == 'index' and name == 'ix_movies_search_vector':
+        return False
+    return True
+
 
 def run_migrations_offline():
     """Run migrations in 'offline' mode.
@@ -37,12 +52,13 @@ def run_migrations_online():
     and associate a connection with the context.
 
     """
-    engine = engine_from_config(settings, prefix='sqlalchemy.')
+    engine = get_engine(settings) # Tanpa sqlalchemy.replica.*: migrasi selalu ke primary
 
     connection = engine.connect()
     context.configure(
         connection=connection,
-        target_metadata=target_metadata
+        target_metadata=target_metadata,
+        include_object=include_object,
     )
 
     try:
@@ -0,0 +1,84 @@
+"""Add full-text search index for movies
+
+SQLite memakai tabel virtual FTS5 ``movies_fts`` (external content dari
+``movies``), PostgreSQL memakai kolom ``search_vector`` (tsvector) dengan
+index GIN. Keduanya disinkronkan oleh trigger.
+
+Revision ID: 36fd07580362
+Revises: 8d5635490954
+Create Date: 2026-10-18 11:26:50.642017
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '36fd07580362'
+down_revision = '8d5635490954'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE movies_fts USING fts5("
+            " title, genre, content='movies', content_rowid='id',"
+            " tokenize='unicode61 remove_diacritics 2')")
+        op.execute(
+            "CREATE TRIGGER movies_fts_ai AFTER INSERT ON movies BEGIN"
+            " INSERT INTO movies_fts (rowid, title, genre)"
+            " VALUES (new.id, new.title, new.genre);"
+            " END")
+        op.execute(
+            "CREATE TRIGGER movies_fts_ad AFTER DELETE ON movies BEGIN"
+            " INSERT INTO movies_fts (movies_fts, rowid, title, genre)"
+            " VALUES ('delete', old.id, old.title, old.genre);"
+            " END")
+        op.execute(
+            "CREATE TRIGGER movies_fts_au AFTER UPDATE OF title, genre ON movies BEGIN"
+            " INSERT INTO movies_fts (movies_fts, rowid, title, genre)"
+            " VALUES ('delete', old.id, old.title, old.genre);"
+            " INSERT INTO movies_fts (rowid, title, genre)"
+            " VALUES (new.id, new.title, new.genre);"
+            " END")
+        # Index baris yang sudah ada
+        op.execute("INSERT INTO movies_fts (movies_fts) VALUES ('rebuild')")
+    elif dialect == 'postgresql':
+        op.add_column('movies', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+        op.execute(
+            "CREATE FUNCTION movies_search_vector_update() RETURNS trigger AS $$\n"
+            "BEGIN\n"
+            "  NEW.search_vector :=\n"
+            "    setweight(to_tsvector('simple', coalesce(NEW.title, '')), 'A') ||\n"
+            "    setweight(to_tsvector('simple', coalesce(NEW.genre, '')), 'B');\n"
+            "  RETURN NEW;\n"
+            "END\n"
+            "$$ LANGUAGE plpgsql")
+        op.execute(
+            "CREATE TRIGGER movies_search_vector_trg"
+            " BEFORE INSERT OR UPDATE OF title, genre ON movies"
+            " FOR EACH ROW EXECUTE PROCEDURE movies_search_vector_update()")
+        op.execute(
+            "UPDATE movies SET search_vector ="
+            " setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||"
+            " setweight(to_tsvector('simple', coalesce(genre, '')), 'B')")
+        op.create_index('ix_movies_search_vector', 'movies', ['search_vector'],
+                        unique=False, postgresql_using='gin')
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS movies_fts_au")
+        op.execute("DROP TRIGGER IF EXISTS movies_fts_ad")
+        op.execute("DROP TRIGGER IF EXISTS movies_fts_ai")
+        op.execute("DROP TABLE IF EXISTS movies_fts")
+    elif dialect == 'postgresql':
+        op.drop_index('ix_movies_search_vector', table_name='movies')
+        op.execute("DROP TRIGGER IF EXISTS movies_search_vector_trg ON movies")
+        op.execute("DROP FUNCTION IF EXISTS movies_search_vector_update()")
+        op.drop_column('movies', 'search_vector')
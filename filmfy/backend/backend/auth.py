@@ -0,0 +1,91 @@
+"""
+User yang sedang login untuk request ini (``request.user``) dan cache profil
+user per proses untuk ``api_check_auth``.
+
+``AuthContext`` di frontend memanggil ``/api/check_auth`` di setiap page load;
+profil hasil ``User.to_dict()`` disimpan di cache LRU + TTL (memakai
+``MemoryResponseCache``) dengan key user_id + application_url, sehingga
+panggilan berikutnya tidak perlu query ke database. View yang mengubah atau
+menghapus user meng-invalidate entri tersebut setelah commit.
+
+Konfigurasi di file .ini::
+
+    auth.user_cache_ttl = 60            # detik; 0 = cache mati
+    auth.user_cache_max_entries = 10000
+
+Cache ini per proses: proses waitress lain bisa melihat profil lama paling
+lama ``auth.user_cache_ttl`` detik.
+"""
+from .cache import MemoryResponseCache
+from .models.user import User
+
+USER_CACHE_REGISTRY_KEY = 'user_profile_cache'
+
+
+def user_tag(user_id):
+    """Tag cache untuk semua entri profil satu user."""
+    return f'users:{user_id}'
+
+
+def get_user_cache(request):
+    return request.registry.get(USER_CACHE_REGISTRY_KEY)
+
+
+def get_authenticated_user(request):
+    """``request.user``: objek User dari session, atau None (di-reify per request)."""
+    user_id = request.session.get('user_id')
+    if user_id is None:
+        return None
+    return request.dbsession.get(User, user_id)
+
+
+def cached_user_profile(request, user_id, load_user):
+    """
+    Profil ``user_id`` (``User.to_dict(request)``) dari cache, atau dari
+    ``load_user()`` jika belum ada. Return None jika user tidak ditemukan.
+    """
+    cache = get_user_cache(request)
+    if cache is None:
+        user = load_user()
+        return user.to_dict(request=request) if user else None
+
+    key = f'{user_id}|{request.application_url}'
+    profile = cache.get(key)
+    if profile is not None:
+        return profile
+    tag = user_tag(user_id)
+    generation = cache.generation(tag)
+    user = load_user()
+    if not user:
+        return None
+    profile = user.to_dict(request=request)
+    cache.set(key, tag, profile, generation)
+    return profile
+
+
+def invalidate_user_after_commit(request, user_id):
+    """Buang profil ``user_id`` dari cache setelah transaksi request commit."""
+    cache = get_user_cache(request)
+    if cache is None:
+        return
+
+    def invalidate_hook(success):
+        if success:
+            cache.invalidate(user_tag(user_id))
+
+    request.tm.get().addAfterCommitHook(invalidate_hook)
+
+
+def user_cache_from_settings(settings, prefix='auth.'):
+    """Buat cache profil dari settings .ini; None jika ttl 0."""
+    ttl = int(settings.get(prefix + 'user_cache_ttl', 60))
+    if ttl <= 0:
+        return None
+    max_entries = int(settings.get(prefix + 'user_cache_max_entries', 10000))
+    return MemoryResponseCache(max_entries=max_entries, ttl=ttl)
+
+
+def includeme(config):
+    """Pasang ``request.user`` dan cache profil: ``config.include('backend.auth')``."""
+    config.registry[USER_CACHE_REGISTRY_KEY] = user_cache_from_settings(config.get_settings())
+    config.add_request_method(get_authenticated_user, 'user', reify=True)
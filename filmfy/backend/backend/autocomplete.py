@@ -0,0 +1,366 @@
+"""
+Index autocomplete judul movie di memori proses.
+
+- Prefix: list terurut judul ternormalisasi + ``bisect``; juga per awal kata
+  di dalam judul, sehingga 'knight' menemukan 'The Dark Knight'.
+- Toleran salah ketik: kata di input yang tidak dikenal dikoreksi ke kata
+  terdekat di kosakata judul (kandidat dari map trigram, lalu jarak edit),
+  kemudian dicari ulang sebagai prefix.
+
+Semua lookup dibatasi oleh ``limit`` dan ukuran kosakata, bukan jumlah
+movie, sehingga tetap sub-milidetik untuk katalog besar.
+
+Index dibangun di thread latar belakang saat aplikasi melayani request
+pertamanya (script ``bootstrap()`` tidak membangunnya, lihat
+backend.background) lalu diperbarui oleh view tulis MovieViews setelah
+transaksi commit. Selama build, autocomplete memakai isi lama (atau kosong);
+index baru ditukar sekaligus setelah selesai. Index bersifat per proses:
+edit satu movie dari proses lain baru terlihat setelah restart. Perubahan
+massal (``import_movies``) menaikkan versi katalog (``CATALOG_TAG``) di cache
+respons; dengan ``cache.backend = sqlite`` (dibagi antar proses) request
+autocomplete berikutnya memicu build ulang di latar belakang. Dengan cache
+``memory`` atau tanpa cache, restart server setelah import.
+"""
+import bisect
+import itertools
+import logging
+import threading
+import unicodedata
+from collections import Counter, defaultdict
+
+from pyramid.settings import asbool
+from sqlalchemy.exc import DBAPIError
+
+from .background import start_on_first_request, start_thread
+from .cache import CACHE_REGISTRY_KEY, CATALOG_TAG, get_response_cache
+from .models.movie import Movie
+
+log = logging.getLogger(__name__)
+
+AUTOCOMPLETE_REGISTRY_KEY = 'title_index'
+
+# Jumlah kandidat koreksi per kata yang diperiksa jarak edit-nya
+MAX_CORRECTION_CANDIDATES = 64
+# Jumlah kombinasi koreksi yang dicari ulang sebagai prefix
+MAX_CORRECTED_QUERIES = 4
+
+
+def normalize_title(title):
+    """casefold + buang diakritik + rapikan spasi: 'Amélie  ' -> 'amelie'."""
+    decomposed = unicodedata.normalize('NFKD', title.casefold())
+    stripped = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return ' '.join(stripped.split())
+
+
+def trigrams(text):
+    """Trigram per kata dengan padding seperti pg_trgm ('  kata ')."""
+    grams = set()
+    for word in text.split():
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def edit_distance(a, b, max_distance):
+    """
+    Jarak Damerau-Levenshtein (optimal string alignment) antara ``a`` dan ``b``;
+    berhenti lebih awal dan mengembalikan ``max_distance + 1`` jika terlampaui.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+def max_typos(word):
+    return 1 if len(word) <= 5 else 2
+
+
+class TitleIndex:
+    """Index prefix + koreksi kata untuk judul movie. Aman dipakai banyak thread."""
+
+    # Atribut yang ditukar sekaligus oleh build()
+    _STATE = ('_titles', '_title_keys', '_word_keys', '_vocab', '_vocab_sorted', '_words_by_gram')
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()
+        self.catalog_version = 0 # Generasi CATALOG_TAG saat index terakhir dibangun
+        self._pending = None     # Edit selama build ulang, diterapkan ulang sebelum ditukar
+        self._clear()
+
+    def _clear(self):
+        self._titles = {}                     # id -> (judul asli, judul ternormalisasi)
+        self._title_keys = []                 # [(judul ternormalisasi, id)] terurut
+        self._word_keys = []                  # [(potongan judul dari kata ke-2 dst, id)] terurut
+        self._vocab = Counter()               # kata -> jumlah judul yang memakainya
+        self._vocab_sorted = []               # kosakata terurut, untuk cek prefix kata
+        self._words_by_gram = defaultdict(set)
+
+    def __len__(self):
+        return len(self._titles)
+
+    def begin_build(self):
+        """Mulai catat add / remove sampai ``build`` berikutnya (panggil sebelum membaca database)."""
+        with self._lock:
+            self._pending = []
+
+    def build(self, rows):
+        """
+        Bangun ulang seluruh index dari iterable (id, title) di luar lock, lalu
+        tukar isinya sekaligus. Edit sejak ``begin_build`` diterapkan ulang.
+        """
+        fresh = TitleIndex()
+        for movie_id, title in rows:
+            fresh._add(movie_id, title, keep_sorted=False)
+        fresh._title_keys.sort()
+        fresh._word_keys.sort()
+        fresh._vocab_sorted.sort()
+        with self._lock:
+            for movie_id, title in self._pending or ():
+                fresh._remove(movie_id)
+                if title is not None:
+                    fresh._add(movie_id, title, keep_sorted=True)
+            self._pending = None
+            for name in self._STATE:
+                setattr(self, name, getattr(fresh, name))
+
+    def abort_build(self):
+        with self._lock:
+            self._pending = None
+
+    def add(self, movie_id, title):
+        """Tambah movie, atau ganti judulnya jika id sudah ada."""
+        with self._lock:
+            self._remove(movie_id)
+            self._add(movie_id, title, keep_sorted=True)
+            if self._pending is not None:
+                self._pending.append((movie_id, title))
+
+    def remove(self, movie_id):
+        with self._lock:
+            self._remove(movie_id)
+            if self._pending is not None:
+                self._pending.append((movie_id, None))
+
+    @staticmethod
+    def _inner_keys(normalized):
+        words = normalized.split(' ')
+        return [' '.join(words[i:]) for i in range(1, len(words))]
+
+    def _insert(self, sorted_list, item, keep_sorted):
+        if keep_sorted:
+            bisect.insort(sorted_list, item)
+        else:
+            sorted_list.append(item)
+
+    @staticmethod
+    def _delete(sorted_list, item):
+        position = bisect.bisect_left(sorted_list, item)
+        if position < len(sorted_list) and sorted_list[position] == item:
+            del sorted_list[position]
+
+    def _add(self, movie_id, title, keep_sorted):
+        normalized = normalize_title(title)
+        self._titles[movie_id] = (title, normalized)
+        self._insert(self._title_keys, (normalized, movie_id), keep_sorted)
+        for key in self._inner_keys(normalized):
+            self._insert(self._word_keys, (key, movie_id), keep_sorted)
+        for word in set(normalized.split()):
+            self._vocab[word] += 1
+            if self._vocab[word] == 1:
+                self._insert(self._vocab_sorted, word, keep_sorted)
+                for gram in trigrams(word):
+                    self._words_by_gram[gram].add(word)
+
+    def _remove(self, movie_id):
+        entry = self._titles.pop(movie_id, None)
+        if entry is None:
+            return
+        normalized = entry[1]
+        self._delete(self._title_keys, (normalized, movie_id))
+        for key in self._inner_keys(normalized):
+            self._delete(self._word_keys, (key, movie_id))
+        for word in set(normalized.split()):
+            self._vocab[word] -= 1
+            if self._vocab[word] == 0:
+                del self._vocab[word]
+                self._delete(self._vocab_sorted, word)
+                for gram in trigrams(word):
+                    words = self._words_by_gram[gram]
+                    words.discard(word)
+                    if not words:
+                        del self._words_by_gram[gram]
+
+    def complete(self, q, limit=10):
+        """
+        Saran judul untuk input ``q``: judul yang diawali ``q`` (urut abjad),
+        lalu judul yang memuat kata berawalan ``q``, lalu hasil yang sama untuk
+        input yang sudah dikoreksi jika masih kurang dari ``limit``.
+        """
+        prefix = normalize_title(q)
+        if not prefix or limit < 1:
+            return []
+        with self._lock:
+            results = []
+            seen = set()
+            self._collect(prefix, limit, results, seen)
+            if len(results) < limit:
+                for corrected in self._corrected_queries(prefix):
+                    self._collect(corrected, limit, results, seen)
+                    if len(results) >= limit:
+                        break
+            return [{'id': movie_id, 'title': self._titles[movie_id][0]} for movie_id in results]
+
+    def _collect(self, prefix, limit, results, seen):
+        for sorted_keys in (self._title_keys, self._word_keys):
+            position = bisect.bisect_left(sorted_keys, (prefix,))
+            while position < len(sorted_keys) and len(results) < limit:
+                key, movie_id = sorted_keys[position]
+                if not key.startswith(prefix):
+                    break
+                if movie_id not in seen:
+                    seen.add(movie_id)
+                    results.append(movie_id)
+                position += 1
+
+    def _has_word_prefix(self, prefix):
+        position = bisect.bisect_left(self._vocab_sorted, prefix)
+        return position < len(self._vocab_sorted) and self._vocab_sorted[position].startswith(prefix)
+
+    def _corrected_queries(self, normalized):
+        words = normalized.split(' ')
+        options = []
+        for i, word in enumerate(words):
+            is_last = i == len(words) - 1
+            # Kata terakhir mungkin belum selesai diketik: cukup cocok sebagai prefix
+            known = self._has_word_prefix(word) if is_last else word in self._vocab
+            options.append([word] if known else self._best_corrections(word, is_last))
+            if not options[-1]:
+                return []
+        combos = itertools.islice(itertools.product(*options), MAX_CORRECTED_QUERIES + 1)
+        return [' '.join(c) for c in combos if ' '.join(c) != normalized][:MAX_CORRECTED_QUERIES]
+
+    def _best_corrections(self, word, as_prefix, count=2):
+        grams = trigrams(word)
+        if as_prefix:
+            # Kata belum lengkap: trigram penutup ('rd ') belum tentu ada di kata aslinya
+            grams = {g for g in grams if not g.endswith(' ')}
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._words_by_gram.get(gram, ()))
+        allowed = max_typos(word)
+        scored = []
+        for candidate, _ in shared.most_common(MAX_CORRECTION_CANDIDATES):
+            if as_prefix:
+                # Bandingkan dengan awal kata kandidat sepanjang input (+/- 1 huruf)
+                distance = min(edit_distance(word, candidate[:len(word) + d], allowed)
+                               for d in (-1, 0, 1))
+            else:
+                distance = edit_distance(word, candidate, allowed)
+            if distance <= allowed:
+                scored.append((distance, -self._vocab[candidate], candidate))
+        scored.sort()
+        return [candidate for _, _, candidate in scored[:count]]
+
+
+def get_title_index(request):
+    return request.registry.get(AUTOCOMPLETE_REGISTRY_KEY)
+
+
+def load_title_index(index, session_factory):
+    """Isi index dari tabel movies; isi lama dipertahankan jika database belum siap."""
+    index.begin_build()
+    dbsession = session_factory()
+    try:
+        # Baca dulu di luar lock index: request autocomplete tetap dilayani selama query
+        index.build(list(dbsession.query(Movie.id, Movie.title).yield_per(1000)))
+        log.info('Autocomplete title index built with %d movies', len(index))
+    except DBAPIError as e:
+        index.abort_build()
+        log.warning('Autocomplete title index not built: %s', e)
+    finally:
+        dbsession.close()
+
+
+def rebuild_title_index(index, session_factory, cache=None):
+    """
+    Bangun ulang ``index`` di thread ``autocomplete-index``. Hanya satu build
+    sekaligus; kembalikan thread-nya, atau None jika build lain masih berjalan.
+    """
+    if not index._refresh_lock.acquire(blocking=False):
+        return None
+
+    def rebuild():
+        try:
+            # Dibaca sebelum build: import yang berjalan bersamaan tetap terdeteksi
+            version = cache.generation(CATALOG_TAG) if cache is not None else index.catalog_version
+            load_title_index(index, session_factory)
+            index.catalog_version = version
+        except Exception:
+            log.exception('Autocomplete title index rebuild failed')
+        finally:
+            index._refresh_lock.release()
+
+    return start_thread(rebuild, 'autocomplete-index')
+
+
+def get_current_title_index(request):
+    """
+    Index untuk request ini. Jika versi katalog di cache respons sudah berubah
+    (mis. ``import_movies`` di proses lain), build ulang dimulai di latar
+    belakang; request ini dan berikutnya memakai isi lama sampai selesai.
+    """
+    index = get_title_index(request)
+    cache = get_response_cache(request)
+    if index is None or cache is None:
+        return index
+    if cache.generation(CATALOG_TAG) != index.catalog_version:
+        rebuild_title_index(index, request.registry['dbsession_factory'], cache)
+    return index
+
+
+def _after_commit(request, callback):
+    index = get_title_index(request)
+    if index is None:
+        return
+
+    def index_hook(success):
+        if success:
+            callback(index)
+
+    request.tm.get().addAfterCommitHook(index_hook)
+
+
+def index_title_after_commit(request, movie_id, title):
+    """Tambah / ganti judul di index setelah transaksi request commit."""
+    _after_commit(request, lambda index: index.add(movie_id, title))
+
+
+def unindex_title_after_commit(request, movie_id):
+    _after_commit(request, lambda index: index.remove(movie_id))
+
+
+def includeme(config):
+    """
+    Daftarkan index autocomplete: ``config.include('backend.autocomplete')``.
+    Harus di-include setelah ``backend.models`` (butuh dbsession_factory).
+    """
+    settings = config.get_settings()
+    index = TitleIndex()
+    config.registry[AUTOCOMPLETE_REGISTRY_KEY] = index
+    if asbool(settings.get('autocomplete.build_on_startup', True)):
+        session_factory = config.registry['dbsession_factory']
+        cache = config.registry.get(CACHE_REGISTRY_KEY)
+        start_on_first_request(config, lambda: rebuild_title_index(index, session_factory, cache))
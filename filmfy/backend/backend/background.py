@@ -0,0 +1,44 @@
+"""
+Thread latar belakang (reaper file, janitor sesi, index autocomplete) yang
+baru dijalankan saat aplikasi melayani request pertamanya.
+
+Script yang memakai ``bootstrap()`` (import_movies, export_catalog, ...) dan
+proses induk reloader memuat aplikasi lewat ``main()`` dan .ini yang sama
+dengan server, tetapi tidak pernah melayani request; pekerjaan yang
+didaftarkan di sini tidak berjalan di sana::
+
+    start_on_first_request(config, reaper.start)
+"""
+import threading
+
+from pyramid.events import NewRequest
+
+
+class StartOnFirstRequest:
+    """Subscriber ``NewRequest`` yang memanggil ``start()`` sekali, saat request pertama dilayani."""
+
+    def __init__(self, start):
+        self.start = start
+        self.started = False
+        self._lock = threading.Lock()
+
+    def __call__(self, event):
+        if self.started:
+            return
+        with self._lock: # Beberapa worker thread bisa menerima request pertama bersamaan
+            if self.started:
+                return
+            self.start()
+            self.started = True
+
+
+def start_on_first_request(config, start):
+    """Panggil ``start()`` (harus cepat, mis. ``Thread.start``) pada request pertama."""
+    config.add_subscriber(StartOnFirstRequest(start), NewRequest)
+
+
+def start_thread(target, name):
+    """Jalankan ``target`` di thread daemon ``name``; kembalikan thread-nya."""
+    thread = threading.Thread(target=target, name=name, daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,254 @@
+"""
+Cache respons untuk endpoint katalog movie yang publik (api_movies_list,
+api_movie_detail).
+
+Yang disimpan adalah body JSON yang sudah di-render, dengan key
+route + query params + application_url. Setiap entri diberi sebuah *tag*
+(misalnya ``movies:list`` atau ``movies:12``) sehingga view yang menulis
+data bisa meng-invalidate entri yang terpengaruh saja.
+
+Backend dipilih lewat file .ini::
+
+    cache.backend = memory        # memory | sqlite | none
+    cache.ttl = 60                # detik
+    cache.max_entries = 1024
+    cache.sqlite_path = %(here)s/data/response_cache.sqlite
+
+Backend ``sqlite`` berbagi isi cache dan invalidasi antar beberapa proses
+waitress yang memakai file yang sama.
+"""
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode
+
+from pyramid.response import Response
+
+CACHE_REGISTRY_KEY = 'response_cache'
+
+# Tag untuk semua bentuk listing katalog (paged, ?all=1, filter, dsb.)
+MOVIE_LIST_TAG = 'movies:list'
+# Versi katalog: dinaikkan oleh perubahan massal (import_movies) sehingga proses
+# server lain tahu index per proses (autocomplete) harus dibangun ulang
+CATALOG_TAG = 'movies:catalog'
+
+
+def movie_tag(movie_id):
+    """Tag untuk entri cache detail satu movie."""
+    return f'movies:{movie_id}'
+
+
+class MemoryResponseCache:
+    """
+    Cache LRU + TTL di memori proses. Aman dipakai banyak thread waitress.
+    """
+
+    def __init__(self, max_entries=1024, ttl=60, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict() # key -> (expires_at, tag, body)
+        self._generations = {}        # tag -> counter invalidasi
+        self._lock = threading.Lock()
+
+    def generation(self, tag):
+        with self._lock:
+            return self._generations.get(tag, 0)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, _, body = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return body
+
+    def set(self, key, tag, body, generation):
+        with self._lock:
+            # Jangan simpan body yang di-render sebelum invalidasi terakhir
+            if self._generations.get(tag, 0) != generation:
+                return False
+            self._entries[key] = (self._clock() + self.ttl, tag, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return True
+
+    def invalidate(self, *tags):
+        tags = set(tags)
+        with self._lock:
+            for tag in tags:
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+            for key in [k for k, (_, tag, _) in self._entries.items() if tag in tags]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteResponseCache:
+    """
+    Cache TTL di file SQLite (mode WAL) yang bisa dibagi beberapa proses.
+    Entri terlama dibuang ketika jumlahnya melewati ``max_entries``.
+    """
+
+    def __init__(self, path, max_entries=1024, ttl=60, clock=time.time):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS response_cache ('
+                ' key TEXT PRIMARY KEY, tag TEXT NOT NULL,'
+                ' body BLOB NOT NULL, expires_at REAL NOT NULL)')
+            conn.execute(
+                'CREATE INDEX IF NOT EXISTS ix_response_cache_tag'
+                ' ON response_cache (tag)')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS response_cache_tags ('
+                ' tag TEXT PRIMARY KEY, generation INTEGER NOT NULL)')
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def generation(self, tag):
+        row = self._connect().execute(
+            'SELECT generation FROM response_cache_tags WHERE tag = ?', (tag,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def get(self, key):
+        row = self._connect().execute(
+            'SELECT body FROM response_cache WHERE key = ? AND expires_at > ?',
+            (key, self._clock())
+        ).fetchone()
+        return bytes(row[0]) if row else None
+
+    def set(self, key, tag, body, generation):
+        with self._connect() as conn:
+            # Insert bersyarat: batal jika tag sudah di-invalidate proses lain
+            cursor = conn.execute(
+                'INSERT OR REPLACE INTO response_cache (key, tag, body, expires_at)'
+                ' SELECT ?, ?, ?, ?'
+                ' WHERE COALESCE((SELECT generation FROM response_cache_tags'
+                '                 WHERE tag = ?), 0) = ?',
+                (key, tag, body, self._clock() + self.ttl, tag, generation))
+            if cursor.rowcount:
+                conn.execute(
+                    'DELETE FROM response_cache WHERE key IN ('
+                    ' SELECT key FROM response_cache'
+                    ' ORDER BY expires_at DESC LIMIT -1 OFFSET ?)',
+                    (self.max_entries,))
+            return bool(cursor.rowcount)
+
+    def invalidate(self, *tags):
+        with self._connect() as conn:
+            for tag in set(tags):
+                conn.execute(
+                    'INSERT INTO response_cache_tags (tag, generation) VALUES (?, 1)'
+                    ' ON CONFLICT(tag) DO UPDATE SET generation = generation + 1',
+                    (tag,))
+                conn.execute('DELETE FROM response_cache WHERE tag = ?', (tag,))
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute('DELETE FROM response_cache')
+
+
+def cache_from_settings(settings, prefix='cache.'):
+    """Buat backend cache dari settings .ini; None jika cache dimatikan."""
+    backend = settings.get(prefix + 'backend', 'none').strip().lower()
+    ttl = int(settings.get(prefix + 'ttl', 60))
+    max_entries = int(settings.get(prefix + 'max_entries', 1024))
+    if backend in ('none', 'off', ''):
+        return None
+    if backend == 'memory':
+        return MemoryResponseCache(max_entries=max_entries, ttl=ttl)
+    if backend == 'sqlite':
+        path = settings.get(prefix + 'sqlite_path')
+        if not path:
+            raise ValueError(f'{prefix}sqlite_path is required for the sqlite cache backend')
+        return SQLiteResponseCache(path, max_entries=max_entries, ttl=ttl)
+    raise ValueError(f'Unknown {prefix}backend: {backend!r}')
+
+
+def get_response_cache(request):
+    return request.registry.get(CACHE_REGISTRY_KEY)
+
+
+def cache_key(request):
+    """route + query params (terurut) + application_url."""
+    route_name = request.matched_route.name if request.matched_route else request.path
+    query = urlencode(sorted(request.GET.items()))
+    return f'{route_name}|{request.path}?{query}|{request.application_url}'
+
+
+def cached_json_view(tag_for_request):
+    """
+    View decorator (``@view_config(decorator=...)``) yang menyajikan body JSON
+    dari cache, atau menyimpan respons 200 hasil view ke cache.
+    Respons streaming (app_iter generator) tidak pernah di-cache.
+    """
+    def decorator(view):
+        def cached_view(context, request):
+            cache = get_response_cache(request)
+            if cache is None:
+                return view(context, request)
+            key = cache_key(request)
+            body = cache.get(key)
+            if body is not None:
+                response = Response(body=body, content_type='application/json')
+                response.headers['X-Cache'] = 'HIT'
+                return response
+
+            tag = tag_for_request(request)
+            generation = cache.generation(tag)
+            response = view(context, request)
+            if (response.status_code == 200 and
+                    response.content_type == 'application/json' and
+                    isinstance(response.app_iter, (list, tuple))):
+                cache.set(key, tag, response.body, generation)
+                response.headers['X-Cache'] = 'MISS'
+            return response
+        return cached_view
+    return decorator
+
+
+def invalidate_after_commit(request, *tags):
+    """
+    Invalidate tag cache setelah transaksi request (pyramid_tm) berhasil commit,
+    agar pembaca lain tidak mengisi ulang cache dengan data sebelum commit.
+    """
+    cache = get_response_cache(request)
+    if cache is None:
+        return
+
+    def invalidate_hook(success):
+        if success:
+            cache.invalidate(*tags)
+
+    request.tm.get().addAfterCommitHook(invalidate_hook)
+
+
+def includeme(config):
+    """
+    Aktifkan cache respons: ``config.include('backend.cache')``.
+    """
+    config.registry[CACHE_REGISTRY_KEY] = cache_from_settings(config.get_settings())
@@ -0,0 +1,103 @@
+"""
+CORS untuk API sebagai tween paling luar (di atas pyramid_tm).
+
+Preflight ``OPTIONS /api/...`` dijawab langsung oleh tween tanpa routing,
+transaksi database, maupun session. Respons lain mendapat header CORS hanya
+jika ``Origin`` ada di allow-list. Semua header yang tidak bergantung pada
+request dihitung sekali saat startup sebagai tuple.
+
+Konfigurasi di file .ini::
+
+    cors.allow_origins = http://localhost:5173 https://filmfy.example.com
+    cors.allow_credentials = true
+    cors.allow_methods = POST,GET,DELETE,PUT,OPTIONS
+    cors.allow_headers = Origin, Content-Type, Accept, Authorization
+    cors.max_age = 1728000
+
+``*`` di ``cors.allow_origins`` mengizinkan semua origin (origin request
+dipantulkan) dan hanya boleh dipakai dengan ``cors.allow_credentials =
+false``: kombinasi keduanya berarti situs mana pun bisa memanggil API
+dengan cookie session user. Semua respons mendapat ``Vary: Origin`` agar
+cache bersama tidak menyajikan respons untuk origin lain.
+"""
+from pyramid.httpexceptions import HTTPForbidden
+from pyramid.response import Response
+from pyramid.settings import asbool, aslist
+from pyramid.tweens import INGRESS
+
+DEFAULT_ALLOW_ORIGINS = 'http://localhost:5173'
+DEFAULT_ALLOW_METHODS = 'POST,GET,DELETE,PUT,OPTIONS'
+DEFAULT_ALLOW_HEADERS = 'Origin, Content-Type, Accept, Authorization'
+DEFAULT_MAX_AGE = 1728000
+
+# Prefix path yang preflight-nya dijawab oleh tween (dulu route catch-all /api/*)
+API_PATH_PREFIX = '/api/'
+
+
+class CORSPolicy:
+    """Allow-list origin + header CORS yang sudah dihitung sebelumnya."""
+
+    def __init__(self, allow_origins=(DEFAULT_ALLOW_ORIGINS,), allow_credentials=True,
+                 allow_methods=DEFAULT_ALLOW_METHODS, allow_headers=DEFAULT_ALLOW_HEADERS,
+                 max_age=DEFAULT_MAX_AGE):
+        self.allow_any = '*' in allow_origins
+        self.allow_origins = frozenset(allow_origins)
+        credentials = (('Access-Control-Allow-Credentials', 'true'),) if allow_credentials else ()
+        self.response_headers = credentials
+        self.preflight_headers = credentials + (
+            ('Access-Control-Allow-Methods', allow_methods),
+            ('Access-Control-Allow-Headers', allow_headers),
+            ('Access-Control-Max-Age', str(max_age)),
+            ('Vary', 'Origin'),
+        )
+
+    def allows(self, origin):
+        return self.allow_any or origin in self.allow_origins
+
+
+def cors_policy_from_settings(settings, prefix='cors.'):
+    allow_origins = aslist(settings.get(prefix + 'allow_origins', DEFAULT_ALLOW_ORIGINS))
+    allow_credentials = asbool(settings.get(prefix + 'allow_credentials', True))
+    if '*' in allow_origins and allow_credentials:
+        raise ValueError(f'{prefix}allow_origins = * requires {prefix}allow_credentials = false')
+    return CORSPolicy(
+        allow_origins=allow_origins,
+        allow_credentials=allow_credentials,
+        allow_methods=settings.get(prefix + 'allow_methods', DEFAULT_ALLOW_METHODS),
+        allow_headers=settings.get(prefix + 'allow_headers', DEFAULT_ALLOW_HEADERS),
+        max_age=int(settings.get(prefix + 'max_age', DEFAULT_MAX_AGE)),
+    )
+
+
+def _vary_origin(response):
+    vary = list(response.vary or ())
+    if 'Origin' not in vary:
+        response.vary = vary + ['Origin']
+    return response
+
+
+def cors_tween_factory(handler, registry):
+    policy = cors_policy_from_settings(registry.settings)
+
+    def cors_tween(request):
+        origin = request.headers.get('Origin')
+        if request.method == 'OPTIONS' and request.path.startswith(API_PATH_PREFIX):
+            if origin is None or 'Access-Control-Request-Method' not in request.headers:
+                return _vary_origin(Response(status=204)) # OPTIONS biasa, bukan preflight browser
+            if not policy.allows(origin):
+                return _vary_origin(HTTPForbidden(json_body={'error': 'Origin not allowed.'}))
+            return Response(status=204, headerlist=[
+                ('Access-Control-Allow-Origin', origin), *policy.preflight_headers])
+
+        response = handler(request)
+        if origin is not None and policy.allows(origin):
+            response.headerlist.append(('Access-Control-Allow-Origin', origin))
+            response.headerlist.extend(policy.response_headers)
+        return _vary_origin(response) # Juga tanpa / dengan origin ditolak: respons bisa di-cache
+
+    return cors_tween
+
+
+def includeme(config):
+    """Pasang tween CORS paling luar: ``config.include('backend.cors')``."""
+    config.add_tween('backend.cors.cors_tween_factory', under=INGRESS)
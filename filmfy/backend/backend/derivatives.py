@@ -0,0 +1,248 @@
+"""
+Versi kecil (thumbnail) poster movie dan foto profil, plus varian WebP.
+
+Setiap upload mendapat versi untuk setiap lebar di ``images.widths``: satu
+WebP dan, untuk JPEG / PNG, satu di format aslinya. Nama file-nya tetap
+(lihat backend.storage.variant_name), jadi ``to_dict`` bisa langsung
+memberi ``srcset`` per MIME type tanpa menunggu file dibuat::
+
+    'poster_srcset': {
+        'image/webp': '.../ab/cd/<sha256>-w160.webp 160w, ...-w320.webp 320w, ...',
+        'image/jpeg': '.../ab/cd/<sha256>-w160.jpg 160w, ...',
+    }
+
+Pembuatan file berjalan di process pool setelah transaksi upload commit,
+di luar jalur request. Selama belum selesai (atau untuk file lama sebelum
+backfill ``generate_image_derivatives``), URL versi kecil yang belum ada
+di-redirect ke file aslinya dan pembuatannya dijadwalkan.
+
+Konfigurasi di file .ini::
+
+    images.executor = process     # process | thread | none (inline setelah commit)
+    images.workers = 1
+    images.widths = 160 320 640
+    images.webp_quality = 80
+
+Gambar yang lebih sempit dari sebuah lebar tidak diperbesar; file untuk
+lebar itu tetap dibuat dengan ukuran aslinya agar srcset selalu lengkap.
+"""
+import logging
+import multiprocessing
+import os
+import re
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from PIL import Image, ImageOps
+from pyramid.httpexceptions import HTTPFound, HTTPNotFound
+from pyramid.settings import aslist
+
+from .storage import UPLOAD_PREFIXES, upload_storage, variant_name
+
+log = logging.getLogger(__name__)
+
+DERIVATIVES_REGISTRY_KEY = 'image_derivatives'
+
+DEFAULT_WIDTHS = (160, 320, 640)
+DEFAULT_WEBP_QUALITY = 80
+JPEG_QUALITY = 85
+
+# (format Pillow, MIME, ekstensi file) per jenis versi kecil
+WEBP = ('WEBP', 'image/webp', 'webp')
+ORIGINAL_FORMATS = {
+    '.jpg': ('JPEG', 'image/jpeg', 'jpg'),
+    '.jpeg': ('JPEG', 'image/jpeg', 'jpg'),
+    '.png': ('PNG', 'image/png', 'png'),
+}
+
+# URL versi kecil yang belum ada: /static/<prefix>/.../<nama>-w<lebar>.<ext>
+MISSING_VARIANT_PATH = r'^/static/({})/.+-w\d+\.[a-z0-9]+$'.format('|'.join(UPLOAD_PREFIXES))
+
+
+def variant_formats(path):
+    """Format versi kecil untuk ``path``: selalu WebP, plus format aslinya jika JPEG / PNG."""
+    original = ORIGINAL_FORMATS.get(os.path.splitext(path)[1].lower())
+    return [WEBP, original] if original is not None else [WEBP]
+
+
+def missing_variants(full_path, widths):
+    return [
+        (width, fmt) for width in widths for fmt in variant_formats(full_path)
+        if not os.path.exists(variant_name(full_path, width, fmt[2]))
+    ]
+
+
+def _save_atomic(image, path, pil_format, **options):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.variant-')
+    try:
+        with os.fdopen(fd, 'wb') as output:
+            image.save(output, pil_format, **options)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+        tmp_path = None
+    finally:
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def generate_derivatives(full_path, widths=DEFAULT_WIDTHS, webp_quality=DEFAULT_WEBP_QUALITY):
+    """
+    Buat versi kecil ``full_path`` yang belum ada; kembalikan jumlah file yang dibuat.
+    Fungsi level modul agar bisa dijalankan di ProcessPoolExecutor.
+    """
+    targets = missing_variants(full_path, widths)
+    if not targets:
+        return 0
+    with Image.open(full_path) as opened:
+        image = ImageOps.exif_transpose(opened)
+        image.load()
+    for width, (pil_format, _, ext) in targets:
+        resized = image
+        if image.width > width:
+            height = max(1, round(image.height * width / image.width))
+            resized = image.resize((width, height), Image.Resampling.LANCZOS)
+        if pil_format == 'JPEG':
+            resized = resized.convert('RGB') if resized.mode not in ('RGB', 'L') else resized
+            options = {'quality': JPEG_QUALITY, 'optimize': True, 'progressive': True}
+        elif pil_format == 'WEBP':
+            resized = resized.convert('RGBA') if resized.mode not in ('RGB', 'RGBA', 'L') else resized
+            options = {'quality': webp_quality, 'method': 4}
+        else:
+            options = {'optimize': True}
+        _save_atomic(resized, variant_name(full_path, width, ext), pil_format, **options)
+    return len(targets)
+
+
+class DerivativePipeline:
+    """Penjadwal pembuatan versi kecil di luar request (fire-and-forget)."""
+
+    def __init__(self, widths=DEFAULT_WIDTHS, webp_quality=DEFAULT_WEBP_QUALITY,
+                 workers=1, executor='process'):
+        self.widths = tuple(widths)
+        self.webp_quality = webp_quality
+        self._pending = set()
+        self._lock = threading.Lock()
+        if executor == 'process':
+            self._executor = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        elif executor == 'thread':
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='derivatives')
+        else:
+            self._executor = None # Inline di thread pemanggil
+
+    def submit(self, full_path):
+        """Jadwalkan ``full_path``; file yang sedang diproses tidak dijadwalkan dua kali."""
+        with self._lock:
+            if full_path in self._pending:
+                return
+            self._pending.add(full_path)
+        if self._executor is None:
+            try:
+                generate_derivatives(full_path, self.widths, self.webp_quality)
+            except Exception:
+                log.exception('Failed to generate image derivatives for %s', full_path)
+            finally:
+                self._discard(full_path)
+            return
+        future = self._executor.submit(generate_derivatives, full_path, self.widths, self.webp_quality)
+        future.add_done_callback(lambda done: self._finished(full_path, done))
+
+    def _discard(self, full_path):
+        with self._lock:
+            self._pending.discard(full_path)
+
+    def _finished(self, full_path, future):
+        self._discard(full_path)
+        if future.exception() is not None:
+            log.error('Failed to generate image derivatives for %s: %s', full_path, future.exception())
+
+    def srcset(self, base_url, path):
+        """``{'image/webp': 'url 160w, ...', ...}`` untuk ``path`` relatif di bawah /static/."""
+        return {
+            mime: ', '.join(f'{base_url}/static/{variant_name(path, width, ext)} {width}w'
+                            for width in self.widths)
+            for _, mime, ext in variant_formats(path)
+        }
+
+    def shutdown(self, wait=True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+
+
+def derivative_pipeline_from_settings(settings, prefix='images.'):
+    """Buat pipeline dari settings .ini; ``images.widths`` kosong mematikan fitur ini."""
+    widths = tuple(sorted({int(width) for width in aslist(settings.get(prefix + 'widths', ''))})) \
+        if prefix + 'widths' in settings else DEFAULT_WIDTHS
+    if not widths:
+        return None
+    if any(width < 1 for width in widths):
+        raise ValueError(f'{prefix}widths must be positive integers')
+    executor = settings.get(prefix + 'executor', 'process').strip().lower()
+    if executor in ('none', 'off', 'inline', ''):
+        executor = 'none'
+    elif executor not in ('thread', 'process'):
+        raise ValueError(f'Unknown {prefix}executor: {executor!r}')
+    return DerivativePipeline(
+        widths=widths,
+        webp_quality=int(settings.get(prefix + 'webp_quality', DEFAULT_WEBP_QUALITY)),
+        workers=int(settings.get(prefix + 'workers', 1)),
+        executor=executor,
+    )
+
+
+def get_derivative_pipeline(request):
+    return request.registry.get(DERIVATIVES_REGISTRY_KEY)
+
+
+def image_srcset(request, path):
+    """srcset versi kecil untuk ``to_dict``; None tanpa path, request, atau pipeline."""
+    if not path or request is None:
+        return None
+    pipeline = get_derivative_pipeline(request)
+    if pipeline is None:
+        return None
+    return pipeline.srcset(request.application_url, path)
+
+
+def generate_derivatives_after_commit(request, storage, path):
+    """Jadwalkan versi kecil ``path`` setelah transaksi request (pyramid_tm) berhasil commit."""
+    pipeline = get_derivative_pipeline(request)
+    if pipeline is None or not path:
+        return
+    full_path = storage.full_path(path)
+
+    def generate_hook(success):
+        if success:
+            pipeline.submit(full_path)
+
+    request.tm.get().addAfterCommitHook(generate_hook)
+
+
+def missing_variant_view(request):
+    """
+    Versi kecil yang belum dibuat: redirect sementara ke file asli dan
+    jadwalkan pembuatannya (404 biasa jika file aslinya juga tidak ada).
+    """
+    prefix, _, rel = request.path[len('/static/'):].partition('/')
+    storage = upload_storage(prefix)
+    try:
+        original = storage.original_for_variant(f'{prefix}/{rel}')
+    except ValueError:
+        original = None
+    if original is None:
+        return HTTPNotFound()
+    pipeline = get_derivative_pipeline(request)
+    if pipeline is not None:
+        pipeline.submit(storage.full_path(original))
+    response = HTTPFound(location=f'{request.application_url}/static/{original}')
+    response.cache_control.no_store = True # Versi kecil segera tersedia; jangan cache redirect
+    return response
+
+
+def includeme(config):
+    """Daftarkan pipeline versi kecil: ``config.include('backend.derivatives')``."""
+    pipeline = derivative_pipeline_from_settings(config.get_settings())
+    config.registry[DERIVATIVES_REGISTRY_KEY] = pipeline
+    if pipeline is not None:
+        config.add_notfound_view(missing_variant_view, path_info=re.compile(MISSING_VARIANT_PATH))
@@ -0,0 +1,157 @@
+"""
+Export katalog (dan opsional users, tanpa hash password) sebagai stream byte
+dengan memori konstan, dipakai oleh GET /api/export/{table} dan CLI
+``export_catalog``.
+
+Baris dibaca per batch lewat ``stream_results`` (server-side cursor di
+PostgreSQL) + ``yield_per``, lalu di-encode ke salah satu format:
+
+- ``ndjson``: satu objek JSON per baris.
+- ``csv``: header + baris; bisa langsung di-import ulang dengan ``import_movies``.
+- ``columnar``: NDJSON per kolom ala row group Parquet. Baris pertama adalah
+  header ``{"format": "filmfy-columnar", "version": 1, "columns": [...]}``,
+  setiap baris berikutnya satu batch ``{"rows": n, "data": {"kolom": [...]}}``.
+  Nilai sejenis berdekatan sehingga jauh lebih ringkas setelah gzip.
+
+Output bisa di-gzip on the fly (``iter_gzip``) tanpa menampung seluruh file.
+
+Konfigurasi di file .ini::
+
+    export.allow_users = true     # default false
+    export.admin_ids = 1 7        # id user yang boleh mengunduh tabel users
+"""
+import csv
+import datetime
+import io
+import json
+import zlib
+
+from pyramid.settings import aslist
+from sqlalchemy import select
+
+from .models.movie import Movie
+from .models.user import User
+
+EXPORT_ADMIN_IDS_REGISTRY_KEY = 'export_admin_ids'
+
+EXPORT_BATCH_SIZE = 1000
+
+# Kolom yang diekspor per tabel; hashed_password sengaja tidak pernah ikut
+EXPORT_TABLES = {
+    'movies': (Movie.id, Movie.title, Movie.genre, Movie.release_year, Movie.rating,
+               Movie.poster_path, Movie.updated_at),
+    'users': (User.id, User.username, User.email, User.bio, User.profile_photo),
+}
+
+EXPORT_FORMATS = {
+    # format -> (content type, ekstensi file)
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'csv': ('text/csv', 'csv'),
+    'columnar': ('application/x-ndjson', 'columnar.ndjson'),
+}
+
+COLUMNAR_FORMAT_NAME = 'filmfy-columnar'
+COLUMNAR_FORMAT_VERSION = 1
+
+
+def _json_value(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    return value
+
+
+def iter_rows(dbsession, table, batch_size=EXPORT_BATCH_SIZE):
+    """Yield list baris (tuple) per batch, urut id, tanpa memuat seluruh tabel."""
+    columns = EXPORT_TABLES[table]
+    stmt = (select(*columns)
+            .order_by(columns[0])
+            .execution_options(stream_results=True, yield_per=batch_size))
+    for partition in dbsession.execute(stmt).partitions():
+        yield [tuple(_json_value(value) for value in row) for row in partition]
+
+
+def _encode_ndjson(names, batches):
+    for rows in batches:
+        yield ''.join(json.dumps(dict(zip(names, row))) + '\n' for row in rows)
+
+
+def _encode_csv(names, batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(names)
+    for rows in batches:
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue() # Tabel kosong: hanya header
+
+
+def _encode_columnar(names, batches):
+    yield json.dumps({'format': COLUMNAR_FORMAT_NAME, 'version': COLUMNAR_FORMAT_VERSION,
+                      'columns': list(names)}) + '\n'
+    for rows in batches:
+        data = dict(zip(names, (list(column) for column in zip(*rows))))
+        yield json.dumps({'rows': len(rows), 'data': data}) + '\n'
+
+
+_ENCODERS = {
+    'ndjson': _encode_ndjson,
+    'csv': _encode_csv,
+    'columnar': _encode_columnar,
+}
+
+
+def iter_export(dbsession, table, fmt, batch_size=EXPORT_BATCH_SIZE):
+    """Yield bytes hasil export ``table`` dalam format ``fmt`` (satu chunk per batch)."""
+    names = [column.key for column in EXPORT_TABLES[table]]
+    for text in _ENCODERS[fmt](names, iter_rows(dbsession, table, batch_size)):
+        yield text.encode('utf-8')
+
+
+def iter_gzip(chunks, level=6):
+    """Kompres iterable bytes menjadi stream gzip, chunk demi chunk."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS) # 16+: header gzip
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def iter_export_response(session_factory, table, fmt, gzip=False, batch_size=EXPORT_BATCH_SIZE):
+    """
+    Generator untuk ``Response(app_iter=...)``. Memakai session sendiri
+    (bukan request.dbsession) karena app_iter baru dikonsumsi setelah
+    pyramid_tm menutup transaksi request.
+    """
+    dbsession = session_factory()
+    try:
+        chunks = iter_export(dbsession, table, fmt, batch_size)
+        yield from (iter_gzip(chunks) if gzip else chunks)
+    finally:
+        dbsession.close()
+
+
+def export_filename(table, fmt, gzip=False):
+    _, extension = EXPORT_FORMATS[fmt]
+    return f'{table}.{extension}' + ('.gz' if gzip else '')
+
+
+def export_admin_ids_from_settings(settings):
+    """``export.admin_ids`` sebagai frozenset id user; ValueError untuk id yang bukan angka."""
+    values = aslist(settings.get('export.admin_ids', ''))
+    invalid = [value for value in values if not value.isdigit()]
+    if invalid:
+        raise ValueError(f'Invalid export.admin_ids: {", ".join(invalid)}')
+    return frozenset(int(value) for value in values)
+
+
+def get_export_admin_ids(request):
+    return request.registry.get(EXPORT_ADMIN_IDS_REGISTRY_KEY, frozenset())
+
+
+def includeme(config):
+    """Baca ``export.*`` sekali saat startup: ``config.include('backend.export')``."""
+    config.registry[EXPORT_ADMIN_IDS_REGISTRY_KEY] = export_admin_ids_from_settings(config.get_settings())
@@ -1,5 +1,12 @@
-from sqlalchemy import engine_from_config
-from sqlalchemy.orm import sessionmaker
+import functools
+import itertools
+import time
+
+from pyramid.interfaces import IRoutesMapper
+from pyramid.settings import aslist
+from sqlalchemy import engine_from_config, event
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.orm import configure_mappers
 import zope.sqlalchemy
 
@@ -7,15 +14,100 @@ import zope.sqlalchemy
 # Base.metadata prior to any initialization routines
 from .mymodel import MyModel  # flake8: noqa
 from .movie import Movie
+from .facet import MovieFacet
 from .user import User
+from .blob import Blob
 
 # run configure_mappers after defining all of the models to ensure
 # all relationships can be setup
 configure_mappers()
 
 
+# Setting replica dibaca terpisah dan tidak boleh sampai ke create_engine() primary
+REPLICA_PREFIX = 'replica.'
+REPLICA_ROUTING_OPTIONS = ('url', 'sticky_seconds', 'sticky_cookie')
+
+
+# PRAGMA SQLite yang boleh diatur dari .ini (``sqlite.<nama>``) beserta validasinya;
+# nilai PRAGMA tidak bisa di-bind sebagai parameter, jadi hanya nilai tervalidasi
+# yang masuk ke SQL.
+def _sqlite_choice(*choices):
+    def parse(value):
+        value = str(value).strip().lower()
+        if value not in choices:
+            raise ValueError(f'Expected one of {", ".join(choices)}, got {value!r}')
+        return value
+    return parse
+
+
+SQLITE_PRAGMAS = {
+    'journal_mode': _sqlite_choice('delete', 'truncate', 'persist', 'memory', 'wal', 'off'),
+    'synchronous': _sqlite_choice('off', 'normal', 'full', 'extra'),
+    'busy_timeout': int, # milidetik
+    'cache_size': int, # negatif = KiB, positif = jumlah halaman
+    'mmap_size': int, # byte
+}
+
+
+def sqlite_pragmas_from_settings(settings, prefix='sqlite.'):
+    """
+    PRAGMA dari ``sqlite.journal_mode``, ``sqlite.synchronous``,
+    ``sqlite.busy_timeout``, ``sqlite.cache_size`` dan ``sqlite.mmap_size``.
+    Hanya yang diisi yang dijalankan (default SQLite untuk sisanya).
+    """
+    pragmas = []
+    for name, parse in SQLITE_PRAGMAS.items():
+        value = settings.get(prefix + name)
+        if value not in (None, ''):
+            pragmas.append((name, parse(value)))
+    return pragmas
+
+
+def apply_sqlite_pragmas(engine, pragmas):
+    """Jalankan ``pragmas`` di setiap koneksi DBAPI baru; engine non-SQLite dibiarkan."""
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return engine
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas:
+                cursor.execute(f'PRAGMA {name} = {value}')
+        finally:
+            cursor.close()
+
+    return engine
+
+
 def get_engine(settings, prefix='sqlalchemy.'):
-    return engine_from_config(settings, prefix)
+    """
+    Engine primary dari ``sqlalchemy.*``. Opsi pool (``pool_size``,
+    ``max_overflow``, ``pool_pre_ping``, ``pool_recycle``) diteruskan apa
+    adanya ke ``create_engine``; PRAGMA ``sqlite.*`` dipasang untuk SQLite.
+    """
+    replica_prefix = prefix + REPLICA_PREFIX
+    options = {key: value for key, value in settings.items() if not key.startswith(replica_prefix)}
+    return apply_sqlite_pragmas(engine_from_config(options, prefix), sqlite_pragmas_from_settings(settings))
+
+
+def get_replica_engines(settings, prefix='sqlalchemy.'):
+    """
+    Engine read-only dari ``sqlalchemy.replica.url`` (satu URL atau lebih,
+    dipisah spasi / baris baru). Opsi ``sqlalchemy.replica.*`` lain, mis.
+    ``pool_size``, berlaku untuk semua replica. Tanpa URL: list kosong.
+    """
+    replica_prefix = prefix + REPLICA_PREFIX
+    options = {
+        key: value for key, value in settings.items()
+        if key.startswith(replica_prefix) and key[len(replica_prefix):] not in REPLICA_ROUTING_OPTIONS
+    }
+    pragmas = sqlite_pragmas_from_settings(settings)
+    return [
+        apply_sqlite_pragmas(
+            engine_from_config(dict(options, **{replica_prefix + 'url': url}), replica_prefix), pragmas)
+        for url in aslist(settings.get(replica_prefix + 'url', ''))
+    ]
 
 
 def get_session_factory(engine):
@@ -24,6 +116,20 @@ def get_session_factory(engine):
     return factory
 
 
+class ReadOnlySession(Session):
+    """Session untuk request read-only: tidak ikut transaksi zope dan menolak flush."""
+
+
+@event.listens_for(ReadOnlySession, 'before_flush')
+def _refuse_flush(session, flush_context, instances):
+    raise InvalidRequestError(
+        'request.dbsession read-only: hapus readonly=True dari route untuk menulis.')
+
+
+def get_readonly_session_factory(engine):
+    return sessionmaker(bind=engine, class_=ReadOnlySession)
+
+
 def get_tm_session(session_factory, transaction_manager):
     """
     Get a ``sqlalchemy.orm.Session`` instance backed by a transaction.
@@ -51,6 +157,159 @@ def get_tm_session(session_factory, transaction_manager):
     return dbsession
 
 
+class ReplicaRouter:
+    """
+    Pilih engine untuk request read-only: replica secara round-robin, atau
+    primary jika tidak ada replica / browser baru saja menulis.
+
+    Read-your-writes: request tulis yang benar-benar mengubah data memberi
+    cookie ``sticky_cookie`` berisi batas waktu; selama ``sticky_seconds``
+    request read-only dari browser itu tetap membaca primary sehingga tidak
+    melihat data lama akibat replication lag. Cookie dipakai (bukan session)
+    agar request read-only tidak perlu memuat session.
+    """
+
+    def __init__(self, primary, replicas=(), sticky_seconds=5, sticky_cookie='filmfy_primary',
+                 clock=time.time):
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.sticky_seconds = sticky_seconds
+        self.sticky_cookie = sticky_cookie
+        self._clock = clock
+        self._next_replica = itertools.cycle(self.replicas) if self.replicas else None
+
+    def engine_for(self, request):
+        if self._next_replica is None or self.is_sticky(request):
+            return self.primary
+        return next(self._next_replica)
+
+    def is_sticky(self, request):
+        try:
+            return float(request.cookies.get(self.sticky_cookie, 0)) > self._clock()
+        except ValueError:
+            return False
+
+    def stick(self, response):
+        if self.sticky_seconds > 0:
+            response.set_cookie(
+                self.sticky_cookie, str(int(self._clock() + self.sticky_seconds)),
+                max_age=self.sticky_seconds, httponly=True, samesite='Lax')
+
+
+def replica_router_from_settings(settings, primary, prefix='sqlalchemy.'):
+    replica_prefix = prefix + REPLICA_PREFIX
+    return ReplicaRouter(
+        primary,
+        get_replica_engines(settings, prefix),
+        sticky_seconds=int(settings.get(replica_prefix + 'sticky_seconds', 5)),
+        sticky_cookie=settings.get(replica_prefix + 'sticky_cookie', 'filmfy_primary'),
+    )
+
+
+WROTE_INFO_KEY = 'filmfy.wrote'
+
+
+def _mark_wrote_after_flush(dbsession, flush_context):
+    dbsession.info[WROTE_INFO_KEY] = True
+
+
+def _mark_wrote_on_dml(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info[WROTE_INFO_KEY] = True
+
+
+def track_writes(dbsession, request, router):
+    """Pasang cookie sticky-primary pada respons jika ``dbsession`` menulis."""
+    event.listen(dbsession, 'after_flush', _mark_wrote_after_flush)
+    event.listen(dbsession, 'do_orm_execute', _mark_wrote_on_dml)
+
+    def stick_if_wrote(request, response):
+        if dbsession.info.get(WROTE_INFO_KEY):
+            router.stick(response)
+
+    request.add_response_callback(stick_if_wrote)
+
+
+def get_readonly_session(session_factory, request, bind=None):
+    """
+    Session biasa (tanpa ``zope.sqlalchemy.register``) untuk request read-only.
+    Tidak pernah commit; koneksi dikembalikan ke pool saat request selesai.
+    ``bind`` memilih engine lain (replica) dari bawaan ``session_factory``.
+    """
+    dbsession = session_factory(bind=bind) if bind is not None else session_factory()
+    request.add_finished_callback(lambda r: dbsession.close())
+    return dbsession
+
+
+def readonly_session_factory_for(request):
+    """
+    Factory ``ReadOnlySession`` untuk engine yang dipilih ``ReplicaRouter`` bagi
+    ``request`` (replica, atau primary jika sticky). Untuk app_iter streaming yang
+    dikonsumsi setelah request selesai, saat request.dbsession sudah ditutup;
+    session-nya ditutup oleh pemanggil.
+    """
+    registry = request.registry
+    return functools.partial(registry['readonly_dbsession_factory'],
+                             bind=registry['replica_router'].engine_for(request))
+
+
+# --- Request read-only (tanpa pyramid_tm / pyramid_retry) ---
+READONLY_ENVIRON_KEY = 'filmfy.readonly'
+READ_METHODS = frozenset(('GET', 'HEAD'))
+
+
+class ReadOnlyRoutePredicate:
+    """
+    Predicate route ``readonly=True``. Hanya penanda (selalu cocok): request
+    GET/HEAD ke route ini dilayani tanpa transaksi, lihat
+    :func:`is_readonly_request`.
+    """
+
+    def __init__(self, val, config):
+        self.val = bool(val)
+
+    def text(self):
+        return f'readonly = {self.val}'
+
+    phash = text
+
+    def __call__(self, info, request):
+        return True
+
+
+def is_readonly_request(request):
+    """
+    ``True`` jika request GET/HEAD cocok dengan route ``readonly=True``.
+
+    Dipanggil oleh activate hook pyramid_tm / pyramid_retry, yang berjalan
+    sebelum router, jadi route dicocokkan sendiri lewat ``IRoutesMapper``.
+    Hasilnya disimpan di environ agar pencocokan hanya terjadi sekali.
+    """
+    environ = request.environ
+    readonly = environ.get(READONLY_ENVIRON_KEY)
+    if readonly is None:
+        readonly = False
+        if request.method in READ_METHODS:
+            mapper = request.registry.queryUtility(IRoutesMapper)
+            route = mapper(request)['route'] if mapper is not None else None
+            readonly = route is not None and any(
+                isinstance(p, ReadOnlyRoutePredicate) and p.val for p in route.predicates)
+        environ[READONLY_ENVIRON_KEY] = readonly
+    return readonly
+
+
+def tm_activate_hook(request):
+    return not is_readonly_request(request)
+
+
+def retry_activate_hook(request):
+    # 1 percobaan = tanpa make_body_seekable dan tanpa loop retry. Upload multipart
+    # dibaca sekali secara streaming oleh backend.uploads, jadi tidak bisa diulang.
+    if is_readonly_request(request) or request.content_type == 'multipart/form-data':
+        return 1
+    return None
+
+
 def includeme(config):
     """
     Initialize the model for a Pyramid app.
@@ -60,6 +319,10 @@ def includeme(config):
     """
     settings = config.get_settings()
     settings['tm.manager_hook'] = 'pyramid_tm.explicit_manager'
+    # Route dengan readonly=True dilewati pyramid_tm dan pyramid_retry
+    settings.setdefault('tm.activate_hook', 'backend.models.tm_activate_hook')
+    settings.setdefault('retry.activate_hook', 'backend.models.retry_activate_hook')
+    config.add_route_predicate('readonly', ReadOnlyRoutePredicate)
 
     # use pyramid_tm to hook the transaction lifecycle to the request
     config.include('pyramid_tm')
@@ -67,13 +330,25 @@ def includeme(config):
     # use pyramid_retry to retry a request when transient exceptions occur
     config.include('pyramid_retry')
 
-    session_factory = get_session_factory(get_engine(settings))
+    engine = get_engine(settings)
+    session_factory = get_session_factory(engine)
+    readonly_session_factory = get_readonly_session_factory(engine)
     config.registry['dbsession_factory'] = session_factory
+    config.registry['readonly_dbsession_factory'] = readonly_session_factory
 
-    # make request.dbsession available for use in Pyramid
-    config.add_request_method(
+    # sqlalchemy.replica.url: request read-only membaca replica, tulis ke primary
+    router = replica_router_from_settings(settings, engine)
+    config.registry['replica_router'] = router
+
+    def dbsession(request):
+        if is_readonly_request(request):
+            return get_readonly_session(
+                readonly_session_factory, request, bind=router.engine_for(request))
         # r.tm is the transaction manager used by pyramid_tm
-        lambda r: get_tm_session(session_factory, r.tm),
-        'dbsession',
-        reify=True
-    )
+        dbsession = get_tm_session(session_factory, request.tm)
+        if router.replicas:
+            track_writes(dbsession, request, router)
+        return dbsession
+
+    # make request.dbsession available for use in Pyramid
+    config.add_request_method(dbsession, 'dbsession', reify=True)
@@ -0,0 +1,125 @@
+"""
+Hitungan referensi file upload (poster movie, foto profil) di ``backend.storage``.
+
+File disimpan berdasarkan hash isinya, jadi beberapa movie / user bisa
+menunjuk file yang sama. Tabel ``blobs`` mencatat berapa baris yang memakai
+setiap path dan diperbarui di transaksi yang sama dengan perubahan
+``poster_path`` / ``profile_photo``; file baru boleh dihapus ketika
+hitungannya habis. Jika hitungan melenceng, perbaiki dengan rebuild_blob_refs.
+"""
+from collections import Counter
+
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    delete,
+    func,
+    select,
+    update,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+
+from .meta import Base
+from .movie import Movie
+from .user import User
+
+_UPSERT_DIALECTS = {
+    'sqlite': sqlite.insert,
+    'postgresql': postgresql.insert,
+}
+
+
+class Blob(Base):
+    __tablename__ = 'blobs'
+
+    path = Column(String(255), primary_key=True)
+    refcount = Column(Integer, nullable=False, default=0)
+
+
+def acquire_blob(dbsession, path):
+    """Tambah satu referensi ke ``path`` di transaksi ``dbsession``."""
+    insert = _UPSERT_DIALECTS.get(dbsession.get_bind().dialect.name)
+    if insert is not None:
+        stmt = insert(Blob).values(path=path, refcount=1)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Blob.path],
+            set_={'refcount': Blob.refcount + 1},
+        )
+        dbsession.execute(stmt)
+        return
+    result = dbsession.execute(
+        update(Blob).where(Blob.path == path).values(refcount=Blob.refcount + 1))
+    if result.rowcount == 0:
+        dbsession.add(Blob(path=path, refcount=1))
+
+
+def release_blob(dbsession, path):
+    """
+    Kurangi satu referensi ke ``path`` dan kembalikan sisa referensinya;
+    ``0`` berarti file tidak dipakai lagi. Path tanpa baris (upload sebelum
+    tabel blobs ada) dianggap hanya punya satu referensi.
+    """
+    stmt = update(Blob).where(Blob.path == path).values(refcount=Blob.refcount - 1)
+    if dbsession.get_bind().dialect.update_returning:
+        remaining = dbsession.execute(stmt.returning(Blob.refcount)).scalar()
+    else: # Dialect tanpa UPDATE ... RETURNING: baca ulang di transaksi yang sama
+        dbsession.execute(stmt)
+        remaining = dbsession.scalar(select(Blob.refcount).where(Blob.path == path))
+    if remaining is None or remaining <= 0:
+        dbsession.execute(delete(Blob).where(Blob.path == path))
+        return 0
+    return remaining
+
+
+def lock_blobs(dbsession, paths):
+    """
+    Kunci baris ``blobs`` untuk ``paths`` sampai transaksi ``dbsession``
+    selesai; path tanpa baris dibuat dengan refcount 0. ``acquire_blob`` untuk
+    path yang sama di transaksi lain menunggu sampai transaksi ini selesai.
+    """
+    paths = sorted(set(paths)) # Urutan tetap: dua reaper tidak saling deadlock
+    if not paths:
+        return
+    insert = _UPSERT_DIALECTS.get(dbsession.get_bind().dialect.name)
+    if insert is not None:
+        stmt = insert(Blob).values([{'path': path, 'refcount': 0} for path in paths])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Blob.path],
+            set_={'refcount': Blob.refcount},
+        )
+        dbsession.execute(stmt)
+        return
+    dbsession.execute(
+        update(Blob).where(Blob.path.in_(paths)).values(refcount=Blob.refcount))
+    existing = set(dbsession.scalars(select(Blob.path).where(Blob.path.in_(paths))))
+    dbsession.add_all(Blob(path=path, refcount=0) for path in paths if path not in existing)
+    dbsession.flush()
+
+
+def referenced_paths(dbsession, paths):
+    """Bagian dari ``paths`` yang masih dirujuk movie / user atau masih punya hitungan di ``blobs``."""
+    paths = list(paths)
+    if not paths:
+        return set()
+    referenced = set(dbsession.scalars(select(Blob.path).where(Blob.path.in_(paths), Blob.refcount > 0)))
+    for column in (Movie.poster_path, User.profile_photo):
+        referenced.update(dbsession.scalars(select(column).where(column.in_(paths)).distinct()))
+    return referenced
+
+
+def count_blob_refs(dbsession):
+    """Hitung referensi setiap path dari movies.poster_path dan users.profile_photo."""
+    counts = Counter()
+    for column in (Movie.poster_path, User.profile_photo):
+        for path, count in dbsession.query(column, func.count()).filter(column.isnot(None)).group_by(column):
+            counts[path] += count
+    return counts
+
+
+def rebuild_blob_refs(dbsession):
+    """Ganti isi ``blobs`` dengan hitungan dari tabel movies dan users."""
+    dbsession.execute(delete(Blob))
+    dbsession.add_all(Blob(path=path, refcount=count)
+                      for path, count in sorted(count_blob_refs(dbsession).items()))
+    dbsession.flush()
@@ -0,0 +1,156 @@
+"""
+Agregat hitungan movie per genre, dekade, dan rating untuk GET /api/movies/facets.
+
+Tabel ``movie_facets`` berisi satu baris per (facet, value) dan diperbarui
+oleh view tulis MovieViews di transaksi yang sama dengan perubahan movie
+(lihat adjust_movie_facets), sehingga endpoint facets tidak perlu
+``GROUP BY`` atas seluruh tabel movies. Jika hitungan melenceng (mis. movie
+diubah langsung di database), perbaiki dengan ``rebuild_movie_facets``.
+"""
+from collections import Counter
+
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    delete,
+    func,
+    update,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+
+from .meta import Base
+from .movie import Movie
+
+FACET_GENRE = 'genre'
+FACET_DECADE = 'decade'
+FACET_RATING = 'rating'
+FACETS = (FACET_GENRE, FACET_DECADE, FACET_RATING)
+
+# Nilai kosong (genre/tahun/rating NULL) disimpan sebagai '' karena bagian dari primary key
+UNKNOWN_VALUE = ''
+
+_UPSERT_DIALECTS = {
+    'sqlite': sqlite.insert,
+    'postgresql': postgresql.insert,
+}
+
+
+class MovieFacet(Base):
+    __tablename__ = 'movie_facets'
+
+    facet = Column(String(20), primary_key=True)
+    value = Column(String(100), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+def _genre_value(genre):
+    return (genre or '').strip()
+
+
+def _decade_value(release_year):
+    return str(release_year // 10 * 10) if release_year is not None else UNKNOWN_VALUE
+
+
+def _rating_value(rating):
+    return str(rating) if rating is not None else UNKNOWN_VALUE
+
+
+def movie_facet_keys(genre, release_year, rating):
+    """(facet, value) yang dihitung untuk satu movie."""
+    return [
+        (FACET_GENRE, _genre_value(genre)),
+        (FACET_DECADE, _decade_value(release_year)),
+        (FACET_RATING, _rating_value(rating)),
+    ]
+
+
+def facet_keys_for(movie):
+    return movie_facet_keys(movie.genre, movie.release_year, movie.rating)
+
+
+def adjust_movie_facets(dbsession, removed=(), added=()):
+    """
+    Kurangi hitungan untuk key ``removed`` dan tambah untuk ``added`` di
+    transaksi ``dbsession``. Key yang sama di keduanya (mis. update yang
+    tidak mengubah genre) tidak menghasilkan query.
+    """
+    delta = Counter(added)
+    delta.subtract(removed)
+    changes = sorted((key, amount) for key, amount in delta.items() if amount)
+    if not changes:
+        return
+    insert = _UPSERT_DIALECTS.get(dbsession.get_bind().dialect.name)
+    for (facet, value), amount in changes:
+        if insert is not None:
+            # Satu statement atomik; aman untuk beberapa writer sekaligus
+            stmt = insert(MovieFacet).values(facet=facet, value=value, count=amount)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[MovieFacet.facet, MovieFacet.value],
+                set_={'count': MovieFacet.count + stmt.excluded.count},
+            )
+            dbsession.execute(stmt)
+            continue
+        result = dbsession.execute(
+            update(MovieFacet)
+            .where(MovieFacet.facet == facet, MovieFacet.value == value)
+            .values(count=MovieFacet.count + amount))
+        if result.rowcount == 0:
+            dbsession.add(MovieFacet(facet=facet, value=value, count=amount))
+
+
+def _facet_value_to_json(facet, value):
+    if value == UNKNOWN_VALUE:
+        return None
+    return value if facet == FACET_GENRE else int(value)
+
+
+def movie_facets(dbsession):
+    """
+    Hitungan per facet: ``{'genre': [{'value': 'Drama', 'count': 3}, ...], ...}``.
+    Genre diurutkan dari yang terbanyak, dekade dan rating berdasarkan nilai.
+    """
+    result = {facet: [] for facet in FACETS}
+    rows = dbsession.query(MovieFacet.facet, MovieFacet.value, MovieFacet.count) \
+        .filter(MovieFacet.count > 0).all()
+    for facet, value, count in rows:
+        if facet in result:
+            result[facet].append({'value': _facet_value_to_json(facet, value), 'count': count})
+    result[FACET_GENRE].sort(key=lambda item: (-item['count'], item['value'] is None, item['value'] or ''))
+    for facet in (FACET_DECADE, FACET_RATING):
+        # Nilai tidak diketahui (None) di akhir
+        result[facet].sort(key=lambda item: (item['value'] is None, item['value'] or 0))
+    return result
+
+
+def count_movie_facets(dbsession):
+    """Hitung ulang semua facet dari tabel movies (satu GROUP BY per kolom)."""
+    counts = Counter()
+    for facet, column, to_value in ((FACET_GENRE, Movie.genre, _genre_value),
+                                    (FACET_DECADE, Movie.release_year, _decade_value),
+                                    (FACET_RATING, Movie.rating, _rating_value)):
+        for value, count in dbsession.query(column, func.count()).group_by(column):
+            counts[(facet, to_value(value))] += count
+    return counts
+
+
+def rebuild_movie_facets(dbsession, dry_run=False):
+    """
+    Ganti isi ``movie_facets`` dengan hitungan dari tabel movies.
+    Mengembalikan jumlah (facet, value) yang hitungannya berubah (drift);
+    dengan ``dry_run`` hanya menghitung drift tanpa mengubah tabel.
+    """
+    expected = count_movie_facets(dbsession)
+    current = Counter({
+        (facet, value): count
+        for facet, value, count in dbsession.query(MovieFacet.facet, MovieFacet.value, MovieFacet.count)
+        if count
+    })
+    drift = sum(1 for key in set(expected) | set(current) if expected[key] != current[key])
+    if dry_run:
+        return drift
+    dbsession.execute(delete(MovieFacet))
+    dbsession.add_all(MovieFacet(facet=facet, value=value, count=count)
+                      for (facet, value), count in sorted(expected.items()))
+    dbsession.flush()
+    return drift
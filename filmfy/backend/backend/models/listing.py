@@ -0,0 +1,85 @@
+"""
+Filter dan urutan untuk listing movie (GET /api/movies) dengan keyset pagination.
+
+Setiap urutan di MOVIE_SORTS diurutkan berdasarkan (kolom, id) dan dilayani
+oleh index komposit di ``backend.models.movie`` (migration ``5c0e7b2d9a41``):
+
+- tanpa filter genre: ``ix_movies_<kolom>_id``
+- dengan ``genre=``: ``ix_movies_genre_<kolom>_id`` (equality + urutan dari index)
+
+Filter rentang (``year_from``/``year_to``/``min_rating``) dievaluasi di index
+yang sama atau lewat index kolomnya sendiri; tidak ada kombinasi yang jatuh
+ke full table scan (lihat test_models_listing.py).
+"""
+from sqlalchemy import and_, or_, tuple_
+
+from .movie import Movie
+
+# sort param -> (kolom, descending)
+MOVIE_SORTS = {
+    'title': (Movie.title, False),
+    '-title': (Movie.title, True),
+    'rating': (Movie.rating, False),
+    '-rating': (Movie.rating, True),
+    'release_year': (Movie.release_year, False),
+    '-release_year': (Movie.release_year, True),
+}
+DEFAULT_MOVIE_SORT = 'title'
+
+# Dialect yang menganggap NULL lebih kecil dari nilai apa pun (PostgreSQL: lebih besar)
+_NULLS_SORT_LOW_DIALECTS = ('sqlite', 'mysql', 'mssql')
+
+
+def filter_movies(query, genre=None, year_from=None, year_to=None, min_rating=None):
+    """Terapkan filter listing; argumen None berarti filter tidak dipakai."""
+    if genre is not None:
+        query = query.filter(Movie.genre == genre)
+    if year_from is not None:
+        query = query.filter(Movie.release_year >= year_from)
+    if year_to is not None:
+        query = query.filter(Movie.release_year <= year_to)
+    if min_rating is not None:
+        query = query.filter(Movie.rating >= min_rating)
+    return query
+
+
+def movie_sort_order(sort):
+    """Klausa ORDER BY (kolom, id) untuk ``sort``; arah id mengikuti kolom agar index dipakai."""
+    column, descending = MOVIE_SORTS[sort]
+    if descending:
+        return column.desc(), Movie.id.desc()
+    return column, Movie.id
+
+
+def sort_value(row, sort):
+    """Nilai kolom urutan dari row, untuk disimpan di cursor."""
+    column, _ = MOVIE_SORTS[sort]
+    return getattr(row, column.key)
+
+
+def keyset_after(sort, value, movie_id, dialect_name):
+    """
+    Kondisi WHERE untuk baris setelah posisi cursor (``value``, ``movie_id``).
+
+    Kolom rating/release_year boleh NULL; posisi NULL (awal atau akhir urutan)
+    mengikuti dialect sehingga ORDER BY tetap bisa dilayani index tanpa
+    ``NULLS FIRST/LAST``.
+    """
+    column, descending = MOVIE_SORTS[sort]
+
+    def after(left, right):
+        return left < right if descending else left > right
+
+    nulls_first = (dialect_name in _NULLS_SORT_LOW_DIALECTS) != descending
+    if value is None:
+        # Masih di blok NULL: lanjut berdasarkan id, lalu (jika NULL di awal) semua nilai non-NULL
+        condition = and_(column.is_(None), after(Movie.id, movie_id))
+        if nulls_first:
+            condition = or_(condition, column.isnot(None))
+        return condition
+
+    # Row value (kolom, id) > (nilai, id) bisa langsung seek di index komposit
+    condition = after(tuple_(column, Movie.id), tuple_(value, movie_id))
+    if not nulls_first and column.nullable:
+        condition = or_(condition, column.is_(None))
+    return condition
@@ -1,11 +1,21 @@
+import datetime
+
 from sqlalchemy import (
     Column,
+    DateTime,
     Index,
     Integer,
     Text,
     String,
+    func,
 )
 from .meta import Base 
+from ..derivatives import image_srcset
+
+
+def _utcnow():
+    # Disimpan sebagai UTC naive agar konsisten di SQLite dan PostgreSQL
+    return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
 
 class Movie(Base):
     """
@@ -20,24 +30,74 @@ class Movie(Base):
     release_year = Column(Integer, nullable=True)
     rating = Column(Integer, nullable=True) 
     poster_path = Column(Text, nullable=True) 
+    # Diperbarui setiap INSERT/UPDATE; dasar versi katalog untuk ETag/Last-Modified
+    updated_at = Column(DateTime, nullable=True, default=_utcnow, onupdate=_utcnow, index=True)
 
     def to_dict(self, request=None): # <--- Perubahan: Ditambahkan 'request=None'
         """
         Mengembalikan representasi dictionary dari objek Movie.
         Jika 'request' diberikan, sertakan 'poster_url' yang lengkap.
         """
+        return Movie.row_to_dict(self, request=request)
+
+    @staticmethod
+    def row_to_dict(row, request=None):
+        """
+        Serialisasi yang sama dengan to_dict(), tetapi untuk objek apa pun yang
+        memiliki atribut kolom movie -- termasuk Row hasil query MOVIE_COLUMNS
+        (jalur read-only yang tidak membuat instance ORM).
+        """
         poster_url = None
         # Periksa jika poster_path ada DAN objek request diberikan
-        if self.poster_path and request:
+        if row.poster_path and request:
             # Bangun URL lengkap: http://domain:port/static/path_relatif
-            poster_url = f"{request.application_url}/static/{self.poster_path}"
-        
+            poster_url = f"{request.application_url}/static/{row.poster_path}"
+
         return {
-            'id': self.id,
-            'title': self.title,
-            'genre': self.genre,
-            'release_year': self.release_year,
-            'rating': self.rating,
-            'poster_path': self.poster_path, 
-            'poster_url': poster_url, # <--- Perubahan: Ditambahkan poster_url
-        }
\ No newline at end of file
+            'id': row.id,
+            'title': row.title,
+            'genre': row.genre,
+            'release_year': row.release_year,
+            'rating': row.rating,
+            'poster_path': row.poster_path,
+            'poster_url': poster_url,
+            'poster_srcset': image_srcset(request, row.poster_path), # {mime: srcset} versi kecil
+        }
+
+
+# Index komposit untuk keyset pagination ORDER BY (title, id) pada GET /api/movies
+Index('ix_movies_title_id', Movie.title, Movie.id)
+
+# Index untuk urutan ?sort= lain dan filter ?genre= (lihat models/listing.py)
+Index('ix_movies_rating_id', Movie.rating, Movie.id)
+Index('ix_movies_release_year_id', Movie.release_year, Movie.id)
+Index('ix_movies_genre_title_id', Movie.genre, Movie.title, Movie.id)
+Index('ix_movies_genre_rating_id', Movie.genre, Movie.rating, Movie.id)
+Index('ix_movies_genre_release_year_id', Movie.genre, Movie.release_year, Movie.id)
+
+
+# Kolom yang dibutuhkan Movie.row_to_dict; query(*MOVIE_COLUMNS) menghasilkan Row
+# ringan yang tidak masuk identity map session.
+MOVIE_COLUMNS = (
+    Movie.id,
+    Movie.title,
+    Movie.genre,
+    Movie.release_year,
+    Movie.rating,
+    Movie.poster_path,
+)
+
+
+def catalog_version(dbsession):
+    """
+    Versi katalog movie: (jumlah baris, id terbesar, updated_at terbesar).
+
+    Ketiganya bisa dijawab dari index saja (pk_movies, ix_movies_updated_at)
+    tanpa membaca baris movie. INSERT dan UPDATE menaikkan updated_at
+    terbesar, sedangkan DELETE mengubah jumlah baris.
+    """
+    return dbsession.query(
+        func.count(Movie.id),
+        func.max(Movie.id),
+        func.max(Movie.updated_at),
+    ).one()
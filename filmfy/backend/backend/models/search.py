@@ -0,0 +1,85 @@
+"""
+Pencarian full-text katalog movie.
+
+Index dibuat oleh migration Alembic ``36fd07580362``:
+
+- SQLite: tabel virtual FTS5 ``movies_fts``, diurutkan dengan ``bm25()``.
+- PostgreSQL: kolom ``movies.search_vector`` + index GIN, diurutkan dengan
+  ``ts_rank()``.
+
+Dialect lain memakai fallback ``LIKE '%q%'`` (tanpa ranking).
+"""
+import re
+
+from sqlalchemy import or_, text
+
+from .movie import Movie, MOVIE_COLUMNS
+
+# Token yang diabaikan setelah batas ini; query panjang tidak menambah relevansi
+MAX_SEARCH_TOKENS = 8
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+_SQLITE_SEARCH_SQL = text(
+    "SELECT movies.id, movies.title, movies.genre, movies.release_year,"
+    " movies.rating, movies.poster_path"
+    " FROM movies_fts JOIN movies ON movies.id = movies_fts.rowid"
+    " WHERE movies_fts MATCH :query"
+    # Judul diberi bobot lebih besar daripada genre
+    " ORDER BY bm25(movies_fts, 10.0, 1.0), movies.id"
+    " LIMIT :limit OFFSET :offset"
+)
+
+_POSTGRESQL_SEARCH_SQL = text(
+    "SELECT movies.id, movies.title, movies.genre, movies.release_year,"
+    " movies.rating, movies.poster_path"
+    " FROM movies, to_tsquery('simple', :query) AS query"
+    " WHERE movies.search_vector @@ query"
+    " ORDER BY ts_rank(movies.search_vector, query) DESC, movies.id"
+    " LIMIT :limit OFFSET :offset"
+)
+
+
+def search_tokens(q):
+    """Pecah input pengguna menjadi token kata; karakter sintaks FTS dibuang."""
+    return _TOKEN_RE.findall(q or '')[:MAX_SEARCH_TOKENS]
+
+
+def sqlite_match_query(tokens):
+    # Setiap token di-quote (aman dari sintaks FTS5) dan dicocokkan sebagai prefix
+    return ' '.join('"{}"*'.format(token) for token in tokens)
+
+
+def postgresql_tsquery(tokens):
+    return ' & '.join('{}:*'.format(token.lower()) for token in tokens)
+
+
+def _like_pattern(token):
+    escaped = token.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f'%{escaped}%'
+
+
+def search_catalog(dbsession, tokens, limit, offset=0):
+    """
+    Cari movie yang cocok dengan semua ``tokens``, terurut berdasarkan relevansi.
+
+    Mengembalikan ``limit + 1`` Row (kolom MOVIE_COLUMNS) paling banyak, supaya
+    pemanggil bisa tahu apakah masih ada halaman berikutnya.
+    """
+    params = {'limit': limit + 1, 'offset': offset}
+    dialect = dbsession.get_bind().dialect.name
+    if dialect == 'sqlite':
+        params['query'] = sqlite_match_query(tokens)
+        return dbsession.execute(_SQLITE_SEARCH_SQL, params).all()
+    if dialect == 'postgresql':
+        params['query'] = postgresql_tsquery(tokens)
+        return dbsession.execute(_POSTGRESQL_SEARCH_SQL, params).all()
+
+    query = dbsession.query(*MOVIE_COLUMNS)
+    for token in tokens:
+        pattern = _like_pattern(token)
+        query = query.filter(or_(
+            Movie.title.ilike(pattern, escape='\\'),
+            Movie.genre.ilike(pattern, escape='\\'),
+        ))
+    return query.order_by(Movie.title, Movie.id).limit(limit + 1).offset(offset).all()
@@ -5,6 +5,7 @@ from sqlalchemy import (
     Text,
 )
 from .meta import Base
+from ..derivatives import image_srcset
 # Hapus import passlib
 # from passlib.context import CryptContext 
 import bcrypt # <-- Impor bcrypt
@@ -12,6 +13,29 @@ import bcrypt # <-- Impor bcrypt
 # Hapus pwd_context
 # pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+def hash_password(plain_password, rounds=None):
+    """
+    Hash password teks biasa dengan bcrypt; dipanggil inline atau di pool password.
+    ``rounds`` adalah cost bcrypt (``auth.bcrypt_rounds``); None = default bcrypt.
+    """
+    # Ubah password menjadi bytes
+    password_bytes = plain_password.encode('utf-8')
+    # Generate salt
+    salt = bcrypt.gensalt() if rounds is None else bcrypt.gensalt(rounds)
+    # Hash password dengan salt (bcrypt hash sudah aman untuk disimpan sebagai string)
+    return bcrypt.hashpw(password_bytes, salt).decode('utf-8')
+
+def verify_password(plain_password, hashed_password):
+    """Verifikasi password teks biasa terhadap hash bcrypt."""
+    return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+
+def password_rounds(hashed_password):
+    """Cost bcrypt yang tersimpan di hash (``$2b$12$...`` -> 12), None jika tidak terbaca."""
+    try:
+        return int(hashed_password.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
 class User(Base):
     __tablename__ = 'users'
 
@@ -22,26 +46,28 @@ class User(Base):
     bio = Column(Text, nullable=True)
     profile_photo = Column(Text, nullable=True) 
 
-    def set_password(self, plain_password):
-        """Mengambil password teks biasa dan menyimpannya sebagai hash menggunakan bcrypt."""
-        # Ubah password menjadi bytes
-        password_bytes = plain_password.encode('utf-8')
-        # Generate salt
-        salt = bcrypt.gensalt()
-        # Hash password dengan salt
-        hashed_bytes = bcrypt.hashpw(password_bytes, salt)
-        # Simpan hash sebagai string (bcrypt hash sudah aman untuk disimpan sebagai string)
-        self.hashed_password = hashed_bytes.decode('utf-8')
-
-    def check_password(self, plain_password):
+    def set_password(self, plain_password, pool=None, rounds=None):
+        """
+        Mengambil password teks biasa dan menyimpannya sebagai hash menggunakan bcrypt.
+        Jika ``pool`` (lihat backend.passwords) diberikan, hashing dijalankan di
+        pool tersebut dan bisa raise PasswordPoolBusy.
+        """
+        if pool is None:
+            self.hashed_password = hash_password(plain_password, rounds)
+        else:
+            self.hashed_password = pool.run(hash_password, plain_password, rounds)
+
+    def password_needs_rehash(self, rounds):
+        """True jika hash tersimpan memakai cost bcrypt selain ``rounds``."""
+        return rounds is not None and password_rounds(self.hashed_password) != rounds
+
+    def check_password(self, plain_password, pool=None):
         """Memverifikasi password teks biasa dengan hash yang tersimpan menggunakan bcrypt."""
         if self.hashed_password is None: # Jika belum ada hash (seharusnya tidak terjadi)
             return False
-        # Ubah password input dan hash tersimpan menjadi bytes
-        password_bytes = plain_password.encode('utf-8')
-        hashed_password_bytes = self.hashed_password.encode('utf-8')
-        # Verifikasi
-        return bcrypt.checkpw(password_bytes, hashed_password_bytes)
+        if pool is None:
+            return verify_password(plain_password, self.hashed_password)
+        return pool.run(verify_password, plain_password, self.hashed_password)
 
     def to_dict(self, request=None):
         profile_url = None
@@ -55,4 +81,5 @@ class User(Base):
             'bio': self.bio,
             'profile_photo': self.profile_photo,
             'profile_url': profile_url,
+            'profile_srcset': image_srcset(request, self.profile_photo),
         }
\ No newline at end of file
@@ -0,0 +1,109 @@
+"""
+Pool worker terbatas untuk hashing / verifikasi password bcrypt.
+
+bcrypt sengaja mahal (ratusan ms CPU per panggilan). Tanpa batas, lonjakan
+request login/signup menghabiskan semua thread waitress dan CPU sehingga
+endpoint lain ikut lambat. Pool ini membatasi jumlah bcrypt yang berjalan
+bersamaan (``workers``) dan panjang antrean (``max_pending``); request di
+atas batas langsung ditolak (view menjawab 503) alih-alih ikut mengantre.
+
+Konfigurasi di file .ini::
+
+    password.executor = thread    # thread | process | none (inline, tanpa pool)
+    password.workers = 2
+    password.max_pending = 4
+    auth.bcrypt_rounds = 12       # cost bcrypt untuk hash baru; kosong = default bcrypt
+
+Hash lama dengan cost berbeda di-hash ulang otomatis saat login berhasil.
+
+``thread`` cukup untuk bcrypt >= 4 yang melepas GIL selama hashing;
+``process`` memakai ProcessPoolExecutor (start method spawn) bila ingin
+isolasi penuh dari interpreter aplikasi.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+PASSWORD_POOL_REGISTRY_KEY = 'password_pool'
+BCRYPT_ROUNDS_REGISTRY_KEY = 'bcrypt_rounds'
+
+# Batas cost yang diterima bcrypt.gensalt()
+MIN_BCRYPT_ROUNDS = 4
+MAX_BCRYPT_ROUNDS = 31
+
+# Detik yang disarankan ke klien lewat header Retry-After ketika pool penuh
+RETRY_AFTER_SECONDS = 1
+
+
+class PasswordPoolBusy(Exception):
+    """Pool dan antreannya penuh; request harus ditolak dengan 503."""
+
+
+class PasswordPool:
+    """Executor bcrypt dengan batas ``workers + max_pending`` pekerjaan sekaligus."""
+
+    def __init__(self, workers=2, max_pending=4, executor='thread'):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._slots = threading.BoundedSemaphore(workers + max_pending)
+        if executor == 'process':
+            self._executor = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bcrypt')
+
+    def run(self, func, *args):
+        """
+        Jalankan ``func(*args)`` di pool dan tunggu hasilnya.
+        Raise PasswordPoolBusy tanpa menunggu jika semua slot terpakai.
+        """
+        if not self._slots.acquire(blocking=False):
+            raise PasswordPoolBusy()
+        try:
+            return self._executor.submit(func, *args).result()
+        finally:
+            self._slots.release()
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+
+def password_pool_from_settings(settings, prefix='password.'):
+    """Buat pool dari settings .ini; None berarti bcrypt dijalankan inline."""
+    executor = settings.get(prefix + 'executor', 'thread').strip().lower()
+    if executor in ('none', 'off', 'inline', ''):
+        return None
+    if executor not in ('thread', 'process'):
+        raise ValueError(f'Unknown {prefix}executor: {executor!r}')
+    workers = int(settings.get(prefix + 'workers', max(1, (os.cpu_count() or 2) // 2)))
+    max_pending = int(settings.get(prefix + 'max_pending', workers * 2))
+    if workers < 1 or max_pending < 0:
+        raise ValueError(f'{prefix}workers must be >= 1 and {prefix}max_pending >= 0')
+    return PasswordPool(workers=workers, max_pending=max_pending, executor=executor)
+
+
+def bcrypt_rounds_from_settings(settings, key='auth.bcrypt_rounds'):
+    """Cost bcrypt dari settings .ini; None berarti default bcrypt tanpa rehash."""
+    value = str(settings.get(key) or '').strip()
+    if not value:
+        return None
+    rounds = int(value)
+    if not MIN_BCRYPT_ROUNDS <= rounds <= MAX_BCRYPT_ROUNDS:
+        raise ValueError(f'{key} must be between {MIN_BCRYPT_ROUNDS} and {MAX_BCRYPT_ROUNDS}')
+    return rounds
+
+
+def get_password_pool(request):
+    return request.registry.get(PASSWORD_POOL_REGISTRY_KEY)
+
+
+def get_bcrypt_rounds(request):
+    return request.registry.get(BCRYPT_ROUNDS_REGISTRY_KEY)
+
+
+def includeme(config):
+    """Daftarkan pool password dan cost bcrypt: ``config.include('backend.passwords')``."""
+    settings = config.get_settings()
+    config.registry[PASSWORD_POOL_REGISTRY_KEY] = password_pool_from_settings(settings)
+    config.registry[BCRYPT_ROUNDS_REGISTRY_KEY] = bcrypt_rounds_from_settings(settings)
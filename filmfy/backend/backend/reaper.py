@@ -0,0 +1,268 @@
+"""
+Penghapusan file upload (poster movie, foto profil) di luar request.
+
+View hanya melepas referensi di tabel ``blobs`` (di transaksi request) lalu
+menjadwalkan file-nya lewat ``delete_file_after_commit``. Setelah pyramid_tm
+commit, path masuk antrean thread ``FileReaper`` yang menghapusnya per batch;
+jika commit gagal, tidak ada yang dihapus dan ``poster_path`` tetap valid.
+Sebelum menghapus, reaper mengunci baris ``blobs`` path-nya dan memeriksa
+ulang database: path yang sudah dirujuk lagi (misalnya upload ulang file yang
+sama) dilewati. Upload yang memakai ulang file itu (dedup) menunggu kunci
+tersebut di ``acquire_blob`` lalu menaruh ulang file-nya jika sudah terhapus.
+
+Saat startup, ``sweep_orphan_files`` mencocokkan isi ``static/postersMovie``
+dan ``static/profile_pics`` dengan database dan membuang file yang tidak
+dirujuk siapa pun: upload dari transaksi yang gagal, antrean yang hilang saat
+proses berhenti, versi kecil tanpa file asli, dan file sementara yang
+tertinggal. File yang lebih muda dari ``files.sweep_min_age`` tidak disentuh
+agar upload yang belum commit di proses lain aman, dan sweep dilewati jika
+database sama sekali tidak merujuk file (database baru atau URL yang salah).
+
+Konfigurasi di file .ini::
+
+    files.reaper_interval = 2       # detik; 0 = hapus langsung setelah commit, tanpa thread
+    files.reaper_batch_size = 100
+    files.sweep_on_startup = true   # default false
+    files.sweep_min_age = 3600      # detik
+
+Thread reaper dan sweep startup baru dijalankan saat aplikasi melayani
+request pertamanya (lihat backend.background), jadi script yang memakai
+``bootstrap()`` tidak menjalankan keduanya; tanpa thread, file dihapus
+langsung setelah commit.
+"""
+import logging
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass
+
+from pyramid.settings import asbool
+from sqlalchemy import delete, select
+from sqlalchemy.exc import DBAPIError
+
+from .background import start_on_first_request, start_thread
+from .models.blob import Blob, count_blob_refs, lock_blobs, referenced_paths
+from .storage import UPLOAD_PREFIXES, is_variant, upload_storage
+
+log = logging.getLogger(__name__)
+
+FILE_REAPER_REGISTRY_KEY = 'file_reaper'
+
+DEFAULT_REAPER_BATCH_SIZE = 100
+DEFAULT_SWEEP_MIN_AGE = 3600
+
+
+@dataclass
+class ReaperStats:
+    files: int = 0   # File asli (beserta versi kecilnya), versi kecil yatim, file sementara
+    skipped: int = 0 # Path yang ternyata masih dirujuk
+
+
+def reap_files(session_factory, items):
+    """
+    Hapus file ``items`` (pasangan ``(storage, path)``) yang tidak dirujuk lagi
+    di database. Satu query per batch, bukan per file.
+    """
+    stats = ReaperStats()
+    if not items:
+        return stats
+    paths = {path for _, path in items}
+    dbsession = session_factory()
+    try:
+        # Upload isi yang sama (dedup) bisa memakai file ini lagi kapan saja:
+        # cek dan hapus sambil memegang kunci baris blobs, sehingga acquire_blob
+        # upload itu menunggu lalu menaruh ulang file-nya (BlobWriter.ensure_stored)
+        lock_blobs(dbsession, paths)
+        referenced = referenced_paths(dbsession, paths)
+        for storage, path in items:
+            if path in referenced:
+                stats.skipped += 1
+            elif storage.delete(path):
+                stats.files += 1
+        dbsession.execute(delete(Blob).where(Blob.path.in_(paths), Blob.refcount <= 0))
+        dbsession.commit()
+    except BaseException:
+        dbsession.rollback()
+        raise
+    finally:
+        dbsession.close()
+    return stats
+
+
+def _remove(full_path):
+    try:
+        os.remove(full_path)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def _older_than(full_path, cutoff):
+    try:
+        return os.stat(full_path).st_mtime < cutoff
+    except FileNotFoundError:
+        return False
+
+
+def sweep_orphan_files(session_factory, storages, min_age=DEFAULT_SWEEP_MIN_AGE, clock=time.time):
+    """Buang file di ``storages`` yang tidak dirujuk database dan lebih tua dari ``min_age`` detik."""
+    dbsession = session_factory()
+    try:
+        referenced = set(count_blob_refs(dbsession))
+        referenced.update(dbsession.scalars(select(Blob.path).where(Blob.refcount > 0)))
+    finally:
+        dbsession.close()
+
+    stats = ReaperStats()
+    if not referenced:
+        # Database kosong / salah sqlalchemy.url: jangan sapu bersih semua upload
+        log.warning('Orphan file sweep skipped: the database references no uploaded files')
+        return stats
+    cutoff = clock() - min_age
+    orphans = []
+    for storage in storages:
+        for dirpath, _, names in list(os.walk(storage.root)):
+            for name in names:
+                full_path = os.path.join(dirpath, name)
+                if not _older_than(full_path, cutoff):
+                    continue
+                path = storage.relative_path(full_path)
+                if name.startswith('.'): # .upload-* / .variant-* dari proses yang terhenti
+                    stats.files += _remove(full_path)
+                elif is_variant(name):
+                    if storage.original_for_variant(path) is None:
+                        stats.files += _remove(full_path)
+                elif path in referenced:
+                    stats.skipped += 1
+                else:
+                    orphans.append((storage, path))
+    # Dicek ulang di bawah kunci: bisa saja dirujuk lagi sejak query di atas
+    for start in range(0, len(orphans), DEFAULT_REAPER_BATCH_SIZE):
+        reaped = reap_files(session_factory, orphans[start:start + DEFAULT_REAPER_BATCH_SIZE])
+        stats.files += reaped.files
+        stats.skipped += reaped.skipped
+    return stats
+
+
+class FileReaper(threading.Thread):
+    """Thread daemon yang menghapus file dari antrean setiap ``interval`` detik, per batch."""
+
+    def __init__(self, session_factory, interval, batch_size=DEFAULT_REAPER_BATCH_SIZE, sweep=None):
+        super().__init__(name='file-reaper', daemon=True)
+        self.session_factory = session_factory
+        self.interval = interval
+        self.batch_size = batch_size
+        self.sweep = sweep
+        self._queue = queue.SimpleQueue()
+        self._stopped = threading.Event()
+
+    def enqueue(self, storage, path):
+        self._queue.put((storage, path))
+
+    def drain(self):
+        """Proses antrean sampai kosong, ``batch_size`` path per query."""
+        total = ReaperStats()
+        while True:
+            batch = []
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return total
+            try:
+                stats = reap_files(self.session_factory, batch)
+            except Exception:
+                # Database tidak bisa dibaca: file dibiarkan, sweep berikutnya yang membereskan
+                log.exception('File reaper failed for %d path(s)', len(batch))
+                continue
+            total.files += stats.files
+            total.skipped += stats.skipped
+
+    def run(self):
+        if self.sweep is not None:
+            self.sweep()
+        while not self._stopped.wait(self.interval):
+            stats = self.drain()
+            if stats.files or stats.skipped:
+                log.info('File reaper deleted %d file(s), skipped %d still referenced',
+                         stats.files, stats.skipped)
+        self.drain()
+
+    def stop(self):
+        self._stopped.set()
+
+
+def get_file_reaper(request):
+    return request.registry.get(FILE_REAPER_REGISTRY_KEY)
+
+
+def discard_files(registry, items):
+    """
+    Hapus file ``items`` (pasangan ``(storage, path)``) yang tidak dirujuk:
+    lewat antrean reaper, atau langsung jika thread reaper tidak berjalan.
+    """
+    reaper = registry.get(FILE_REAPER_REGISTRY_KEY)
+    if reaper is not None and reaper.is_alive():
+        for storage, path in items:
+            reaper.enqueue(storage, path)
+        return
+    try:
+        reap_files(registry['dbsession_factory'], items)
+    except Exception:
+        log.exception('Failed to delete %d file(s)', len(items))
+
+
+def delete_file_after_commit(request, storage, path):
+    """
+    Jadwalkan penghapusan ``path`` setelah transaksi request commit. Tanpa
+    reaper (``files.reaper_interval = 0``) file dihapus langsung di hook commit.
+    """
+    if not path:
+        return
+    registry = request.registry
+
+    def delete_hook(success):
+        if success:
+            discard_files(registry, [(storage, path)])
+
+    request.tm.get().addAfterCommitHook(delete_hook)
+
+
+def _sweep(session_factory, storages, min_age):
+    try:
+        stats = sweep_orphan_files(session_factory, storages, min_age)
+    except DBAPIError as e:
+        log.warning('Orphan file sweep skipped: %s', e)
+        return
+    except Exception:
+        log.exception('Orphan file sweep failed')
+        return
+    log.info('Orphan file sweep deleted %d file(s), kept %d referenced', stats.files, stats.skipped)
+
+
+def includeme(config):
+    """
+    Daftarkan reaper file upload: ``config.include('backend.reaper')``.
+    Harus di-include setelah ``backend.models`` (butuh dbsession_factory).
+    """
+    settings = config.get_settings()
+    session_factory = config.registry['dbsession_factory']
+    interval = float(settings.get('files.reaper_interval') or 0)
+    sweep = None
+    if asbool(settings.get('files.sweep_on_startup', False)):
+        storages = [upload_storage(prefix) for prefix in UPLOAD_PREFIXES]
+        min_age = float(settings.get('files.sweep_min_age', DEFAULT_SWEEP_MIN_AGE))
+        sweep = lambda: _sweep(session_factory, storages, min_age)
+    reaper = None
+    if interval > 0:
+        # Sweep startup berjalan di thread reaper agar tidak menunda start aplikasi
+        batch_size = int(settings.get('files.reaper_batch_size') or DEFAULT_REAPER_BATCH_SIZE)
+        reaper = FileReaper(session_factory, interval, batch_size, sweep=sweep)
+    config.registry[FILE_REAPER_REGISTRY_KEY] = reaper
+    if reaper is not None:
+        start_on_first_request(config, reaper.start)
+    elif sweep is not None:
+        start_on_first_request(config, lambda: start_thread(sweep, 'file-sweep'))
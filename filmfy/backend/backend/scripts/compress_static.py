@@ -0,0 +1,60 @@
+import argparse
+import os
+import sys
+
+from pyramid.paster import get_appsettings, setup_logging
+from pyramid.settings import aslist
+
+from ..static_assets import (
+    DEFAULT_CONTENT_ENCODINGS,
+    available_encodings,
+    compressible_files,
+    precompress,
+)
+from ..storage import STATIC_DIR
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description='Buat varian .br / .gz untuk file teks di static/ (theme.css, dsb.).',
+    )
+    parser.add_argument(
+        'config_uri',
+        help='Configuration file, e.g., development.ini',
+    )
+    parser.add_argument(
+        '--static-dir',
+        default=STATIC_DIR,
+        help='Folder static (default: static/ milik backend)',
+    )
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Tulis ulang varian yang sudah ada walaupun tidak basi',
+    )
+    return parser.parse_args(argv[1:])
+
+
+def main(argv=sys.argv):
+    args = parse_args(argv)
+    setup_logging(args.config_uri)
+    settings = get_appsettings(args.config_uri)
+
+    encodings = aslist(settings.get('static.content_encodings', ' '.join(DEFAULT_CONTENT_ENCODINGS)))
+    if not encodings:
+        print('static.content_encodings is empty: precompressed assets are disabled.')
+        return 0
+    usable = available_encodings(encodings)
+    if len(usable) < len(encodings):
+        print('brotli is not installed: skipping .br variants (pip install brotli).')
+
+    files = written = 0
+    for full_path in compressible_files(args.static_dir):
+        files += 1
+        for target in precompress(full_path, usable, force=args.force):
+            written += 1
+            print(f'{os.path.relpath(target, args.static_dir)}: '
+                  f'{os.path.getsize(full_path)} -> {os.path.getsize(target)} bytes')
+
+    print(f'{written} compressed variant(s) written for {files} file(s).')
+    return 0
@@ -0,0 +1,47 @@
+import argparse
+import sys
+
+from pyramid.paster import get_appsettings, setup_logging
+
+from ..sessions import DEFAULT_JANITOR_BATCH_SIZE, expire_sessions, session_janitor_target
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description='Buang session yang sudah kedaluwarsa (session.timeout) per batch.',
+    )
+    parser.add_argument(
+        'config_uri',
+        help='Configuration file, e.g., development.ini',
+    )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=DEFAULT_JANITOR_BATCH_SIZE,
+        help=f'Jumlah session per batch (default: {DEFAULT_JANITOR_BATCH_SIZE})',
+    )
+    parser.add_argument(
+        '--max-batches',
+        type=int,
+        default=None,
+        help='Berhenti setelah sejumlah batch (default: sampai habis)',
+    )
+    return parser.parse_args(argv[1:])
+
+
+def main(argv=sys.argv):
+    args = parse_args(argv)
+    setup_logging(args.config_uri)
+    settings = get_appsettings(args.config_uri)
+
+    target = session_janitor_target(settings)
+    if target is None:
+        backend = settings.get('session.backend', 'beaker')
+        print(f'Nothing to expire for session.backend = {backend}: sessions are not stored '
+              f'outside the app process (use session.janitor_interval for the memory store).')
+        return 0
+
+    stats = expire_sessions(target, batch_size=args.batch_size, max_batches=args.max_batches)
+    print(f'{stats.sessions} expired session(s) removed in {stats.batches} batch(es), '
+          f'{stats.bytes} bytes reclaimed.')
+    return 0
@@ -0,0 +1,77 @@
+import argparse
+import sys
+
+from pyramid.paster import bootstrap, setup_logging
+from sqlalchemy.exc import OperationalError
+
+from ..export import (
+    EXPORT_TABLES,
+    EXPORT_FORMATS,
+    EXPORT_BATCH_SIZE,
+    iter_export,
+    iter_gzip,
+)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description='Export tabel movies / users (tanpa hash password) sebagai stream.',
+    )
+    parser.add_argument(
+        'config_uri',
+        help='Configuration file, e.g., development.ini',
+    )
+    parser.add_argument(
+        '--table',
+        choices=tuple(EXPORT_TABLES),
+        default='movies',
+        help='Tabel yang diekspor (default: movies)',
+    )
+    parser.add_argument(
+        '--format',
+        choices=tuple(EXPORT_FORMATS),
+        default='ndjson',
+        help='Format output (default: ndjson)',
+    )
+    parser.add_argument(
+        '--gzip',
+        action='store_true',
+        help='Kompres output dengan gzip',
+    )
+    parser.add_argument(
+        '-o', '--output',
+        default='-',
+        help='File tujuan; "-" untuk stdout (default)',
+    )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=EXPORT_BATCH_SIZE,
+        help=f'Jumlah baris per batch (default: {EXPORT_BATCH_SIZE})',
+    )
+    return parser.parse_args(argv[1:])
+
+
+def main(argv=sys.argv):
+    args = parse_args(argv)
+    setup_logging(args.config_uri)
+    env = bootstrap(args.config_uri)
+
+    output = sys.stdout.buffer if args.output == '-' else open(args.output, 'wb')
+    try:
+        with env['request'].tm:
+            chunks = iter_export(env['request'].dbsession, args.table, args.format, args.batch_size)
+            for chunk in (iter_gzip(chunks) if args.gzip else chunks):
+                output.write(chunk)
+    except OperationalError:
+        print('''
+Pyramid is having a problem using your SQL database.  Make sure the
+database referred to by the "sqlalchemy.url" setting exists and is
+migrated to the latest revision (`alembic -c <config> upgrade head`).
+            ''', file=sys.stderr)
+        return 1
+    finally:
+        if output is not sys.stdout.buffer:
+            output.close()
+        env['closer']()
+    return 0
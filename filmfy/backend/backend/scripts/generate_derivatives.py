@@ -0,0 +1,82 @@
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from pyramid.paster import get_appsettings, setup_logging
+
+from ..derivatives import derivative_pipeline_from_settings, generate_derivatives, missing_variants
+from ..storage import STATIC_DIR, UPLOAD_PREFIXES, upload_storage
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description='Buat versi kecil + WebP yang belum ada untuk poster dan foto profil lama.',
+    )
+    parser.add_argument(
+        'config_uri',
+        help='Configuration file, e.g., development.ini',
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=os.cpu_count() or 1,
+        help='Jumlah proses worker (default: jumlah CPU)',
+    )
+    parser.add_argument(
+        '--prefix',
+        choices=UPLOAD_PREFIXES,
+        action='append',
+        help='Hanya folder ini (bisa diulang; default: semua folder upload)',
+    )
+    parser.add_argument(
+        '--static-dir',
+        default=STATIC_DIR,
+        help='Folder static yang berisi folder upload (default: static/ milik backend)',
+    )
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='Hanya hitung file yang belum punya versi kecil lengkap',
+    )
+    return parser.parse_args(argv[1:])
+
+
+def main(argv=sys.argv):
+    args = parse_args(argv)
+    setup_logging(args.config_uri)
+    settings = get_appsettings(args.config_uri)
+
+    # Hanya untuk membaca images.widths / images.webp_quality; worker milik script ini sendiri
+    pipeline = derivative_pipeline_from_settings({**settings, 'images.executor': 'none'})
+    if pipeline is None:
+        print('images.widths is empty: image derivatives are disabled.')
+        return 0
+
+    pending = []
+    for prefix in args.prefix or UPLOAD_PREFIXES:
+        storage = upload_storage(prefix, args.static_dir)
+        for path in storage.originals():
+            full_path = storage.full_path(path)
+            if missing_variants(full_path, pipeline.widths):
+                pending.append(full_path)
+
+    if args.dry_run:
+        print(f'{len(pending)} upload(s) missing image derivatives.')
+        return 0
+
+    created = failed = 0
+    with ProcessPoolExecutor(max_workers=max(1, args.workers)) as executor:
+        futures = {
+            executor.submit(generate_derivatives, full_path, pipeline.widths, pipeline.webp_quality): full_path
+            for full_path in pending
+        }
+        for future in as_completed(futures):
+            try:
+                created += future.result()
+            except Exception as e:
+                failed += 1
+                print(f'Failed to generate derivatives for {futures[future]}: {e}')
+
+    print(f'{created} derivative file(s) created for {len(pending) - failed} upload(s), {failed} failed.')
+    return 1 if failed else 0
@@ -0,0 +1,351 @@
+"""
+Import katalog movie secara massal dari CSV atau JSON Lines.
+
+    env/bin/import_movies development.ini movies.csv --on-conflict upsert
+
+File dibaca per baris (streaming) dan di-insert per batch: ``INSERT``
+executemany + ``ON CONFLICT`` di SQLite, ``COPY`` ke tabel sementara lalu
+``INSERT ... SELECT ... ON CONFLICT`` di PostgreSQL. Semua batch berjalan
+dalam satu transaksi; tabel agregat facets dihitung ulang di akhir.
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass
+
+from pyramid.paster import bootstrap, setup_logging
+from sqlalchemy import insert, select, update
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.exc import OperationalError
+
+from ..cache import CATALOG_TAG, MOVIE_LIST_TAG, get_response_cache
+from ..models.blob import rebuild_blob_refs
+from ..models.facet import rebuild_movie_facets
+from ..models.movie import Movie, _utcnow
+from ..storage import upload_storage
+
+IMPORT_FIELDS = ('title', 'genre', 'release_year', 'rating', 'poster_path')
+DEFAULT_BATCH_SIZE = 5000
+# Jumlah pesan baris invalid yang dicetak; sisanya hanya dihitung
+MAX_REPORTED_ERRORS = 20
+
+ON_CONFLICT_SKIP = 'skip'
+ON_CONFLICT_UPSERT = 'upsert'
+
+_MOVIES = Movie.__table__
+# poster_path dihitung sebagai referensi blob: harus file di folder poster
+_POSTER_STORAGE = upload_storage('postersMovie')
+
+
+@dataclass
+class ImportStats:
+    read: int = 0
+    invalid: int = 0
+    duplicates: int = 0 # Judul yang muncul lebih dari sekali dalam satu batch
+    written: int = 0    # Baris yang di-insert (atau di-update pada mode upsert)
+    skipped: int = 0    # Judul yang sudah ada di database / batch sebelumnya (mode skip)
+
+
+def _optional_int(value, field):
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    if isinstance(value, bool):
+        raise ValueError(f'{field} must be an integer.')
+    if isinstance(value, int):
+        return value
+    if not isinstance(value, str) or not value.strip().isdigit():
+        raise ValueError(f'{field} must be an integer.')
+    return int(value.strip())
+
+
+def _optional_text(value):
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def _poster_path(value):
+    path = _optional_text(value)
+    if path is None:
+        return None
+    prefix = _POSTER_STORAGE.url_prefix + '/'
+    if not path.startswith(prefix):
+        raise ValueError(f'poster_path must start with {prefix}')
+    _POSTER_STORAGE.full_path(path) # ValueError jika keluar dari folder poster (../)
+    return path
+
+
+def clean_movie_record(record):
+    """
+    Validasi satu record dengan aturan create_movie: title wajib, tahun
+    integer, rating integer 1-10, poster_path di bawah ``postersMovie/``.
+    Mengembalikan dict kolom movie atau raise ValueError.
+    """
+    title = _optional_text(record.get('title'))
+    if not title:
+        raise ValueError('Title is required')
+    rating = _optional_int(record.get('rating'), 'Rating')
+    if rating is not None and not (1 <= rating <= 10):
+        raise ValueError('Rating must be between 1 and 10')
+    return {
+        'title': title,
+        'genre': _optional_text(record.get('genre')),
+        'release_year': _optional_int(record.get('release_year'), 'Release year'),
+        'rating': rating,
+        'poster_path': _poster_path(record.get('poster_path')),
+    }
+
+
+def read_records(stream, fmt):
+    """Yield (nomor baris, dict) dari stream teks CSV (dengan header) atau JSON Lines."""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+        return
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_number, e
+            continue
+        yield line_number, record if isinstance(record, dict) else ValueError('expected a JSON object')
+
+
+def _insert_batch_sqlite(connection, rows, on_conflict):
+    stmt = sqlite.insert(_MOVIES)
+    if on_conflict == ON_CONFLICT_UPSERT:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[_MOVIES.c.title],
+            set_={name: stmt.excluded[name] for name in IMPORT_FIELDS + ('updated_at',) if name != 'title'},
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=[_MOVIES.c.title])
+    return connection.execute(stmt, rows).rowcount
+
+
+def _copy_text(rows):
+    """Baris ke format COPY text PostgreSQL (tab-separated, \\N untuk NULL)."""
+    def field(value):
+        if value is None:
+            return '\\N'
+        return (str(value).replace('\\', '\\\\').replace('\t', '\\t')
+                .replace('\n', '\\n').replace('\r', '\\r'))
+    columns = IMPORT_FIELDS + ('updated_at',)
+    return ''.join('\t'.join(field(row[name]) for name in columns) + '\n' for row in rows)
+
+
+def _insert_batch_postgresql(connection, rows, on_conflict):
+    columns = ', '.join(IMPORT_FIELDS + ('updated_at',))
+    connection.exec_driver_sql(
+        'CREATE TEMPORARY TABLE IF NOT EXISTS movies_import'
+        ' (LIKE movies INCLUDING DEFAULTS) ON COMMIT DROP')
+    connection.exec_driver_sql('TRUNCATE movies_import')
+    cursor = connection.connection.dbapi_connection.cursor()
+    try:
+        copy_sql = f'COPY movies_import ({columns}) FROM STDIN'
+        data = _copy_text(rows)
+        if hasattr(cursor, 'copy_expert'): # psycopg2
+            cursor.copy_expert(copy_sql, io.StringIO(data))
+        else:                              # psycopg 3
+            with cursor.copy(copy_sql) as copy:
+                copy.write(data)
+    finally:
+        cursor.close()
+    if on_conflict == ON_CONFLICT_UPSERT:
+        conflict = 'DO UPDATE SET ' + ', '.join(
+            f'{name} = EXCLUDED.{name}' for name in IMPORT_FIELDS + ('updated_at',) if name != 'title')
+    else:
+        conflict = 'DO NOTHING'
+    return connection.exec_driver_sql(
+        f'INSERT INTO movies ({columns}) SELECT {columns} FROM movies_import'
+        f' ON CONFLICT (title) {conflict}').rowcount
+
+
+def _insert_batch_generic(connection, rows, on_conflict):
+    """Dialect tanpa ON CONFLICT: cek judul yang sudah ada, lalu insert/update."""
+    existing = set(connection.execute(
+        select(_MOVIES.c.title).where(_MOVIES.c.title.in_([row['title'] for row in rows]))).scalars())
+    new_rows = [row for row in rows if row['title'] not in existing]
+    if new_rows:
+        connection.execute(insert(_MOVIES), new_rows)
+    written = len(new_rows)
+    if on_conflict == ON_CONFLICT_UPSERT:
+        for row in rows:
+            if row['title'] in existing:
+                connection.execute(update(_MOVIES).where(_MOVIES.c.title == row['title']).values(**row))
+                written += 1
+    return written
+
+
+def _defer_sqlite_fts_indexing(connection):
+    """
+    Lepas sementara trigger ``movies_fts_ai`` (migration FTS) agar baris baru
+    diindex FTS5 sekali di akhir dengan INSERT ... SELECT, jauh lebih cepat
+    daripada trigger per baris. Mengembalikan fungsi untuk mengindex baris
+    baru dan memasang kembali trigger, atau None jika tidak ada trigger.
+    """
+    if connection.dialect.name != 'sqlite':
+        return None
+    trigger_sql = connection.exec_driver_sql(
+        "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = 'movies_fts_ai'").scalar()
+    if trigger_sql is None:
+        return None
+    # pysqlite baru membuka transaksi sebelum DML; SAVEPOINT memastikan DROP
+    # TRIGGER ikut di-rollback jika import gagal
+    savepoint = connection.begin_nested()
+    last_id = connection.exec_driver_sql('SELECT COALESCE(MAX(id), 0) FROM movies').scalar()
+    connection.exec_driver_sql('DROP TRIGGER movies_fts_ai')
+
+    def index_new_rows():
+        connection.exec_driver_sql(
+            'INSERT INTO movies_fts (rowid, title, genre)'
+            ' SELECT id, title, genre FROM movies WHERE id > ?', (last_id,))
+        connection.exec_driver_sql(trigger_sql)
+        savepoint.commit()
+    return index_new_rows
+
+
+_BATCH_INSERTERS = {
+    'sqlite': _insert_batch_sqlite,
+    'postgresql': _insert_batch_postgresql,
+}
+
+
+def import_movies(dbsession, records, on_conflict=ON_CONFLICT_SKIP,
+                  batch_size=DEFAULT_BATCH_SIZE, errors=None):
+    """
+    Import record (hasil read_records) ke tabel movies di transaksi ``dbsession``.
+    Record invalid dilewati dan dilaporkan ke ``errors``.
+    """
+    errors = errors or sys.stderr
+    stats = ImportStats()
+    connection = dbsession.connection()
+    insert_batch = _BATCH_INSERTERS.get(connection.dialect.name, _insert_batch_generic)
+    index_new_rows = _defer_sqlite_fts_indexing(connection)
+    batch = {}
+
+    def flush_batch():
+        rows = list(batch.values())
+        batch.clear()
+        written = insert_batch(connection, rows, on_conflict)
+        stats.written += written
+        if on_conflict == ON_CONFLICT_SKIP:
+            stats.skipped += len(rows) - written
+
+    for line_number, record in records:
+        stats.read += 1
+        try:
+            if isinstance(record, Exception):
+                raise ValueError(f'Invalid JSON: {record}')
+            row = clean_movie_record(record)
+        except ValueError as e:
+            stats.invalid += 1
+            if stats.invalid <= MAX_REPORTED_ERRORS:
+                print(f'line {line_number}: {e}', file=errors)
+            continue
+        row['updated_at'] = _utcnow()
+        if row['title'] in batch:
+            stats.duplicates += 1
+            if on_conflict == ON_CONFLICT_SKIP:
+                continue
+        batch[row['title']] = row # upsert: baris terakhir di file yang menang
+        if len(batch) >= batch_size:
+            flush_batch()
+    if batch:
+        flush_batch()
+    if index_new_rows is not None:
+        index_new_rows()
+
+    # Agregat facets dan referensi poster tidak di-update per baris; hitung ulang sekali di akhir
+    rebuild_movie_facets(dbsession)
+    rebuild_blob_refs(dbsession)
+    return stats
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description='Import movies dari file CSV atau JSON Lines.')
+    parser.add_argument(
+        'config_uri',
+        help='Configuration file, e.g., development.ini',
+    )
+    parser.add_argument(
+        'path',
+        help='File CSV (dengan header) atau JSON Lines; "-" untuk stdin',
+    )
+    parser.add_argument(
+        '--format',
+        choices=('csv', 'jsonl'),
+        help='Format file (default: dari ekstensi, .csv atau .jsonl/.ndjson)',
+    )
+    parser.add_argument(
+        '--on-conflict',
+        choices=(ON_CONFLICT_SKIP, ON_CONFLICT_UPSERT),
+        default=ON_CONFLICT_SKIP,
+        help='Perlakuan untuk judul yang sudah ada (default: skip)',
+    )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f'Jumlah baris per batch insert (default: {DEFAULT_BATCH_SIZE})',
+    )
+    args = parser.parse_args(argv[1:])
+    if args.format is None:
+        extension = os.path.splitext(args.path)[1].lower()
+        if extension == '.csv':
+            args.format = 'csv'
+        elif extension in ('.jsonl', '.ndjson'):
+            args.format = 'jsonl'
+        else:
+            parser.error('cannot detect file format, use --format')
+    if args.batch_size < 1:
+        parser.error('--batch-size must be positive')
+    return args
+
+
+def main(argv=sys.argv):
+    args = parse_args(argv)
+    setup_logging(args.config_uri)
+    env = bootstrap(args.config_uri)
+
+    stream = sys.stdin if args.path == '-' else open(args.path, newline='', encoding='utf-8')
+    start = time.perf_counter()
+    try:
+        with env['request'].tm:
+            stats = import_movies(env['request'].dbsession, read_records(stream, args.format),
+                                  on_conflict=args.on_conflict, batch_size=args.batch_size)
+    except OperationalError:
+        print('''
+Pyramid is having a problem using your SQL database.  Make sure the
+database referred to by the "sqlalchemy.url" setting exists and is
+migrated to the latest revision (`alembic -c <config> upgrade head`).
+            ''')
+        return 1
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+        env['closer']()
+    elapsed = time.perf_counter() - start
+
+    # Listing/detail yang di-cache sudah usang. invalidate() menaikkan generasi tag
+    # (set() lama yang sedang berjalan batal) dan versi katalog, sehingga server
+    # yang berbagi cache sqlite juga membangun ulang index autocomplete-nya.
+    # Cache memory hanya milik proses ini: restart server setelah import.
+    cache = get_response_cache(env['request'])
+    if cache is not None and stats.written:
+        cache.invalidate(MOVIE_LIST_TAG, CATALOG_TAG)
+        cache.clear() # Detail movie yang di-upsert (tag per movie)
+
+    rate = stats.read / elapsed if elapsed else 0
+    print(f'{stats.read} rows read in {elapsed:.2f} s ({rate:,.0f} rows/s): '
+          f'{stats.written} written, {stats.skipped} skipped (existing title), '
+          f'{stats.duplicates} duplicate title(s) in file, {stats.invalid} invalid.')
+    return 0
@@ -0,0 +1,46 @@
+import argparse
+import sys
+
+from pyramid.paster import bootstrap, setup_logging
+from sqlalchemy.exc import OperationalError
+
+from ..models.facet import rebuild_movie_facets
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description='Hitung ulang tabel movie_facets dari tabel movies (perbaikan drift).',
+    )
+    parser.add_argument(
+        'config_uri',
+        help='Configuration file, e.g., development.ini',
+    )
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='Hanya laporkan jumlah drift tanpa menyimpan perubahan',
+    )
+    return parser.parse_args(argv[1:])
+
+
+def main(argv=sys.argv):
+    args = parse_args(argv)
+    setup_logging(args.config_uri)
+    env = bootstrap(args.config_uri)
+
+    try:
+        with env['request'].tm:
+            drift = rebuild_movie_facets(env['request'].dbsession, dry_run=args.dry_run)
+    except OperationalError:
+        print('''
+Pyramid is having a problem using your SQL database.  Make sure the
+database referred to by the "sqlalchemy.url" setting exists and is
+migrated to the latest revision (`alembic -c <config> upgrade head`).
+            ''')
+        return 1
+    finally:
+        env['closer']()
+
+    action = 'would be corrected' if args.dry_run else 'corrected'
+    print(f'movie_facets rebuilt: {drift} facet value(s) {action}.')
+    return 0
@@ -0,0 +1,568 @@
+"""
+Session store yang bisa dipilih dari file .ini, pengganti session Beaker
+berbasis file (lock file + pickle per request).
+
+Backend dipilih lewat ``session.backend``::
+
+    session.backend = sqlite      # memory | sqlite | cookie | beaker
+    session.key = filmfy_session_cookie
+    session.secret = ...
+    session.timeout = 86400       # detik tanpa aktivitas sebelum session kedaluwarsa
+    session.max_entries = 100000  # memory: batas LRU
+    session.sqlite_path = %(here)s/data/sessions.sqlite
+    session.cookie_httponly = true
+    session.cookie_secure = false
+    session.cookie_samesite = Lax
+
+- ``memory``: LRU + TTL di memori proses; tercepat, hilang saat restart.
+- ``sqlite``: file SQLite mode WAL, dibagi antar proses dan tahan restart.
+- ``cookie``: stateless, seluruh isi session ditandatangani di cookie
+  (``SignedCookieSessionFactory``); isi harus kecil (< 4 KB).
+- ``beaker``: perilaku lama lewat pyramid_beaker (``session.type`` dsb.).
+
+Untuk ``memory`` dan ``sqlite`` cookie hanya berisi id session acak yang
+ditandatangani; isi session di-serialisasi sebagai JSON, jadi nilai yang
+disimpan harus JSON-able (seperti ``user_id``). Session hanya ditulis ke
+store jika berubah, atau jika umurnya sudah melewati ``session.reissue_time``
+(default sepersepuluh ``timeout``) untuk memperpanjang masa berlakunya.
+
+Session kedaluwarsa dibuang oleh janitor (``expire_sessions``), baik lewat CLI
+``expire_sessions`` maupun thread latar belakang yang dijalankan saat request
+pertama dilayani (lihat backend.background)::
+
+    session.janitor_interval = 300  # detik; 0 = tanpa thread (default)
+    session.janitor_batch_size = 1000
+
+Janitor juga membersihkan file ``.cache`` Beaker lama (``session.type = file``)
+yang tidak disentuh lebih lama dari ``session.timeout``.
+"""
+import binascii
+import json
+import logging
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from pyramid.interfaces import ISession
+from pyramid.session import SignedCookieSessionFactory
+from pyramid.settings import asbool
+from webob.cookies import SignedSerializer
+from zope.interface import implementer
+
+from .background import start_on_first_request
+
+log = logging.getLogger(__name__)
+
+SESSION_STORE_REGISTRY_KEY = 'session_store'
+SESSION_JANITOR_REGISTRY_KEY = 'session_janitor'
+
+DEFAULT_SESSION_TIMEOUT = 86400
+DEFAULT_JANITOR_BATCH_SIZE = 1000
+SESSION_ID_SALT = 'filmfy.session.id'
+
+
+class MemorySessionStore:
+    """Session LRU + TTL di memori proses. Aman dipakai banyak thread waitress."""
+
+    def __init__(self, max_entries=100000, timeout=DEFAULT_SESSION_TIMEOUT, clock=time.time):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._clock = clock
+        self._entries = OrderedDict() # session id -> (expires_at, payload)
+        self._lock = threading.Lock()
+
+    def load(self, session_id):
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                return None
+            expires_at, payload = entry
+            if expires_at <= self._clock():
+                del self._entries[session_id]
+                return None
+            self._entries.move_to_end(session_id)
+            return payload
+
+    def save(self, session_id, payload):
+        with self._lock:
+            self._entries[session_id] = (self._clock() + self.timeout, payload)
+            self._entries.move_to_end(session_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, session_id):
+        with self._lock:
+            self._entries.pop(session_id, None)
+
+    def purge_expired(self, limit):
+        """Buang maksimal ``limit`` session kedaluwarsa; return (jumlah, byte)."""
+        now = self._clock()
+        with self._lock:
+            expired = []
+            for session_id, (expires_at, _) in self._entries.items():
+                if expires_at <= now:
+                    expired.append(session_id)
+                    if len(expired) >= limit:
+                        break
+            reclaimed = sum(len(self._entries.pop(session_id)[1]) for session_id in expired)
+        return len(expired), reclaimed
+
+
+class SQLiteSessionStore:
+    """Session di file SQLite (mode WAL) yang bisa dibagi beberapa proses."""
+
+    def __init__(self, path, timeout=DEFAULT_SESSION_TIMEOUT, clock=time.time):
+        self.path = path
+        self.timeout = timeout
+        self._clock = clock
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS sessions ('
+                ' id TEXT PRIMARY KEY, payload BLOB NOT NULL,'
+                ' expires_at REAL NOT NULL)')
+            conn.execute(
+                'CREATE INDEX IF NOT EXISTS ix_sessions_expires_at'
+                ' ON sessions (expires_at)')
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def load(self, session_id):
+        row = self._connect().execute(
+            'SELECT payload FROM sessions WHERE id = ? AND expires_at > ?',
+            (session_id, self._clock())
+        ).fetchone()
+        return bytes(row[0]) if row else None
+
+    def save(self, session_id, payload):
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO sessions (id, payload, expires_at) VALUES (?, ?, ?)',
+                (session_id, payload, self._clock() + self.timeout))
+
+    def delete(self, session_id):
+        with self._connect() as conn:
+            conn.execute('DELETE FROM sessions WHERE id = ?', (session_id,))
+
+    def purge_expired(self, limit):
+        """
+        Buang maksimal ``limit`` session kedaluwarsa dalam satu transaksi
+        pendek (lewat index expires_at); return (jumlah, byte payload).
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                'SELECT id, length(payload) FROM sessions WHERE expires_at <= ? LIMIT ?',
+                (self._clock(), limit)).fetchall()
+            conn.executemany('DELETE FROM sessions WHERE id = ?', [(row[0],) for row in rows])
+        return len(rows), sum(row[1] for row in rows)
+
+
+class BeakerFileSessions:
+    """
+    File session Beaker (``session.type = file``) untuk janitor. Beaker sudah
+    membagi file ke subfolder per prefix hash id, tapi tidak pernah menghapus
+    file ``.cache`` session yang kedaluwarsa; yang tidak diubah lebih lama dari
+    ``timeout`` dibuang di sini, begitu juga file ``.lock`` yang sama lamanya.
+    """
+
+    def __init__(self, data_dir, lock_dir=None, timeout=DEFAULT_SESSION_TIMEOUT, clock=time.time):
+        self.directories = [(os.path.join(data_dir, 'container_file'), '.cache'),
+                            (lock_dir or os.path.join(data_dir, 'container_file_lock'), '.lock')]
+        self.timeout = timeout
+        self._clock = clock
+        self._scan = None
+
+    def _iter_files(self):
+        for directory, extension in self.directories:
+            for root, _, files in os.walk(directory):
+                for name in files:
+                    if name.endswith(extension):
+                        yield os.path.join(root, name), extension
+
+    def purge_expired(self, limit):
+        """Lanjutkan scan folder dari batch sebelumnya; return (session, byte)."""
+        if self._scan is None:
+            self._scan = self._iter_files()
+        cutoff = self._clock() - self.timeout
+        count = reclaimed = 0
+        for path, extension in self._scan:
+            try:
+                stat = os.stat(path)
+                if stat.st_mtime > cutoff:
+                    continue
+                os.remove(path)
+            except FileNotFoundError:
+                continue # Dihapus proses lain di tengah scan
+            reclaimed += stat.st_size
+            if extension == '.cache':
+                count += 1
+                if count >= limit:
+                    return count, reclaimed
+        self._scan = None # Scan selesai; batch berikutnya mulai dari awal
+        return count, reclaimed
+
+
+class _TextSerializer:
+    """Serializer identitas untuk SignedSerializer: id session sudah berupa teks."""
+
+    def dumps(self, value):
+        return value.encode('ascii')
+
+    def loads(self, value):
+        return value.decode('ascii')
+
+
+class CookieOptions:
+    """Atribut cookie session yang dibaca dari settings ``session.*``."""
+
+    def __init__(self, name='session', max_age=None, path='/', domain=None, secure=False,
+                 httponly=True, samesite='Lax', set_on_exception=True):
+        self.name = name
+        self.max_age = max_age
+        self.path = path
+        self.domain = domain
+        self.secure = secure
+        self.httponly = httponly
+        self.samesite = samesite
+        self.set_on_exception = set_on_exception
+
+    def set_cookie(self, response, value):
+        response.set_cookie(self.name, value, max_age=self.max_age, path=self.path,
+                            domain=self.domain, secure=self.secure, httponly=self.httponly,
+                            samesite=self.samesite)
+
+    def delete_cookie(self, response):
+        response.delete_cookie(self.name, path=self.path, domain=self.domain)
+
+
+def _accessed(method):
+    def accessed(session, *args, **kwargs):
+        session._renew_if_stale()
+        return method(session, *args, **kwargs)
+    return accessed
+
+
+def _changed(method):
+    def changed(session, *args, **kwargs):
+        result = method(session, *args, **kwargs)
+        session.changed()
+        return result
+    return changed
+
+
+@implementer(ISession)
+class StoreSession(dict):
+    """
+    Session dict-like yang isinya disimpan di ``store`` (memory/sqlite) dan
+    hanya id-nya (ditandatangani) yang dikirim sebagai cookie.
+    """
+
+    def __init__(self, request, store, signer, cookie, reissue_time):
+        self.request = request
+        self._store = store
+        self._signer = signer
+        self._cookie = cookie
+        self._reissue_time = reissue_time
+        self._session_id = None
+        self._dirty = False
+        self._invalidated = False
+        self._callback_added = False
+
+        now = time.time()
+        created = accessed = now
+        state = {}
+        cookie_value = request.cookies.get(cookie.name)
+        if cookie_value:
+            try:
+                session_id = signer.loads(cookie_value.encode('ascii'))
+            except (ValueError, UnicodeError, binascii.Error):
+                session_id = None # Cookie palsu/rusak: mulai session baru
+            payload = store.load(session_id) if session_id else None
+            if payload is not None:
+                created, accessed, state = json.loads(payload)
+                self._session_id = session_id
+
+        self.created = created
+        self.accessed = accessed
+        self.new = self._session_id is None
+        dict.__init__(self, state)
+
+    # ISession methods
+    def changed(self):
+        self._dirty = True
+        self._add_response_callback()
+
+    def invalidate(self):
+        if self._session_id is not None:
+            self._store.delete(self._session_id)
+        self._session_id = None
+        self._invalidated = True
+        self._dirty = False
+        dict.clear(self)
+        self._add_response_callback()
+
+    def save(self):
+        """Kompatibel dengan API Beaker yang dipakai view (``session.save()``)."""
+        self.changed()
+
+    # non-modifying dictionary methods
+    get = _accessed(dict.get)
+    __getitem__ = _accessed(dict.__getitem__)
+    items = _accessed(dict.items)
+    values = _accessed(dict.values)
+    keys = _accessed(dict.keys)
+    __contains__ = _accessed(dict.__contains__)
+    __len__ = _accessed(dict.__len__)
+    __iter__ = _accessed(dict.__iter__)
+
+    # modifying dictionary methods
+    clear = _changed(dict.clear)
+    update = _changed(dict.update)
+    setdefault = _changed(dict.setdefault)
+    pop = _changed(dict.pop)
+    popitem = _changed(dict.popitem)
+    __setitem__ = _changed(dict.__setitem__)
+    __delitem__ = _changed(dict.__delitem__)
+
+    # flash API methods
+    @_changed
+    def flash(self, msg, queue='', allow_duplicate=True):
+        storage = dict.setdefault(self, '_f_' + queue, [])
+        if allow_duplicate or (msg not in storage):
+            storage.append(msg)
+
+    @_changed
+    def pop_flash(self, queue=''):
+        return dict.pop(self, '_f_' + queue, [])
+
+    @_accessed
+    def peek_flash(self, queue=''):
+        return dict.get(self, '_f_' + queue, [])
+
+    # CSRF API methods
+    @_changed
+    def new_csrf_token(self):
+        token = secrets.token_hex(20)
+        dict.__setitem__(self, '_csrft_', token)
+        return token
+
+    @_accessed
+    def get_csrf_token(self):
+        token = dict.get(self, '_csrft_')
+        if token is None:
+            token = self.new_csrf_token()
+        return token
+
+    # non-API methods
+    def _renew_if_stale(self):
+        # Perpanjang masa berlaku session yang aktif tanpa menulis di setiap request
+        if (not self.new and not self._dirty and self._reissue_time is not None and
+                time.time() - self.accessed > self._reissue_time):
+            self.changed()
+
+    def _add_response_callback(self):
+        if not self._callback_added:
+            self._callback_added = True
+            self.request.add_response_callback(self._on_response)
+
+    def _on_response(self, request, response):
+        if not self._cookie.set_on_exception and getattr(request, 'exception', None) is not None:
+            return
+        if self._dirty:
+            if self._session_id is None:
+                self._session_id = secrets.token_urlsafe(32)
+            self.accessed = time.time()
+            payload = json.dumps([self.created, self.accessed, dict(self)]).encode('utf-8')
+            self._store.save(self._session_id, payload)
+            cookie_value = self._signer.dumps(self._session_id).decode('ascii')
+            self._cookie.set_cookie(response, cookie_value)
+        elif self._invalidated:
+            self._cookie.delete_cookie(response)
+        self.request = None # putuskan referensi siklik untuk gc
+
+
+@dataclass
+class JanitorStats:
+    sessions: int = 0 # Session kedaluwarsa yang dibuang
+    bytes: int = 0    # Byte payload / file yang dibebaskan
+    batches: int = 0
+
+
+def expire_sessions(target, batch_size=DEFAULT_JANITOR_BATCH_SIZE, max_batches=None):
+    """
+    Buang session kedaluwarsa dari ``target`` (store atau BeakerFileSessions)
+    per batch ``batch_size`` sampai habis atau ``max_batches`` tercapai.
+    """
+    stats = JanitorStats()
+    while max_batches is None or stats.batches < max_batches:
+        count, reclaimed = target.purge_expired(batch_size)
+        stats.batches += 1
+        stats.sessions += count
+        stats.bytes += reclaimed
+        if count < batch_size:
+            break
+    return stats
+
+
+class SessionJanitor(threading.Thread):
+    """Thread daemon yang menjalankan ``expire_sessions`` setiap ``interval`` detik."""
+
+    def __init__(self, target, interval, batch_size=DEFAULT_JANITOR_BATCH_SIZE, max_batches=None):
+        super().__init__(name='session-janitor', daemon=True)
+        self.target = target
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                stats = expire_sessions(self.target, self.batch_size, self.max_batches)
+            except Exception:
+                log.exception('Session janitor failed')
+                continue
+            if stats.sessions:
+                log.info('Session janitor expired %d session(s), reclaimed %d bytes',
+                         stats.sessions, stats.bytes)
+
+    def stop(self):
+        self._stopped.set()
+
+
+def store_session_factory(store, secret, cookie=None, reissue_time=None):
+    """Session factory Pyramid untuk ``StoreSession`` di atas ``store``."""
+    signer = SignedSerializer(secret, SESSION_ID_SALT, hashalg='sha512', serializer=_TextSerializer())
+    cookie = cookie or CookieOptions()
+
+    def session_factory(request):
+        return StoreSession(request, store, signer, cookie, reissue_time)
+
+    return session_factory
+
+
+def signed_cookie_session_factory(secret, cookie, timeout, reissue_time):
+    """Session stateless di cookie bertanda tangan, dengan ``save()`` gaya Beaker."""
+    base = SignedCookieSessionFactory(
+        secret, cookie_name=cookie.name, max_age=cookie.max_age, path=cookie.path,
+        domain=cookie.domain, secure=cookie.secure, httponly=cookie.httponly,
+        samesite=cookie.samesite, timeout=timeout, reissue_time=reissue_time,
+        set_on_exception=cookie.set_on_exception)
+
+    class SignedCookieSession(base):
+        def save(self):
+            self.changed()
+
+    return SignedCookieSession
+
+
+def _session_backend(settings, prefix='session.'):
+    return settings.get(prefix + 'backend', 'beaker').strip().lower()
+
+
+def _session_timeout(settings, prefix='session.'):
+    return int(settings.get(prefix + 'timeout') or DEFAULT_SESSION_TIMEOUT)
+
+
+def session_factory_from_settings(settings, prefix='session.'):
+    """
+    Buat ``(session_factory, store)`` dari settings .ini. ``store`` None untuk
+    backend ``cookie``. Backend ``beaker`` ditangani langsung oleh ``includeme``.
+    """
+    backend = _session_backend(settings, prefix)
+    secret = settings.get(prefix + 'secret')
+    if not secret:
+        raise ValueError(f'{prefix}secret is required for the {backend} session backend')
+    timeout = _session_timeout(settings, prefix)
+    reissue_time = settings.get(prefix + 'reissue_time')
+    reissue_time = int(reissue_time) if reissue_time is not None else timeout // 10
+    max_age = settings.get(prefix + 'cookie_expires') # Nama opsi Beaker; kosong = cookie browser
+    cookie = CookieOptions(
+        name=settings.get(prefix + 'key', 'session'),
+        max_age=int(max_age) if max_age and max_age.strip().isdigit() else None,
+        path=settings.get(prefix + 'cookie_path', '/'),
+        domain=settings.get(prefix + 'cookie_domain') or None,
+        secure=asbool(settings.get(prefix + 'cookie_secure', False)),
+        httponly=asbool(settings.get(prefix + 'cookie_httponly', True)),
+        samesite=settings.get(prefix + 'cookie_samesite', 'Lax') or None,
+        set_on_exception=asbool(settings.get(prefix + 'cookie_on_exception', True)),
+    )
+
+    if backend == 'cookie':
+        return signed_cookie_session_factory(secret, cookie, timeout, reissue_time), None
+    if backend == 'memory':
+        store = MemorySessionStore(
+            max_entries=int(settings.get(prefix + 'max_entries', 100000)), timeout=timeout)
+    elif backend == 'sqlite':
+        store = _sqlite_store_from_settings(settings, prefix)
+    else:
+        raise ValueError(f'Unknown {prefix}backend: {backend!r}')
+    return store_session_factory(store, secret, cookie, reissue_time), store
+
+
+def _sqlite_store_from_settings(settings, prefix='session.'):
+    path = settings.get(prefix + 'sqlite_path')
+    if not path:
+        raise ValueError(f'{prefix}sqlite_path is required for the sqlite session backend')
+    return SQLiteSessionStore(path, timeout=_session_timeout(settings, prefix))
+
+
+def session_janitor_target(settings, store=None, prefix='session.'):
+    """
+    Objek yang dibersihkan janitor untuk settings ini, atau None jika tidak ada
+    yang perlu dibersihkan dari luar proses (cookie, atau memory tanpa ``store``).
+    """
+    backend = _session_backend(settings, prefix)
+    if backend in ('memory', 'sqlite') and store is not None:
+        return store
+    if backend == 'sqlite':
+        return _sqlite_store_from_settings(settings, prefix)
+    if backend == 'beaker' and settings.get(prefix + 'type') == 'file' and settings.get(prefix + 'data_dir'):
+        return BeakerFileSessions(settings[prefix + 'data_dir'], settings.get(prefix + 'lock_dir'),
+                                  timeout=_session_timeout(settings, prefix))
+    return None
+
+
+def get_session_store(request):
+    return request.registry.get(SESSION_STORE_REGISTRY_KEY)
+
+
+def _register_janitor(config, store):
+    settings = config.get_settings()
+    interval = float(settings.get('session.janitor_interval') or 0)
+    target = session_janitor_target(settings, store) if interval > 0 else None
+    janitor = None
+    if target is not None:
+        batch_size = int(settings.get('session.janitor_batch_size') or DEFAULT_JANITOR_BATCH_SIZE)
+        janitor = SessionJanitor(target, interval, batch_size)
+        start_on_first_request(config, janitor.start) # Bukan di script bootstrap() / proses reloader
+    config.registry[SESSION_JANITOR_REGISTRY_KEY] = janitor
+
+
+def includeme(config):
+    """
+    Pasang session factory sesuai ``session.backend``: ``config.include('backend.sessions')``.
+    Tanpa ``session.backend`` perilaku lama (pyramid_beaker) dipertahankan.
+    """
+    settings = config.get_settings()
+    if _session_backend(settings) == 'beaker':
+        config.include('pyramid_beaker')
+        store = None
+    else:
+        session_factory, store = session_factory_from_settings(settings)
+        config.set_session_factory(session_factory)
+    config.registry[SESSION_STORE_REGISTRY_KEY] = store
+    _register_janitor(config, store)
@@ -0,0 +1,202 @@
+"""
+Penyajian ``/static/`` dengan aturan cache per jenis file dan varian
+terkompresi yang dibuat sebelumnya.
+
+- Upload yang namanya sidik isi (poster / foto profil berbasis SHA-256,
+  upload lama bernama UUID, dan versi kecilnya ``-w<lebar>``) tidak pernah
+  berubah isi: dikirim dengan ``Cache-Control: public, max-age=<1 tahun>,
+  immutable`` sehingga browser tidak perlu revalidasi sama sekali.
+- File lain (``theme.css``, logo) memakai ``static.cache_max_age`` plus
+  ``ETag`` / ``Last-Modified``, jadi revalidasi dijawab 304 tanpa body.
+- Untuk file teks, ``<nama>.br`` / ``<nama>.gz`` di sebelahnya dikirim jika
+  ``Accept-Encoding`` mengizinkan (lihat ``compress_static_assets``); varian
+  yang lebih tua dari file aslinya diabaikan.
+- Body dikirim lewat ``wsgi.file_wrapper`` milik server (FileResponse), dan
+  route ``static`` memakai ``readonly=True`` sehingga tidak melewati
+  pyramid_tm / pyramid_retry.
+
+Konfigurasi di file .ini::
+
+    static.cache_max_age = 3600             # detik, file yang namanya tetap
+    static.immutable_max_age = 31536000     # detik, upload bersidik isi
+    static.content_encodings = br gzip      # kosong = tanpa varian terkompresi
+"""
+import gzip
+import mimetypes
+import os
+import re
+
+from pyramid.httpexceptions import HTTPNotFound
+from pyramid.response import FileResponse
+from pyramid.security import NO_PERMISSION_REQUIRED
+from pyramid.settings import asbool, aslist
+from pyramid.static import static_view
+
+from .storage import STATIC_DIR, UPLOAD_PREFIXES
+
+try:
+    import brotli
+except ImportError: # Opsional: tanpa paket brotli hanya .gz yang dibuat
+    brotli = None
+
+STATIC_ROUTE = 'static'
+
+DEFAULT_CACHE_MAX_AGE = 3600
+DEFAULT_IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+DEFAULT_CONTENT_ENCODINGS = ('br', 'gzip')
+
+# <prefix>/ab/cd/<sha256>[-w<lebar>].<ext> atau upload lama <prefix>/<uuid>[-w<lebar>].<ext>
+IMMUTABLE_PATH = re.compile(
+    r'^(?:{})/(?:[0-9a-f]{{2}}/[0-9a-f]{{2}}/[0-9a-f]{{64}}'
+    r'|[0-9a-f]{{8}}-[0-9a-f]{{4}}-[0-9a-f]{{4}}-[0-9a-f]{{4}}-[0-9a-f]{{12}})'
+    r'(?:-w\d+)?\.[a-z0-9]+$'.format('|'.join(UPLOAD_PREFIXES))
+)
+
+# Ekstensi yang layak dikompresi; gambar sudah terkompresi
+COMPRESSIBLE_EXTENSIONS = frozenset(('.css', '.js', '.mjs', '.map', '.svg', '.html', '.json', '.txt', '.xml'))
+ENCODING_EXTENSIONS = {'br': '.br', 'gzip': '.gz'}
+MIN_COMPRESS_SIZE = 256
+
+
+def is_immutable_path(path):
+    """``True`` untuk path relatif di bawah /static/ yang isinya tidak pernah berubah."""
+    return IMMUTABLE_PATH.match(path) is not None
+
+
+class StaticAssetView(static_view):
+    """``static_view`` Pyramid dengan Cache-Control per path dan ETag."""
+
+    def __init__(self, root_dir, cache_max_age=DEFAULT_CACHE_MAX_AGE,
+                 immutable_max_age=DEFAULT_IMMUTABLE_MAX_AGE, content_encodings=(), **kw):
+        super().__init__(root_dir, cache_max_age=cache_max_age, use_subpath=True,
+                         content_encodings=content_encodings, **kw)
+        self.immutable_max_age = immutable_max_age
+
+    def __call__(self, context, request):
+        resource_name = self.get_resource_name(request)
+        immutable = is_immutable_path('/'.join(request.subpath))
+        if immutable:
+            # Upload: tanpa varian terkompresi dan tanpa filemap (bisa jutaan file,
+            # dan file yang dihapus reaper harus langsung 404)
+            files = [(resource_name, None)] if os.path.isfile(resource_name) else []
+        else:
+            files = self.get_possible_files(resource_name)
+        filepath, content_encoding = self.find_best_match(request, files)
+        if filepath is None:
+            raise HTTPNotFound(request.url)
+
+        content_type = mimetypes.guess_type(resource_name, strict=False)[0] or 'application/octet-stream'
+        try:
+            stat = os.stat(filepath)
+            response = FileResponse(filepath, request, None, content_type, content_encoding)
+        except FileNotFoundError: # Dihapus di antara pencarian dan open
+            self.filemap.pop(resource_name, None)
+            raise HTTPNotFound(request.url)
+        response.etag = f'{stat.st_mtime_ns:x}-{stat.st_size:x}'
+        if immutable:
+            response.cache_expires = self.immutable_max_age
+            response.headers['Cache-Control'] = f'public, max-age={self.immutable_max_age}, immutable'
+        else:
+            response.cache_expires = self.cache_max_age
+            response.cache_control.public = True
+        if len(files) > 1:
+            vary = list(response.vary or ())
+            if 'Accept-Encoding' not in vary:
+                response.vary = vary + ['Accept-Encoding']
+        return response
+
+    def get_possible_files(self, resource_name):
+        """
+        Seperti ``static_view.get_possible_files``, tetapi varian terkompresi yang
+        lebih tua dari file aslinya dibuang, dan nama yang tidak ada tidak di-cache.
+        """
+        result = self.filemap.get(resource_name)
+        if result is not None:
+            return result
+        result = super().get_possible_files(resource_name)
+        identity = next((path for path, encoding in result if encoding is None), None)
+        if identity is None:
+            self.filemap.pop(resource_name, None)
+            return []
+        mtime = os.path.getmtime(identity)
+        result = [(path, encoding) for path, encoding in result
+                  if encoding is None or os.path.getmtime(path) >= mtime]
+        if not self.reload:
+            self.filemap[resource_name] = result
+        return result
+
+
+def static_asset_view_from_settings(settings, root_dir=STATIC_DIR, prefix='static.'):
+    encodings = aslist(settings.get(prefix + 'content_encodings', ' '.join(DEFAULT_CONTENT_ENCODINGS)))
+    unknown = set(encodings) - set(ENCODING_EXTENSIONS)
+    if unknown:
+        raise ValueError(f'Unsupported {prefix}content_encodings: {", ".join(sorted(unknown))}')
+    return StaticAssetView(
+        root_dir,
+        cache_max_age=int(settings.get(prefix + 'cache_max_age', DEFAULT_CACHE_MAX_AGE)),
+        immutable_max_age=int(settings.get(prefix + 'immutable_max_age', DEFAULT_IMMUTABLE_MAX_AGE)),
+        content_encodings=encodings,
+        reload=asbool(settings.get('pyramid.reload_assets', False)),
+    )
+
+
+# --- Varian terkompresi (dipakai oleh compress_static_assets) ---
+def _compress(data, encoding):
+    if encoding == 'gzip':
+        return gzip.compress(data, compresslevel=9, mtime=0) # mtime=0: output deterministik
+    return brotli.compress(data, quality=11)
+
+
+def available_encodings(encodings=DEFAULT_CONTENT_ENCODINGS):
+    """``encodings`` yang bisa dibuat di sini (``br`` butuh paket brotli)."""
+    return [encoding for encoding in encodings if encoding != 'br' or brotli is not None]
+
+
+def compressible_files(static_dir=STATIC_DIR):
+    """File teks di ``static_dir`` yang layak dikompresi; folder upload dilewati."""
+    for dirpath, dirnames, names in os.walk(static_dir):
+        if dirpath == static_dir:
+            dirnames[:] = [name for name in dirnames if name not in UPLOAD_PREFIXES]
+        for name in sorted(names):
+            full_path = os.path.join(dirpath, name)
+            if (os.path.splitext(name)[1].lower() in COMPRESSIBLE_EXTENSIONS
+                    and os.path.getsize(full_path) >= MIN_COMPRESS_SIZE):
+                yield full_path
+
+
+def precompress(full_path, encodings=DEFAULT_CONTENT_ENCODINGS, force=False):
+    """
+    Tulis ``<file>.gz`` / ``<file>.br`` yang belum ada atau sudah basi.
+    Varian yang tidak lebih kecil dari aslinya tidak disimpan.
+    Kembalikan path varian yang ditulis.
+    """
+    mtime = os.path.getmtime(full_path)
+    written = []
+    data = None
+    for encoding in available_encodings(encodings):
+        target = full_path + ENCODING_EXTENSIONS[encoding]
+        if not force and os.path.exists(target) and os.path.getmtime(target) >= mtime:
+            continue
+        if data is None:
+            with open(full_path, 'rb') as source:
+                data = source.read()
+        compressed = _compress(data, encoding)
+        if len(compressed) >= len(data):
+            if os.path.exists(target):
+                os.remove(target)
+            continue
+        tmp_path = target + '.tmp'
+        with open(tmp_path, 'wb') as output:
+            output.write(compressed)
+        os.replace(tmp_path, target)
+        written.append(target)
+    return written
+
+
+def includeme(config):
+    """Daftarkan view untuk route ``static`` (lihat backend.routes)."""
+    config.add_view(
+        static_asset_view_from_settings(config.get_settings()),
+        route_name=STATIC_ROUTE,
+        permission=NO_PERMISSION_REQUIRED,
+    )
@@ -0,0 +1,226 @@
+"""
+Penyimpanan file upload berbasis isi (content-addressed) untuk poster movie
+dan foto profil.
+
+Upload di-copy per chunk ke file sementara sambil di-hash (SHA-256), lalu
+dipindahkan ke ``<root>/<ab>/<cd>/<sha256><ext>``. Byte yang sama selalu
+mendapat path (dan URL ``/static/...``) yang sama, sehingga upload ulang
+tidak memakan disk dan URL-nya aman di-cache selamanya. Siapa yang memakai
+sebuah file dicatat di tabel ``blobs`` (lihat backend.models.blob); file
+hanya dihapus setelah referensi terakhirnya dilepas.
+
+Versi kecil (lihat backend.derivatives) disimpan di sebelah file aslinya
+sebagai ``<nama>-w<lebar>.<format>`` dan ikut terhapus bersama file aslinya.
+"""
+import hashlib
+import os
+import re
+import tempfile
+
+CHUNK_SIZE = 64 * 1024
+# Dua level direktori 2 karakter hex = 65536 direktori, cukup untuk jutaan file
+SHARD_DEPTH = 2
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+# Prefix path di database (poster_path / profile_photo) = subdirektori static/
+UPLOAD_PREFIXES = ('postersMovie', 'profile_pics')
+
+_VARIANT_SUFFIX = re.compile(r'-w\d+\.[a-z0-9]+$')
+
+
+def variant_name(path, width, ext):
+    """Nama versi selebar ``width`` dari ``path`` (relatif atau di disk)."""
+    return f'{os.path.splitext(path)[0]}-w{width}.{ext}'
+
+
+def is_variant(path):
+    return _VARIANT_SUFFIX.search(path) is not None
+
+
+def upload_storage(prefix, static_dir=STATIC_DIR):
+    """BlobStorage untuk ``static/<prefix>``, mis. ``upload_storage('postersMovie')``."""
+    return BlobStorage(os.path.join(static_dir, prefix), prefix)
+
+
+class BlobStorage:
+    """File berbasis hash di bawah ``root``, dirujuk sebagai ``<url_prefix>/<ab>/<cd>/<nama>``."""
+
+    def __init__(self, root, url_prefix, shard_depth=SHARD_DEPTH):
+        self.root = root
+        self.url_prefix = url_prefix
+        self.shard_depth = shard_depth
+
+    def _shard(self, digest):
+        return [digest[i * 2:i * 2 + 2] for i in range(self.shard_depth)]
+
+    def relative_path(self, full_path):
+        rel = os.path.relpath(full_path, self.root).replace(os.sep, '/')
+        return f'{self.url_prefix}/{rel}'
+
+    def full_path(self, path):
+        """Path di disk untuk ``path`` dari database (``postersMovie/...``)."""
+        rel = path[len(self.url_prefix) + 1:] if path.startswith(self.url_prefix + '/') else path
+        full_path = os.path.normpath(os.path.join(self.root, rel))
+        if not full_path.startswith(os.path.normpath(self.root) + os.sep):
+            raise ValueError(f'Path outside storage root: {path!r}')
+        return full_path
+
+    def _existing(self, shard_dir, digest):
+        try:
+            names = os.listdir(shard_dir)
+        except FileNotFoundError:
+            return None
+        for name in names:
+            if os.path.splitext(name)[0] == digest:
+                return os.path.join(shard_dir, name)
+        return None
+
+    def originals(self):
+        """Path relatif semua file upload asli (tanpa versi kecil dan file sementara)."""
+        for dirpath, _, names in os.walk(self.root):
+            for name in sorted(names):
+                if not name.startswith('.') and not is_variant(name):
+                    yield self.relative_path(os.path.join(dirpath, name))
+
+    def original_for_variant(self, path):
+        """Path relatif file asli dari path versi kecil; None jika tidak ada."""
+        if not is_variant(path):
+            return None
+        stem = _VARIANT_SUFFIX.sub('', self.full_path(path))
+        existing = self._existing(os.path.dirname(stem), os.path.basename(stem))
+        return self.relative_path(existing) if existing is not None else None
+
+    def open_writer(self, ext=''):
+        """``BlobWriter`` untuk menulis upload per chunk langsung ke folder storage."""
+        return BlobWriter(self, ext)
+
+    def put(self, fileobj, ext='', acquire=None):
+        """
+        Simpan isi ``fileobj`` (dibaca dari posisi sekarang) dan kembalikan
+        path relatifnya. Isi yang sudah tersimpan (ekstensi apa pun) dipakai
+        ulang. ``acquire(path)`` (mis. ``acquire_blob``) dipanggil sebelum file
+        sementara dibuang, lihat ``BlobWriter.ensure_stored``.
+        """
+        writer = self.open_writer(ext)
+        try:
+            for chunk in iter(lambda: fileobj.read(CHUNK_SIZE), b''):
+                writer.write(chunk)
+        except BaseException:
+            writer.abort()
+            raise
+        path = writer.commit()
+        try:
+            if acquire is not None:
+                acquire(path)
+                writer.ensure_stored()
+        finally:
+            writer.abort() # Salinan sementara isi yang dedup
+        return path
+
+    def _place(self, tmp_path, hexdigest, ext):
+        """
+        Pindahkan file sementara ke path hash-nya; kembalikan ``(path, dibuat_baru)``.
+        Jika isinya sudah tersimpan, file sementara dibiarkan (dibuang pemanggil).
+        """
+        shard_dir = os.path.join(self.root, *self._shard(hexdigest))
+        existing = self._existing(shard_dir, hexdigest)
+        if existing is not None:
+            return self.relative_path(existing), False
+        full_path = os.path.join(shard_dir, hexdigest + ext.lower())
+        self._move_into_place(tmp_path, full_path)
+        return self.relative_path(full_path), True
+
+    def _move_into_place(self, tmp_path, full_path):
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        os.chmod(tmp_path, 0o644) # mkstemp membuat 0600; file statis harus bisa dibaca
+        os.replace(tmp_path, full_path)
+
+    def delete(self, path):
+        """Hapus file ``path`` beserta versi kecilnya; ``True`` jika file asli dihapus."""
+        full_path = self.full_path(path)
+        stem = os.path.basename(os.path.splitext(full_path)[0])
+        try:
+            siblings = os.listdir(os.path.dirname(full_path))
+        except FileNotFoundError:
+            siblings = []
+        for name in siblings:
+            if is_variant(name) and _VARIANT_SUFFIX.sub('', name) == stem:
+                try:
+                    os.remove(os.path.join(os.path.dirname(full_path), name))
+                except OSError as e:
+                    print(f"Error deleting file variant {name}: {e}")
+        deleted = False
+        if os.path.exists(full_path):
+            try:
+                os.remove(full_path)
+                deleted = True
+            except OSError as e:
+                print(f"Error deleting file {full_path}: {e}")
+        self._prune_empty_dirs(os.path.dirname(full_path))
+        return deleted
+
+    def _prune_empty_dirs(self, directory):
+        """Hapus direktori shard yang kosong, naik sampai (tidak termasuk) ``root``."""
+        root = os.path.normpath(self.root)
+        while os.path.normpath(directory) != root and directory.startswith(root + os.sep):
+            try:
+                os.rmdir(directory)
+            except OSError: # Tidak kosong / sudah hilang
+                return
+            directory = os.path.dirname(directory)
+
+
+class BlobWriter:
+    """
+    File sementara ``.upload-*`` di folder storage yang di-hash sambil ditulis.
+    ``commit()`` memindahkannya ke path hash-nya, ``abort()`` membuangnya.
+
+    Jika isinya sudah tersimpan (dedup), file sementara disimpan sampai
+    ``ensure_stored()`` atau ``abort()``: reaper bisa menghapus file lama itu
+    sebelum referensi baru di ``blobs`` diambil.
+    """
+
+    def __init__(self, storage, ext=''):
+        os.makedirs(storage.root, exist_ok=True)
+        self.storage = storage
+        self.ext = ext
+        self.size = 0
+        self.created = False # True jika commit() menaruh file baru (bukan dedup)
+        self.path = None
+        fd, self._tmp_path = tempfile.mkstemp(dir=storage.root, prefix='.upload-')
+        self._output = os.fdopen(fd, 'wb')
+        self._digest = hashlib.sha256()
+
+    def write(self, chunk):
+        self._digest.update(chunk)
+        self._output.write(chunk)
+        self.size += len(chunk)
+
+    def commit(self):
+        self._output.close()
+        try:
+            self.path, self.created = self.storage._place(self._tmp_path, self._digest.hexdigest(), self.ext)
+        except BaseException:
+            self.abort()
+            raise
+        return self.path
+
+    def ensure_stored(self):
+        """
+        Panggil setelah ``acquire_blob`` untuk path hasil ``commit()``: jika
+        reaper sempat menghapus file dedup-nya, salinan sementara ditaruh ulang.
+        Setelah referensi diambil, reaper menunggu transaksinya (lihat
+        ``lock_blobs``) sehingga file tidak bisa hilang lagi.
+        """
+        if not os.path.exists(self._tmp_path):
+            return
+        full_path = self.storage.full_path(self.path)
+        if os.path.exists(full_path):
+            os.remove(self._tmp_path)
+        else:
+            self.storage._move_into_place(self._tmp_path, full_path)
+
+    def abort(self):
+        self._output.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
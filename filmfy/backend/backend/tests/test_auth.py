@@ -0,0 +1,84 @@
+# filmfy/backend/backend/tests/test_auth.py
+from unittest.mock import MagicMock
+
+import pytest
+from pyramid.testing import DummyRequest
+
+from ..auth import (
+    USER_CACHE_REGISTRY_KEY,
+    cached_user_profile,
+    get_authenticated_user,
+    invalidate_user_after_commit,
+    user_cache_from_settings,
+)
+from ..models.user import User
+
+
+@pytest.fixture
+def request_with_cache():
+    request = DummyRequest()
+    request.registry = {USER_CACHE_REGISTRY_KEY: user_cache_from_settings({})}
+    request.tm = MagicMock()
+    return request
+
+
+def make_user(username='budi'):
+    return User(id=3, username=username, email='budi@example.com', profile_photo='profile_pics/b.jpg')
+
+
+class TestCachedUserProfile:
+
+    def test_second_call_served_from_cache(self, request_with_cache):
+        load_user = MagicMock(return_value=make_user())
+
+        first = cached_user_profile(request_with_cache, 3, load_user)
+        second = cached_user_profile(request_with_cache, 3, load_user)
+
+        assert first == second
+        assert second['profile_url'] == 'http://example.com/static/profile_pics/b.jpg'
+        load_user.assert_called_once_with() # Hanya satu query ke database
+
+    def test_missing_user_is_not_cached(self, request_with_cache):
+        load_user = MagicMock(return_value=None)
+
+        assert cached_user_profile(request_with_cache, 3, load_user) is None
+        assert cached_user_profile(request_with_cache, 3, load_user) is None
+        assert load_user.call_count == 2
+
+    def test_invalidated_after_commit(self, request_with_cache):
+        cached_user_profile(request_with_cache, 3, lambda: make_user())
+        invalidate_user_after_commit(request_with_cache, 3)
+        hook = request_with_cache.tm.get.return_value.addAfterCommitHook.call_args[0][0]
+
+        hook(False) # Rollback: profil lama tetap berlaku
+        assert cached_user_profile(request_with_cache, 3, lambda: make_user('baru'))['username'] == 'budi'
+        hook(True)
+        assert cached_user_profile(request_with_cache, 3, lambda: make_user('baru'))['username'] == 'baru'
+
+    def test_profile_loaded_before_invalidation_is_not_cached(self, request_with_cache):
+        cache = request_with_cache.registry[USER_CACHE_REGISTRY_KEY]
+
+        def load_user_during_update():
+            cache.invalidate('users:3') # Update lain commit di tengah request ini
+            return make_user('lama')
+
+        cached_user_profile(request_with_cache, 3, load_user_during_update)
+
+        assert cached_user_profile(request_with_cache, 3, lambda: make_user('baru'))['username'] == 'baru'
+
+    def test_cache_disabled(self):
+        assert user_cache_from_settings({'auth.user_cache_ttl': '0'}) is None
+
+
+class TestRequestUser:
+
+    def test_get_authenticated_user(self):
+        request = DummyRequest()
+        request.dbsession = MagicMock()
+        request.session = {'user_id': 3}
+
+        assert get_authenticated_user(request) is request.dbsession.get.return_value
+        request.dbsession.get.assert_called_once_with(User, 3)
+
+        request.session = {}
+        assert get_authenticated_user(request) is None
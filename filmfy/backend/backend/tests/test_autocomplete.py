@@ -0,0 +1,206 @@
+# filmfy/backend/backend/tests/test_autocomplete.py
+import threading
+
+import pytest
+from unittest.mock import MagicMock
+from pyramid import testing
+from pyramid.events import NewRequest
+from pyramid.testing import DummyRequest
+from sqlalchemy import create_engine
+
+from ..autocomplete import (
+    TitleIndex,
+    AUTOCOMPLETE_REGISTRY_KEY,
+    get_current_title_index,
+    normalize_title,
+    trigrams,
+    edit_distance,
+    load_title_index,
+    rebuild_title_index,
+    index_title_after_commit,
+    unindex_title_after_commit,
+)
+from ..cache import CACHE_REGISTRY_KEY, CATALOG_TAG, MemoryResponseCache
+from ..models import get_session_factory
+from ..models.meta import Base
+from ..models.movie import Movie
+
+
+@pytest.fixture
+def title_index():
+    index = TitleIndex()
+    index.build([
+        (1, 'The Dark Knight'),
+        (2, 'The Dark Knight Rises'),
+        (3, 'Dark City'),
+        (4, 'Amélie'),
+        (5, 'Interstellar'),
+        (6, 'Inception'),
+    ])
+    return index
+
+
+def titles(suggestions):
+    return [s['title'] for s in suggestions]
+
+
+class TestNormalization:
+
+    def test_normalize_title(self):
+        assert normalize_title('  Amélie   POULAIN ') == 'amelie poulain'
+
+    def test_trigrams_are_padded_per_word(self):
+        assert trigrams('ab cd') == {'  a', ' ab', 'ab ', '  c', ' cd', 'cd '}
+
+    def test_edit_distance_counts_transposition_once(self):
+        assert edit_distance('dakr', 'dark', 2) == 1
+        assert edit_distance('intersteller', 'interstellar', 2) == 1
+        assert edit_distance('abc', 'xyzabc', 2) == 3 # Berhenti di max_distance + 1
+
+
+class TestTitleIndex:
+
+    def test_prefix_matches_are_sorted(self, title_index):
+        # Hasil prefix selalu di depan, sisa slot diisi hasil fuzzy
+        assert titles(title_index.complete('the dark'))[:2] == ['The Dark Knight', 'The Dark Knight Rises']
+        assert titles(title_index.complete('the dark', limit=2)) == ['The Dark Knight', 'The Dark Knight Rises']
+        assert titles(title_index.complete('AME')) == ['Amélie'] # Tanpa beda huruf besar / diakritik
+
+    def test_limit(self, title_index):
+        assert len(title_index.complete('the', limit=1)) == 1
+
+    def test_fuzzy_matches_typos(self, title_index):
+        assert titles(title_index.complete('intersteller'))[0] == 'Interstellar'
+        assert titles(title_index.complete('dakr city'))[0] == 'Dark City'
+
+    def test_fuzzy_fills_after_prefix_without_duplicates(self, title_index):
+        suggestions = title_index.complete('inception')
+        assert titles(suggestions)[0] == 'Inception'
+        assert len({s['id'] for s in suggestions}) == len(suggestions)
+
+    def test_no_match(self, title_index):
+        assert title_index.complete('zzzzqqq') == []
+        assert title_index.complete('   ') == []
+
+    def test_incremental_add_rename_remove(self, title_index):
+        title_index.add(7, 'Dunkirk')
+        assert titles(title_index.complete('dun')) == ['Dunkirk']
+
+        title_index.add(3, 'Bright City') # Rename id yang sudah ada
+        assert 'Dark City' not in titles(title_index.complete('dark c'))
+        assert titles(title_index.complete('bright')) == ['Bright City']
+
+        title_index.remove(1)
+        title_index.remove(999) # Id tidak dikenal diabaikan
+        assert 'The Dark Knight' not in titles(title_index.complete('the dark'))
+        assert len(title_index) == 6
+
+
+class TestLoadAndHooks:
+
+    def test_load_title_index_from_database(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'ac.sqlite'}")
+        Base.metadata.create_all(engine)
+        session_factory = get_session_factory(engine)
+        session = session_factory()
+        session.add_all([Movie(title='Parasite'), Movie(title='Paprika')])
+        session.commit()
+        session.close()
+
+        index = TitleIndex()
+        load_title_index(index, session_factory)
+
+        assert titles(index.complete('pa')) == ['Paprika', 'Parasite']
+        engine.dispose()
+
+    def test_load_title_index_without_tables(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'empty.sqlite'}")
+        index = TitleIndex()
+        load_title_index(index, get_session_factory(engine)) # Tidak boleh raise
+        assert len(index) == 0
+        engine.dispose()
+
+    def test_hooks_apply_only_after_successful_commit(self, title_index):
+        request = DummyRequest()
+        request.registry = {AUTOCOMPLETE_REGISTRY_KEY: title_index}
+        request.tm = MagicMock()
+
+        index_title_after_commit(request, 8, 'Parasite')
+        unindex_title_after_commit(request, 5)
+        add_hook, remove_hook = [c[0][0] for c in request.tm.get.return_value.addAfterCommitHook.call_args_list]
+
+        add_hook(False)
+        assert title_index.complete('parasite') == []
+        add_hook(True)
+        remove_hook(True)
+        assert titles(title_index.complete('parasite')) == ['Parasite']
+        assert title_index.complete('interstellar') == []
+
+    def test_index_rebuilt_when_catalog_version_changes(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'ac.sqlite'}")
+        Base.metadata.create_all(engine)
+        session_factory = get_session_factory(engine)
+        with session_factory() as session:
+            session.add(Movie(title='Parasite'))
+            session.commit()
+        cache = MemoryResponseCache()
+        index = TitleIndex()
+        load_title_index(index, session_factory)
+        request = DummyRequest()
+        request.registry = {AUTOCOMPLETE_REGISTRY_KEY: index, CACHE_REGISTRY_KEY: cache,
+                            'dbsession_factory': session_factory}
+        with session_factory() as session: # import_movies di proses lain
+            session.add(Movie(title='Paprika'))
+            session.commit()
+
+        assert titles(get_current_title_index(request).complete('pa')) == ['Parasite']
+        cache.invalidate(CATALOG_TAG)
+        # Build ulang di latar belakang: request ini tidak menunggu full scan
+        assert titles(get_current_title_index(request).complete('pa')) == ['Parasite']
+        join_index_threads()
+        assert titles(get_current_title_index(request).complete('pa')) == ['Paprika', 'Parasite']
+        assert index.catalog_version == 1
+        engine.dispose()
+
+    def test_edits_during_rebuild_survive_the_swap(self, title_index):
+        title_index.begin_build() # Database sudah dibaca, build belum selesai
+        title_index.add(7, 'Parasite')
+        title_index.remove(5)
+
+        title_index.build([(1, 'The Dark Knight'), (5, 'Interstellar')])
+
+        assert titles(title_index.complete('parasite')) == ['Parasite']
+        assert title_index.complete('interstellar') == []
+        assert len(title_index) == 2
+
+    def test_only_one_rebuild_at_a_time(self, title_index):
+        title_index._refresh_lock.acquire() # Build lain sedang berjalan
+        try:
+            assert rebuild_title_index(title_index, MagicMock()) is None
+        finally:
+            title_index._refresh_lock.release()
+
+    def test_includeme_builds_on_first_request(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'ac.sqlite'}")
+        Base.metadata.create_all(engine)
+        session_factory = get_session_factory(engine)
+        with session_factory() as session:
+            session.add(Movie(title='Parasite'))
+            session.commit()
+
+        with testing.testConfig() as config:
+            config.registry['dbsession_factory'] = session_factory
+            config.include('backend.autocomplete')
+            index = config.registry[AUTOCOMPLETE_REGISTRY_KEY]
+            assert len(index) == 0 # bootstrap() di script tidak membaca judul
+
+            config.registry.notify(NewRequest(testing.DummyRequest()))
+            join_index_threads()
+        assert titles(index.complete('pa')) == ['Parasite']
+        engine.dispose()
+
+
+def join_index_threads():
+    for thread in threading.enumerate():
+        if thread.name == 'autocomplete-index':
+            thread.join(timeout=5)
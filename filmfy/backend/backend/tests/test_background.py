@@ -0,0 +1,32 @@
+# filmfy/backend/backend/tests/test_background.py
+import threading
+from unittest.mock import MagicMock
+
+from pyramid import testing
+from pyramid.events import NewRequest
+
+from ..background import StartOnFirstRequest, start_on_first_request
+
+
+def test_starts_once_on_first_request():
+    start = MagicMock()
+    with testing.testConfig() as config:
+        start_on_first_request(config, start)
+        start.assert_not_called() # Seperti bootstrap() di script
+
+        config.registry.notify(NewRequest(testing.DummyRequest()))
+        config.registry.notify(NewRequest(testing.DummyRequest()))
+
+    start.assert_called_once_with()
+
+
+def test_concurrent_first_requests_start_once():
+    start = MagicMock()
+    subscriber = StartOnFirstRequest(start)
+    threads = [threading.Thread(target=subscriber, args=(None,)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    start.assert_called_once_with()
@@ -0,0 +1,177 @@
+# filmfy/backend/backend/tests/test_cache.py
+import pytest
+from unittest.mock import MagicMock
+from pyramid.response import Response
+from pyramid.testing import DummyRequest
+
+from ..cache import (
+    MemoryResponseCache,
+    SQLiteResponseCache,
+    MOVIE_LIST_TAG,
+    CACHE_REGISTRY_KEY,
+    movie_tag,
+    cache_from_settings,
+    cache_key,
+    cached_json_view,
+    invalidate_after_commit,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def cache_backend(request, tmp_path):
+    clock = FakeClock()
+    if request.param == 'memory':
+        cache = MemoryResponseCache(max_entries=3, ttl=10, clock=clock)
+    else:
+        cache = SQLiteResponseCache(str(tmp_path / 'cache.sqlite'), max_entries=3, ttl=10, clock=clock)
+    cache.clock = clock
+    return cache
+
+
+class TestCacheBackends:
+
+    def test_set_and_get(self, cache_backend):
+        assert cache_backend.get('k1') is None
+        assert cache_backend.set('k1', MOVIE_LIST_TAG, b'[1]', cache_backend.generation(MOVIE_LIST_TAG))
+        assert cache_backend.get('k1') == b'[1]'
+
+    def test_ttl_expiry(self, cache_backend):
+        cache_backend.set('k1', MOVIE_LIST_TAG, b'[1]', 0)
+        cache_backend.clock.now += 11
+        assert cache_backend.get('k1') is None
+
+    def test_max_entries_evicts_oldest(self, cache_backend):
+        for i in range(4):
+            cache_backend.clock.now += 1
+            cache_backend.set(f'k{i}', MOVIE_LIST_TAG, b'x', 0)
+        assert cache_backend.get('k0') is None
+        assert cache_backend.get('k3') == b'x'
+
+    def test_invalidate_only_matching_tags(self, cache_backend):
+        cache_backend.set('list', MOVIE_LIST_TAG, b'[]', 0)
+        cache_backend.set('detail-1', movie_tag(1), b'{"id": 1}', 0)
+        cache_backend.set('detail-2', movie_tag(2), b'{"id": 2}', 0)
+
+        cache_backend.invalidate(MOVIE_LIST_TAG, movie_tag(1))
+
+        assert cache_backend.get('list') is None
+        assert cache_backend.get('detail-1') is None
+        assert cache_backend.get('detail-2') == b'{"id": 2}'
+
+    def test_set_rejected_after_concurrent_invalidation(self, cache_backend):
+        # Body di-render sebelum invalidasi tidak boleh masuk cache
+        generation = cache_backend.generation(MOVIE_LIST_TAG)
+        cache_backend.invalidate(MOVIE_LIST_TAG)
+        assert not cache_backend.set('list', MOVIE_LIST_TAG, b'[stale]', generation)
+        assert cache_backend.get('list') is None
+
+    def test_sqlite_cache_shared_between_instances(self, tmp_path):
+        path = str(tmp_path / 'shared.sqlite')
+        cache_a = SQLiteResponseCache(path)
+        cache_b = SQLiteResponseCache(path) # Mewakili proses waitress lain
+        cache_a.set('list', MOVIE_LIST_TAG, b'[]', 0)
+        assert cache_b.get('list') == b'[]'
+        cache_b.invalidate(MOVIE_LIST_TAG)
+        assert cache_a.get('list') is None
+
+
+class TestCacheFromSettings:
+
+    def test_disabled_by_default(self):
+        assert cache_from_settings({}) is None
+        assert cache_from_settings({'cache.backend': 'none'}) is None
+
+    def test_memory(self):
+        cache = cache_from_settings({'cache.backend': 'memory', 'cache.ttl': '5', 'cache.max_entries': '7'})
+        assert isinstance(cache, MemoryResponseCache)
+        assert (cache.ttl, cache.max_entries) == (5, 7)
+
+    def test_sqlite_requires_path(self, tmp_path):
+        with pytest.raises(ValueError):
+            cache_from_settings({'cache.backend': 'sqlite'})
+        cache = cache_from_settings({'cache.backend': 'sqlite', 'cache.sqlite_path': str(tmp_path / 'c.sqlite')})
+        assert isinstance(cache, SQLiteResponseCache)
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            cache_from_settings({'cache.backend': 'redis'})
+
+
+@pytest.fixture
+def cache_request():
+    request = DummyRequest(path='/api/movies', params={'limit': '10', 'after': 'abc'})
+    request.matched_route = MagicMock()
+    request.matched_route.name = 'api_movies_list'
+    request.registry = {CACHE_REGISTRY_KEY: MemoryResponseCache()}
+    return request
+
+
+class TestCachedJsonView:
+
+    def test_cache_key_is_independent_of_param_order(self, cache_request):
+        other = DummyRequest(path='/api/movies', params={'after': 'abc', 'limit': '10'})
+        other.matched_route = cache_request.matched_route
+        assert cache_key(cache_request) == cache_key(other)
+        assert cache_request.application_url in cache_key(cache_request)
+
+    def test_miss_then_hit(self, cache_request):
+        view = MagicMock(return_value=Response(body=b'{"movies": []}', content_type='application/json'))
+        cached_view = cached_json_view(lambda request: MOVIE_LIST_TAG)(view)
+
+        first = cached_view(None, cache_request)
+        second = cached_view(None, cache_request)
+
+        view.assert_called_once()
+        assert first.headers['X-Cache'] == 'MISS'
+        assert second.headers['X-Cache'] == 'HIT'
+        assert second.body == b'{"movies": []}'
+
+    def test_errors_and_streams_are_not_cached(self, cache_request):
+        error_response = Response(body=b'{"error": "x"}', content_type='application/json', status=400)
+        stream_response = Response(app_iter=iter([b'[', b']']), content_type='application/json')
+        view = MagicMock(side_effect=[error_response, stream_response, error_response])
+        cached_view = cached_json_view(lambda request: MOVIE_LIST_TAG)(view)
+
+        cached_view(None, cache_request)
+        cached_view(None, cache_request)
+        cached_view(None, cache_request)
+
+        assert view.call_count == 3
+
+    def test_passthrough_without_cache(self, cache_request):
+        cache_request.registry = {}
+        view = MagicMock(return_value=Response(body=b'[]', content_type='application/json'))
+        cached_json_view(lambda request: MOVIE_LIST_TAG)(view)(None, cache_request)
+        cached_json_view(lambda request: MOVIE_LIST_TAG)(view)(None, cache_request)
+        assert view.call_count == 2
+
+
+class TestInvalidateAfterCommit:
+
+    def test_invalidates_only_on_successful_commit(self, cache_request):
+        cache = cache_request.registry[CACHE_REGISTRY_KEY]
+        cache.set('list', MOVIE_LIST_TAG, b'[]', 0)
+        cache_request.tm = MagicMock()
+
+        invalidate_after_commit(cache_request, MOVIE_LIST_TAG)
+
+        hook = cache_request.tm.get.return_value.addAfterCommitHook.call_args[0][0]
+        assert cache.get('list') == b'[]' # Belum commit
+        hook(False) # Transaksi gagal / abort
+        assert cache.get('list') == b'[]'
+        hook(True)
+        assert cache.get('list') is None
+
+    def test_noop_without_cache(self, cache_request):
+        cache_request.registry = {}
+        cache_request.tm = MagicMock()
+        invalidate_after_commit(cache_request, MOVIE_LIST_TAG)
+        cache_request.tm.get.assert_not_called()
@@ -0,0 +1,92 @@
+# filmfy/backend/backend/tests/test_cors.py
+from unittest.mock import MagicMock
+
+import pytest
+from pyramid.httpexceptions import HTTPForbidden
+from pyramid.request import Request
+from pyramid.response import Response
+
+from ..cors import cors_policy_from_settings, cors_tween_factory
+
+
+def make_tween(**settings):
+    handler = MagicMock(side_effect=lambda request: Response(json_body={'ok': True}))
+    registry = MagicMock()
+    registry.settings = {'cors.allow_origins': 'http://localhost:5173 https://filmfy.example.com',
+                         **settings}
+    return cors_tween_factory(handler, registry), handler
+
+
+def preflight(path='/api/movies', origin='http://localhost:5173'):
+    return Request.blank(path, method='OPTIONS', headers={
+        'Origin': origin, 'Access-Control-Request-Method': 'POST'})
+
+
+class TestCORSTween:
+
+    def test_preflight_answered_without_calling_the_app(self):
+        tween, handler = make_tween()
+
+        response = tween(preflight())
+
+        handler.assert_not_called() # Tanpa routing, pyramid_tm, maupun session
+        assert response.status_code == 204
+        assert response.headers['Access-Control-Allow-Origin'] == 'http://localhost:5173'
+        assert response.headers['Access-Control-Allow-Credentials'] == 'true'
+        assert response.headers['Access-Control-Allow-Methods'] == 'POST,GET,DELETE,PUT,OPTIONS'
+        assert response.headers['Access-Control-Max-Age'] == '1728000'
+
+    def test_preflight_from_unknown_origin_is_rejected(self):
+        tween, handler = make_tween()
+
+        response = tween(preflight(origin='https://evil.example.com'))
+
+        handler.assert_not_called()
+        assert response.status_code == 403
+        assert 'Access-Control-Allow-Origin' not in response.headers
+
+    def test_plain_options_and_other_paths(self):
+        tween, handler = make_tween()
+
+        assert tween(Request.blank('/api/movies', method='OPTIONS')).status_code == 204
+        tween(preflight(path='/static/app.js'))
+        handler.assert_called_once() # Di luar /api/ diteruskan ke aplikasi
+
+    @pytest.mark.parametrize('origin, allowed', [
+        ('https://filmfy.example.com', True),
+        ('https://evil.example.com', False),
+        (None, False),
+    ])
+    def test_response_headers_only_for_allowed_origins(self, origin, allowed):
+        tween, _ = make_tween()
+        headers = {'Origin': origin} if origin else {}
+
+        response = tween(Request.blank('/api/movies', headers=headers))
+
+        assert response.headers.get('Access-Control-Allow-Origin') == (origin if allowed else None)
+        assert response.headers['Vary'] == 'Origin' # Selalu, agar cache bersama memisahkan per origin
+
+    def test_wildcard_origin_reflects_request_origin(self):
+        tween, _ = make_tween(**{'cors.allow_origins': '*', 'cors.allow_credentials': 'false'})
+
+        response = tween(preflight(origin='https://siapa.saja'))
+
+        assert response.headers['Access-Control-Allow-Origin'] == 'https://siapa.saja'
+        assert 'Access-Control-Allow-Credentials' not in response.headers
+
+    def test_vary_is_merged_with_existing_header(self):
+        handler = MagicMock(side_effect=lambda request: Response(body=b'css', headers={'Vary': 'Accept-Encoding'}))
+        registry = MagicMock()
+        registry.settings = {}
+        tween = cors_tween_factory(handler, registry)
+
+        response = tween(Request.blank('/static/theme.css', headers={'Origin': 'https://evil.example.com'}))
+
+        assert response.headers['Vary'] == 'Accept-Encoding, Origin'
+        assert isinstance(tween(preflight(origin='https://evil.example.com')), HTTPForbidden)
+        assert tween(preflight(origin='https://evil.example.com')).headers['Vary'] == 'Origin'
+
+    def test_wildcard_with_credentials_is_rejected(self):
+        with pytest.raises(ValueError):
+            cors_policy_from_settings({'cors.allow_origins': '*'})
+        assert cors_policy_from_settings({'cors.allow_origins': '*', 'cors.allow_credentials': 'false'}).allow_any
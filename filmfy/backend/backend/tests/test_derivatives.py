@@ -0,0 +1,125 @@
+# filmfy/backend/backend/tests/test_derivatives.py
+import os
+from io import BytesIO
+from unittest.mock import MagicMock
+
+import pytest
+from PIL import Image
+from pyramid import testing
+
+from ..derivatives import (
+    DERIVATIVES_REGISTRY_KEY,
+    DerivativePipeline,
+    derivative_pipeline_from_settings,
+    generate_derivatives,
+    generate_derivatives_after_commit,
+    missing_variant_view,
+)
+from ..storage import BlobStorage, variant_name
+
+
+def image_bytes(size=(800, 1200), fmt='JPEG', mode='RGB'):
+    output = BytesIO()
+    Image.new(mode, size, 'red').save(output, fmt)
+    return output.getvalue()
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return BlobStorage(str(tmp_path / 'postersMovie'), 'postersMovie')
+
+
+class TestGenerateDerivatives:
+
+    def test_widths_and_webp_for_jpeg(self, storage):
+        full_path = storage.full_path(storage.put(BytesIO(image_bytes()), '.jpg'))
+
+        assert generate_derivatives(full_path, (160, 320)) == 4
+
+        for width in (160, 320):
+            for ext, fmt in (('webp', 'WEBP'), ('jpg', 'JPEG')):
+                with Image.open(variant_name(full_path, width, ext)) as variant:
+                    assert variant.format == fmt
+                    assert variant.size == (width, width * 3 // 2)
+        assert generate_derivatives(full_path, (160, 320)) == 0 # Sudah lengkap
+
+    def test_narrow_image_is_not_upscaled(self, storage):
+        full_path = storage.full_path(storage.put(BytesIO(image_bytes((100, 100), 'PNG', 'RGBA')), '.png'))
+
+        generate_derivatives(full_path, (160,))
+
+        with Image.open(variant_name(full_path, 160, 'png')) as variant:
+            assert variant.size == (100, 100)
+        assert os.path.exists(variant_name(full_path, 160, 'webp'))
+
+    def test_variants_are_deleted_with_original(self, storage):
+        path = storage.put(BytesIO(image_bytes()), '.jpg')
+        generate_derivatives(storage.full_path(path), (160,))
+
+        storage.delete(path)
+
+        assert [name for _, _, names in os.walk(storage.root) for name in names] == []
+
+
+class TestDerivativePipeline:
+
+    def test_settings(self):
+        pipeline = derivative_pipeline_from_settings({'images.widths': '640 160', 'images.executor': 'none'})
+        assert pipeline.widths == (160, 640)
+        assert derivative_pipeline_from_settings({'images.widths': ''}) is None
+        with pytest.raises(ValueError):
+            derivative_pipeline_from_settings({'images.executor': 'gpu'})
+
+    def test_srcset_only_webp_for_other_formats(self):
+        pipeline = DerivativePipeline(widths=(160,), executor='none')
+        assert pipeline.srcset('http://x', 'profile_pics/a.gif') == {
+            'image/webp': 'http://x/static/profile_pics/a-w160.webp 160w',
+        }
+
+    def test_thread_executor(self, storage):
+        full_path = storage.full_path(storage.put(BytesIO(image_bytes()), '.jpg'))
+        pipeline = DerivativePipeline(widths=(160,), executor='thread')
+
+        pipeline.submit(full_path)
+        pipeline.shutdown()
+
+        assert os.path.exists(variant_name(full_path, 160, 'webp'))
+
+    def test_after_commit_hook(self, storage):
+        full_path = storage.full_path(storage.put(BytesIO(image_bytes()), '.jpg'))
+        pipeline = MagicMock()
+        request = MagicMock()
+        request.registry = {DERIVATIVES_REGISTRY_KEY: pipeline}
+
+        generate_derivatives_after_commit(request, storage, storage.relative_path(full_path))
+        hook = request.tm.get.return_value.addAfterCommitHook.call_args[0][0]
+        hook(False)
+        pipeline.submit.assert_not_called()
+        hook(True)
+        pipeline.submit.assert_called_once_with(full_path)
+
+
+class TestMissingVariantView:
+
+    def test_redirects_to_original_and_generates(self, tmp_path, monkeypatch):
+        storage = BlobStorage(str(tmp_path / 'postersMovie'), 'postersMovie')
+        monkeypatch.setattr('backend.derivatives.upload_storage', lambda prefix: storage)
+        path = storage.put(BytesIO(image_bytes()), '.jpg')
+        pipeline = DerivativePipeline(widths=(160,), executor='none')
+        request = testing.DummyRequest(path=f'/static/{variant_name(path, 160, "webp")}')
+        request.registry = {DERIVATIVES_REGISTRY_KEY: pipeline}
+
+        response = missing_variant_view(request)
+
+        assert response.status_code == 302
+        assert response.location == f'http://example.com/static/{path}'
+        assert response.cache_control.no_store
+        assert os.path.exists(variant_name(storage.full_path(path), 160, 'webp'))
+
+    def test_unknown_original_is_404(self, tmp_path, monkeypatch):
+        storage = BlobStorage(str(tmp_path / 'postersMovie'), 'postersMovie')
+        monkeypatch.setattr('backend.derivatives.upload_storage', lambda prefix: storage)
+        request = testing.DummyRequest(path='/static/postersMovie/ab/cd/abcd-w160.webp')
+        request.registry = {}
+
+        assert missing_variant_view(request).status_code == 404
@@ -0,0 +1,156 @@
+# filmfy/backend/backend/tests/test_export.py
+import gzip
+import io
+import json
+from unittest.mock import MagicMock
+
+import pytest
+from pyramid.registry import Registry
+from pyramid.testing import DummyRequest
+from pyramid.httpexceptions import HTTPBadRequest, HTTPForbidden, HTTPNotFound, HTTPUnauthorized
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from ..export import (
+    EXPORT_ADMIN_IDS_REGISTRY_KEY,
+    export_admin_ids_from_settings,
+    export_filename,
+    iter_export,
+    iter_export_response,
+    iter_gzip,
+)
+from ..models import get_session_factory
+from ..models.meta import Base
+from ..models.movie import Movie
+from ..models.user import User
+from ..scripts.import_movies import read_records, clean_movie_record
+from ..views.export import export_view
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    session_factory = get_session_factory(engine)
+    session = session_factory()
+    session.add_all([Movie(title=f'Movie {i}', genre='Drama', release_year=2000 + i, rating=i % 10 + 1)
+                     for i in range(1, 6)])
+    user = User(username='budi', email='budi@example.com')
+    user.hashed_password = 'rahasia'
+    session.add(user)
+    session.commit()
+    session.close()
+    yield session_factory
+    engine.dispose()
+
+
+def export_text(session_factory, table, fmt, batch_size=2):
+    session = session_factory()
+    try:
+        chunks = list(iter_export(session, table, fmt, batch_size))
+    finally:
+        session.close()
+    return chunks, b''.join(chunks).decode('utf-8')
+
+
+class TestIterExport:
+
+    def test_ndjson_streams_one_chunk_per_batch(self, session_factory):
+        chunks, body = export_text(session_factory, 'movies', 'ndjson')
+
+        rows = [json.loads(line) for line in body.splitlines()]
+        assert len(chunks) == 3 # 5 baris, batch 2
+        assert [row['title'] for row in rows] == [f'Movie {i}' for i in range(1, 6)]
+        assert rows[0]['updated_at'] is not None # datetime di-encode ISO 8601
+
+    def test_csv_can_be_imported_again(self, session_factory):
+        _, body = export_text(session_factory, 'movies', 'csv')
+
+        records = [clean_movie_record(record) for _, record in read_records(io.StringIO(body), 'csv')]
+        assert records[0] == {'title': 'Movie 1', 'genre': 'Drama', 'release_year': 2001,
+                              'rating': 2, 'poster_path': None}
+        assert len(records) == 5
+
+    def test_columnar(self, session_factory):
+        _, body = export_text(session_factory, 'movies', 'columnar')
+
+        header, *batches = [json.loads(line) for line in body.splitlines()]
+        assert header['format'] == 'filmfy-columnar'
+        assert header['columns'][:2] == ['id', 'title']
+        assert [batch['rows'] for batch in batches] == [2, 2, 1]
+        assert batches[0]['data']['release_year'] == [2001, 2002]
+
+    def test_users_export_never_includes_password_hash(self, session_factory):
+        for fmt in ('ndjson', 'csv', 'columnar'):
+            _, body = export_text(session_factory, 'users', fmt)
+            assert 'budi@example.com' in body
+            assert 'rahasia' not in body and 'hashed_password' not in body
+
+    def test_empty_csv_has_header(self):
+        engine = create_engine('sqlite://')
+        Base.metadata.create_all(engine)
+        with Session(engine) as session:
+            body = b''.join(iter_export(session, 'movies', 'csv')).decode('utf-8')
+        assert body.splitlines() == ['id,title,genre,release_year,rating,poster_path,updated_at']
+        engine.dispose()
+
+    def test_gzip_round_trip(self, session_factory):
+        chunks = list(iter_export_response(session_factory, 'movies', 'ndjson', gzip=True, batch_size=2))
+
+        assert len(gzip.decompress(b''.join(chunks)).splitlines()) == 5
+        assert list(iter_gzip([])) and gzip.decompress(b''.join(iter_gzip([]))) == b''
+
+    def test_export_filename(self):
+        assert export_filename('movies', 'columnar', gzip=True) == 'movies.columnar.ndjson.gz'
+
+
+class TestExportView:
+
+    def make_request(self, table, session_factory=None, allow_users='false', user_id=None, **params):
+        request = DummyRequest(params=params)
+        request.matchdict = {'table': table}
+        request.session = {} if user_id is None else {'user_id': user_id}
+        request.registry = Registry('test')
+        request.registry.settings = {'export.allow_users': allow_users}
+        request.registry['dbsession_factory'] = MagicMock() # Primary: tidak boleh dipakai
+        request.registry['readonly_dbsession_factory'] = lambda bind: session_factory()
+        request.registry['replica_router'] = MagicMock()
+        request.registry[EXPORT_ADMIN_IDS_REGISTRY_KEY] = export_admin_ids_from_settings({'export.admin_ids': '1 7'})
+        return request
+
+    def test_streams_movies_as_download(self, session_factory):
+        response = export_view(self.make_request('movies', session_factory, format='csv', gzip='1'))
+
+        assert response.content_type == 'application/gzip'
+        assert response.content_disposition == 'attachment; filename="movies.csv.gz"'
+        assert gzip.decompress(response.body).decode('utf-8').startswith('id,title')
+
+    def test_reads_from_replica_router(self, session_factory):
+        request = self.make_request('movies', session_factory)
+
+        export_view(request).body
+
+        request.registry['replica_router'].engine_for.assert_called_once_with(request)
+        request.registry['dbsession_factory'].assert_not_called()
+
+    def test_invalid_requests(self):
+        assert isinstance(export_view(self.make_request('sessions')), HTTPNotFound)
+        assert isinstance(export_view(self.make_request('movies', format='xml')), HTTPBadRequest)
+        # users: mati secara default, dan butuh login jika diaktifkan
+        assert isinstance(export_view(self.make_request('users')), HTTPNotFound)
+        assert isinstance(export_view(self.make_request('users', allow_users='true')), HTTPUnauthorized)
+
+    def test_users_export_requires_admin(self, session_factory):
+        # Email semua user: user biasa yang login tetap ditolak
+        response = export_view(self.make_request('users', session_factory, allow_users='true', user_id=2))
+        assert isinstance(response, HTTPForbidden)
+
+        response = export_view(self.make_request('users', session_factory, allow_users='true', user_id=7))
+        assert response.status_code == 200
+        assert response.content_disposition == 'attachment; filename="users.ndjson"'
+
+    def test_admin_ids_are_validated_at_startup(self):
+        assert export_admin_ids_from_settings({'export.admin_ids': '1\n 7'}) == frozenset({1, 7})
+        assert export_admin_ids_from_settings({}) == frozenset()
+        with pytest.raises(ValueError, match='Invalid export.admin_ids: admin'):
+            export_admin_ids_from_settings({'export.admin_ids': '1 admin'})
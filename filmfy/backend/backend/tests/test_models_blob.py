@@ -0,0 +1,91 @@
+# filmfy/backend/backend/tests/test_models_blob.py
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from ..models import blob as blob_module
+from ..models.meta import Base
+from ..models.movie import Movie
+from ..models.user import User
+from ..models.blob import (
+    Blob,
+    acquire_blob,
+    release_blob,
+    count_blob_refs,
+    lock_blobs,
+    rebuild_blob_refs,
+)
+
+
+@pytest.fixture
+def session():
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    session = Session(engine)
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def refcount(session, path):
+    blob = session.get(Blob, path)
+    return blob.refcount if blob is not None else None
+
+
+class TestBlobRefs:
+
+    def test_acquire_and_release(self, session):
+        acquire_blob(session, 'postersMovie/ab/cd/abcd.jpg')
+        acquire_blob(session, 'postersMovie/ab/cd/abcd.jpg')
+        assert refcount(session, 'postersMovie/ab/cd/abcd.jpg') == 2
+
+        assert release_blob(session, 'postersMovie/ab/cd/abcd.jpg') == 1
+        assert release_blob(session, 'postersMovie/ab/cd/abcd.jpg') == 0
+        session.expire_all()
+        assert refcount(session, 'postersMovie/ab/cd/abcd.jpg') is None # Baris ikut dihapus
+
+    def test_release_without_returning(self, session, monkeypatch):
+        # Dialect tanpa UPDATE ... RETURNING memakai UPDATE lalu SELECT
+        monkeypatch.setattr(session.get_bind().dialect, 'update_returning', False)
+        acquire_blob(session, 'postersMovie/ab/cd/abcd.jpg')
+        acquire_blob(session, 'postersMovie/ab/cd/abcd.jpg')
+
+        assert release_blob(session, 'postersMovie/ab/cd/abcd.jpg') == 1
+        assert release_blob(session, 'postersMovie/ab/cd/abcd.jpg') == 0
+        assert release_blob(session, 'postersMovie/2b0178c4.png') == 0
+        session.expire_all()
+        assert refcount(session, 'postersMovie/ab/cd/abcd.jpg') is None
+
+    def test_release_legacy_path_without_row(self, session):
+        # Upload lama (nama uuid) tidak punya baris: dianggap referensi terakhir
+        assert release_blob(session, 'postersMovie/2b0178c4.png') == 0
+
+    @pytest.mark.parametrize('upsert', [True, False])
+    def test_lock_blobs_keeps_counts(self, session, monkeypatch, upsert):
+        if not upsert: # Dialect tanpa ON CONFLICT
+            monkeypatch.setattr(blob_module, '_UPSERT_DIALECTS', {})
+        acquire_blob(session, 'postersMovie/ab/cd/abcd.jpg')
+
+        lock_blobs(session, ['postersMovie/ab/cd/abcd.jpg', 'postersMovie/ef/01/ef01.jpg'])
+
+        session.expire_all()
+        assert refcount(session, 'postersMovie/ab/cd/abcd.jpg') == 1
+        assert refcount(session, 'postersMovie/ef/01/ef01.jpg') == 0
+
+    def test_rebuild_counts_movies_and_users(self, session):
+        session.add_all([
+            Movie(title='A', poster_path='postersMovie/shared.jpg'),
+            Movie(title='B', poster_path='postersMovie/shared.jpg'),
+            Movie(title='C'),
+            User(username='u', email='u@example.com', hashed_password='x',
+                 profile_photo='profile_pics/me.png'),
+        ])
+        acquire_blob(session, 'postersMovie/stale.jpg') # Tidak dirujuk siapa pun
+
+        assert count_blob_refs(session) == {'postersMovie/shared.jpg': 2, 'profile_pics/me.png': 1}
+        rebuild_blob_refs(session)
+
+        session.expire_all()
+        assert refcount(session, 'postersMovie/shared.jpg') == 2
+        assert refcount(session, 'profile_pics/me.png') == 1
+        assert refcount(session, 'postersMovie/stale.jpg') is None
@@ -0,0 +1,66 @@
+# filmfy/backend/backend/tests/test_models_engine.py
+import pytest
+from sqlalchemy import text
+
+from ..models import get_engine, get_replica_engines, sqlite_pragmas_from_settings
+
+PRODUCTION_PROFILE = {
+    'sqlite.journal_mode': 'WAL',
+    'sqlite.synchronous': 'normal',
+    'sqlite.busy_timeout': '5000',
+    'sqlite.cache_size': '-65536',
+    'sqlite.mmap_size': '268435456',
+}
+
+
+def pragma(engine, name):
+    with engine.connect() as connection:
+        return connection.execute(text(f'PRAGMA {name}')).scalar()
+
+
+def test_sqlite_profile_applied_on_every_connection(tmp_path):
+    settings = {'sqlalchemy.url': f'sqlite:///{tmp_path / "prod.sqlite"}', **PRODUCTION_PROFILE}
+    engine = get_engine(settings)
+
+    assert pragma(engine, 'journal_mode') == 'wal'
+    assert pragma(engine, 'synchronous') == 1 # NORMAL
+    assert pragma(engine, 'busy_timeout') == 5000
+    assert pragma(engine, 'cache_size') == -65536
+    assert pragma(engine, 'mmap_size') == 268435456
+
+    engine.dispose() # Koneksi baru mendapat PRAGMA yang sama
+    assert pragma(engine, 'busy_timeout') == 5000
+
+
+def test_replicas_get_the_same_profile(tmp_path):
+    settings = {'sqlalchemy.url': 'sqlite://',
+                'sqlalchemy.replica.url': f'sqlite:///{tmp_path / "replica.sqlite"}',
+                'sqlite.busy_timeout': '1234'}
+
+    [replica] = get_replica_engines(settings)
+
+    assert pragma(replica, 'busy_timeout') == 1234
+
+
+def test_without_profile_sqlite_defaults_are_kept(tmp_path):
+    engine = get_engine({'sqlalchemy.url': f'sqlite:///{tmp_path / "dev.sqlite"}'})
+
+    assert pragma(engine, 'journal_mode') == 'delete'
+
+
+def test_pool_options_are_passed_to_create_engine(tmp_path):
+    engine = get_engine({'sqlalchemy.url': f'sqlite:///{tmp_path / "pool.sqlite"}',
+                         'sqlalchemy.pool_size': '3', 'sqlalchemy.max_overflow': '2'})
+
+    assert engine.pool.size() == 3
+    assert engine.pool._max_overflow == 2
+
+
+@pytest.mark.parametrize('name, value', [
+    ('journal_mode', 'wal; DROP TABLE movies'),
+    ('synchronous', 'kadang'),
+    ('busy_timeout', '5 detik'),
+])
+def test_invalid_pragma_values_are_rejected(name, value):
+    with pytest.raises(ValueError):
+        sqlite_pragmas_from_settings({f'sqlite.{name}': value})
@@ -0,0 +1,108 @@
+# filmfy/backend/backend/tests/test_models_facet.py
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from ..models.meta import Base
+from ..models.movie import Movie
+from ..models.facet import (
+    MovieFacet,
+    movie_facet_keys,
+    facet_keys_for,
+    adjust_movie_facets,
+    movie_facets,
+    count_movie_facets,
+    rebuild_movie_facets,
+)
+
+
+@pytest.fixture
+def session():
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    session = Session(engine)
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def add_movie(session, **fields):
+    movie = Movie(**fields)
+    session.add(movie)
+    session.flush()
+    adjust_movie_facets(session, added=facet_keys_for(movie))
+    return movie
+
+
+class TestFacetKeys:
+
+    def test_movie_facet_keys(self):
+        assert movie_facet_keys(' Drama ', 1999, 8) == [('genre', 'Drama'), ('decade', '1990'), ('rating', '8')]
+        assert movie_facet_keys(None, None, None) == [('genre', ''), ('decade', ''), ('rating', '')]
+
+
+class TestAdjustMovieFacets:
+
+    def test_create_update_delete_keep_counts_in_sync(self, session):
+        # Arrange & Act: create
+        first = add_movie(session, title='A', genre='Drama', release_year=1994, rating=8)
+        add_movie(session, title='B', genre='Drama', release_year=2001, rating=None)
+
+        # Update: genre & rating berubah, dekade tetap
+        before = facet_keys_for(first)
+        first.genre = 'Comedy'
+        first.rating = 9
+        session.flush()
+        adjust_movie_facets(session, removed=before, added=facet_keys_for(first))
+
+        # Delete
+        second = session.query(Movie).filter_by(title='B').one()
+        session.delete(second)
+        session.flush()
+        adjust_movie_facets(session, removed=facet_keys_for(second))
+
+        # Assert
+        assert count_movie_facets(session) == {
+            (facet, value): count
+            for facet, value, count in session.query(MovieFacet.facet, MovieFacet.value, MovieFacet.count)
+            if count
+        }
+        assert movie_facets(session) == {
+            'genre': [{'value': 'Comedy', 'count': 1}],
+            'decade': [{'value': 1990, 'count': 1}],
+            'rating': [{'value': 9, 'count': 1}],
+        }
+
+    def test_unchanged_keys_do_not_touch_table(self, session):
+        keys = movie_facet_keys('Drama', 1999, 8)
+        adjust_movie_facets(session, removed=keys, added=keys)
+        assert session.query(MovieFacet).count() == 0
+
+
+class TestMovieFacetsAndRebuild:
+
+    def test_ordering_and_unknown_values(self, session):
+        for title, genre, year, rating in [('A', 'Drama', 2005, 7), ('B', 'Action', 1985, None),
+                                           ('C', 'Action', None, 3), ('D', None, 2010, 7)]:
+            add_movie(session, title=title, genre=genre, release_year=year, rating=rating)
+
+        facets = movie_facets(session)
+
+        assert facets['genre'] == [{'value': 'Action', 'count': 2}, {'value': 'Drama', 'count': 1},
+                                   {'value': None, 'count': 1}]
+        assert [item['value'] for item in facets['decade']] == [1980, 2000, 2010, None]
+        assert facets['rating'] == [{'value': 3, 'count': 1}, {'value': 7, 'count': 2},
+                                    {'value': None, 'count': 1}]
+
+    def test_rebuild_repairs_drift(self, session):
+        # Arrange: movie ditambahkan tanpa adjust_movie_facets (mis. lewat SQL langsung)
+        add_movie(session, title='A', genre='Drama', release_year=1999, rating=8)
+        session.add(Movie(title='B', genre='Horror', release_year=1999, rating=8))
+        session.flush()
+
+        # Act & Assert
+        assert rebuild_movie_facets(session, dry_run=True) == 3 # genre Horror, dekade 1990, rating 8
+        assert movie_facets(session)['genre'] == [{'value': 'Drama', 'count': 1}]
+        assert rebuild_movie_facets(session) == 3
+        assert movie_facets(session)['decade'] == [{'value': 1990, 'count': 2}]
+        assert rebuild_movie_facets(session) == 0
@@ -0,0 +1,130 @@
+# filmfy/backend/backend/tests/test_models_listing.py
+import itertools
+import os
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from ..models.meta import Base
+from ..models.movie import Movie, MOVIE_COLUMNS
+from ..models.listing import (
+    MOVIE_SORTS,
+    filter_movies,
+    movie_sort_order,
+    sort_value,
+    keyset_after,
+)
+
+# Set ke URL database PostgreSQL kosong untuk menjalankan test plan PostgreSQL,
+# mis. postgresql://postgres@localhost/filmfy_test
+POSTGRESQL_URL = os.environ.get('FILMFY_TEST_POSTGRESQL_URL')
+
+# Satu nilai per filter; kombinasi diuji dengan semua subset filter
+FILTER_VALUES = {
+    'genre': 'Drama',
+    'year_from': 1990,
+    'year_to': 2010,
+    'min_rating': 7,
+}
+
+
+def filter_combinations():
+    for size in range(len(FILTER_VALUES) + 1):
+        for names in itertools.combinations(FILTER_VALUES, size):
+            yield {name: FILTER_VALUES[name] for name in names}
+
+
+def listing_query(session, sort, filters, after=None):
+    query = filter_movies(session.query(*MOVIE_COLUMNS), **filters)
+    if after is not None:
+        query = query.filter(keyset_after(sort, after[0], after[1], session.get_bind().dialect.name))
+    return query.order_by(*movie_sort_order(sort)).limit(51)
+
+
+def explain_sqlite(session, query):
+    sql = query.statement.compile(session.get_bind(), compile_kwargs={'literal_binds': True})
+    return [row[-1] for row in session.connection().exec_driver_sql(f'EXPLAIN QUERY PLAN {sql}')]
+
+
+@pytest.fixture
+def sqlite_session():
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    session = Session(engine)
+    yield session
+    session.close()
+    engine.dispose()
+
+
+class TestKeysetPagination:
+
+    def test_pages_match_full_ordering_including_nulls(self, sqlite_session):
+        # Arrange: rating/release_year sengaja berulang dan sebagian NULL
+        sqlite_session.add_all([
+            Movie(title=f'Movie {i:02d}', genre='Drama' if i % 2 else 'Comedy',
+                  release_year=None if i % 5 == 0 else 1980 + i % 4,
+                  rating=None if i % 3 == 0 else i % 4 + 5)
+            for i in range(1, 21)
+        ])
+        sqlite_session.flush()
+
+        for sort in MOVIE_SORTS:
+            expected = [row.id for row in listing_query(sqlite_session, sort, {}).all()]
+
+            # Act: jalan per halaman berisi 3 baris mengikuti cursor
+            seen = []
+            after = None
+            while True:
+                page = listing_query(sqlite_session, sort, {}, after).limit(3).all()
+                if not page:
+                    break
+                seen.extend(row.id for row in page)
+                after = (sort_value(page[-1], sort), page[-1].id)
+
+            # Assert
+            assert seen == expected, sort
+            assert len(seen) == 20
+
+    def test_filters(self, sqlite_session):
+        sqlite_session.add_all([
+            Movie(title='A', genre='Drama', release_year=1995, rating=8),
+            Movie(title='B', genre='Drama', release_year=1985, rating=9),
+            Movie(title='C', genre='Comedy', release_year=2000, rating=8),
+            Movie(title='D', genre='Drama', release_year=2005, rating=None),
+        ])
+        sqlite_session.flush()
+
+        rows = listing_query(sqlite_session, '-rating', FILTER_VALUES).all()
+
+        assert [row.title for row in rows] == ['A']
+
+
+class TestQueryPlans:
+
+    def test_no_full_table_scan_on_sqlite(self, sqlite_session):
+        for sort, filters in itertools.product(MOVIE_SORTS, filter_combinations()):
+            for after in (None, ('x' if sort.endswith('title') else 5, 10)):
+                plan = explain_sqlite(sqlite_session, listing_query(sqlite_session, sort, filters, after))
+
+                # 'SCAN movies' tanpa 'USING ... INDEX' berarti full table scan
+                assert not [line for line in plan if line.startswith('SCAN') and 'INDEX' not in line], \
+                    (sort, filters, after, plan)
+
+    @pytest.mark.skipif(not POSTGRESQL_URL, reason='FILMFY_TEST_POSTGRESQL_URL not set')
+    def test_no_seq_scan_on_postgresql(self):
+        engine = create_engine(POSTGRESQL_URL)
+        Base.metadata.create_all(engine)
+        try:
+            with Session(engine) as session:
+                # Tabel kosong selalu di-seq-scan; matikan seq scan agar plan
+                # menunjukkan apakah ada index yang bisa melayani query
+                session.connection().exec_driver_sql('SET enable_seqscan = off')
+                for sort, filters in itertools.product(MOVIE_SORTS, filter_combinations()):
+                    query = listing_query(session, sort, filters)
+                    sql = query.statement.compile(engine, compile_kwargs={'literal_binds': True})
+                    plan = '\n'.join(row[0] for row in session.connection().exec_driver_sql(f'EXPLAIN {sql}'))
+                    assert 'Seq Scan' not in plan, (sort, filters, plan)
+        finally:
+            Base.metadata.drop_all(engine)
+            engine.dispose()
@@ -1,9 +1,14 @@
 # filmfy/backend/backend/tests/test_models_movie.py
+import json
 import pytest
 from unittest.mock import MagicMock
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
 
 # Sesuaikan path import ini jika berbeda
-from ..models.movie import Movie
+from ..models.movie import Movie, MOVIE_COLUMNS, catalog_version
+from ..models.meta import Base
+from ..derivatives import DERIVATIVES_REGISTRY_KEY, DerivativePipeline
 
 class TestMovieModel:
 
@@ -49,7 +54,8 @@ class TestMovieModel:
             'release_year': 2008,
             'rating': 9,
             'poster_path': "postersMovie/tdk.jpg",
-            'poster_url': None # Karena tidak ada request
+            'poster_url': None, # Karena tidak ada request
+            'poster_srcset': None,
         }
         assert movie_dict == expected_dict
 
@@ -65,6 +71,7 @@ class TestMovieModel:
         )
         mock_request = MagicMock()
         mock_request.application_url = "http://localhost:6543" # Contoh application_url
+        mock_request.registry = {} # Tanpa pipeline versi kecil
 
         # Act
         movie_dict = movie.to_dict(request=mock_request)
@@ -78,10 +85,25 @@ class TestMovieModel:
             'release_year': 2014,
             'rating': 9,
             'poster_path': "postersMovie/interstellar.jpg",
-            'poster_url': expected_poster_url
+            'poster_url': expected_poster_url,
+            'poster_srcset': None,
         }
         assert movie_dict == expected_dict
 
+    def test_movie_to_dict_with_derivative_pipeline(self):
+        movie = Movie(id=5, title="Dune", poster_path="postersMovie/ab/cd/abcd.jpg")
+        mock_request = MagicMock()
+        mock_request.application_url = "http://localhost:6543"
+        mock_request.registry = {DERIVATIVES_REGISTRY_KEY: DerivativePipeline(widths=(160, 320), executor='none')}
+
+        srcset = movie.to_dict(request=mock_request)['poster_srcset']
+
+        base = "http://localhost:6543/static/postersMovie/ab/cd/abcd"
+        assert srcset == {
+            'image/webp': f"{base}-w160.webp 160w, {base}-w320.webp 320w",
+            'image/jpeg': f"{base}-w160.jpg 160w, {base}-w320.jpg 320w",
+        }
+
     def test_movie_to_dict_with_request_but_no_poster_path(self):
         # Arrange
         movie = Movie(
@@ -94,6 +116,7 @@ class TestMovieModel:
         )
         mock_request = MagicMock()
         mock_request.application_url = "http://localhost:6543"
+        mock_request.registry = {} # Tanpa pipeline versi kecil
 
         # Act
         movie_dict = movie.to_dict(request=mock_request)
@@ -106,7 +129,8 @@ class TestMovieModel:
             'release_year': 2020,
             'rating': 8,
             'poster_path': None,
-            'poster_url': None # Karena poster_path tidak ada
+            'poster_url': None, # Karena poster_path tidak ada
+            'poster_srcset': None,
         }
         assert movie_dict == expected_dict
 
@@ -133,6 +157,61 @@ class TestMovieModel:
             'release_year': 2023,
             'rating': 9,
             'poster_path': "postersMovie/oppenheimer.jpg",
-            'poster_url': None # Karena request tidak diberikan
+            'poster_url': None, # Karena request tidak diberikan
+            'poster_srcset': None,
         }
-        assert movie_dict == expected_dict
\ No newline at end of file
+        assert movie_dict == expected_dict
+
+    def test_row_to_dict_is_byte_identical_to_to_dict(self):
+        # Arrange: Row dari query kolom vs instance ORM untuk baris yang sama
+        engine = create_engine('sqlite://')
+        Base.metadata.create_all(engine)
+        session = Session(engine)
+        session.add_all([
+            Movie(title="Parasite", genre="Thriller", release_year=2019, rating=9,
+                  poster_path="postersMovie/parasite.jpg"),
+            Movie(title="Tanpa Poster", genre=None, release_year=None, rating=None, poster_path=None),
+        ])
+        session.commit()
+        mock_request = MagicMock()
+        mock_request.application_url = "http://localhost:6543"
+        mock_request.registry = {} # Tanpa pipeline versi kecil
+
+        # Act
+        from_orm = [m.to_dict(request=mock_request) for m in session.query(Movie).order_by(Movie.id)]
+        session.expunge_all()
+        from_rows = [Movie.row_to_dict(row, request=mock_request)
+                     for row in session.query(*MOVIE_COLUMNS).order_by(Movie.id)]
+
+        # Assert
+        assert len(session.identity_map) == 0 # Jalur kolom tidak membuat instance ORM
+        assert json.dumps(from_rows) == json.dumps(from_orm)
+        session.close()
+        engine.dispose()
+
+
+    def test_catalog_version_changes_on_every_write(self):
+        # Arrange
+        engine = create_engine('sqlite://')
+        Base.metadata.create_all(engine)
+        session = Session(engine)
+        empty_version = catalog_version(session)
+        movie_a = Movie(title="A")
+        session.add_all([movie_a, Movie(title="B")])
+        session.flush()
+        versions = [empty_version, catalog_version(session)]
+
+        # Act: UPDATE lalu DELETE masing-masing harus menghasilkan versi baru
+        movie_a.rating = 7
+        session.flush()
+        versions.append(catalog_version(session))
+        session.delete(movie_a)
+        session.flush()
+        versions.append(catalog_version(session))
+
+        # Assert
+        assert empty_version == (0, None, None)
+        assert movie_a.updated_at is not None
+        assert len(set(versions)) == len(versions)
+        session.close()
+        engine.dispose()
@@ -0,0 +1,86 @@
+# filmfy/backend/backend/tests/test_models_readonly.py
+import pytest
+from pyramid.config import Configurator
+from pyramid.request import Request, apply_request_extensions
+from sqlalchemy import create_engine
+from sqlalchemy.exc import InvalidRequestError
+
+from ..models import (
+    ReadOnlySession,
+    get_readonly_session_factory,
+    is_readonly_request,
+    retry_activate_hook,
+    tm_activate_hook,
+)
+from ..models.meta import Base
+from ..models.movie import Movie
+
+
+@pytest.fixture(scope='module')
+def registry(tmp_path_factory):
+    db_url = f"sqlite:///{tmp_path_factory.mktemp('readonly') / 'filmfy.sqlite'}"
+    with Configurator(settings={'sqlalchemy.url': db_url}) as config:
+        config.include('pyramid_jinja2')
+        config.include('backend.models')
+        config.include('backend.routes')
+    config.make_wsgi_app()
+    return config.registry
+
+
+def make_request(registry, path, method='GET'):
+    request = Request.blank(path, method=method)
+    request.registry = registry
+    apply_request_extensions(request)
+    return request
+
+
+@pytest.mark.parametrize('method, path, readonly', [
+    ('GET', '/api/movies', True),
+    ('HEAD', '/api/movies/7', True),
+    ('GET', '/api/check_auth', True),
+    ('POST', '/api/movies', False), # Route tulis tetap lewat pyramid_tm
+    ('DELETE', '/api/movies/7', False),
+    ('GET', '/', False), # Route tanpa readonly=True
+    ('GET', '/api/tidak-ada', False),
+])
+def test_readonly_routes_skip_tm_and_retry(registry, method, path, readonly):
+    request = make_request(registry, path, method)
+
+    assert is_readonly_request(request) is readonly
+    assert tm_activate_hook(request) is not readonly
+    assert retry_activate_hook(request) == (1 if readonly else None)
+
+
+def test_dbsession_for_readonly_request_is_not_joined_to_tm(registry):
+    request = make_request(registry, '/api/movies')
+
+    assert isinstance(request.dbsession, ReadOnlySession)
+    assert request.environ.get('tm.active') is None
+
+    request._process_finished_callbacks() # Session ditutup saat request selesai
+    assert not request.dbsession.in_transaction()
+
+
+def test_dbsession_for_write_request_uses_tm(registry):
+    request = make_request(registry, '/api/movies', 'POST')
+
+    assert not isinstance(request.dbsession, ReadOnlySession)
+
+
+def test_readonly_session_refuses_flush():
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    dbsession = get_readonly_session_factory(engine)()
+
+    assert dbsession.query(Movie).count() == 0
+    dbsession.add(Movie(title='Tidak boleh', genre='Drama', release_year=2000))
+    with pytest.raises(InvalidRequestError):
+        dbsession.flush()
+
+
+def test_multipart_upload_is_not_retried(registry):
+    request = make_request(registry, '/api/movies', 'POST')
+    request.content_type = 'multipart/form-data; boundary=x'
+
+    assert tm_activate_hook(request) is True # Tetap dalam transaksi
+    assert retry_activate_hook(request) == 1 # Body di-stream sekali, tidak bisa diulang
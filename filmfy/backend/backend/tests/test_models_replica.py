@@ -0,0 +1,131 @@
+# filmfy/backend/backend/tests/test_models_replica.py
+import pytest
+from pyramid.config import Configurator
+from pyramid.request import Request, apply_request_extensions
+from pyramid.response import Response
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from ..models import ReadOnlySession, ReplicaRouter, get_engine, get_replica_engines, readonly_session_factory_for
+from ..models.meta import Base
+from ..models.movie import Movie
+
+
+def make_database(path, title):
+    """Satu file SQLite berisi satu film; judulnya menandai database mana yang dibaca."""
+    url = f'sqlite:///{path}'
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(Movie(title=title))
+        session.commit()
+    engine.dispose()
+    return url
+
+
+@pytest.fixture(scope='module')
+def registry(tmp_path_factory):
+    workdir = tmp_path_factory.mktemp('replica')
+    settings = {
+        'sqlalchemy.url': make_database(workdir / 'primary.sqlite', 'Primary'),
+        'sqlalchemy.replica.url': make_database(workdir / 'replica.sqlite', 'Replica'),
+        'sqlalchemy.replica.pool_pre_ping': 'true',
+        'sqlalchemy.replica.sticky_seconds': '30',
+    }
+    with Configurator(settings=settings) as config:
+        config.include('pyramid_jinja2')
+        config.include('backend.models')
+        config.include('backend.routes')
+    config.make_wsgi_app()
+    return config.registry
+
+
+def make_request(registry, path, method='GET', cookies=None):
+    request = Request.blank(path, method=method)
+    request.registry = registry
+    if cookies:
+        request.cookies.update(cookies)
+    apply_request_extensions(request)
+    return request
+
+
+def titles(request):
+    return [title for (title,) in request.dbsession.query(Movie.title)]
+
+
+def test_get_engine_ignores_replica_settings():
+    settings = {'sqlalchemy.url': 'sqlite://', 'sqlalchemy.replica.url': 'sqlite:// sqlite://',
+                'sqlalchemy.replica.sticky_seconds': '5'}
+
+    assert str(get_engine(settings).url) == 'sqlite://'
+    assert len(get_replica_engines(settings)) == 2
+    assert get_replica_engines({'sqlalchemy.url': 'sqlite://'}) == []
+
+
+def test_router_round_robin_and_sticky_cookie():
+    router = ReplicaRouter('primary', ['r1', 'r2'], sticky_seconds=5,
+                           sticky_cookie='stick', clock=lambda: 1000)
+    request = Request.blank('/api/movies')
+
+    assert [router.engine_for(request) for _ in range(3)] == ['r1', 'r2', 'r1']
+
+    request.cookies['stick'] = '1004'
+    assert router.engine_for(request) == 'primary'
+    request.cookies['stick'] = '999' # Sudah lewat
+    assert router.engine_for(request) == 'r2'
+    request.cookies['stick'] = 'rusak'
+    assert router.engine_for(request) == 'r1'
+
+    assert ReplicaRouter('primary').engine_for(request) == 'primary'
+
+
+def test_readonly_request_reads_replica(registry):
+    assert titles(make_request(registry, '/api/movies')) == ['Replica']
+
+
+def test_sticky_readonly_request_reads_primary(registry):
+    request = make_request(registry, '/api/movies', cookies={'filmfy_primary': '99999999999'})
+
+    assert titles(request) == ['Primary']
+
+
+def test_streaming_session_reads_replica(registry):
+    session = readonly_session_factory_for(make_request(registry, '/api/movies?stream=1'))()
+    try:
+        assert isinstance(session, ReadOnlySession)
+        assert [title for (title,) in session.query(Movie.title)] == ['Replica']
+    finally:
+        session.close()
+
+
+def write_request(registry):
+    request = make_request(registry, '/api/movies', 'POST')
+    request.tm.begin() # Seperti pyramid_tm; di-abort agar database tidak berubah
+    return request
+
+
+def finish(request):
+    response = Response()
+    request._process_response_callbacks(response)
+    request.tm.abort()
+    return response
+
+
+def test_write_request_uses_primary_and_sets_sticky_cookie(registry):
+    request = write_request(registry)
+    assert titles(request) == ['Primary']
+
+    request.dbsession.add(Movie(title='Baru'))
+    request.dbsession.flush()
+    response = finish(request)
+
+    assert 'filmfy_primary=' in response.headers['Set-Cookie']
+    assert 'Max-Age=30' in response.headers['Set-Cookie']
+
+
+def test_write_request_without_changes_sets_no_cookie(registry):
+    request = write_request(registry)
+    titles(request)
+    response = finish(request)
+
+    assert 'Set-Cookie' not in response.headers
@@ -0,0 +1,110 @@
+# filmfy/backend/backend/tests/test_models_search.py
+import importlib.util
+import os
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+
+from ..models.meta import Base
+from ..models.movie import Movie
+from ..models.search import (
+    search_catalog,
+    search_tokens,
+    sqlite_match_query,
+    postgresql_tsquery,
+    MAX_SEARCH_TOKENS,
+)
+
+FTS_MIGRATION_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)),
+    'alembic', 'versions', '20261018_36fd07580362.py')
+
+
+def run_fts_migration(connection):
+    """Jalankan upgrade() migration FTS pada koneksi yang skemanya sudah ada."""
+    spec = importlib.util.spec_from_file_location('fts_migration', FTS_MIGRATION_PATH)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+    with Operations.context(MigrationContext.configure(connection)):
+        migration.upgrade()
+
+
+@pytest.fixture
+def fts_session():
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.exec_driver_sql("INSERT INTO movies (title, genre) VALUES ('Sudah Ada Sebelumnya', 'Drama')")
+        run_fts_migration(connection)
+    session = Session(engine)
+    yield session
+    session.close()
+    engine.dispose()
+
+
+class TestSearchQueryBuilding:
+
+    def test_search_tokens_strips_fts_syntax(self):
+        assert search_tokens('dark "knight" OR -rises*') == ['dark', 'knight', 'OR', 'rises']
+        assert search_tokens('   ') == []
+        assert search_tokens(None) == []
+        assert len(search_tokens(' '.join(['kata'] * 20))) == MAX_SEARCH_TOKENS
+
+    def test_sqlite_match_query(self):
+        assert sqlite_match_query(['dark', 'OR']) == '"dark"* "OR"*'
+
+    def test_postgresql_tsquery(self):
+        assert postgresql_tsquery(['Dark', 'knight']) == 'dark:* & knight:*'
+
+
+class TestSearchCatalogSQLite:
+
+    def test_existing_rows_are_indexed_by_migration(self, fts_session):
+        rows = search_catalog(fts_session, ['sebelumnya'], limit=10)
+        assert [row.title for row in rows] == ['Sudah Ada Sebelumnya']
+
+    def test_triggers_keep_index_in_sync(self, fts_session):
+        # Arrange
+        knight = Movie(title='The Dark Knight', genre='Action')
+        city = Movie(title='Dark City', genre='Sci-Fi')
+        fts_session.add_all([knight, city])
+        fts_session.flush()
+
+        # Act & Assert: INSERT
+        assert {row.title for row in search_catalog(fts_session, ['dark'], limit=10)} == \
+            {'The Dark Knight', 'Dark City'}
+
+        # UPDATE judul
+        city.title = 'Bright City'
+        fts_session.flush()
+        assert [row.title for row in search_catalog(fts_session, ['dark'], limit=10)] == ['The Dark Knight']
+        assert [row.title for row in search_catalog(fts_session, ['brig'], limit=10)] == ['Bright City']
+
+        # DELETE
+        fts_session.delete(knight)
+        fts_session.flush()
+        assert search_catalog(fts_session, ['knight'], limit=10) == []
+
+    def test_ranking_prefers_title_over_genre_and_paginates(self, fts_session):
+        fts_session.add_all([
+            Movie(title='Tanpa Kata Kunci', genre='Horror'),
+            Movie(title='Horror Express', genre='Thriller'),
+            Movie(title='Lainnya', genre='Horror'),
+        ])
+        fts_session.flush()
+
+        first_page = search_catalog(fts_session, ['horror'], limit=2)
+        second_page = search_catalog(fts_session, ['horror'], limit=2, offset=2)
+
+        assert len(first_page) == 3 # limit + 1 untuk deteksi halaman berikutnya
+        assert first_page[0].title == 'Horror Express'
+        assert len(second_page) == 1
+        assert {row.id for row in first_page[:2]}.isdisjoint({row.id for row in second_page})
+
+    def test_requires_all_tokens(self, fts_session):
+        fts_session.add_all([Movie(title='Dark Water', genre='Horror'), Movie(title='Dark Star', genre='Comedy')])
+        fts_session.flush()
+        assert [row.title for row in search_catalog(fts_session, ['dark', 'horror'], limit=10)] == ['Dark Water']
@@ -3,7 +3,8 @@ from unittest.mock import patch, MagicMock # patch untuk bcrypt, MagicMock untuk
 
 # Sesuaikan path import ini jika struktur proyek Anda berbeda
 # Asumsikan User ada di ..models.user relatif terhadap direktori tests
-from ..models.user import User # Ini adalah model User yang sebenarnya
+from ..models.user import User, password_rounds # Ini adalah model User yang sebenarnya
+from ..derivatives import DERIVATIVES_REGISTRY_KEY, DerivativePipeline
 
 # Path untuk mem-patch bcrypt SEPERTI YANG DIGUNAKAN DI DALAM models/user.py
 # Jika di models/user.py Anda melakukan 'import bcrypt', maka path ini benar.
@@ -103,6 +104,25 @@ class TestUserModel:
         )
         assert result is False
 
+    @patch(f'{BCRYPT_PATH}.gensalt')
+    @patch(f'{BCRYPT_PATH}.hashpw')
+    def test_user_set_password_with_rounds(self, mock_bcrypt_hashpw, mock_bcrypt_gensalt):
+        user = User(username="testuser", email="test@example.com")
+        mock_bcrypt_gensalt.return_value = b'$2b$10$abcdefghijklmnopqrstuv'
+        mock_bcrypt_hashpw.return_value = b'$2b$10$abcdefghijklmnopqrstuv.examplehashedpassword'
+
+        user.set_password("SecurePassword123!", rounds=10)
+
+        mock_bcrypt_gensalt.assert_called_once_with(10)
+        assert not user.password_needs_rehash(10)
+        assert user.password_needs_rehash(12)
+        assert not user.password_needs_rehash(None) # auth.bcrypt_rounds tidak diset
+
+    def test_password_rounds(self):
+        assert password_rounds('$2b$12$somevalidsaltandhashcombination') == 12
+        assert password_rounds('bukan-hash-bcrypt') is None
+        assert password_rounds(None) is None
+
     def test_user_check_password_when_no_hash_stored(self):
         # Arrange
         user = User(username="nohashuser", email="nohash@example.com")
@@ -136,6 +156,7 @@ class TestUserModel:
             'bio': "A simple bio.",
             'profile_photo': None,
             'profile_url': None, # Karena tidak ada request dan tidak ada photo
+            'profile_srcset': None,
         }
         assert user_data == expected_data
         assert 'hashed_password' not in user_data # Pastikan hash password tidak ada
@@ -151,6 +172,7 @@ class TestUserModel:
         )
         mock_request = MagicMock()
         mock_request.application_url = "http://localhost:6543" # Contoh URL aplikasi
+        mock_request.registry = {DERIVATIVES_REGISTRY_KEY: DerivativePipeline(widths=(96,), executor='none')}
 
         # Act
         user_data = user.to_dict(request=mock_request)
@@ -164,6 +186,10 @@ class TestUserModel:
             'bio': "Loves photography.",
             'profile_photo': "profile_pics/photo.jpg",
             'profile_url': expected_profile_url,
+            'profile_srcset': {
+                'image/webp': "http://localhost:6543/static/profile_pics/photo-w96.webp 96w",
+                'image/jpeg': "http://localhost:6543/static/profile_pics/photo-w96.jpg 96w",
+            },
         }
         assert user_data == expected_data
         assert 'hashed_password' not in user_data
@@ -179,6 +205,7 @@ class TestUserModel:
         )
         mock_request = MagicMock()
         mock_request.application_url = "http://localhost:6543"
+        mock_request.registry = {} # Tanpa pipeline versi kecil
 
         # Act
         user_data = user.to_dict(request=mock_request)
@@ -191,5 +218,6 @@ class TestUserModel:
             'bio': "Prefers no photo.",
             'profile_photo': None,
             'profile_url': None, # Karena tidak ada profile_photo
+            'profile_srcset': None,
         }
         assert user_data == expected_data
\ No newline at end of file
@@ -0,0 +1,83 @@
+# filmfy/backend/backend/tests/test_passwords.py
+import threading
+
+import pytest
+
+from ..models.user import User
+from ..passwords import (
+    PasswordPool,
+    PasswordPoolBusy,
+    bcrypt_rounds_from_settings,
+    password_pool_from_settings,
+)
+
+
+@pytest.fixture
+def pool():
+    pool = PasswordPool(workers=1, max_pending=1)
+    yield pool
+    pool.shutdown()
+
+
+class TestPasswordPool:
+
+    def test_rejects_callers_over_the_limit_without_waiting(self):
+        # Arrange: satu worker tanpa antrean, ditempati pekerjaan yang menunggu
+        pool = PasswordPool(workers=1, max_pending=0)
+        release = threading.Event()
+        started = threading.Event()
+        results = []
+
+        def blocking_job():
+            started.set()
+            release.wait(5)
+            return 'selesai'
+
+        caller = threading.Thread(target=lambda: results.append(pool.run(blocking_job)))
+        caller.start()
+        started.wait(5)
+
+        # Act & Assert
+        with pytest.raises(PasswordPoolBusy):
+            pool.run(str, 'ditolak')
+        release.set()
+        caller.join(5)
+        assert results == ['selesai']
+        assert pool.run(str, 'lagi') == 'lagi' # Slot dilepas setelah pekerjaan selesai
+        pool.shutdown()
+
+    def test_slot_released_when_job_raises(self, pool):
+        for _ in range(3):
+            with pytest.raises(ZeroDivisionError):
+                pool.run(divmod, 1, 0)
+        assert pool.run(divmod, 7, 2) == (3, 1)
+
+    def test_user_password_round_trip_through_pool(self, pool):
+        user = User(username='budi', email='budi@example.com')
+
+        user.set_password('rahasia123', pool=pool)
+
+        assert user.hashed_password.startswith('$2')
+        assert user.check_password('rahasia123', pool=pool)
+        assert not user.check_password('salah', pool=pool)
+        assert user.check_password('rahasia123') # Hash sama bisa diverifikasi inline
+
+
+class TestPasswordPoolFromSettings:
+
+    def test_settings(self):
+        assert password_pool_from_settings({'password.executor': 'none'}) is None
+        pool = password_pool_from_settings({'password.workers': '3', 'password.max_pending': '0'})
+        assert (pool.workers, pool.max_pending) == (3, 0)
+        pool.shutdown()
+        with pytest.raises(ValueError):
+            password_pool_from_settings({'password.executor': 'gevent'})
+        with pytest.raises(ValueError):
+            password_pool_from_settings({'password.workers': '0'})
+
+    def test_bcrypt_rounds(self):
+        assert bcrypt_rounds_from_settings({}) is None
+        assert bcrypt_rounds_from_settings({'auth.bcrypt_rounds': ' 13 '}) == 13
+        for value in ('3', '32', 'tinggi'):
+            with pytest.raises(ValueError):
+                bcrypt_rounds_from_settings({'auth.bcrypt_rounds': value})
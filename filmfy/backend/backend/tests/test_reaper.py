@@ -0,0 +1,222 @@
+# filmfy/backend/backend/tests/test_reaper.py
+import os
+import threading
+import time
+from io import BytesIO
+from unittest.mock import MagicMock
+
+import pytest
+from pyramid import testing
+from pyramid.events import NewRequest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from .. import reaper as reaper_module
+from ..models.blob import Blob, acquire_blob, release_blob
+from ..models.meta import Base
+from ..models.movie import Movie
+from ..reaper import (
+    FILE_REAPER_REGISTRY_KEY,
+    FileReaper,
+    delete_file_after_commit,
+    discard_files,
+    reap_files,
+    sweep_orphan_files,
+)
+from ..storage import BlobStorage, variant_name
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f'sqlite:///{tmp_path}/reaper.sqlite') # File: dibaca juga dari thread reaper
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return BlobStorage(str(tmp_path / 'postersMovie'), 'postersMovie')
+
+
+def stored_files(storage):
+    return sorted(name for _, _, names in os.walk(storage.root) for name in names)
+
+
+def make_old(storage, age=7200):
+    past = time.time() - age
+    for dirpath, _, names in os.walk(storage.root):
+        for name in names:
+            os.utime(os.path.join(dirpath, name), (past, past))
+
+
+def test_reap_skips_paths_referenced_again(session_factory, storage):
+    released = storage.put(BytesIO(b'lama'), '.jpg')
+    reused = storage.put(BytesIO(b'dipakai lagi'), '.jpg')
+    with session_factory() as dbsession:
+        dbsession.add(Movie(title='A', poster_path=reused)) # Upload ulang sebelum reaper jalan
+        dbsession.commit()
+
+    stats = reap_files(session_factory, [(storage, released), (storage, reused)])
+
+    assert (stats.files, stats.skipped) == (1, 1)
+    assert os.path.exists(storage.full_path(reused))
+    assert not os.path.exists(storage.full_path(released))
+    assert os.listdir(storage.root) == [reused.split('/')[1]] # Shard kosong ikut dibuang
+
+
+def release_last_reference(session_factory, storage, data):
+    path = storage.put(BytesIO(data), '.jpg')
+    with session_factory() as dbsession:
+        acquire_blob(dbsession, path)
+        dbsession.commit()
+    with session_factory() as dbsession:
+        assert release_blob(dbsession, path) == 0 # Movie lama dihapus
+        dbsession.commit()
+    return path
+
+
+def test_duplicate_upload_restores_file_reaped_before_acquire(session_factory, storage):
+    path = release_last_reference(session_factory, storage, b'poster')
+    writer = storage.open_writer('.jpg')
+    writer.write(b'poster')
+    assert writer.commit() == path and not writer.created # Dedup ke file yang akan dihapus
+
+    assert reap_files(session_factory, [(storage, path)]).files == 1
+    with session_factory() as dbsession:
+        acquire_blob(dbsession, path)
+        writer.ensure_stored()
+        dbsession.commit()
+
+    with open(storage.full_path(path), 'rb') as stored:
+        assert stored.read() == b'poster'
+    assert stored_files(storage) == [os.path.basename(path)] # Salinan sementara sudah dipakai
+
+
+def test_reaper_waits_for_duplicate_upload_transaction(session_factory, storage):
+    path = release_last_reference(session_factory, storage, b'poster')
+    writer = storage.open_writer('.jpg')
+    writer.write(b'poster')
+    writer.commit()
+    dbsession = session_factory()
+    acquire_blob(dbsession, path) # Referensi baru belum commit
+    writer.ensure_stored()
+
+    results = []
+    reaper = threading.Thread(target=lambda: results.append(reap_files(session_factory, [(storage, path)])))
+    reaper.start()
+    reaper.join(timeout=0.2)
+    assert reaper.is_alive() # Menunggu kunci blobs
+    dbsession.commit()
+    dbsession.close()
+    reaper.join(timeout=5)
+
+    assert (results[0].files, results[0].skipped) == (0, 1)
+    assert stored_files(storage) == [os.path.basename(path)]
+    with session_factory() as dbsession:
+        assert dbsession.get(Blob, path).refcount == 1
+
+
+def test_sweep_removes_only_old_unreferenced_files(session_factory, storage):
+    kept = storage.put(BytesIO(b'dirujuk movie'), '.jpg')
+    counted = storage.put(BytesIO(b'dirujuk blobs'), '.png')
+    orphan = storage.put(BytesIO(b'transaksi gagal'), '.jpg')
+    with open(variant_name(storage.full_path(orphan), 160, 'webp'), 'wb') as variant:
+        variant.write(b'kecil')
+    with open(os.path.join(storage.root, '.upload-abc'), 'wb') as leftover:
+        leftover.write(b'sementara')
+    with session_factory() as dbsession:
+        dbsession.add(Movie(title='A', poster_path=kept))
+        acquire_blob(dbsession, counted)
+        dbsession.commit()
+    make_old(storage)
+    young = storage.put(BytesIO(b'upload belum commit'), '.jpg')
+
+    stats = sweep_orphan_files(session_factory, [storage], min_age=3600)
+
+    assert stats.files == 2 # orphan (beserta versi kecilnya) + .upload-abc
+    assert stored_files(storage) == sorted(
+        os.path.basename(path) for path in (kept, counted, young))
+
+
+def test_sweep_skips_database_without_references(session_factory, storage):
+    storage.put(BytesIO(b'poster'), '.jpg')
+    make_old(storage)
+
+    assert sweep_orphan_files(session_factory, [storage], min_age=0).files == 0
+    assert len(stored_files(storage)) == 1
+
+
+def test_after_commit_hook_enqueues_only_on_success(storage):
+    reaper = MagicMock()
+    request = MagicMock()
+    request.registry = {FILE_REAPER_REGISTRY_KEY: reaper}
+
+    delete_file_after_commit(request, storage, 'postersMovie/ab/cd/abcd.jpg')
+    hook = request.tm.get.return_value.addAfterCommitHook.call_args[0][0]
+    hook(False)
+    reaper.enqueue.assert_not_called() # Rollback: poster_path lama tetap valid
+    hook(True)
+    reaper.enqueue.assert_called_once_with(storage, 'postersMovie/ab/cd/abcd.jpg')
+
+
+def test_without_reaper_deletes_in_commit_hook(session_factory, storage):
+    path = storage.put(BytesIO(b'poster'), '.jpg')
+    request = MagicMock()
+    request.registry = {FILE_REAPER_REGISTRY_KEY: None, 'dbsession_factory': session_factory}
+
+    delete_file_after_commit(request, storage, path)
+    request.tm.get.return_value.addAfterCommitHook.call_args[0][0](True)
+
+    assert stored_files(storage) == []
+
+
+def test_reaper_thread_drains_in_batches(session_factory, storage):
+    paths = [storage.put(BytesIO(f'poster {i}'.encode()), '.jpg') for i in range(5)]
+    reaper = FileReaper(session_factory, interval=0.01, batch_size=2)
+    for path in paths:
+        reaper.enqueue(storage, path)
+
+    reaper.start()
+    reaper.stop()
+    reaper.join(timeout=5)
+
+    assert stored_files(storage) == []
+
+
+def test_includeme_defers_thread_and_sweep_to_first_request(session_factory, storage, monkeypatch):
+    sweeps = []
+    monkeypatch.setattr(reaper_module, '_sweep', lambda *args: sweeps.append(args))
+    with testing.testConfig(settings={'files.reaper_interval': '60',
+                                      'files.sweep_on_startup': 'true'}) as config:
+        config.registry['dbsession_factory'] = session_factory
+        config.include('backend.reaper')
+        reaper = config.registry[FILE_REAPER_REGISTRY_KEY]
+        # Seperti bootstrap() di script: belum ada request, belum ada thread / sweep
+        assert not reaper.is_alive() and sweeps == []
+        path = storage.put(BytesIO(b'poster'), '.jpg')
+        discard_files(config.registry, [(storage, path)]) # Langsung, bukan ke antrean
+        assert stored_files(storage) == []
+
+        config.registry.notify(NewRequest(testing.DummyRequest()))
+        assert reaper.is_alive()
+        reaper.stop()
+        reaper.join(timeout=5)
+    assert len(sweeps) == 1 # Di thread reaper, sekali
+
+
+def test_sweep_without_reaper_runs_once_in_own_thread(session_factory, monkeypatch):
+    sweeps = []
+    monkeypatch.setattr(reaper_module, '_sweep', lambda *args: sweeps.append(args))
+    with testing.testConfig(settings={'files.reaper_interval': '0',
+                                      'files.sweep_on_startup': 'true'}) as config:
+        config.registry['dbsession_factory'] = session_factory
+        config.include('backend.reaper')
+        assert config.registry[FILE_REAPER_REGISTRY_KEY] is None and sweeps == []
+
+        config.registry.notify(NewRequest(testing.DummyRequest()))
+        config.registry.notify(NewRequest(testing.DummyRequest()))
+        for thread in threading.enumerate():
+            if thread.name == 'file-sweep':
+                thread.join(timeout=5)
+    assert len(sweeps) == 1
@@ -0,0 +1,171 @@
+# filmfy/backend/backend/tests/test_scripts_import_movies.py
+import io
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from ..cache import CATALOG_TAG, MOVIE_LIST_TAG, SQLiteResponseCache
+from ..models.meta import Base
+from ..models.movie import Movie
+from ..models.facet import movie_facets
+from ..models.search import search_catalog
+from ..scripts import import_movies as import_script
+from ..scripts.import_movies import (
+    clean_movie_record,
+    read_records,
+    import_movies,
+    main,
+)
+from .test_models_search import run_fts_migration
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'import.sqlite'}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        run_fts_migration(connection)
+    yield engine
+    engine.dispose()
+
+
+def csv_records(content):
+    return read_records(io.StringIO(content), 'csv')
+
+
+def fts_trigger_names(session):
+    return {name for (name,) in session.execute(text("SELECT name FROM sqlite_master WHERE type = 'trigger'"))}
+
+
+class TestRecords:
+
+    def test_clean_movie_record_uses_create_movie_rules(self):
+        assert clean_movie_record({'title': ' Heat ', 'genre': '', 'release_year': '1995', 'rating': 8}) == {
+            'title': 'Heat', 'genre': None, 'release_year': 1995, 'rating': 8, 'poster_path': None}
+        for record, error in [({'title': ' '}, 'Title is required'),
+                              ({'title': 'X', 'rating': '11'}, 'Rating must be between 1 and 10'),
+                              ({'title': 'X', 'rating': 'high'}, 'Rating must be an integer.'),
+                              ({'title': 'X', 'release_year': '19x5'}, 'Release year must be an integer.')]:
+            with pytest.raises(ValueError, match=error):
+                clean_movie_record(record)
+
+    def test_poster_path_must_stay_in_poster_storage(self):
+        assert clean_movie_record({'title': 'X', 'poster_path': 'postersMovie/ab/cd/abcd.jpg'})[
+            'poster_path'] == 'postersMovie/ab/cd/abcd.jpg'
+        for poster_path in ('../x.jpg', 'profile_pics/me.png', '/etc/passwd',
+                            'postersMovie/../../x.jpg', 'postersMovie/'):
+            with pytest.raises(ValueError):
+                clean_movie_record({'title': 'X', 'poster_path': poster_path})
+
+    def test_read_records_csv_and_jsonl(self):
+        assert list(csv_records('title,rating\nHeat,8\n')) == [(2, {'title': 'Heat', 'rating': '8'})]
+
+        records = list(read_records(io.StringIO('{"title": "Heat"}\n\n{broken\n[1]\n'), 'jsonl'))
+        assert records[0] == (1, {'title': 'Heat'})
+        assert [number for number, _ in records[1:]] == [3, 4]
+        assert all(isinstance(record, ValueError) for _, record in records[1:])
+
+
+class TestImportMovies:
+
+    def test_skip_conflicts_in_batches(self, engine):
+        # Arrange
+        with Session(engine) as session:
+            session.add(Movie(title='Heat', genre='Crime', rating=9))
+            session.commit()
+        content = ('title,genre,release_year,rating\n'
+                   'Alien,Horror,1979,8\nHeat,Drama,1995,1\nAliens,Action,1986,8\n'
+                   'Alien,Comedy,2000,2\nBroken,Drama,abc,5\n')
+        errors = io.StringIO()
+
+        # Act
+        with Session(engine) as session:
+            stats = import_movies(session, csv_records(content), batch_size=2, errors=errors)
+            session.commit()
+
+        # Assert
+        # 'Alien' kedua ada di batch berikutnya, jadi dihitung skipped (bukan duplicate) oleh ON CONFLICT
+        assert (stats.read, stats.written, stats.skipped, stats.duplicates, stats.invalid) == (5, 2, 2, 0, 1)
+        assert 'line 6: Release year must be an integer.' in errors.getvalue()
+        with Session(engine) as session:
+            assert session.query(Movie.genre).filter_by(title='Heat').scalar() == 'Crime'
+            assert session.query(Movie.genre).filter_by(title='Alien').scalar() == 'Horror'
+            # Index FTS untuk baris baru dibangun di akhir dan trigger dipasang kembali
+            assert [row.title for row in search_catalog(session, ['alien'], limit=10)] == ['Alien', 'Aliens']
+            assert 'movies_fts_ai' in fts_trigger_names(session)
+            assert movie_facets(session)['genre'] == [
+                {'value': 'Action', 'count': 1}, {'value': 'Crime', 'count': 1}, {'value': 'Horror', 'count': 1}]
+
+    def test_poster_path_outside_storage_is_invalid_row(self, engine):
+        content = ('title,poster_path\n'
+                   'Alien,postersMovie/ab/cd/abcd.jpg\nHeat,../x.jpg\n')
+        errors = io.StringIO()
+
+        with Session(engine) as session:
+            stats = import_movies(session, csv_records(content), errors=errors)
+            session.commit()
+
+        assert (stats.written, stats.invalid) == (1, 1)
+        assert 'line 3: poster_path must start with postersMovie/' in errors.getvalue()
+        with Session(engine) as session:
+            assert session.query(Movie.title).all() == [('Alien',)]
+
+    def test_upsert_updates_existing_titles(self, engine):
+        with Session(engine) as session:
+            session.add(Movie(title='Heat', genre='Crime', rating=9))
+            session.commit()
+
+        with Session(engine) as session:
+            stats = import_movies(session, csv_records('title,genre\nHeat,Drama\nHeat,Thriller\n'),
+                                  on_conflict='upsert')
+            session.commit()
+
+        assert (stats.written, stats.duplicates) == (1, 1)
+        with Session(engine) as session:
+            assert session.query(Movie.genre).filter_by(title='Heat').scalar() == 'Thriller' # Baris terakhir menang
+            assert [row.title for row in search_catalog(session, ['thriller'], limit=10)] == ['Heat']
+
+    def test_failed_import_rolls_back_trigger_removal(self, engine, monkeypatch):
+        def failing_insert(connection, rows, on_conflict):
+            raise RuntimeError('disk full')
+        monkeypatch.setitem(import_script._BATCH_INSERTERS, 'sqlite', failing_insert)
+
+        with Session(engine) as session:
+            with pytest.raises(RuntimeError):
+                import_movies(session, csv_records('title\nAlien\n'))
+            session.rollback()
+            assert 'movies_fts_ai' in fts_trigger_names(session)
+
+
+class TestMain:
+
+    def test_main_imports_jsonl_file(self, engine, tmp_path, capsys):
+        config_path = tmp_path / 'import.ini'
+        config_path.write_text(f'[app:main]\nuse = egg:backend\nsqlalchemy.url = {engine.url}\n')
+        data_path = tmp_path / 'movies.jsonl'
+        data_path.write_text('{"title": "Alien", "release_year": 1979}\n{"title": "Heat", "rating": 0}\n')
+
+        assert main(['import_movies', str(config_path), str(data_path)]) == 0
+
+        output = capsys.readouterr()
+        assert '2 rows read' in output.out and '1 written' in output.out and '1 invalid' in output.out
+        assert 'line 2: Rating must be between 1 and 10' in output.err
+        with Session(engine) as session:
+            assert session.query(Movie.title).all() == [('Alien',)]
+
+    def test_main_bumps_shared_cache_generations(self, engine, tmp_path):
+        cache_path = tmp_path / 'response_cache.sqlite'
+        config_path = tmp_path / 'import.ini'
+        config_path.write_text(f'[app:main]\nuse = egg:backend\nsqlalchemy.url = {engine.url}\n'
+                               f'cache.backend = sqlite\ncache.sqlite_path = {cache_path}\n')
+        data_path = tmp_path / 'movies.csv'
+        data_path.write_text('title\nAlien\n')
+        server_cache = SQLiteResponseCache(str(cache_path)) # Cache milik proses server
+        server_cache.set('list', MOVIE_LIST_TAG, b'[]', server_cache.generation(MOVIE_LIST_TAG))
+
+        assert main(['import_movies', str(config_path), str(data_path)]) == 0
+
+        assert server_cache.get('list') is None
+        assert server_cache.generation(MOVIE_LIST_TAG) == 1
+        assert server_cache.generation(CATALOG_TAG) == 1 # Server membangun ulang index autocomplete
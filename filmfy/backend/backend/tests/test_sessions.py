@@ -0,0 +1,240 @@
+# filmfy/backend/backend/tests/test_sessions.py
+import os
+import time
+
+import pytest
+from pyramid import testing
+from pyramid.events import NewRequest
+from pyramid.response import Response
+from pyramid.testing import DummyRequest
+
+from ..scripts.expire_sessions import main as expire_sessions_main
+from ..sessions import (
+    BeakerFileSessions,
+    MemorySessionStore,
+    SQLiteSessionStore,
+    SESSION_JANITOR_REGISTRY_KEY,
+    SessionJanitor,
+    expire_sessions,
+    session_factory_from_settings,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def store_and_clock(request, tmp_path):
+    clock = FakeClock()
+    if request.param == 'memory':
+        return MemorySessionStore(max_entries=2, timeout=60, clock=clock), clock
+    return SQLiteSessionStore(str(tmp_path / 'sessions.sqlite'), timeout=60, clock=clock), clock
+
+
+class TestSessionStores:
+
+    def test_save_load_delete(self, store_and_clock):
+        store, _ = store_and_clock
+
+        store.save('abc', b'{"user_id": 1}')
+
+        assert store.load('abc') == b'{"user_id": 1}'
+        store.delete('abc')
+        assert store.load('abc') is None
+
+    def test_expired_session_is_not_loaded(self, store_and_clock):
+        store, clock = store_and_clock
+        store.save('abc', b'{}')
+
+        clock.now += 61
+
+        assert store.load('abc') is None
+
+    def test_purge_expired_in_batches(self, store_and_clock):
+        store, clock = store_and_clock
+        store.max_entries = 100
+        for i in range(5):
+            store.save(f'old{i}', b'12345')
+        clock.now += 61
+        store.save('fresh', b'{}')
+
+        stats = expire_sessions(store, batch_size=2)
+
+        assert (stats.sessions, stats.bytes, stats.batches) == (5, 25, 3)
+        assert store.load('fresh') == b'{}'
+        assert expire_sessions(store, batch_size=2).sessions == 0
+
+    def test_memory_store_evicts_least_recently_used(self):
+        store = MemorySessionStore(max_entries=2)
+        store.save('a', b'1')
+        store.save('b', b'2')
+        store.load('a')
+        store.save('c', b'3')
+
+        assert [store.load(key) for key in 'abc'] == [b'1', None, b'3']
+
+    def test_sqlite_store_is_shared_between_instances(self, tmp_path):
+        path = str(tmp_path / 'sessions.sqlite')
+        SQLiteSessionStore(path).save('abc', b'{}')
+
+        assert SQLiteSessionStore(path).load('abc') == b'{}' # Proses lain / setelah restart
+
+
+SETTINGS = {'session.secret': 'rahasia', 'session.key': 'filmfy_session'}
+
+
+def make_request(factory, cookie=None):
+    request = DummyRequest(cookies={'filmfy_session': cookie} if cookie else {})
+    return request, factory(request)
+
+
+def finish(request):
+    response = Response()
+    request._process_response_callbacks(response)
+    return response, response.headers.getall('Set-Cookie')
+
+
+def cookie_value(set_cookie_header):
+    return set_cookie_header.split(';', 1)[0].split('=', 1)[1]
+
+
+@pytest.fixture(params=['memory', 'sqlite', 'cookie'])
+def session_factory(request, tmp_path):
+    settings = dict(SETTINGS, **{'session.backend': request.param,
+                                 'session.sqlite_path': str(tmp_path / 'sessions.sqlite')})
+    factory, store = session_factory_from_settings(settings)
+    factory.store = store
+    return factory
+
+
+class TestSessions:
+
+    def test_round_trip_and_logout(self, session_factory):
+        # Arrange: login menyimpan user_id (gaya Beaker: session.save())
+        request, session = make_request(session_factory)
+        session['user_id'] = 5
+        session.save()
+        _, headers = finish(request)
+        assert len(headers) == 1 and 'HttpOnly' in headers[0] and 'SameSite=Lax' in headers[0]
+        cookie = cookie_value(headers[0])
+
+        # Act & Assert: request berikutnya membaca session yang sama
+        request, session = make_request(session_factory, cookie)
+        assert session['user_id'] == 5 and not session.new
+        session.invalidate()
+        _, headers = finish(request)
+
+        if session_factory.store is None:
+            # Cookie stateless: isi cookie diganti dengan session kosong
+            cookie = cookie_value(headers[0])
+        else:
+            assert 'Max-Age=0' in headers[0] # Cookie dihapus di browser
+        request, session = make_request(session_factory, cookie)
+        assert 'user_id' not in session # Server-side: cookie lama sudah dicabut di store
+
+    def test_read_only_request_does_not_write(self, session_factory):
+        request, session = make_request(session_factory)
+        session['user_id'] = 5
+        _, headers = finish(request)
+
+        request, session = make_request(session_factory, cookie_value(headers[0]))
+        assert 'user_id' in session
+        _, headers = finish(request)
+
+        assert headers == [] # Tidak ada Set-Cookie / tulis ulang untuk check_auth biasa
+
+    def test_tampered_cookie_starts_new_session(self, session_factory):
+        request, session = make_request(session_factory)
+        session['user_id'] = 5
+        _, headers = finish(request)
+
+        request, session = make_request(session_factory, cookie_value(headers[0])[:-2] + 'xx')
+
+        assert session.new and 'user_id' not in session
+
+
+class TestSessionSettings:
+
+    def test_invalid_settings(self):
+        with pytest.raises(ValueError):
+            session_factory_from_settings({'session.backend': 'memory'}) # Tanpa secret
+        with pytest.raises(ValueError):
+            session_factory_from_settings(dict(SETTINGS, **{'session.backend': 'sqlite'}))
+        with pytest.raises(ValueError):
+            session_factory_from_settings(dict(SETTINGS, **{'session.backend': 'redis'}))
+
+
+def write_beaker_session(data_dir, name, size, age):
+    shard = os.path.join(data_dir, 'container_file', name[0], name[:2])
+    os.makedirs(shard, exist_ok=True)
+    path = os.path.join(shard, f'{name}.cache')
+    with open(path, 'wb') as f:
+        f.write(b'x' * size)
+    mtime = time.time() - age
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+class TestSessionJanitor:
+
+    def test_beaker_file_sessions_resume_scan_between_batches(self, tmp_path):
+        data_dir = str(tmp_path / 'sessions')
+        stale = [write_beaker_session(data_dir, f'a{i}b', 10, age=7200) for i in range(3)]
+        fresh = write_beaker_session(data_dir, 'ffff', 10, age=0)
+
+        stats = expire_sessions(BeakerFileSessions(data_dir, timeout=3600), batch_size=2)
+
+        assert (stats.sessions, stats.bytes, stats.batches) == (3, 30, 2)
+        assert not any(os.path.exists(path) for path in stale) and os.path.exists(fresh)
+
+    def test_max_batches_bounds_one_run(self):
+        store = MemorySessionStore(timeout=0)
+        for i in range(10):
+            store.save(str(i), b'{}')
+
+        stats = expire_sessions(store, batch_size=3, max_batches=2)
+
+        assert (stats.sessions, stats.batches) == (6, 2)
+
+    def test_background_thread(self):
+        store = MemorySessionStore(timeout=0)
+        store.save('old', b'{}')
+        janitor = SessionJanitor(store, interval=0.01)
+
+        janitor.start()
+        deadline = time.time() + 5
+        while store._entries and time.time() < deadline:
+            time.sleep(0.01)
+        janitor.stop()
+        janitor.join(5)
+
+        assert not store._entries and not janitor.is_alive()
+
+    def test_janitor_starts_on_first_request(self):
+        with testing.testConfig(settings={'session.backend': 'memory', 'session.secret': 's',
+                                          'session.janitor_interval': '60'}) as config:
+            config.include('backend.sessions')
+            janitor = config.registry[SESSION_JANITOR_REGISTRY_KEY]
+            assert not janitor.is_alive() # Seperti bootstrap() di script
+
+            config.registry.notify(NewRequest(testing.DummyRequest()))
+            assert janitor.is_alive()
+            janitor.stop()
+            janitor.join(5)
+
+    def test_cli_expires_sqlite_sessions(self, tmp_path, capsys):
+        sessions_path = tmp_path / 'sessions.sqlite'
+        store = SQLiteSessionStore(str(sessions_path), timeout=-1) # Langsung kedaluwarsa
+        store.save('old', b'1234')
+        config_path = tmp_path / 'app.ini'
+        config_path.write_text('[app:main]\nuse = egg:backend\nsession.backend = sqlite\n'
+                               f'session.sqlite_path = {sessions_path}\n')
+
+        assert expire_sessions_main(['expire_sessions', str(config_path)]) == 0
+
+        assert '1 expired session(s) removed in 1 batch(es), 4 bytes reclaimed.' in capsys.readouterr().out
@@ -0,0 +1,129 @@
+# filmfy/backend/backend/tests/test_static_assets.py
+import gzip
+import os
+import time
+
+import pytest
+from pyramid.httpexceptions import HTTPNotFound
+from pyramid.request import Request
+
+from ..static_assets import (
+    StaticAssetView,
+    compressible_files,
+    is_immutable_path,
+    precompress,
+    static_asset_view_from_settings,
+)
+
+CSS = b'body { color: #333; }\n' * 200
+DIGEST = 'ab' * 32
+UPLOAD = f'postersMovie/ab/ab/{DIGEST}.jpg'
+
+
+@pytest.fixture
+def static_dir(tmp_path):
+    (tmp_path / 'theme.css').write_bytes(CSS)
+    (tmp_path / 'postersMovie' / 'ab' / 'ab').mkdir(parents=True)
+    (tmp_path / UPLOAD).write_bytes(b'\xff\xd8\xff' + os.urandom(64))
+    return tmp_path
+
+
+def serve(view, path, **headers):
+    request = Request.blank(f'/static/{path}', headers=headers)
+    request.subpath = tuple(path.split('/'))
+    return request.get_response(view(None, request)) # Jalankan conditional response WebOb
+
+
+@pytest.mark.parametrize('path, immutable', [
+    (UPLOAD, True),
+    (f'profile_pics/ab/ab/{DIGEST}-w160.webp', True),
+    ('postersMovie/2b0178c4-81f3-4134-b0c0-ad15c5a870fe.png', True), # Upload lama (UUID)
+    ('theme.css', False),
+    (f'other/ab/ab/{DIGEST}.jpg', False),
+    ('postersMovie/poster.jpg', False),
+])
+def test_immutable_paths(path, immutable):
+    assert is_immutable_path(path) is immutable
+
+
+def test_upload_is_immutable_for_a_year(static_dir):
+    response = serve(StaticAssetView(str(static_dir)), UPLOAD)
+
+    assert response.status_code == 200
+    assert response.headers['Cache-Control'] == 'public, max-age=31536000, immutable'
+    assert response.expires is not None
+    assert 'Vary' not in response.headers
+
+
+def test_theme_revalidates_with_etag_and_last_modified(static_dir):
+    view = StaticAssetView(str(static_dir), cache_max_age=600)
+
+    first = serve(view, 'theme.css')
+    assert first.headers['Cache-Control'] == 'max-age=600, public'
+    assert first.body == CSS
+
+    by_etag = serve(view, 'theme.css', **{'If-None-Match': first.headers['ETag']})
+    by_date = serve(view, 'theme.css', **{'If-Modified-Since': first.headers['Last-Modified']})
+    assert (by_etag.status_code, by_etag.body) == (304, b'')
+    assert by_date.status_code == 304
+
+
+def test_precompressed_variant_follows_accept_encoding(static_dir):
+    assert precompress(str(static_dir / 'theme.css'), ['gzip']) == [str(static_dir / 'theme.css.gz')]
+    view = StaticAssetView(str(static_dir), content_encodings=['gzip'])
+
+    encoded = serve(view, 'theme.css', **{'Accept-Encoding': 'gzip, deflate'})
+    plain = serve(view, 'theme.css')
+
+    assert encoded.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(encoded.body) == CSS
+    assert encoded.headers['ETag'] != plain.headers['ETag']
+    assert plain.body == CSS and 'Content-Encoding' not in plain.headers
+    assert encoded.headers['Vary'] == plain.headers['Vary'] == 'Accept-Encoding'
+
+
+def test_stale_variant_is_ignored(static_dir):
+    precompress(str(static_dir / 'theme.css'), ['gzip'])
+    past = time.time() - 60
+    os.utime(static_dir / 'theme.css.gz', (past, past)) # theme.css diubah setelah kompresi
+    view = StaticAssetView(str(static_dir), content_encodings=['gzip'])
+
+    response = serve(view, 'theme.css', **{'Accept-Encoding': 'gzip'})
+
+    assert 'Content-Encoding' not in response.headers
+    assert precompress(str(static_dir / 'theme.css'), ['gzip']) # Dibuat ulang
+
+
+def test_deleted_upload_is_not_cached(static_dir):
+    view = StaticAssetView(str(static_dir))
+    serve(view, UPLOAD)
+    os.remove(static_dir / UPLOAD) # Dihapus reaper
+
+    with pytest.raises(HTTPNotFound):
+        serve(view, UPLOAD)
+    with pytest.raises(HTTPNotFound):
+        serve(view, 'missing.css')
+    assert view.filemap == {}
+
+
+def test_file_wrapper_is_used(static_dir):
+    wrapped = []
+    request = Request.blank('/static/theme.css', environ={
+        'wsgi.file_wrapper': lambda f, size: wrapped.append(f) or iter([f.read()])})
+    request.subpath = ('theme.css',)
+
+    StaticAssetView(str(static_dir))(None, request)
+
+    assert len(wrapped) == 1
+
+
+def test_compressible_files_and_settings(static_dir):
+    (static_dir / 'tiny.css').write_bytes(b'a{}')
+    (static_dir / 'postersMovie' / 'notes.txt').write_bytes(CSS)
+
+    assert list(compressible_files(str(static_dir))) == [str(static_dir / 'theme.css')]
+    view = static_asset_view_from_settings({'static.cache_max_age': '60', 'static.content_encodings': 'gzip'},
+                                           root_dir=str(static_dir))
+    assert (view.cache_max_age, view.immutable_max_age, list(view.content_encodings)) == (60, 31536000, ['gzip'])
+    with pytest.raises(ValueError):
+        static_asset_view_from_settings({'static.content_encodings': 'deflate'})
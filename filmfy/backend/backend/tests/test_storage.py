@@ -0,0 +1,68 @@
+# filmfy/backend/backend/tests/test_storage.py
+import hashlib
+import os
+from io import BytesIO
+
+import pytest
+
+from ..storage import BlobStorage, is_variant, variant_name
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return BlobStorage(str(tmp_path / 'postersMovie'), 'postersMovie')
+
+
+def stored_files(storage):
+    return sorted(name for _, _, names in os.walk(storage.root) for name in names)
+
+
+class TestBlobStorage:
+
+    def test_put_stores_by_digest_in_shards(self, storage):
+        data = os.urandom(200 * 1024) # Lebih dari satu chunk
+        digest = hashlib.sha256(data).hexdigest()
+
+        path = storage.put(BytesIO(data), '.PNG')
+
+        assert path == f'postersMovie/{digest[:2]}/{digest[2:4]}/{digest}.png'
+        with open(storage.full_path(path), 'rb') as stored:
+            assert stored.read() == data
+        assert oct(os.stat(storage.full_path(path)).st_mode & 0o777) == '0o644'
+
+    def test_same_bytes_share_one_file(self, storage):
+        first = storage.put(BytesIO(b'poster'), '.jpg')
+        second = storage.put(BytesIO(b'poster'), '.jpeg')
+        other = storage.put(BytesIO(b'poster lain'), '.jpg')
+
+        assert first == second
+        assert other != first
+        assert len(stored_files(storage)) == 2 # Tidak ada file sementara tertinggal
+
+    def test_delete(self, storage):
+        path = storage.put(BytesIO(b'poster'), '.jpg')
+
+        assert storage.delete(path) is True
+        assert storage.delete(path) is False
+        assert stored_files(storage) == []
+
+    def test_legacy_flat_paths_resolve(self, storage):
+        assert storage.full_path('postersMovie/2b0178c4.png') == os.path.join(storage.root, '2b0178c4.png')
+
+    def test_paths_outside_root_are_rejected(self, storage):
+        with pytest.raises(ValueError):
+            storage.full_path('postersMovie/../../etc/passwd')
+
+    def test_originals_and_variants(self, storage):
+        path = storage.put(BytesIO(b'poster'), '.jpg')
+        variant = variant_name(path, 160, 'webp')
+        with open(storage.full_path(variant), 'wb') as output:
+            output.write(b'kecil')
+
+        assert is_variant(variant) and not is_variant(path)
+        assert list(storage.originals()) == [path]
+        assert storage.original_for_variant(variant) == path
+        assert storage.original_for_variant(variant_name('postersMovie/ab/cd/lain.jpg', 160, 'webp')) is None
+
+        storage.delete(path)
+        assert stored_files(storage) == []
@@ -0,0 +1,194 @@
+# filmfy/backend/backend/tests/test_uploads.py
+import hashlib
+import os
+from io import BytesIO
+
+import pytest
+from pyramid.httpexceptions import (
+    HTTPBadRequest,
+    HTTPRequestEntityTooLarge,
+    HTTPUnsupportedMediaType,
+)
+from pyramid.request import Request
+
+from ..reaper import FILE_REAPER_REGISTRY_KEY
+from ..storage import BlobStorage
+from ..uploads import (
+    UPLOAD_LIMITS_REGISTRY_KEY,
+    UploadLimits,
+    UploadedFile,
+    _MultipartReader,
+    get_upload_form,
+    read_upload_form,
+    sniff_content_type,
+    upload_limits_from_settings,
+)
+
+PNG = b'\x89PNG\r\n\x1a\n' + os.urandom(300 * 1024) # Lebih dari beberapa chunk
+JPEG = b'\xff\xd8\xff\xe0' + os.urandom(1024)
+
+
+class FakeReaper:
+    def __init__(self):
+        self.queued = []
+
+    def is_alive(self):
+        return True
+
+    def enqueue(self, storage, path):
+        self.queued.append(path)
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return BlobStorage(str(tmp_path / 'postersMovie'), 'postersMovie')
+
+
+def multipart_body(fields, boundary='----filmfyTestBoundary'):
+    body = b''
+    for name, value in fields.items():
+        body += f'--{boundary}\r\n'.encode()
+        if isinstance(value, tuple):
+            filename, content, content_type = value
+            body += (f'Content-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                     f'Content-Type: {content_type}\r\n\r\n').encode() + content + b'\r\n'
+        else:
+            body += f'Content-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+    return body + f'--{boundary}--\r\n'.encode(), f'multipart/form-data; boundary={boundary}'
+
+
+def make_request(fields, limits=None, reaper=None):
+    body, content_type = multipart_body(fields)
+    request = Request.blank('/api/movies', method='POST', body=body, content_type=content_type)
+    request.registry = {UPLOAD_LIMITS_REGISTRY_KEY: limits or UploadLimits(),
+                        FILE_REAPER_REGISTRY_KEY: reaper or FakeReaper()}
+    return request
+
+
+def stored_files(storage):
+    return sorted(name for _, _, names in os.walk(storage.root) for name in names)
+
+
+def test_fields_and_file_are_streamed_to_storage(storage):
+    request = make_request({'title': 'Jalan Pulang', 'genre': 'Drama',
+                            'poster': ('Poster Besar.PNG', PNG, 'image/png')})
+
+    form = read_upload_form(request, {'poster': storage})
+
+    digest = hashlib.sha256(PNG).hexdigest()
+    assert form['title'] == 'Jalan Pulang'
+    assert form['genre'] == 'Drama'
+    poster = form['poster']
+    assert isinstance(poster, UploadedFile)
+    assert (poster.filename, poster.content_type, poster.size) == ('Poster Besar.PNG', 'image/png', len(PNG))
+    assert poster.path == f'postersMovie/{digest[:2]}/{digest[2:4]}/{digest}.png'
+    with open(storage.full_path(poster.path), 'rb') as stored:
+        assert stored.read() == PNG
+    # Body sudah habis: form yang sama dikembalikan, tanpa menyentuh internal WebOb
+    assert get_upload_form(request) is form
+    assert read_upload_form(request, {'poster': storage}) is form
+    assert 'webob._parsed_post_vars' not in request.environ
+
+
+def test_extension_follows_content(storage):
+    request = make_request({'poster': ('poster.png', JPEG, 'image/png')})
+
+    assert read_upload_form(request, {'poster': storage})['poster'].path.endswith('.jpg')
+
+
+def test_empty_file_input_is_not_an_upload(storage):
+    request = make_request({'title': 'Tanpa Poster', 'poster': ('', b'', 'application/octet-stream')})
+
+    assert read_upload_form(request, {'poster': storage})['poster'] == ''
+    assert stored_files(storage) == []
+
+
+def test_declared_type_is_rejected_before_reading(storage):
+    request = make_request({'poster': ('notes.txt', b'hello', 'text/plain')})
+
+    with pytest.raises(HTTPUnsupportedMediaType):
+        read_upload_form(request, {'poster': storage})
+    assert stored_files(storage) == []
+
+
+def test_content_must_match_an_allowed_type(storage):
+    request = make_request({'poster': ('evil.jpg', b'<html>' + os.urandom(64), 'image/jpeg')})
+
+    with pytest.raises(HTTPUnsupportedMediaType):
+        read_upload_form(request, {'poster': storage})
+    assert stored_files(storage) == [] # File sementara ikut dibuang
+
+
+def test_oversized_file_aborts_and_removes_spool(storage):
+    request = make_request({'poster': ('big.png', PNG, 'image/png')},
+                           UploadLimits(max_size=100 * 1024, max_body_size=10 * 1024 * 1024))
+
+    with pytest.raises(HTTPRequestEntityTooLarge):
+        read_upload_form(request, {'poster': storage})
+    assert stored_files(storage) == []
+
+
+def test_oversized_body_is_rejected_without_reading(storage):
+    request = make_request({'poster': ('big.png', PNG, 'image/png')},
+                           UploadLimits(max_size=10 * 1024 * 1024, max_body_size=1024))
+
+    with pytest.raises(HTTPRequestEntityTooLarge):
+        read_upload_form(request, {'poster': storage})
+    assert request.body_file_raw.tell() == 0
+
+
+def test_truncated_body_is_bad_request(storage):
+    request = make_request({'poster': ('p.png', PNG, 'image/png')})
+    body = request.body
+    request.body = body[:len(body) // 2]
+
+    with pytest.raises(HTTPBadRequest):
+        read_upload_form(request, {'poster': storage})
+    assert stored_files(storage) == []
+
+
+def test_unused_new_upload_is_discarded_after_request(storage):
+    reaper = FakeReaper()
+    request = make_request({'poster': ('p.png', PNG, 'image/png')}, reaper=reaper)
+
+    upload = read_upload_form(request, {'poster': storage})['poster'] # View gagal validasi
+    request._process_finished_callbacks()
+
+    assert reaper.queued == [upload.path]
+
+
+def test_acquired_upload_is_kept(storage):
+    reaper = FakeReaper()
+    request = make_request({'poster': ('p.png', PNG, 'image/png')}, reaper=reaper)
+
+    read_upload_form(request, {'poster': storage})['poster'].acquired = True
+    request._process_finished_callbacks()
+
+    assert reaper.queued == []
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 45, 4096])
+def test_boundary_split_across_chunks(chunk_size):
+    body, _ = multipart_body({'a': 'satu', 'b': ('x.png', PNG[:5000], 'image/png'), 'c': ''})
+    reader = _MultipartReader(BytesIO(body).read, b'----filmfyTestBoundary', chunk_size=chunk_size)
+
+    parts = [(headers['content-disposition'], b''.join(chunks)) for headers, chunks in reader.parts()]
+
+    assert [data for _, data in parts] == [b'satu', PNG[:5000], b'']
+
+
+def test_non_multipart_uses_webob():
+    request = Request.blank('/api/movies', POST={'title': 'Biasa'})
+    request.registry = {}
+
+    assert read_upload_form(request, {})['title'] == 'Biasa'
+
+
+def test_sniff_and_settings():
+    assert sniff_content_type(b'RIFF\x00\x00\x00\x00WEBPVP8 ') == 'image/webp'
+    assert sniff_content_type(b'GIF89a') == 'image/gif'
+    assert sniff_content_type(b'%PDF-1.7') is None
+    limits = upload_limits_from_settings({'uploads.max_size': '1024', 'uploads.content_types': 'image/png'})
+    assert (limits.max_size, limits.max_body_size, limits.content_types) == (1024, 1024 + 1024 * 1024, {'image/png'})
+    with pytest.raises(ValueError):
+        upload_limits_from_settings({'uploads.content_types': 'application/pdf'})
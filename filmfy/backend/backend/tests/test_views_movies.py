@@ -1,14 +1,13 @@
 # filmfy/backend/backend/tests/test_views_movies.py
 import pytest
 import os # Untuk os.path.join di helper
-import uuid # Untuk mock uuid.uuid4
-import shutil # Untuk mock shutil.copyfileobj
+import hashlib # Nama file poster = sha256 isinya
 from io import BytesIO # Untuk mock file
 from pyramid.testing import DummyRequest
 from pyramid.httpexceptions import (
     HTTPCreated, HTTPNotFound, HTTPBadRequest, HTTPNoContent, HTTPOk, HTTPUnauthorized
 )
-from unittest.mock import MagicMock, patch, mock_open
+from unittest.mock import MagicMock, patch
 from ..models.movie import Movie as RealMovieModel
 
 # --- PATH PENTING UNTUK PATCHING ---
@@ -19,15 +18,32 @@ MODELS_MOVIE_PATH = f'{VIEWS_MODULE_PATH}.Movie' # Movie seperti yang diimpor di
 CHECK_SESSION_PATH = f'{VIEWS_MODULE_PATH}.check_session'
 SAVE_POSTER_PATH = f'{VIEWS_MODULE_PATH}._save_poster'
 DELETE_POSTER_PATH = f'{VIEWS_MODULE_PATH}._delete_poster'
-OS_PATH = f'{VIEWS_MODULE_PATH}.os' # Jika Anda memanggil os.path, os.makedirs, os.remove
-SHUTIL_PATH = f'{VIEWS_MODULE_PATH}.shutil'
-UUID_PATH = f'{VIEWS_MODULE_PATH}.uuid'
-OPEN_PATH = f'{VIEWS_MODULE_PATH}.open' # Untuk built-in open
+POSTER_STORAGE_PATH = f'{VIEWS_MODULE_PATH}.POSTER_STORAGE'
+ACQUIRE_BLOB_PATH = f'{VIEWS_MODULE_PATH}.acquire_blob'
+RELEASE_BLOB_PATH = f'{VIEWS_MODULE_PATH}.release_blob'
+DELETE_AFTER_COMMIT_PATH = f'{VIEWS_MODULE_PATH}.delete_file_after_commit'
 
 
 # Impor class View dan helper jika ingin mengujinya secara terpisah juga
-from ..views.movies import MovieViews, _save_poster, _delete_poster, check_session, POSTER_UPLOAD_DIR
+from ..views.movies import (
+    MovieViews, _save_poster, _delete_poster, check_session,
+    _encode_cursor, _decode_cursor, _parse_limit, DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT,
+    _iter_movies_json, conditional_catalog_view, _parse_sort, _parse_movie_filters,
+    _movie_detail_tag
+)
+from ..cache import CACHE_REGISTRY_KEY, MemoryResponseCache, cached_json_view
+from pyramid.response import Response
 from ..models.movie import Movie as RealMovieModel # Untuk membuat instance di data
+from ..storage import BlobStorage
+from ..models.movie import MOVIE_COLUMNS
+from types import SimpleNamespace
+
+
+def make_movie_row(movie_id, title, **fields):
+    """Objek mirip Row hasil query(*MOVIE_COLUMNS) untuk jalur read-only."""
+    row = dict(genre=None, release_year=None, rating=None, poster_path=None)
+    row.update(fields)
+    return SimpleNamespace(id=movie_id, title=title, **row)
 
 
 # --- Pytest Fixtures ---
@@ -54,100 +70,77 @@ def movie_view_instance(dummy_request):
 # --- Tes untuk Helper Functions ---
 
 class TestHelperFunctions:
-    # Menggunakan patch untuk views.movies.os, views.movies.uuid, dll.
-    @patch(f'{VIEWS_MODULE_PATH}.shutil.copyfileobj')
-    @patch(f'{VIEWS_MODULE_PATH}.open', new_callable=mock_open)
-    @patch(f'{VIEWS_MODULE_PATH}.uuid.uuid4')
-    @patch(f'{VIEWS_MODULE_PATH}.os.path.splitext')
-    def test_save_poster_success(self, mock_splitext_param, mock_uuid4_param, mock_file_open_param, mock_copyfileobj_param, tmp_path):
+    # Poster disimpan lewat BlobStorage di tmp_path; refcount (tabel blobs) di-mock
+    @patch(ACQUIRE_BLOB_PATH)
+    def test_save_poster_success(self, mock_acquire_blob, tmp_path):
         # Arrange
         mock_poster_file = MagicMock()
-        mock_poster_file.filename = "test_image.jpg"
+        mock_poster_file.filename = "test_image.JPG"
         mock_poster_file.file = BytesIO(b"file_content")
+        mock_poster_file.file.read(4) # Posisi stream di tengah; _save_poster harus seek(0)
+        dbsession = MagicMock()
 
-        # PENTING: Mock method 'seek' pada objek BytesIO SEBELUM _save_poster dipanggil
-        mock_poster_file.file.seek = MagicMock()
-
-        # Atur return value untuk mock lainnya
-        mock_uuid4_param.return_value = "test-uuid"
-        # Pastikan return value mock_splitext_param sesuai dengan yang diharapkan os.path.splitext
-        # yaitu tuple (nama_tanpa_ekstensi, ekstensi)
-        mock_splitext_param.return_value = ('test_image', '.jpg') 
-
-        expected_unique_filename = "test-uuid.jpg" # Ini berdasarkan mock_uuid4 dan mock_splitext
-        expected_path_in_db = f"postersMovie/{expected_unique_filename}"
-        expected_full_output_path = os.path.join(str(tmp_path), expected_unique_filename)
+        digest = hashlib.sha256(b"file_content").hexdigest()
+        expected_path_in_db = f"postersMovie/{digest[:2]}/{digest[2:4]}/{digest}.jpg"
 
         # Act
-        # Panggil _save_poster HANYA SEKALI setelah semua mock yang relevan (termasuk .seek) disiapkan
-        with patch(f'{VIEWS_MODULE_PATH}.POSTER_UPLOAD_DIR', str(tmp_path)):
-            saved_filename = _save_poster(mock_poster_file)
+        with patch(POSTER_STORAGE_PATH, BlobStorage(str(tmp_path), 'postersMovie')):
+            saved_filename = _save_poster(mock_poster_file, dbsession)
 
         # Assert
-        # Verifikasi mock parameter decorator
-        mock_splitext_param.assert_called_once_with("test_image.jpg")
-        mock_uuid4_param.assert_called_once()
-        mock_file_open_param.assert_called_once_with(expected_full_output_path, 'wb')
-        
-        # Verifikasi bahwa shutil.copyfileobj dipanggil. Anda bisa lebih spesifik dengan argumennya jika perlu.
-        # mock_file_handle_opened = mock_file_open_param.return_value # atau mock_file_open_param().__enter__.return_value jika mock_open adalah context manager
-        # mock_copyfileobj_param.assert_called_once_with(mock_poster_file.file, mock_file_handle_opened)
-        mock_copyfileobj_param.assert_called_once() # Versi sederhana
-
-        # Verifikasi bahwa mock_poster_file.file.seek dipanggil oleh _save_poster
-        # Ini adalah inti perbaikannya.
-        mock_poster_file.file.seek.assert_called_once_with(0)
-
-        # Verifikasi hasil fungsi _save_poster
         assert saved_filename == expected_path_in_db
-
-        # Baris 'mock_poster_file.file.seek(0)' yang Anda tambahkan di akhir harus dihapus
-        # karena itu akan mengganggu assertion_called_once_with jika dipanggil lagi.
+        with open(os.path.join(str(tmp_path), digest[:2], digest[2:4], f"{digest}.jpg"), 'rb') as saved:
+            assert saved.read() == b"file_content"
+        mock_acquire_blob.assert_called_once_with(dbsession, expected_path_in_db)
+
+    @patch(ACQUIRE_BLOB_PATH)
+    def test_save_poster_same_bytes_are_stored_once(self, mock_acquire_blob, tmp_path):
+        storage = BlobStorage(str(tmp_path), 'postersMovie')
+        with patch(POSTER_STORAGE_PATH, storage):
+            first = _save_poster(MagicMock(filename="a.png", file=BytesIO(b"poster")), MagicMock())
+            second = _save_poster(MagicMock(filename="b.jpeg", file=BytesIO(b"poster")), MagicMock())
+
+        assert first == second # Satu file, satu URL; ekstensi upload pertama yang dipakai
+        assert mock_acquire_blob.call_count == 2 # Tapi dua referensi
+        files = [name for _, _, names in os.walk(tmp_path) for name in names]
+        assert len(files) == 1
 
     def test_save_poster_no_file(self):
-        assert _save_poster(None) is None
+        assert _save_poster(None, MagicMock()) is None
         mock_poster_file_no_filename = MagicMock(filename=None, file=BytesIO(b"content"))
-        assert _save_poster(mock_poster_file_no_filename) is None
+        assert _save_poster(mock_poster_file_no_filename, MagicMock()) is None
         mock_poster_file_no_file_attr = MagicMock(filename="file.jpg")
         del mock_poster_file_no_file_attr.file # Hapus atribut file
-        assert _save_poster(mock_poster_file_no_file_attr) is None
-
-    @patch(f'{VIEWS_MODULE_PATH}.os.remove')
-    @patch(f'{VIEWS_MODULE_PATH}.os.path.exists')
-    def test_delete_poster_success(self, mock_os_exists, mock_os_remove, tmp_path):
-        poster_path_in_db = "postersMovie/existing_poster.jpg"
-        actual_filename = "existing_poster.jpg"
-        full_disk_path = os.path.join(str(tmp_path), actual_filename)
-
-        mock_os_exists.return_value = True
-        
-        with patch(f'{VIEWS_MODULE_PATH}.POSTER_UPLOAD_DIR', str(tmp_path)):
-            result = _delete_poster(poster_path_in_db)
-
-        # mock_os_join.assert_called_once_with(str(tmp_path), actual_filename)
-        mock_os_exists.assert_called_once_with(full_disk_path)
-        mock_os_remove.assert_called_once_with(full_disk_path)
+        assert _save_poster(mock_poster_file_no_file_attr, MagicMock()) is None
+
+    @patch(DELETE_AFTER_COMMIT_PATH)
+    @patch(RELEASE_BLOB_PATH, return_value=0)
+    def test_delete_poster_last_reference_schedules_file(self, mock_release_blob, mock_delete_after_commit, tmp_path):
+        poster_path_in_db = "postersMovie/ab/cd/existing_poster.jpg"
+        full_disk_path = tmp_path / "ab" / "cd" / "existing_poster.jpg"
+        full_disk_path.parent.mkdir(parents=True)
+        full_disk_path.write_bytes(b"poster")
+        dbsession, request = MagicMock(), MagicMock()
+        storage = BlobStorage(str(tmp_path), 'postersMovie')
+
+        with patch(POSTER_STORAGE_PATH, storage):
+            result = _delete_poster(poster_path_in_db, dbsession, request)
+
+        mock_release_blob.assert_called_once_with(dbsession, poster_path_in_db)
+        mock_delete_after_commit.assert_called_once_with(request, storage, poster_path_in_db)
         assert result is True
+        assert full_disk_path.exists() # Baru dihapus reaper setelah commit
 
-    @patch(f'{VIEWS_MODULE_PATH}.os.remove')
-    @patch(f'{VIEWS_MODULE_PATH}.os.path.exists')
-    def test_delete_poster_not_exists(self, mock_os_exists, mock_os_remove, tmp_path):
-        poster_path_in_db = "postersMovie/non_existing_poster.jpg"
-        actual_filename = "non_existing_poster.jpg"
-        full_disk_path = os.path.join(str(tmp_path), actual_filename)
-
-        mock_os_exists.return_value = False # File tidak ada
+    @patch(DELETE_AFTER_COMMIT_PATH)
+    @patch(RELEASE_BLOB_PATH, return_value=1)
+    def test_delete_poster_still_referenced_keeps_file(self, mock_release_blob, mock_delete_after_commit):
+        result = _delete_poster("postersMovie/shared.jpg", MagicMock(), MagicMock())
 
-        with patch(f'{VIEWS_MODULE_PATH}.POSTER_UPLOAD_DIR', str(tmp_path)):
-            result = _delete_poster(poster_path_in_db)
-
-        # mock_os_join.assert_called_once_with(str(tmp_path), actual_filename)
-        mock_os_exists.assert_called_once_with(full_disk_path)
-        mock_os_remove.assert_not_called()
         assert result is False
+        mock_delete_after_commit.assert_not_called() # Masih dipakai movie lain
 
     def test_delete_poster_none_path(self):
-        assert _delete_poster(None) is False
+        assert _delete_poster(None, MagicMock(), MagicMock()) is False
 
     def test_check_session_authenticated(self, dummy_request):
         dummy_request.session = {'user_id': 123} # User terautentikasi
@@ -160,6 +153,112 @@ class TestHelperFunctions:
             check_session(dummy_request)
         assert excinfo.value.json_body['error'] == 'Authentication required. Please log in.'
 
+    def test_cursor_roundtrip(self):
+        cursor = _encode_cursor("Judul Film / Ünïcode", 42)
+        assert '=' not in cursor # Padding dibuang agar aman di query string
+        assert _decode_cursor(cursor) == ("Judul Film / Ünïcode", 42)
+
+    def test_decode_cursor_invalid(self):
+        for bad_cursor in ['!!!', 'bm90LWpzb24', _encode_cursor("x", 1)[:-3]]:
+            with pytest.raises(HTTPBadRequest) as excinfo:
+                _decode_cursor(bad_cursor)
+            assert excinfo.value.json_body['error'] == 'Invalid cursor.'
+
+    def test_iter_movies_json_matches_json_renderer(self, dummy_request, tmp_path):
+        # Arrange: database SQLite sungguhan agar yield_per benar-benar dijalankan
+        import json
+        from sqlalchemy import create_engine
+        from ..models import get_session_factory
+        from ..models.meta import Base
+        engine = create_engine(f"sqlite:///{tmp_path / 'stream.sqlite'}")
+        Base.metadata.create_all(engine)
+        session_factory = get_session_factory(engine)
+        seed_session = session_factory()
+        seed_session.add_all([
+            RealMovieModel(title=f'Film {i:03d}', rating=(i % 10) + 1, poster_path=f'postersMovie/{i}.png')
+            for i in range(7)
+        ])
+        seed_session.commit()
+        expected = [m.to_dict(request=dummy_request)
+                    for m in seed_session.query(RealMovieModel).order_by(RealMovieModel.title)]
+        seed_session.close()
+
+        # Act: batch kecil supaya beberapa chunk dihasilkan
+        chunks = list(_iter_movies_json(dummy_request, session_factory, batch_size=3))
+
+        # Assert
+        assert len(chunks) == 5 # '[' + 3 chunk data (3, 3, 1) + ']'
+        assert b''.join(chunks) == json.dumps(expected).encode('utf-8')
+        engine.dispose()
+
+    def test_iter_movies_json_empty(self, dummy_request):
+        session_factory = MagicMock()
+        session_factory.return_value.query.return_value.order_by.return_value.yield_per.return_value = []
+        assert b''.join(_iter_movies_json(dummy_request, session_factory)) == b'[]'
+        session_factory.return_value.close.assert_called_once()
+
+    def _webob_request(self, dummy_request, headers=None):
+        # DummyRequest tidak punya properti conditional WebOb (if_none_match, path_qs)
+        from pyramid.request import Request
+        request = Request.blank('/api/movies?limit=5', headers=headers or {})
+        request.dbsession = dummy_request.dbsession
+        return request
+
+    @patch(f'{VIEWS_MODULE_PATH}.catalog_version')
+    def test_conditional_catalog_view_sets_etag(self, mock_catalog_version, dummy_request):
+        import datetime
+        from pyramid.response import Response
+        mock_catalog_version.return_value = (2, 5, datetime.datetime(2026, 1, 2, 3, 4, 5))
+        view = MagicMock(return_value=Response(json_body=[]))
+        request = self._webob_request(dummy_request)
+
+        response = conditional_catalog_view(view)(None, request)
+
+        mock_catalog_version.assert_called_once_with(dummy_request.dbsession)
+        assert response.status_code == 200
+        assert response.etag
+        assert response.last_modified == datetime.datetime(2026, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc)
+        assert response.headers['Cache-Control'] == 'no-cache'
+
+    @patch(f'{VIEWS_MODULE_PATH}.catalog_version')
+    def test_conditional_catalog_view_not_modified(self, mock_catalog_version, dummy_request):
+        from pyramid.response import Response
+        from pyramid.httpexceptions import HTTPNotModified
+        mock_catalog_version.return_value = (2, 5, None)
+        view = MagicMock(return_value=Response(json_body=[]))
+        etag = conditional_catalog_view(view)(None, self._webob_request(dummy_request)).etag
+        view.reset_mock()
+
+        request = self._webob_request(dummy_request, {'If-None-Match': f'"{etag}"'})
+        response = conditional_catalog_view(view)(None, request)
+
+        view.assert_not_called() # Baris movie tidak disentuh sama sekali
+        assert isinstance(response, HTTPNotModified)
+        assert response.etag == etag
+
+        # Versi katalog berubah -> ETag lama tidak lagi cocok
+        mock_catalog_version.return_value = (1, 5, None)
+        response = conditional_catalog_view(view)(None, request)
+        view.assert_called_once()
+        assert response.status_code == 200 and response.etag != etag
+
+    @patch(f'{VIEWS_MODULE_PATH}.catalog_version')
+    def test_conditional_catalog_view_skips_errors(self, mock_catalog_version, dummy_request):
+        mock_catalog_version.return_value = (0, None, None)
+        not_found = HTTPNotFound(json_body={'error': 'Movie not found'})
+        request = self._webob_request(dummy_request)
+        response = conditional_catalog_view(MagicMock(return_value=not_found))(None, request)
+        assert response is not_found
+        assert response.etag is None
+
+    def test_parse_limit(self):
+        assert _parse_limit(None) == DEFAULT_PAGE_LIMIT
+        assert _parse_limit('10') == 10
+        assert _parse_limit(str(MAX_PAGE_LIMIT + 1000)) == MAX_PAGE_LIMIT
+        for bad_limit in ['0', '-5', 'abc']:
+            with pytest.raises(HTTPBadRequest):
+                _parse_limit(bad_limit)
+
 
 # --- Tes untuk MovieViews Class ---
 
@@ -198,7 +297,7 @@ class TestMovieViews:
 
         # Assert
         mock_check_session.assert_called_once_with(dummy_request)
-        mock_save_poster.assert_called_once_with(dummy_request.POST['poster'])
+        mock_save_poster.assert_called_once_with(dummy_request.POST['poster'], dummy_request.dbsession)
         MockMovieClass.assert_called_once_with(
             title='New Movie Title',
             genre='Comedy',
@@ -240,7 +339,7 @@ class TestMovieViews:
         response = movie_view_instance.create_movie()
 
         # Assert
-        mock_save_poster.assert_called_once_with(None)
+        mock_save_poster.assert_called_once_with(None, dummy_request.dbsession)
         MockMovieClass.assert_called_once_with(
             title='No Poster Movie',
             genre='Drama',
@@ -321,10 +420,9 @@ class TestMovieViews:
     # --- LIST ---
     def test_list_movies_success(self, movie_view_instance, dummy_request):
         # Arrange
-        mock_movie1 = MagicMock(spec=RealMovieModel)
-        mock_movie1.to_dict.return_value = {'id': 1, 'title': 'Movie Alpha'}
-        mock_movie2 = MagicMock(spec=RealMovieModel)
-        mock_movie2.to_dict.return_value = {'id': 2, 'title': 'Movie Beta'}
+        dummy_request.params = {'all': '1'} # Opt-in ke mode lama (tanpa pagination)
+        movie_row1 = make_movie_row(1, 'Movie Alpha', poster_path='postersMovie/a.png')
+        movie_row2 = make_movie_row(2, 'Movie Beta')
 
         # --- Perbaikan Cara Mocking Rantai Pemanggilan ---
         # 1. Dapatkan mock untuk method 'query' itu sendiri
@@ -336,15 +434,15 @@ class TestMovieViews:
 
         # 3. Lanjutkan rantai mock dari query_result_mock
         ordered_query_result_mock = query_result_mock.order_by.return_value
-        ordered_query_result_mock.all.return_value = [mock_movie1, mock_movie2]
+        ordered_query_result_mock.all.return_value = [movie_row1, movie_row2]
         # --- Akhir Perbaikan Cara Mocking ---
 
         # Act
         response_data = movie_view_instance.list_movies()
 
         # Assert
-        # 1. Pastikan dbsession.query (yaitu mock_query_method) dipanggil sekali dengan RealMovieModel
-        mock_query_method.assert_called_once_with(RealMovieModel)
+        # 1. Pastikan dbsession.query dipanggil sekali dengan kolom saja (bukan entity ORM)
+        mock_query_method.assert_called_once_with(*MOVIE_COLUMNS)
 
         # 2. Pastikan method order_by pada hasil query (query_result_mock) dipanggil sekali
         #    DAN dengan argumen yang benar (RealMovieModel.title)
@@ -353,15 +451,15 @@ class TestMovieViews:
         # 3. Pastikan method all pada hasil ordered query (ordered_query_result_mock) dipanggil sekali
         ordered_query_result_mock.all.assert_called_once()
 
-        mock_movie1.to_dict.assert_called_once_with(request=dummy_request)
-        mock_movie2.to_dict.assert_called_once_with(request=dummy_request)
         assert len(response_data) == 2
+        assert response_data[0]['poster_url'] == 'http://example.com/static/postersMovie/a.png'
         assert response_data[0]['title'] == 'Movie Alpha'
         assert response_data[1]['title'] == 'Movie Beta'
 
 
     def test_list_movies_empty(self, movie_view_instance, dummy_request):
         # Arrange
+        dummy_request.params = {'all': 'true'}
         dummy_request.dbsession.query(RealMovieModel).order_by().all.return_value = []
 
         # Act
@@ -370,28 +468,191 @@ class TestMovieViews:
         # Assert
         assert len(response_data) == 0
 
+    def _make_movie_mocks(self, count):
+        return [make_movie_row(i, f'Movie {i:02d}') for i in range(1, count + 1)]
+
+    def test_list_movies_paged_first_page(self, movie_view_instance, dummy_request):
+        # Arrange
+        dummy_request.params = {'limit': '2'}
+        query_mock = dummy_request.dbsession.query.return_value
+        limited_query_mock = query_mock.order_by.return_value.limit.return_value
+        limited_query_mock.all.return_value = self._make_movie_mocks(3) # limit + 1 baris
+
+        # Act
+        response_data = movie_view_instance.list_movies()
+
+        # Assert
+        query_mock.filter.assert_not_called() # Halaman pertama tidak butuh seek
+        query_mock.order_by.assert_called_once_with(RealMovieModel.title, RealMovieModel.id)
+        query_mock.order_by.return_value.limit.assert_called_once_with(3)
+        assert [m['id'] for m in response_data['movies']] == [1, 2]
+        assert _decode_cursor(response_data['next_cursor']) == ('Movie 02', 2)
+
+    def test_list_movies_paged_with_cursor_last_page(self, movie_view_instance, dummy_request):
+        # Arrange
+        dummy_request.params = {'limit': '2', 'after': _encode_cursor('Movie 02', 2)}
+        query_mock = dummy_request.dbsession.query.return_value
+        filtered_query_mock = query_mock.filter.return_value
+        filtered_query_mock.order_by.return_value.limit.return_value.all.return_value = self._make_movie_mocks(1)
+
+        # Act
+        response_data = movie_view_instance.list_movies()
+
+        # Assert
+        query_mock.filter.assert_called_once()
+        assert len(response_data['movies']) == 1
+        assert response_data['next_cursor'] is None
+
+    @patch(f'{VIEWS_MODULE_PATH}._iter_movies_json')
+    def test_list_movies_stream(self, mock_iter_movies_json, movie_view_instance, dummy_request):
+        # Arrange
+        dummy_request.params = {'stream': '1'}
+        readonly_factory, router = MagicMock(), MagicMock()
+        dummy_request.registry = {'dbsession_factory': MagicMock(), 'readonly_dbsession_factory': readonly_factory,
+                                  'replica_router': router}
+        mock_iter_movies_json.return_value = iter([b'[', b']'])
+
+        # Act
+        response = movie_view_instance.list_movies()
+
+        # Assert: session read-only di engine pilihan ReplicaRouter, bukan primary
+        session_factory = mock_iter_movies_json.call_args[0][1]
+        session_factory()
+        router.engine_for.assert_called_once_with(dummy_request)
+        readonly_factory.assert_called_once_with(bind=router.engine_for.return_value)
+        dummy_request.registry['dbsession_factory'].assert_not_called()
+        dummy_request.dbsession.query.assert_not_called() # Tidak memakai session transaksi request
+        assert response.content_type == 'application/json'
+        assert response.body == b'[]'
+
+    def test_list_movies_paged_invalid_cursor(self, movie_view_instance, dummy_request):
+        # Arrange
+        dummy_request.params = {'after': 'not-a-cursor'}
+
+        # Act
+        response = movie_view_instance.list_movies()
+
+        # Assert
+        assert isinstance(response, HTTPBadRequest)
+        dummy_request.dbsession.query.return_value.order_by.assert_not_called()
+
+    @patch(f'{VIEWS_MODULE_PATH}.filter_movies')
+    def test_list_movies_filtered_and_sorted(self, mock_filter_movies, movie_view_instance, dummy_request):
+        # Arrange
+        dummy_request.params = {'limit': '1', 'genre': 'Drama', 'year_from': '1990', 'sort': '-rating'}
+        filtered_query_mock = mock_filter_movies.return_value
+        filtered_query_mock.order_by.return_value.limit.return_value.all.return_value = [
+            make_movie_row(7, 'Movie 07', rating=9), make_movie_row(3, 'Movie 03', rating=8)]
+
+        # Act
+        response_data = movie_view_instance.list_movies()
+
+        # Assert
+        mock_filter_movies.assert_called_once_with(
+            dummy_request.dbsession.query.return_value,
+            genre='Drama', year_from=1990, year_to=None, min_rating=None)
+        order_args = filtered_query_mock.order_by.call_args[0]
+        assert [str(arg) for arg in order_args] == ['movies.rating DESC', 'movies.id DESC']
+        assert [m['id'] for m in response_data['movies']] == [7]
+        assert _decode_cursor(response_data['next_cursor']) == (9, 7) # Cursor berisi nilai rating
+
+    def test_list_movies_invalid_sort_or_filter(self, movie_view_instance, dummy_request):
+        for params in [{'sort': 'poster_path'}, {'min_rating': '11'}, {'year_to': 'abc'},
+                       {'sort': 'rating', 'after': _encode_cursor('Judul', 1)}]: # Cursor dari urutan title
+            dummy_request.params = params
+            response = movie_view_instance.list_movies()
+            assert isinstance(response, HTTPBadRequest), params
+
+    def test_parse_sort_and_filters(self):
+        assert _parse_sort(None) == 'title'
+        assert _parse_sort(' -release_year ') == '-release_year'
+        assert _parse_movie_filters({'genre': '  ', 'min_rating': '7'}) == {
+            'genre': None, 'year_from': None, 'year_to': None, 'min_rating': 7}
+
+    # --- SEARCH ---
+    @patch(f'{VIEWS_MODULE_PATH}.search_catalog')
+    def test_search_movies_success(self, mock_search_catalog, movie_view_instance, dummy_request):
+        # Arrange
+        dummy_request.params = {'q': 'dark "knight', 'limit': '2'}
+        mock_search_catalog.return_value = [make_movie_row(i, f'Dark {i}') for i in (3, 1, 2)]
+
+        # Act
+        response_data = movie_view_instance.search_movies()
+
+        # Assert
+        mock_search_catalog.assert_called_once_with(dummy_request.dbsession, ['dark', 'knight'], 2, 0)
+        assert [m['id'] for m in response_data['movies']] == [3, 1] # Urutan relevansi dipertahankan
+        assert response_data['next_offset'] == 2
+
+    @patch(f'{VIEWS_MODULE_PATH}.search_catalog')
+    def test_search_movies_last_page(self, mock_search_catalog, movie_view_instance, dummy_request):
+        dummy_request.params = {'q': 'dark', 'offset': '50'}
+        mock_search_catalog.return_value = [make_movie_row(1, 'Dark')]
+
+        response_data = movie_view_instance.search_movies()
+
+        mock_search_catalog.assert_called_once_with(dummy_request.dbsession, ['dark'], DEFAULT_PAGE_LIMIT, 50)
+        assert response_data['next_offset'] is None
+
+    @patch(f'{VIEWS_MODULE_PATH}.search_catalog')
+    def test_search_movies_invalid_params(self, mock_search_catalog, movie_view_instance, dummy_request):
+        for params in [{}, {'q': '***'}, {'q': 'dark', 'offset': '-1'}, {'q': 'dark', 'limit': 'x'}]:
+            dummy_request.params = params
+            response = movie_view_instance.search_movies()
+            assert isinstance(response, HTTPBadRequest)
+        mock_search_catalog.assert_not_called()
+
+    # --- AUTOCOMPLETE ---
+    def test_autocomplete_movies(self, movie_view_instance, dummy_request):
+        from ..autocomplete import TitleIndex, AUTOCOMPLETE_REGISTRY_KEY
+        index = TitleIndex()
+        index.build([(1, 'Inception'), (2, 'Interstellar'), (3, 'Insomnia')])
+        dummy_request.registry = {AUTOCOMPLETE_REGISTRY_KEY: index}
+        dummy_request.params = {'q': 'ins', 'limit': '1'}
+
+        response_data = movie_view_instance.autocomplete_movies()
+
+        assert response_data == {'suggestions': [{'id': 3, 'title': 'Insomnia'}]}
+        dummy_request.dbsession.query.assert_not_called() # Tanpa round-trip database
+
+    def test_autocomplete_movies_invalid_limit(self, movie_view_instance, dummy_request):
+        dummy_request.params = {'q': 'ins', 'limit': 'banyak'}
+        assert isinstance(movie_view_instance.autocomplete_movies(), HTTPBadRequest)
+
+    def test_autocomplete_movies_without_index(self, movie_view_instance, dummy_request):
+        dummy_request.registry = {}
+        dummy_request.params = {'q': 'ins'}
+        assert movie_view_instance.autocomplete_movies() == {'suggestions': []}
+
     # --- GET DETAIL ---
+    @patch(f'{VIEWS_MODULE_PATH}.movie_facets')
+    def test_facets_movies(self, mock_movie_facets, movie_view_instance, dummy_request):
+        mock_movie_facets.return_value = {'genre': [], 'decade': [], 'rating': []}
+
+        assert movie_view_instance.facets_movies() == mock_movie_facets.return_value
+        mock_movie_facets.assert_called_once_with(dummy_request.dbsession)
+
     def test_get_movie_success(self, movie_view_instance, dummy_request):
         # Arrange
         movie_id = 1
         dummy_request.matchdict['id'] = str(movie_id)
-        mock_movie = MagicMock(spec=RealMovieModel)
-        mock_movie.to_dict.return_value = {'id': movie_id, 'title': 'Specific Movie'}
-        dummy_request.dbsession.query(RealMovieModel).get.return_value = mock_movie
+        filtered_query_mock = dummy_request.dbsession.query.return_value.filter.return_value
+        filtered_query_mock.first.return_value = make_movie_row(movie_id, 'Specific Movie', rating=8)
 
         # Act
         response = movie_view_instance.get_movie()
 
         # Assert
-        dummy_request.dbsession.query(RealMovieModel).get.assert_called_once_with(movie_id)
-        mock_movie.to_dict.assert_called_once_with(request=dummy_request)
+        dummy_request.dbsession.query.assert_called_once_with(*MOVIE_COLUMNS)
+        filtered_query_mock.first.assert_called_once()
         assert response['title'] == 'Specific Movie'
+        assert response['rating'] == 8
 
     def test_get_movie_not_found(self, movie_view_instance, dummy_request):
         # Arrange
         movie_id = 99
         dummy_request.matchdict['id'] = str(movie_id)
-        dummy_request.dbsession.query(RealMovieModel).get.return_value = None # Movie tidak ditemukan
+        dummy_request.dbsession.query.return_value.filter.return_value.first.return_value = None # Movie tidak ditemukan
 
         # Act
         response = movie_view_instance.get_movie()
@@ -460,8 +721,8 @@ class TestMovieViews:
         mock_check_session.assert_called_once_with(dummy_request)
         dummy_request.dbsession.query(RealMovieModel).get.assert_called_once_with(movie_id)
         
-        mock_delete_poster.assert_called_once_with("postersMovie/old_poster.jpg") # Cek poster lama dihapus
-        mock_save_poster.assert_called_once_with(dummy_request.POST['poster']) # Cek poster baru disimpan
+        mock_delete_poster.assert_called_once_with("postersMovie/old_poster.jpg", dummy_request.dbsession, dummy_request) # Cek poster lama dilepas
+        mock_save_poster.assert_called_once_with(dummy_request.POST['poster'], dummy_request.dbsession) # Cek poster baru disimpan
         
         assert existing_movie_mock.title == 'Updated Title'
         assert existing_movie_mock.genre == 'Updated Genre'
@@ -491,6 +752,63 @@ class TestMovieViews:
         assert isinstance(response, HTTPNotFound)
         assert response.json_body['error'] == 'Movie not found'
 
+    @patch(CHECK_SESSION_PATH)
+    def test_update_movie_invalid_rating_leaves_movie_untouched(self, mock_check_session, movie_view_instance, dummy_request):
+        # Arrange
+        mock_check_session.return_value = 1
+        dummy_request.matchdict['id'] = '1'
+        dummy_request.POST = {'title': 'Judul Baru', 'genre': 'Horror', 'rating': '11'}
+        existing_movie_mock = MagicMock(spec=RealMovieModel)
+        existing_movie_mock.title, existing_movie_mock.genre = 'Judul Lama', 'Drama'
+        existing_movie_mock.release_year, existing_movie_mock.rating = 2020, 7
+        dummy_request.dbsession.query(RealMovieModel).get.return_value = existing_movie_mock
+
+        # Act
+        response = movie_view_instance.update_movie()
+
+        # Assert: 400 di-return (transaksi tetap commit), jadi movie tidak boleh berubah sebagian
+        assert isinstance(response, HTTPBadRequest)
+        assert (existing_movie_mock.title, existing_movie_mock.genre, existing_movie_mock.rating) == ('Judul Lama', 'Drama', 7)
+        dummy_request.dbsession.flush.assert_not_called()
+
+    @patch(CHECK_SESSION_PATH)
+    def test_update_movie_invalidates_leading_zero_detail_url(self, mock_check_session, movie_view_instance, dummy_request):
+        # Arrange: /api/movies/007 (cocok dengan {id:\d+}) sudah ada di cache
+        cache = MemoryResponseCache()
+        detail_request = DummyRequest(path='/api/movies/007')
+        detail_request.matchdict = {'id': '007'}
+        detail_request.matched_route = MagicMock()
+        detail_request.matched_route.name = 'api_movie_detail'
+        detail_request.registry = {CACHE_REGISTRY_KEY: cache}
+        detail_view = MagicMock(side_effect=[
+            Response(body=b'{"title": "Judul Lama"}', content_type='application/json'),
+            Response(body=b'{"title": "Judul Baru"}', content_type='application/json'),
+        ])
+        cached_detail = cached_json_view(_movie_detail_tag)(detail_view)
+        cached_detail(None, detail_request)
+
+        mock_check_session.return_value = 1
+        dummy_request.registry = {CACHE_REGISTRY_KEY: cache}
+        dummy_request.tm = MagicMock()
+        dummy_request.matchdict['id'] = '7'
+        dummy_request.POST = {'title': 'Judul Baru'}
+        existing_movie_mock = MagicMock(spec=RealMovieModel)
+        existing_movie_mock.title, existing_movie_mock.genre = 'Judul Lama', 'Drama'
+        existing_movie_mock.release_year, existing_movie_mock.rating = 2020, 7
+        existing_movie_mock.poster_path = None
+        existing_movie_mock.to_dict.return_value = {'id': 7, 'title': 'Judul Baru'}
+        dummy_request.dbsession.query(RealMovieModel).get.return_value = existing_movie_mock
+
+        # Act: update lalu commit berhasil
+        assert isinstance(movie_view_instance.update_movie(), HTTPOk)
+        for call in dummy_request.tm.get.return_value.addAfterCommitHook.call_args_list:
+            call[0][0](True)
+
+        # Assert
+        response = cached_detail(None, detail_request)
+        assert response.headers['X-Cache'] == 'MISS'
+        assert response.body == b'{"title": "Judul Baru"}'
+
     @patch(CHECK_SESSION_PATH)
     def test_update_movie_unauthorized(self, mock_check_session, movie_view_instance, dummy_request):
         # Arrange
@@ -526,7 +844,7 @@ class TestMovieViews:
         # Assert
         mock_check_session.assert_called_once_with(dummy_request)
         dummy_request.dbsession.query(RealMovieModel).get.assert_called_once_with(movie_id)
-        mock_delete_poster.assert_called_once_with(existing_movie_mock.poster_path)
+        mock_delete_poster.assert_called_once_with(existing_movie_mock.poster_path, dummy_request.dbsession, dummy_request)
         dummy_request.dbsession.delete.assert_called_once_with(existing_movie_mock)
         dummy_request.dbsession.flush.assert_called_once()
         assert isinstance(response, HTTPNoContent)
@@ -1,17 +1,20 @@
 import pytest
 import os
+import hashlib
 from unittest.mock import MagicMock, patch, mock_open
 from io import BytesIO
 from pyramid.testing import DummyRequest
 from pyramid.httpexceptions import (
     HTTPCreated, HTTPNotFound, HTTPBadRequest, HTTPConflict,
-    HTTPUnauthorized, HTTPOk, HTTPNoContent, HTTPForbidden
+    HTTPUnauthorized, HTTPOk, HTTPNoContent, HTTPForbidden, HTTPServiceUnavailable
 )
 import sqlalchemy.exc # Untuk mock IntegrityError
 
 # Sesuaikan path import ini jika berbeda
-from ..views.users import UserViews, _save_profile_photo, _delete_profile_photo, check_authorization
+from ..views.users import UserViews, _save_profile_photo, _delete_profile_photo, check_authorization, PROFILE_PIC_STORAGE
 from ..models.user import User as RealUserModel # Model User yang asli
+from ..passwords import PasswordPoolBusy
+from ..storage import BlobStorage
 
 # --- PATH PENTING UNTUK PATCHING (Sesuaikan dengan struktur Anda) ---
 VIEWS_USERS_MODULE_PATH = 'backend.views.users'
@@ -21,8 +24,6 @@ SAVE_PHOTO_PATH_IN_VIEWS = f'{VIEWS_USERS_MODULE_PATH}._save_profile_photo'
 DELETE_PHOTO_PATH_IN_VIEWS = f'{VIEWS_USERS_MODULE_PATH}._delete_profile_photo'
 # Untuk mock modul bawaan yang digunakan di views.users
 OS_PATH_VIEWS_USERS = f'{VIEWS_USERS_MODULE_PATH}.os'
-SHUTIL_PATH_VIEWS_USERS = f'{VIEWS_USERS_MODULE_PATH}.shutil'
-UUID_PATH_VIEWS_USERS = f'{VIEWS_USERS_MODULE_PATH}.uuid'
 OPEN_PATH_VIEWS_USERS = f'{VIEWS_USERS_MODULE_PATH}.open'
 
 
@@ -36,6 +37,7 @@ def dummy_user_request(tmp_path): # Menggunakan tmp_path untuk isolasi file syst
     request.matchdict = {}
     request.registry = MagicMock() # Mock registry
     request.registry.settings = {} # Mock settings di dalam registry
+    request.registry.get.return_value = None # Fitur opsional (pool bcrypt, cache profil) mati
     request.application_url = "http://example.com"
     
     # Override PROFILE_PIC_UPLOAD_DIR untuk tes, arahkan ke tmp_path
@@ -55,26 +57,33 @@ def user_view_instance(dummy_user_request):
 # Namun, jika ada perbedaan, tes di sini. Untuk contoh, saya akan buat kerangka singkat.
 
 class TestUserViewHelperFunctions:
-    @patch(f'{VIEWS_USERS_MODULE_PATH}.shutil.copyfileobj')
-    @patch(f'{VIEWS_USERS_MODULE_PATH}.open', new_callable=mock_open)
-    @patch(f'{VIEWS_USERS_MODULE_PATH}.uuid.uuid4')
-    @patch(f'{VIEWS_USERS_MODULE_PATH}.os.path.splitext')
-    def test_save_profile_photo_success(self, mock_splitext, mock_uuid4, mock_file_open, mock_copyfileobj, tmp_path):
-        # Mirip dengan test_save_poster_success, sesuaikan nama file dan path
-        # Pastikan Anda mem-patch PROFILE_PIC_UPLOAD_DIR di dalam views.users jika digunakan oleh helper ini
-        with patch(f'{VIEWS_USERS_MODULE_PATH}.PROFILE_PIC_UPLOAD_DIR', str(tmp_path)):
+    @patch(f'{VIEWS_USERS_MODULE_PATH}.acquire_blob')
+    def test_save_profile_photo_success(self, mock_acquire_blob, tmp_path):
+        # Mirip dengan test_save_poster_success: path = sha256 isi file, dibagi per shard
+        digest = hashlib.sha256(b"imgdata").hexdigest()
+        dbsession = MagicMock()
+        with patch(f'{VIEWS_USERS_MODULE_PATH}.PROFILE_PIC_STORAGE', BlobStorage(str(tmp_path), 'profile_pics')):
             mock_photo_file = MagicMock(filename="profile.png", file=BytesIO(b"imgdata"))
-            mock_photo_file.file.seek = MagicMock()
-            mock_uuid4.return_value = "user-photo-uuid"
-            mock_splitext.return_value = ('profile', '.png')
-            
-            saved_path = _save_profile_photo(mock_photo_file)
-            
-            assert saved_path == 'profile_pics/user-photo-uuid.png'
-            mock_file_open.assert_called_once_with(os.path.join(str(tmp_path), "user-photo-uuid.png"), 'wb')
-            mock_copyfileobj.assert_called_once()
-            mock_photo_file.file.seek.assert_called_once_with(0) 
 
+            saved_path = _save_profile_photo(mock_photo_file, dbsession)
+
+            assert saved_path == f'profile_pics/{digest[:2]}/{digest[2:4]}/{digest}.png'
+            assert os.path.exists(os.path.join(str(tmp_path), digest[:2], digest[2:4], f'{digest}.png'))
+            mock_acquire_blob.assert_called_once_with(dbsession, saved_path)
+
+    @patch(f'{VIEWS_USERS_MODULE_PATH}.delete_file_after_commit')
+    @patch(f'{VIEWS_USERS_MODULE_PATH}.release_blob', return_value=2)
+    def test_delete_profile_photo_still_referenced(self, mock_release_blob, mock_delete_after_commit):
+        assert _delete_profile_photo('profile_pics/shared.png', MagicMock(), MagicMock()) is False
+        mock_delete_after_commit.assert_not_called()
+
+    @patch(f'{VIEWS_USERS_MODULE_PATH}.delete_file_after_commit')
+    @patch(f'{VIEWS_USERS_MODULE_PATH}.release_blob', return_value=0)
+    def test_delete_profile_photo_last_reference_is_scheduled(self, mock_release_blob, mock_delete_after_commit):
+        request = MagicMock()
+        assert _delete_profile_photo('profile_pics/me.png', MagicMock(), request) is True
+        mock_delete_after_commit.assert_called_once_with(
+            request, PROFILE_PIC_STORAGE, 'profile_pics/me.png') # Dihapus setelah commit
 
     def test_check_authorization_success(self, dummy_user_request):
         dummy_user_request.session = {'user_id': 10}
@@ -125,12 +134,14 @@ class TestUserViewsIntegration: # Ganti nama jika perlu, ini untuk view methods
         response = user_view_instance.signup_view()
 
         # Assert
-        mock_save_photo.assert_called_once_with(dummy_user_request.POST['foto_profil'])
+        mock_save_photo.assert_called_once_with(dummy_user_request.POST['foto_profil'], dummy_user_request.dbsession)
         MockUserClass.assert_called_once_with(
             username='newuser', email='new@example.com', bio='A new bio',
-            profile_photo="profile_pics/saved_avatar.jpg"
         )
-        mock_created_user_instance.set_password.assert_called_once_with('Password123!')
+        assert mock_created_user_instance.profile_photo == "profile_pics/saved_avatar.jpg"
+        registry_value = dummy_user_request.registry.get.return_value # Pool & bcrypt rounds
+        mock_created_user_instance.set_password.assert_called_once_with(
+            'Password123!', pool=registry_value, rounds=registry_value)
         dummy_user_request.dbsession.add.assert_called_once_with(mock_created_user_instance)
         dummy_user_request.dbsession.flush.assert_called_once()
         
@@ -190,6 +201,7 @@ class TestUserViewsIntegration: # Ganti nama jika perlu, ini untuk view methods
         mock_user_instance = MagicMock(spec=RealUserModel) # Ganti nama variabel agar lebih jelas
         mock_user_instance.id = 5
         mock_user_instance.check_password.return_value = True
+        mock_user_instance.password_needs_rehash.return_value = False
         mock_user_instance.to_dict.return_value = {'id': 5, 'email': 'login@example.com', 'username': 'loginuser'}
 
         # --- PERBAIKAN CARA MOCKING ---
@@ -205,7 +217,9 @@ class TestUserViewsIntegration: # Ganti nama jika perlu, ini untuk view methods
         mock_query_method.assert_called_once_with(MockUserClass) # Assert pada mock_query_method
         query_result_mock.filter_by.assert_called_once_with(email='login@example.com')
         filter_by_result_mock.first.assert_called_once_with()
-        mock_user_instance.check_password.assert_called_once_with('Password123!')
+        mock_user_instance.check_password.assert_called_once_with(
+            'Password123!', pool=dummy_user_request.registry.get.return_value)
+        mock_user_instance.set_password.assert_not_called() # Cost hash sudah sesuai
 
         dummy_user_request.session.__setitem__.assert_any_call('user_id', 5)
         dummy_user_request.session.save.assert_called_once()
@@ -241,6 +255,81 @@ class TestUserViewsIntegration: # Ganti nama jika perlu, ini untuk view methods
         assert isinstance(response, HTTPUnauthorized)
         assert response.json_body['error'] == 'Invalid email or password.'
 
+    @patch(USER_MODEL_PATH_IN_VIEWS)
+    def test_login_view_rehashes_password_with_configured_rounds(self, MockUserClass, user_view_instance,
+                                                                 dummy_user_request):
+        # Arrange
+        dummy_user_request.json_body = {'email': 'user@example.com', 'password': 'Password123!'}
+        dummy_user_request.registry.get.side_effect = {'password_pool': None, 'bcrypt_rounds': 13}.get
+        mock_user = MagicMock(spec=RealUserModel)
+        mock_user.id = 7
+        mock_user.check_password.return_value = True
+        mock_user.password_needs_rehash.return_value = True # Hash lama memakai cost lain
+        mock_user.to_dict.return_value = {'id': 7}
+        dummy_user_request.dbsession.query(MockUserClass).filter_by().first.return_value = mock_user
+
+        # Act
+        response = user_view_instance.login_view()
+
+        # Assert
+        assert isinstance(response, HTTPOk)
+        mock_user.password_needs_rehash.assert_called_once_with(13)
+        mock_user.set_password.assert_called_once_with('Password123!', pool=None, rounds=13)
+
+    @patch(USER_MODEL_PATH_IN_VIEWS)
+    def test_login_view_succeeds_when_rehash_pool_busy(self, MockUserClass, user_view_instance, dummy_user_request):
+        dummy_user_request.json_body = {'email': 'user@example.com', 'password': 'Password123!'}
+        mock_user = MagicMock(spec=RealUserModel)
+        mock_user.id = 7
+        mock_user.check_password.return_value = True
+        mock_user.password_needs_rehash.return_value = True
+        mock_user.set_password.side_effect = PasswordPoolBusy()
+        mock_user.to_dict.return_value = {'id': 7}
+        dummy_user_request.dbsession.query(MockUserClass).filter_by().first.return_value = mock_user
+
+        response = user_view_instance.login_view()
+
+        assert isinstance(response, HTTPOk) # Rehash ditunda ke login berikutnya
+
+    @patch(USER_MODEL_PATH_IN_VIEWS)
+    def test_login_view_password_pool_busy(self, MockUserClass, user_view_instance, dummy_user_request):
+        # Arrange
+        dummy_user_request.json_body = {'email': 'user@example.com', 'password': 'Password123!'}
+        mock_user = MagicMock(spec=RealUserModel)
+        mock_user.check_password.side_effect = PasswordPoolBusy() # Pool bcrypt penuh
+        dummy_user_request.dbsession.query(MockUserClass).filter_by().first.return_value = mock_user
+
+        # Act
+        response = user_view_instance.login_view()
+
+        # Assert
+        assert isinstance(response, HTTPServiceUnavailable)
+        assert response.headers['Retry-After'] == '1'
+        dummy_user_request.session.save.assert_not_called()
+
+    @patch(DELETE_PHOTO_PATH_IN_VIEWS)
+    @patch(SAVE_PHOTO_PATH_IN_VIEWS)
+    @patch(USER_MODEL_PATH_IN_VIEWS)
+    def test_signup_view_password_pool_busy(self, MockUserClass, mock_save_photo, mock_delete_photo,
+                                            user_view_instance, dummy_user_request):
+        # Arrange
+        dummy_user_request.POST = {
+            'username': 'newuser', 'email': 'new@example.com',
+            'password': 'Password123!', 'confirm_password': 'Password123!',
+            'foto_profil': MagicMock(filename="avatar.jpg", file=BytesIO(b"pic")),
+        }
+        mock_save_photo.return_value = "profile_pics/saved_avatar.jpg"
+        MockUserClass.return_value.set_password.side_effect = PasswordPoolBusy()
+
+        # Act
+        response = user_view_instance.signup_view()
+
+        # Assert
+        assert isinstance(response, HTTPServiceUnavailable)
+        mock_save_photo.assert_not_called() # Hash sebelum foto: tanpa lock tulis blobs selama bcrypt
+        mock_delete_photo.assert_not_called()
+        dummy_user_request.dbsession.add.assert_not_called()
+
     # --- LOGOUT ---
     def test_logout_view_success(self, user_view_instance, dummy_user_request):
         # Arrange
@@ -276,10 +365,7 @@ class TestUserViewsIntegration: # Ganti nama jika perlu, ini untuk view methods
 
         mock_user_to_return = MagicMock(spec=RealUserModel)
         mock_user_to_return.to_dict.return_value = {'id': 10, 'username': 'authed_user'}
-        
-        mock_query_method = dummy_user_request.dbsession.query
-        query_result_mock = mock_query_method.return_value 
-        query_result_mock.get.return_value = mock_user_to_return
+        dummy_user_request.user = mock_user_to_return # request.user (reify) dari backend.auth
 
         # Act
         response = user_view_instance.check_auth_view()
@@ -289,8 +375,7 @@ class TestUserViewsIntegration: # Ganti nama jika perlu, ini untuk view methods
         dummy_user_request.session.__getitem__.assert_called_with('user_id') # Pastikan 'user_id' diambil
         
         assert isinstance(response, HTTPOk)
-        mock_query_method.assert_called_once_with(MockUserClassInView) 
-        query_result_mock.get.assert_called_once_with(10)
+        dummy_user_request.dbsession.query.assert_not_called() # Hanya lookup request.user
         
         assert response.json_body['isAuthenticated'] is True
         assert response.json_body['user']['id'] == 10
@@ -312,9 +397,7 @@ class TestUserViewsIntegration: # Ganti nama jika perlu, ini untuk view methods
         dummy_user_request.session.__contains__ = MagicMock(return_value=True) # <--- TAMBAHAN PENTING
         dummy_user_request.session.__getitem__ = MagicMock(return_value=99)    # <--- TAMBAHAN PENTING
 
-        mock_query_method = dummy_user_request.dbsession.query
-        query_result_mock = mock_query_method.return_value
-        query_result_mock.get.return_value = None # User tidak ditemukan
+        dummy_user_request.user = None # User tidak ditemukan
 
         # Act
         response = user_view_instance.check_auth_view()
@@ -326,9 +409,7 @@ class TestUserViewsIntegration: # Ganti nama jika perlu, ini untuk view methods
         assert isinstance(response, HTTPOk)
         assert response.json_body['isAuthenticated'] is False
         assert response.json_body['user'] is None
-        
-        mock_query_method.assert_called_once_with(MockUserClassInView) 
-        query_result_mock.get.assert_called_once_with(99)
+        dummy_user_request.dbsession.query.assert_not_called()
 
 
     # --- GET PROFILE ---
@@ -398,7 +479,7 @@ class TestUserViewsIntegration: # Ganti nama jika perlu, ini untuk view methods
             }
         existing_user_mock.to_dict.side_effect = to_dict_side_effect_update
         
-        dummy_user_request.dbsession.query(MockUserClass).get.return_value = existing_user_mock
+        dummy_user_request.user = existing_user_mock
         mock_save_photo.return_value = "profile_pics/new_saved_avatar.png"
         mock_delete_photo.return_value = True
 
@@ -407,10 +488,10 @@ class TestUserViewsIntegration: # Ganti nama jika perlu, ini untuk view methods
 
         # Assert
         mock_check_auth.assert_called_once_with(dummy_user_request, user_id_to_update)
-        dummy_user_request.dbsession.query(MockUserClass).get.assert_called_once_with(user_id_to_update)
+        dummy_user_request.dbsession.query.assert_not_called() # User dari request.user
         
-        mock_delete_photo.assert_called_once_with("profile_pics/old_avatar.png")
-        mock_save_photo.assert_called_once_with(dummy_user_request.POST['foto_profil'])
+        mock_delete_photo.assert_called_once_with("profile_pics/old_avatar.png", dummy_user_request.dbsession, dummy_user_request)
+        mock_save_photo.assert_called_once_with(dummy_user_request.POST['foto_profil'], dummy_user_request.dbsession)
         
         assert existing_user_mock.username == 'updated_username'
         assert existing_user_mock.email == 'updated@example.com'
@@ -455,7 +536,7 @@ class TestUserViewsIntegration: # Ganti nama jika perlu, ini untuk view methods
         existing_user_mock = MagicMock(spec=RealUserModel)
         existing_user_mock.id = user_id_to_delete
         existing_user_mock.profile_photo = "profile_pics/some_photo.jpg"
-        dummy_user_request.dbsession.query(MockUserClass).get.return_value = existing_user_mock
+        dummy_user_request.user = existing_user_mock
         mock_delete_photo.return_value = True
 
         # Act
@@ -463,8 +544,8 @@ class TestUserViewsIntegration: # Ganti nama jika perlu, ini untuk view methods
 
         # Assert
         mock_check_auth.assert_called_once_with(dummy_user_request, user_id_to_delete)
-        dummy_user_request.dbsession.query(MockUserClass).get.assert_called_once_with(user_id_to_delete)
-        mock_delete_photo.assert_called_once_with(existing_user_mock.profile_photo)
+        dummy_user_request.dbsession.query.assert_not_called()
+        mock_delete_photo.assert_called_once_with(existing_user_mock.profile_photo, dummy_user_request.dbsession, dummy_user_request)
         dummy_user_request.dbsession.delete.assert_called_once_with(existing_user_mock)
         dummy_user_request.dbsession.flush.assert_called_once()
         dummy_user_request.session.invalidate.assert_called_once() # Cek session dihapus
@@ -0,0 +1,369 @@
+"""
+Pembacaan form ``multipart/form-data`` secara streaming untuk route upload
+(poster movie, foto profil).
+
+``request.POST`` WebOb mem-parse seluruh body sebelum view berjalan: body
+di-copy ke file sementara, lalu cgi.FieldStorage meng-copy setiap file ke
+file sementara lain, lalu ``BlobStorage.put`` meng-copy-nya sekali lagi.
+``read_upload_form`` membaca ``wsgi.input`` sekali, per chunk 64 KiB, dan
+menulis file langsung ke folder storage tujuannya (``BlobWriter``)::
+
+    form = read_upload_form(request, {'poster': POSTER_STORAGE})
+    form['title']    # str
+    form['poster']   # UploadedFile yang sudah tersimpan (path berbasis hash)
+
+Setelah itu body request sudah habis dibaca: ``request.POST`` tidak berisi
+form ini. Pakai nilai kembalian ``read_upload_form`` atau
+``request.upload_form`` (panggilan berikutnya mengembalikan form yang sama).
+
+Batas dicek sedini mungkin:
+
+- ``Content-Length`` di atas ``uploads.max_body_size`` -> 413 tanpa membaca body;
+- ``Content-Type`` bagian file di luar ``uploads.content_types`` -> 415 sebelum
+  isi file dibaca, dan byte pertamanya harus cocok dengan salah satu format itu;
+- file yang melewati ``uploads.max_size`` -> 413 saat itu juga, file
+  sementaranya dibuang.
+
+Konfigurasi di file .ini::
+
+    uploads.max_size = 5242880          # byte per file
+    uploads.max_body_size = 6291456     # byte per request (default: max_size + 1 MiB)
+    uploads.content_types = image/jpeg image/png image/webp image/gif
+
+File yang sudah tersimpan tetapi tidak dipakai view (validasi gagal) dibuang
+lewat reaper setelah request selesai. Request multipart tidak di-retry
+pyramid_retry, karena body-nya hanya bisa dibaca sekali.
+"""
+import os
+import re
+from dataclasses import dataclass
+from urllib.parse import unquote
+
+from pyramid.httpexceptions import (
+    HTTPBadRequest,
+    HTTPRequestEntityTooLarge,
+    HTTPUnsupportedMediaType,
+)
+from pyramid.settings import aslist
+from webob.multidict import MultiDict
+
+from .reaper import discard_files
+from .storage import CHUNK_SIZE
+
+UPLOAD_LIMITS_REGISTRY_KEY = 'upload_limits'
+UPLOAD_FORM_ENVIRON_KEY = 'filmfy.upload_form'
+
+DEFAULT_MAX_SIZE = 5 * 1024 * 1024
+MAX_HEADER_SIZE = 16 * 1024 # Header satu bagian multipart
+MAX_FIELD_SIZE = 64 * 1024  # Isi satu field teks
+MAX_PARTS = 100
+
+# Tanda tangan byte awal -> MIME, dan ekstensi yang diterima per MIME
+SNIFF_SIZE = 12
+IMAGE_EXTENSIONS = {
+    'image/jpeg': ('.jpg', '.jpeg'),
+    'image/png': ('.png',),
+    'image/webp': ('.webp',),
+    'image/gif': ('.gif',),
+}
+
+_PARAM = re.compile(r';\s*([^\s=;]+)\s*=\s*("(?:\\.|[^"\\])*"|[^;]*)')
+
+
+def sniff_content_type(head):
+    """MIME gambar dari byte pertama file, atau None jika tidak dikenal."""
+    if head.startswith(b'\xff\xd8\xff'):
+        return 'image/jpeg'
+    if head.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'image/png'
+    if head.startswith((b'GIF87a', b'GIF89a')):
+        return 'image/gif'
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'image/webp'
+    return None
+
+
+@dataclass(frozen=True)
+class UploadLimits:
+    max_size: int = DEFAULT_MAX_SIZE
+    max_body_size: int = DEFAULT_MAX_SIZE + 1024 * 1024
+    content_types: frozenset = frozenset(IMAGE_EXTENSIONS)
+
+
+def upload_limits_from_settings(settings, prefix='uploads.'):
+    max_size = int(settings.get(prefix + 'max_size', DEFAULT_MAX_SIZE))
+    content_types = frozenset(
+        ct.lower() for ct in aslist(settings.get(prefix + 'content_types', ' '.join(IMAGE_EXTENSIONS))))
+    unknown = content_types - set(IMAGE_EXTENSIONS)
+    if unknown:
+        raise ValueError(f'Unsupported {prefix}content_types: {", ".join(sorted(unknown))}')
+    return UploadLimits(
+        max_size=max_size,
+        max_body_size=int(settings.get(prefix + 'max_body_size', max_size + 1024 * 1024)),
+        content_types=content_types,
+    )
+
+
+def get_upload_limits(request):
+    return request.registry.get(UPLOAD_LIMITS_REGISTRY_KEY) or UploadLimits()
+
+
+class UploadedFile:
+    """File dari form multipart yang sudah tersimpan di storage tujuannya."""
+
+    def __init__(self, filename, content_type, path, size, created, writer=None):
+        self.filename = filename
+        self.content_type = content_type
+        self.path = path         # Path relatif di database, mis. postersMovie/ab/cd/<sha256>.jpg
+        self.size = size
+        self.created = created   # False jika isi yang sama sudah tersimpan (dedup)
+        self.acquired = False    # Diset view setelah acquire_blob; jika tidak, file dibuang
+        self._writer = writer
+
+    def ensure_stored(self):
+        """Panggil setelah ``acquire_blob``; lihat ``BlobWriter.ensure_stored``."""
+        if self._writer is not None:
+            self._writer.ensure_stored()
+
+    def discard_spare(self):
+        """Buang salinan sementara isi yang dedup, jika masih ada."""
+        if self._writer is not None:
+            self._writer.abort()
+
+    def __repr__(self):
+        return f'<UploadedFile {self.filename!r} -> {self.path!r} ({self.size} bytes)>'
+
+
+def _header_params(value):
+    """``form-data; name="a"; filename="b.jpg"`` -> ``('form-data', {'name': 'a', ...})``."""
+    main, _, rest = value.partition(';')
+    params = {}
+    for key, raw in _PARAM.findall(';' + rest):
+        raw = raw.strip()
+        if raw.startswith('"') and raw.endswith('"'):
+            raw = re.sub(r'\\(.)', r'\1', raw[1:-1])
+        key = key.lower()
+        if key.endswith('*'): # RFC 5987: filename*=UTF-8''nama%20file.jpg
+            charset, _, encoded = raw.partition("''")
+            key, raw = key[:-1], unquote(encoded, encoding=charset or 'utf-8', errors='replace')
+        params[key] = raw
+    return main.strip().lower(), params
+
+
+class _MultipartReader:
+    """Pengurai multipart berbasis chunk; buffer tidak pernah lebih dari satu chunk + boundary."""
+
+    def __init__(self, read, boundary, chunk_size=CHUNK_SIZE):
+        self._read = read
+        self._chunk_size = chunk_size
+        self._separator = b'\r\n--' + boundary
+        self._buffer = b'\r\n' # Boundary pertama tidak diawali CRLF
+        self._eof = False
+
+    def _fill(self):
+        if self._eof:
+            return False
+        chunk = self._read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer += chunk
+        return True
+
+    def _until_separator(self, limit=None):
+        """Hasilkan data sampai separator berikutnya (separator ikut dibuang)."""
+        keep = len(self._separator) - 1
+        seen = 0
+        while True:
+            index = self._buffer.find(self._separator)
+            if index >= 0:
+                data, self._buffer = self._buffer[:index], self._buffer[index + len(self._separator):]
+                if data:
+                    yield data
+                return
+            if len(self._buffer) > keep:
+                data, self._buffer = self._buffer[:-keep], self._buffer[-keep:]
+                seen += len(data)
+                if limit is not None and seen > limit:
+                    raise HTTPBadRequest(json_body={'error': 'Malformed multipart body.'})
+                yield data
+            if not self._fill():
+                raise HTTPBadRequest(json_body={'error': 'Unexpected end of multipart body.'})
+
+    def _headers(self):
+        while len(self._buffer) < 2 and self._fill():
+            pass
+        if self._buffer.startswith(b'\r\n'): # Bagian tanpa header
+            self._buffer = self._buffer[2:]
+            return {}
+        while b'\r\n\r\n' not in self._buffer:
+            if len(self._buffer) > MAX_HEADER_SIZE or not self._fill():
+                raise HTTPBadRequest(json_body={'error': 'Malformed multipart headers.'})
+        raw, self._buffer = self._buffer.split(b'\r\n\r\n', 1)
+        headers = {}
+        for line in raw.decode('utf-8', 'replace').split('\r\n'):
+            name, sep, value = line.partition(':')
+            if sep:
+                headers[name.strip().lower()] = value.strip()
+        return headers
+
+    def parts(self):
+        """Hasilkan ``(headers, body_chunks)``; body harus habis dibaca sebelum bagian berikutnya."""
+        for _ in self._until_separator(limit=MAX_HEADER_SIZE): # Preamble
+            pass
+        count = 0
+        while True:
+            while len(self._buffer) < 2 and self._fill():
+                pass
+            if self._buffer.startswith(b'--'):
+                return
+            if not self._buffer.startswith(b'\r\n'):
+                raise HTTPBadRequest(json_body={'error': 'Malformed multipart boundary.'})
+            count += 1
+            if count > MAX_PARTS:
+                raise HTTPBadRequest(json_body={'error': f'Too many form fields (max {MAX_PARTS}).'})
+            self._buffer = self._buffer[2:]
+            body = self._until_separator()
+            yield self._headers(), body
+            for _ in body: # Sisa bagian yang tidak dibaca pemanggil
+                pass
+
+
+def _format_size(size):
+    if size >= 1024 * 1024:
+        return f'{size / (1024 * 1024):.3g} MB'
+    return f'{size / 1024:.3g} KB'
+
+
+def _too_large(limits):
+    return HTTPRequestEntityTooLarge(json_body={
+        'error': f'Upload is too large (max {_format_size(limits.max_size)}).'})
+
+
+def _unsupported(limits):
+    return HTTPUnsupportedMediaType(json_body={
+        'error': f'Unsupported file type. Allowed: {", ".join(sorted(limits.content_types))}.'})
+
+
+def _limited_reader(body_file, limits):
+    """``read`` yang melempar 413 begitu body melewati ``max_body_size`` (juga tanpa Content-Length)."""
+    total = 0
+
+    def read(size):
+        nonlocal total
+        chunk = body_file.read(size)
+        total += len(chunk)
+        if total > limits.max_body_size:
+            raise _too_large(limits)
+        return chunk
+
+    return read
+
+
+def _store_file(body, storage, filename, declared_type, limits):
+    """Tulis isi bagian file ke ``storage`` per chunk; cek tipe dari byte awal dan ukurannya."""
+    if declared_type not in limits.content_types:
+        raise _unsupported(limits) # Sebelum satu byte pun isi file dibaca
+    writer = storage.open_writer()
+    try:
+        head = b''
+        content_type = None
+        for chunk in body:
+            if writer.size + len(chunk) > limits.max_size:
+                raise _too_large(limits)
+            if content_type is None:
+                head += chunk[:SNIFF_SIZE - len(head)]
+                if len(head) >= SNIFF_SIZE:
+                    content_type = sniff_content_type(head)
+                    if content_type not in limits.content_types:
+                        raise _unsupported(limits)
+            writer.write(chunk)
+        if content_type is None: # File lebih kecil dari SNIFF_SIZE
+            content_type = sniff_content_type(head)
+            if content_type not in limits.content_types:
+                raise _unsupported(limits)
+    except BaseException:
+        writer.abort()
+        raise
+    # Ekstensi mengikuti isi file; nama asli hanya dipakai jika cocok
+    ext = os.path.splitext(filename)[1].lower()
+    writer.ext = ext if ext in IMAGE_EXTENSIONS[content_type] else IMAGE_EXTENSIONS[content_type][0]
+    path = writer.commit()
+    return UploadedFile(filename, content_type, path, writer.size, writer.created, writer)
+
+
+def _discard_unused(request, uploads):
+    for _, upload in uploads:
+        upload.discard_spare()
+    unused = [(storage, upload.path) for storage, upload in uploads
+              if upload.created and not upload.acquired]
+    if unused:
+        discard_files(request.registry, unused)
+
+
+def read_upload_form(request, files):
+    """
+    Baca form ``request`` dengan field file ``files`` (nama field -> BlobStorage)
+    di-stream ke storage masing-masing. Request yang bukan multipart memakai
+    ``request.POST`` seperti biasa. Form disimpan di request: panggilan
+    berikutnya (dan ``request.upload_form``) mengembalikan form yang sama.
+    Melempar HTTPRequestEntityTooLarge (413), HTTPUnsupportedMediaType (415)
+    atau HTTPBadRequest untuk body yang rusak.
+    """
+    form = get_upload_form(request)
+    if form is not None:
+        return form
+    if getattr(request, 'content_type', None) != 'multipart/form-data':
+        form = request.environ[UPLOAD_FORM_ENVIRON_KEY] = request.POST
+        return form
+    limits = get_upload_limits(request)
+    if request.content_length is not None and request.content_length > limits.max_body_size:
+        raise _too_large(limits) # Body tidak dibaca sama sekali
+
+    _, params = _header_params(request.headers['Content-Type'])
+    boundary = params.get('boundary', '').encode('latin-1')
+    if not boundary or len(boundary) > 70:
+        raise HTTPBadRequest(json_body={'error': 'Missing multipart boundary.'})
+
+    form = MultiDict()
+    uploads = []
+    request.add_finished_callback(lambda request: _discard_unused(request, uploads))
+    reader = _MultipartReader(_limited_reader(request.body_file, limits), boundary)
+    for headers, body in reader.parts():
+        _, disposition = _header_params(headers.get('content-disposition', ''))
+        name = disposition.get('name')
+        if name is None:
+            continue
+        filename = disposition.get('filename')
+        if filename is None:
+            value = b''
+            for chunk in body:
+                value += chunk
+                if len(value) > MAX_FIELD_SIZE:
+                    raise HTTPBadRequest(json_body={'error': f'Form field {name!r} is too large.'})
+            try:
+                form.add(name, value.decode('utf-8'))
+            except UnicodeDecodeError:
+                raise HTTPBadRequest(json_body={'error': f'Form field {name!r} is not valid UTF-8.'})
+        elif not filename or name not in files:
+            # Input file kosong dari browser, atau file yang tidak diharapkan route ini
+            form.add(name, '')
+        else:
+            declared_type, _ = _header_params(headers.get('content-type', 'application/octet-stream'))
+            upload = _store_file(body, files[name], filename, declared_type, limits)
+            uploads.append((files[name], upload))
+            form.add(name, upload)
+
+    request.environ[UPLOAD_FORM_ENVIRON_KEY] = form
+    return form
+
+
+def get_upload_form(request):
+    """Form yang sudah dibaca ``read_upload_form`` untuk request ini, atau None."""
+    return request.environ.get(UPLOAD_FORM_ENVIRON_KEY)
+
+
+def includeme(config):
+    """Daftarkan batas upload dan ``request.upload_form``: ``config.include('backend.uploads')``."""
+    config.registry[UPLOAD_LIMITS_REGISTRY_KEY] = upload_limits_from_settings(config.get_settings())
+    config.add_request_method(get_upload_form, 'upload_form', property=True)
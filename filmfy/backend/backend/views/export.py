@@ -0,0 +1,58 @@
+from pyramid.view import view_config
+from pyramid.response import Response
+from pyramid.settings import asbool
+from pyramid.httpexceptions import (
+    HTTPBadRequest,
+    HTTPForbidden,
+    HTTPNotFound,
+    HTTPUnauthorized,
+)
+
+from ..export import (
+    EXPORT_TABLES,
+    EXPORT_FORMATS,
+    export_filename,
+    get_export_admin_ids,
+    iter_export_response,
+)
+from ..models import readonly_session_factory_for
+from .movies import _is_truthy, check_session
+
+
+# --- EXPORT (STREAMING) ---
+@view_config(route_name='api_export', request_method='GET', renderer='json')
+def export_view(request):
+    """
+    Export seluruh tabel sebagai file download: ``/api/export/movies?format=csv&gzip=1``.
+
+    ``movies`` publik seperti listing; ``users`` (tanpa hashed_password, tetapi
+    dengan email) harus diaktifkan dengan ``export.allow_users = true`` di .ini
+    dan hanya boleh diunduh user yang id-nya ada di ``export.admin_ids``.
+    """
+    try:
+        table = request.matchdict['table']
+        if table not in EXPORT_TABLES:
+            raise HTTPNotFound(json_body={'error': f'Unknown export table: {table}'})
+        if table == 'users':
+            if not asbool(request.registry.settings.get('export.allow_users', False)):
+                raise HTTPNotFound(json_body={'error': 'User export is disabled.'})
+            user_id = check_session(request)
+            if user_id not in get_export_admin_ids(request):
+                raise HTTPForbidden(json_body={'error': 'User export requires an admin account.'})
+
+        fmt = request.params.get('format', 'ndjson').strip().lower()
+        if fmt not in EXPORT_FORMATS:
+            allowed = ', '.join(EXPORT_FORMATS)
+            raise HTTPBadRequest(json_body={'error': f'Invalid format. Allowed values: {allowed}.'})
+        gzip = _is_truthy(request.params.get('gzip'))
+    except (HTTPBadRequest, HTTPForbidden, HTTPNotFound, HTTPUnauthorized) as e:
+        return e
+
+    content_type, _ = EXPORT_FORMATS[fmt]
+    response = Response(
+        # Dibaca setelah view selesai, di replica pilihan ReplicaRouter
+        app_iter=iter_export_response(readonly_session_factory_for(request), table, fmt, gzip=gzip),
+        content_type='application/gzip' if gzip else content_type,
+    )
+    response.content_disposition = f'attachment; filename="{export_filename(table, fmt, gzip)}"'
+    return response
@@ -1,8 +1,10 @@
 import os
-import uuid
-import shutil
+import json
+import base64
+import hashlib
+import datetime
 from pyramid.view import view_config, view_defaults
-from pyramid.response import Response # Tidak terpakai, bisa dihapus jika tidak ada penggunaan lain
+from pyramid.response import Response
 from pyramid.httpexceptions import (
     HTTPOk,
     HTTPCreated,
@@ -10,11 +12,41 @@ from pyramid.httpexceptions import (
     HTTPBadRequest,
     HTTPNoContent,
     HTTPUnauthorized,
+    HTTPNotModified,
+    HTTPRequestEntityTooLarge,
+    HTTPUnsupportedMediaType,
     HTTPException # <--- Tambahkan ini jika ingin menangkap semua HTTPException
 )
 
 # Sesuaikan path import berdasarkan struktur proyek Anda
-from ..models.movie import Movie
+from ..models import readonly_session_factory_for
+from ..models.movie import Movie, MOVIE_COLUMNS, catalog_version
+from ..models.search import search_catalog, search_tokens
+from ..models.blob import acquire_blob, release_blob
+from ..models.facet import adjust_movie_facets, facet_keys_for, movie_facets
+from ..models.listing import (
+    MOVIE_SORTS,
+    DEFAULT_MOVIE_SORT,
+    filter_movies,
+    movie_sort_order,
+    sort_value,
+    keyset_after,
+)
+from ..cache import (
+    MOVIE_LIST_TAG,
+    movie_tag,
+    cached_json_view,
+    invalidate_after_commit,
+)
+from ..storage import BlobStorage
+from ..derivatives import generate_derivatives_after_commit
+from ..reaper import delete_file_after_commit
+from ..uploads import UploadedFile, read_upload_form
+from ..autocomplete import (
+    get_current_title_index,
+    index_title_after_commit,
+    unindex_title_after_commit,
+)
 
 # --- Konfigurasi Direktori Upload ---
 # (Tidak ada perubahan di sini)
@@ -24,42 +56,196 @@ BACKEND_BACKEND_DIR = os.path.dirname(VIEWS_DIR)
 POSTER_UPLOAD_DIR = os.path.join(BACKEND_BACKEND_DIR, 'static', 'postersMovie')
 os.makedirs(POSTER_UPLOAD_DIR, exist_ok=True)
 
-def _save_poster(poster_file_storage):
-    # (Tidak ada perubahan di sini)
+# Poster disimpan berdasarkan hash isinya (lihat backend/storage.py)
+POSTER_STORAGE = BlobStorage(POSTER_UPLOAD_DIR, 'postersMovie')
+
+def _save_poster(poster_file_storage, dbsession):
+    """Simpan poster (dedup per isi) dan tambah referensinya; kembalikan path relatif."""
+    if isinstance(poster_file_storage, UploadedFile): # Sudah di-stream ke POSTER_STORAGE
+        acquire_blob(dbsession, poster_file_storage.path)
+        poster_file_storage.acquired = True
+        poster_file_storage.ensure_stored() # File dedup bisa terhapus reaper sebelum acquire_blob
+        return poster_file_storage.path
     if (poster_file_storage is not None and
         hasattr(poster_file_storage, 'filename') and
         poster_file_storage.filename and
         hasattr(poster_file_storage, 'file')):
-        # Perbaikan untuk ValueError:
-        filename, ext = os.path.splitext(poster_file_storage.filename)
-        if not ext: # Jika tidak ada ekstensi, tambahkan default atau handle error
-            # Untuk sementara, kita bisa set ekstensi default jika kosong,
-            # atau Anda bisa raise error jika ekstensi diperlukan
-            # contoh: ext = '.jpg' # jika ingin default
-            pass # Biarkan ext kosong jika memang tidak ada dan itu valid
-
-        unique_filename = f"{uuid.uuid4()}{ext}"
-        output_path = os.path.join(POSTER_UPLOAD_DIR, unique_filename)
+        _, ext = os.path.splitext(poster_file_storage.filename)
         poster_file_storage.file.seek(0)
-        with open(output_path, 'wb') as output_f:
-            shutil.copyfileobj(poster_file_storage.file, output_f)
-        return 'postersMovie/' + unique_filename
+        poster_path = POSTER_STORAGE.put(poster_file_storage.file, ext,
+                                         acquire=lambda path: acquire_blob(dbsession, path))
+        return poster_path
     return None
 
-def _delete_poster(poster_path):
-    # (Tidak ada perubahan di sini)
-    if poster_path:
-        actual_filename = poster_path.replace('postersMovie/', '', 1)
-        full_path = os.path.join(POSTER_UPLOAD_DIR, actual_filename)
-        if os.path.exists(full_path):
-            try:
-                os.remove(full_path)
-                return True
-            except OSError as e:
-                print(f"Error deleting poster file {full_path}: {e}")
-                return False
+def _delete_poster(poster_path, dbsession, request):
+    """
+    Lepas referensi poster; jika tidak dipakai movie lain, file dijadwalkan
+    dihapus setelah commit (lihat backend/reaper.py). ``True`` jika dijadwalkan.
+    """
+    if poster_path and release_blob(dbsession, poster_path) == 0:
+        delete_file_after_commit(request, POSTER_STORAGE, poster_path)
+        return True
     return False
 
+def _movie_detail_tag(request):
+    """Tag cache detail dari id numerik: /api/movies/007 di-invalidate bersama /api/movies/7."""
+    return movie_tag(int(request.matchdict['id']))
+
+# --- Konfigurasi Pagination (Keyset / Cursor) ---
+DEFAULT_PAGE_LIMIT = 50
+MAX_PAGE_LIMIT = 200
+
+# Batas jumlah saran untuk ?limit= pada autocomplete
+DEFAULT_AUTOCOMPLETE_LIMIT = 10
+MAX_AUTOCOMPLETE_LIMIT = 20
+
+# Jumlah baris yang diambil per round-trip (yield_per) & di-encode per chunk saat streaming
+STREAM_BATCH_SIZE = 500
+
+def _is_truthy(value):
+    """Interpretasi query param boolean seperti ?all=1 / ?all=true."""
+    return value is not None and value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+def _parse_limit(limit_str):
+    """Validasi ?limit=, default DEFAULT_PAGE_LIMIT dan dibatasi MAX_PAGE_LIMIT."""
+    if limit_str is None or not limit_str.strip():
+        return DEFAULT_PAGE_LIMIT
+    limit_str = limit_str.strip()
+    if not limit_str.isdigit() or int(limit_str) < 1:
+        raise HTTPBadRequest(json_body={'error': 'Limit must be a positive integer.'})
+    return min(int(limit_str), MAX_PAGE_LIMIT)
+
+def _parse_offset(offset_str):
+    """Validasi ?offset= untuk hasil pencarian (terurut relevansi, bukan keyset)."""
+    if offset_str is None or not offset_str.strip():
+        return 0
+    offset_str = offset_str.strip()
+    if not offset_str.isdigit():
+        raise HTTPBadRequest(json_body={'error': 'Offset must be a non-negative integer.'})
+    return int(offset_str)
+
+def _parse_int_param(params, name, minimum=None, maximum=None):
+    """Validasi query param integer opsional seperti ?year_from=; kosong berarti None."""
+    value = params.get(name)
+    if value is None or not value.strip():
+        return None
+    value = value.strip()
+    if not value.lstrip('-').isdigit():
+        raise HTTPBadRequest(json_body={'error': f'{name} must be an integer.'})
+    value = int(value)
+    if (minimum is not None and value < minimum) or (maximum is not None and value > maximum):
+        raise HTTPBadRequest(json_body={'error': f'{name} must be between {minimum} and {maximum}.'})
+    return value
+
+def _parse_movie_filters(params):
+    """Filter listing ?genre=&year_from=&year_to=&min_rating= (semua opsional)."""
+    genre = params.get('genre')
+    return {
+        'genre': genre.strip() if genre and genre.strip() else None,
+        'year_from': _parse_int_param(params, 'year_from'),
+        'year_to': _parse_int_param(params, 'year_to'),
+        'min_rating': _parse_int_param(params, 'min_rating', 1, 10),
+    }
+
+def _parse_sort(sort):
+    """Validasi ?sort= terhadap whitelist MOVIE_SORTS."""
+    if sort is None or not sort.strip():
+        return DEFAULT_MOVIE_SORT
+    sort = sort.strip()
+    if sort not in MOVIE_SORTS:
+        allowed = ', '.join(MOVIE_SORTS)
+        raise HTTPBadRequest(json_body={'error': f'Invalid sort. Allowed values: {allowed}.'})
+    return sort
+
+def _encode_cursor(value, movie_id):
+    """
+    Encode posisi (nilai kolom urutan, id) terakhir menjadi cursor opaque
+    (base64 url-safe). Untuk urutan default nilainya adalah title.
+    """
+    raw = json.dumps([value, movie_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def _decode_cursor(cursor):
+    """Kebalikan dari _encode_cursor. Cursor yang rusak menghasilkan HTTPBadRequest."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        value, movie_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if not isinstance(value, (str, int, type(None))) or not isinstance(movie_id, int):
+            raise ValueError('cursor payload has wrong types')
+    except (ValueError, TypeError):
+        raise HTTPBadRequest(json_body={'error': 'Invalid cursor.'})
+    return value, movie_id
+
+def _decode_sort_cursor(cursor, sort):
+    """_decode_cursor + pastikan tipe nilai cocok dengan kolom urutan ``sort``."""
+    value, movie_id = _decode_cursor(cursor)
+    column, _ = MOVIE_SORTS[sort]
+    if column is Movie.title:
+        valid = isinstance(value, str)
+    else:
+        valid = value is None or (isinstance(value, int) and not isinstance(value, bool))
+    if not valid:
+        raise HTTPBadRequest(json_body={'error': 'Invalid cursor.'})
+    return value, movie_id
+
+def _iter_movies_json(request, session_factory, batch_size=STREAM_BATCH_SIZE):
+    """
+    Generator (WSGI app_iter) yang menulis array JSON movie chunk demi chunk.
+
+    Memakai session sendiri (bukan request.dbsession) karena app_iter baru
+    dikonsumsi setelah request selesai dan request.dbsession ditutup. Output-nya
+    byte-identik dengan renderer 'json' untuk list yang sama.
+    """
+    dbsession = session_factory()
+    try:
+        query = dbsession.query(*MOVIE_COLUMNS).order_by(Movie.title).yield_per(batch_size)
+        yield b'['
+        separator = ''
+        chunk = []
+        for row in query:
+            chunk.append(separator + json.dumps(Movie.row_to_dict(row, request=request)))
+            separator = ', '
+            if len(chunk) >= batch_size:
+                yield ''.join(chunk).encode('utf-8')
+                chunk = []
+        if chunk:
+            yield ''.join(chunk).encode('utf-8')
+        yield b']'
+    finally:
+        dbsession.close()
+
+def _catalog_etag(request, version):
+    """ETag kuat: URL lengkap + versi katalog (jumlah, id terbesar, updated_at terbesar)."""
+    raw = f'{request.application_url}|{request.path_qs}|{version[0]}|{version[1]}|{version[2]}'
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+def conditional_catalog_view(view):
+    """
+    View decorator untuk endpoint baca katalog: pasang ETag/Last-Modified dan
+    jawab 304 bila If-None-Match cocok, cukup dengan query versi katalog
+    (index-only) tanpa membaca baris movie.
+
+    If-Modified-Since sengaja tidak dievaluasi: DELETE tidak menaikkan
+    updated_at terbesar, jadi hanya ETag yang aman dipakai untuk validasi.
+    """
+    def conditional_view(context, request):
+        version = catalog_version(request.dbsession)
+        etag = _catalog_etag(request, version)
+        last_modified = version[2].replace(tzinfo=datetime.timezone.utc) if version[2] else None
+
+        if etag in request.if_none_match:
+            response = HTTPNotModified()
+        else:
+            response = view(context, request)
+            if response.status_code != 200:
+                return response
+        response.etag = etag
+        response.last_modified = last_modified
+        # Paksa browser selalu revalidasi (murah berkat 304) daripada heuristik freshness
+        response.cache_control = 'no-cache'
+        return response
+    return conditional_view
+
 def check_session(request):
     # (Tidak ada perubahan di sini)
     if 'user_id' not in request.session:
@@ -78,12 +264,14 @@ class MovieViews:
     def create_movie(self):
         try:
             check_session(self.request)
+            # Body dibaca setelah cek login; poster langsung di-stream ke storage
+            form = read_upload_form(self.request, {'poster': POSTER_STORAGE})
 
-            title = self.request.POST['title']
-            genre = self.request.POST.get('genre')
-            release_year_str = self.request.POST.get('release_year')
-            rating_str = self.request.POST.get('rating')
-            poster_file = self.request.POST.get('poster')
+            title = form['title']
+            genre = form.get('genre')
+            release_year_str = form.get('release_year')
+            rating_str = form.get('rating')
+            poster_file = form.get('poster')
 
             if not title:
                 raise HTTPBadRequest(json_body={'error': 'Title is required'})
@@ -98,7 +286,7 @@ class MovieViews:
                  raise HTTPBadRequest(json_body={'error': 'Rating must be between 1 and 10'})
 
 
-            poster_path_rel = _save_poster(poster_file)
+            poster_path_rel = _save_poster(poster_file, self.dbsession)
 
             new_movie = Movie(
                 title=title,
@@ -109,13 +297,19 @@ class MovieViews:
             )
             self.dbsession.add(new_movie)
             self.dbsession.flush() # flush untuk mendapatkan ID jika diperlukan sebelum commit
+            adjust_movie_facets(self.dbsession, added=facet_keys_for(new_movie))
+            # Movie baru hanya memengaruhi listing, bukan detail movie lain
+            invalidate_after_commit(self.request, MOVIE_LIST_TAG)
+            index_title_after_commit(self.request, new_movie.id, new_movie.title)
+            generate_derivatives_after_commit(self.request, POSTER_STORAGE, poster_path_rel)
 
             return HTTPCreated(json_body={
                 'message': 'Movie created successfully!',
                 'movie': new_movie.to_dict(request=self.request)
             })
         # ===== PERUBAHAN BLOK EXCEPT =====
-        except (HTTPBadRequest, HTTPUnauthorized, HTTPNotFound) as e: # Tangkap HTTPException spesifik
+        except (HTTPBadRequest, HTTPUnauthorized, HTTPNotFound,
+                HTTPRequestEntityTooLarge, HTTPUnsupportedMediaType) as e: # Tangkap HTTPException spesifik
             return e # Kembalikan objek HTTPException langsung
         except KeyError as e:
             # Ini akan menjadi HTTPBadRequest, jadi bisa digabung jika ingin konsisten
@@ -134,13 +328,62 @@ class MovieViews:
         # =================================
 
     # --- READ (TIDAK DIPROTEKSI - PUBLIK) ---
-    @view_config(route_name='api_movies_list', request_method='GET')
+    @view_config(route_name='api_movies_list', request_method='GET',
+                 decorator=(conditional_catalog_view,
+                            cached_json_view(lambda request: MOVIE_LIST_TAG)))
     def list_movies(self):
+        """
+        Daftar movie dengan keyset pagination: ``?limit=&after=<cursor>``.
+        Hasil diurutkan berdasarkan (title, id) dan ``next_cursor`` bernilai
+        None jika sudah halaman terakhir.
+
+        Filter ``?genre=&year_from=&year_to=&min_rating=`` dan urutan
+        ``?sort=`` (whitelist MOVIE_SORTS, mis. ``-release_year``) berlaku
+        untuk listing berhalaman; cursor terikat pada urutan yang dipakai.
+
+        Perilaku lama (seluruh katalog sebagai list) tetap tersedia lewat ``?all=1``,
+        atau ``?stream=1`` untuk list yang sama tetapi di-stream dengan memori konstan.
+        """
         try:
-            movies = self.dbsession.query(Movie).order_by(Movie.title).all()
-            data = [movie.to_dict(request=self.request) for movie in movies]
-            return data
+            params = self.request.params
+            if _is_truthy(params.get('stream')):
+                # Replica (ReplicaRouter) seperti request.dbsession read-only lainnya
+                session_factory = readonly_session_factory_for(self.request)
+                return Response(
+                    app_iter=_iter_movies_json(self.request, session_factory),
+                    content_type='application/json',
+                )
+
+            # Endpoint read-only: query kolom (Row) saja, tanpa instance ORM / identity map
+            if _is_truthy(params.get('all')):
+                rows = self.dbsession.query(*MOVIE_COLUMNS).order_by(Movie.title).all()
+                data = [Movie.row_to_dict(row, request=self.request) for row in rows]
+                return data
+
+            limit = _parse_limit(params.get('limit'))
+            sort = _parse_sort(params.get('sort'))
+            query = filter_movies(self.dbsession.query(*MOVIE_COLUMNS), **_parse_movie_filters(params))
+            after = params.get('after')
+            if after:
+                after_value, after_id = _decode_sort_cursor(after, sort)
+                # Seek langsung ke posisi cursor lewat index (kolom, id), bukan OFFSET
+                dialect_name = self.dbsession.get_bind().dialect.name
+                query = query.filter(keyset_after(sort, after_value, after_id, dialect_name))
+
+            # Ambil satu baris ekstra untuk mengetahui apakah masih ada halaman berikutnya
+            rows = query.order_by(*movie_sort_order(sort)).limit(limit + 1).all()
+            next_cursor = None
+            if len(rows) > limit:
+                rows = rows[:limit]
+                next_cursor = _encode_cursor(sort_value(rows[-1], sort), rows[-1].id)
+
+            return {
+                'movies': [Movie.row_to_dict(row, request=self.request) for row in rows],
+                'next_cursor': next_cursor,
+            }
         # ===== PERUBAHAN BLOK EXCEPT (JIKA PERLU PENANGANAN SPESIFIK) =====
+        except HTTPBadRequest as e:
+            return e
         except Exception as e:
             print(f"UNEXPECTED ERROR in list_movies: {e}")
             import traceback
@@ -149,8 +392,81 @@ class MovieViews:
             return {'error': 'An unexpected server error occurred while listing movies.'}
         # =================================
 
+    # --- SEARCH (TIDAK DIPROTEKSI - PUBLIK) ---
+    @view_config(route_name='api_movies_search', request_method='GET',
+                 decorator=(conditional_catalog_view,
+                            cached_json_view(lambda request: MOVIE_LIST_TAG)))
+    def search_movies(self):
+        """
+        Full-text search ``?q=&limit=&offset=`` pada judul dan genre
+        (FTS5 di SQLite, tsvector di PostgreSQL), terurut berdasarkan relevansi.
+        """
+        try:
+            params = self.request.params
+            tokens = search_tokens(params.get('q'))
+            if not tokens:
+                raise HTTPBadRequest(json_body={'error': 'Search query (q) is required.'})
+            limit = _parse_limit(params.get('limit'))
+            offset = _parse_offset(params.get('offset'))
+
+            rows = search_catalog(self.dbsession, tokens, limit, offset)
+            next_offset = None
+            if len(rows) > limit:
+                rows = rows[:limit]
+                next_offset = offset + limit
+
+            return {
+                'movies': [Movie.row_to_dict(row, request=self.request) for row in rows],
+                'next_offset': next_offset,
+            }
+        except HTTPBadRequest as e:
+            return e
+        except Exception as e:
+            print(f"UNEXPECTED ERROR in search_movies: {e}")
+            import traceback
+            traceback.print_exc()
+            self.request.response.status_code = 500
+            return {'error': 'An unexpected server error occurred while searching movies.'}
+
+    # --- AUTOCOMPLETE (TIDAK DIPROTEKSI - PUBLIK) ---
+    @view_config(route_name='api_movies_autocomplete', request_method='GET')
+    def autocomplete_movies(self):
+        """
+        Saran judul ``?q=&limit=`` dari index di memori (prefix + toleran salah
+        ketik), tanpa round-trip ke database.
+        """
+        q = self.request.params.get('q', '')
+        limit_str = self.request.params.get('limit', '').strip()
+        if limit_str and not limit_str.isdigit():
+            return HTTPBadRequest(json_body={'error': 'Limit must be a positive integer.'})
+        limit = min(int(limit_str), MAX_AUTOCOMPLETE_LIMIT) if limit_str else DEFAULT_AUTOCOMPLETE_LIMIT
+
+        index = get_current_title_index(self.request)
+        suggestions = index.complete(q, limit=limit) if index is not None and limit else []
+        return {'suggestions': suggestions}
+
+    # --- FACETS (TIDAK DIPROTEKSI - PUBLIK) ---
+    @view_config(route_name='api_movies_facets', request_method='GET',
+                 decorator=(conditional_catalog_view,
+                            cached_json_view(lambda request: MOVIE_LIST_TAG)))
+    def facets_movies(self):
+        """
+        Hitungan movie per genre, dekade, dan rating dari tabel agregat
+        ``movie_facets`` (tanpa GROUP BY atas tabel movies).
+        """
+        try:
+            return movie_facets(self.dbsession)
+        except Exception as e:
+            print(f"UNEXPECTED ERROR in facets_movies: {e}")
+            import traceback
+            traceback.print_exc()
+            self.request.response.status_code = 500
+            return {'error': 'An unexpected server error occurred while counting movies.'}
+
     # --- READ (TIDAK DIPROTEKSI - PUBLIK) ---
-    @view_config(route_name='api_movie_detail', request_method='GET')
+    @view_config(route_name='api_movie_detail', request_method='GET',
+                 decorator=(conditional_catalog_view,
+                            cached_json_view(_movie_detail_tag)))
     def get_movie(self):
         try:
             movie_id_str = self.request.matchdict['id']
@@ -158,9 +474,9 @@ class MovieViews:
                 raise HTTPBadRequest(json_body={'error': 'Invalid movie ID format. ID must be an integer.'})
             movie_id = int(movie_id_str)
             
-            movie = self.dbsession.query(Movie).get(movie_id)
-            if movie:
-                return movie.to_dict(request=self.request)
+            row = self.dbsession.query(*MOVIE_COLUMNS).filter(Movie.id == movie_id).first()
+            if row:
+                return Movie.row_to_dict(row, request=self.request)
             else:
                 # HTTPNotFound akan ditangkap oleh blok except HTTPException di bawah jika ada
                 raise HTTPNotFound(json_body={'error': 'Movie not found'})
@@ -192,28 +508,33 @@ class MovieViews:
 
             if not movie:
                 raise HTTPNotFound(json_body={'error': 'Movie not found'})
-
-            # Ambil data dari POST, jika tidak ada, gunakan nilai yang sudah ada di movie
-            movie.title = self.request.POST.get('title', movie.title).strip()
-            if not movie.title: # Judul tidak boleh kosong setelah diupdate
+            facet_keys_before = facet_keys_for(movie)
+            form = read_upload_form(self.request, {'poster': POSTER_STORAGE})
+
+            # Validasi semua field dulu; movie baru diubah setelah semuanya valid,
+            # agar error 400 (yang di-return, bukan di-raise) tidak meninggalkan
+            # edit setengah jalan untuk di-commit pyramid_tm
+            title = form.get('title', movie.title).strip()
+            if not title: # Judul tidak boleh kosong setelah diupdate
                 raise HTTPBadRequest(json_body={'error': 'Title cannot be empty'})
 
-            movie.genre = self.request.POST.get('genre', movie.genre)
-            if movie.genre is not None: # Pastikan string, bukan None yang di-strip
-                 movie.genre = movie.genre.strip()
-
+            genre = form.get('genre', movie.genre)
+            if genre is not None: # Pastikan string, bukan None yang di-strip
+                 genre = genre.strip()
 
-            release_year_str = self.request.POST.get('release_year')
+            release_year = movie.release_year
+            release_year_str = form.get('release_year')
             if release_year_str is not None: # Hanya proses jika ada input 'release_year'
                 release_year_str = release_year_str.strip()
                 if release_year_str: # Jika tidak kosong setelah strip
                     if not release_year_str.isdigit():
                         raise HTTPBadRequest(json_body={'error': 'Release year must be an integer.'})
-                    movie.release_year = int(release_year_str)
-                else: # Jika dikirim sebagai string kosong, set ke None atau biarkan (tergantung logika bisnis)
-                    movie.release_year = None # Atau movie.release_year = movie.release_year
+                    release_year = int(release_year_str)
+                else: # Jika dikirim sebagai string kosong, set ke None
+                    release_year = None
 
-            rating_str = self.request.POST.get('rating')
+            rating = movie.rating
+            rating_str = form.get('rating')
             if rating_str is not None: # Hanya proses jika ada input 'rating'
                 rating_str = rating_str.strip()
                 if rating_str: # Jika tidak kosong setelah strip
@@ -222,26 +543,36 @@ class MovieViews:
                     rating = int(rating_str)
                     if not (1 <= rating <= 10):
                         raise HTTPBadRequest(json_body={'error': 'Rating must be between 1 and 10'})
-                    movie.rating = rating
-                else: # Jika dikirim sebagai string kosong, set ke None atau biarkan
-                    movie.rating = None # Atau movie.rating = movie.rating
+                else: # Jika dikirim sebagai string kosong, set ke None
+                    rating = None
 
+            movie.title = title
+            movie.genre = genre
+            movie.release_year = release_year
+            movie.rating = rating
 
-            poster_file = self.request.POST.get('poster')
+            poster_file = form.get('poster')
             if (poster_file is not None and
                 hasattr(poster_file, 'filename') and
                 poster_file.filename):
-                if movie.poster_path:
-                    _delete_poster(movie.poster_path)
-                movie.poster_path = _save_poster(poster_file)
+                old_poster_path = movie.poster_path
+                # Simpan dulu: upload ulang poster yang sama tidak sempat menghapus file-nya
+                movie.poster_path = _save_poster(poster_file, self.dbsession)
+                if old_poster_path:
+                    _delete_poster(old_poster_path, self.dbsession, self.request)
+                generate_derivatives_after_commit(self.request, POSTER_STORAGE, movie.poster_path)
 
             self.dbsession.flush()
+            adjust_movie_facets(self.dbsession, removed=facet_keys_before, added=facet_keys_for(movie))
+            invalidate_after_commit(self.request, MOVIE_LIST_TAG, movie_tag(movie_id))
+            index_title_after_commit(self.request, movie_id, movie.title)
             return HTTPOk(json_body={
                 'message': 'Movie updated successfully!',
                 'movie': movie.to_dict(request=self.request)
             })
         # ===== PERUBAHAN BLOK EXCEPT =====
-        except (HTTPBadRequest, HTTPUnauthorized, HTTPNotFound) as e:
+        except (HTTPBadRequest, HTTPUnauthorized, HTTPNotFound,
+                HTTPRequestEntityTooLarge, HTTPUnsupportedMediaType) as e:
             return e
         except ValueError as e: # Untuk konversi int jika ada yang lolos validasi string
             return HTTPBadRequest(json_body={'error': f'Invalid data format: {e}'})
@@ -270,10 +601,13 @@ class MovieViews:
                 raise HTTPNotFound(json_body={'error': 'Movie not found'})
 
             if movie.poster_path:
-                _delete_poster(movie.poster_path)
+                _delete_poster(movie.poster_path, self.dbsession, self.request)
 
             self.dbsession.delete(movie)
             self.dbsession.flush()
+            adjust_movie_facets(self.dbsession, removed=facet_keys_for(movie))
+            invalidate_after_commit(self.request, MOVIE_LIST_TAG, movie_tag(movie_id))
+            unindex_title_after_commit(self.request, movie_id)
 
             return HTTPNoContent() # HTTPNoContent biasanya tidak memiliki body
         # ===== PERUBAHAN BLOK EXCEPT =====
@@ -1,14 +1,20 @@
 import os
-import uuid
-import shutil
 import sqlalchemy.exc
 from pyramid.view import view_config, view_defaults
 from pyramid.response import Response
 from pyramid.httpexceptions import (
     HTTPOk, HTTPCreated, HTTPNotFound, HTTPBadRequest,
-    HTTPConflict, HTTPUnauthorized, HTTPNoContent, HTTPForbidden # Ditambahkan HTTPForbidden
+    HTTPConflict, HTTPUnauthorized, HTTPNoContent, HTTPForbidden, # Ditambahkan HTTPForbidden
+    HTTPServiceUnavailable, HTTPRequestEntityTooLarge, HTTPUnsupportedMediaType,
 )
+from ..auth import cached_user_profile, invalidate_user_after_commit
+from ..models.blob import acquire_blob, release_blob
 from ..models.user import User
+from ..storage import BlobStorage
+from ..derivatives import generate_derivatives_after_commit
+from ..reaper import delete_file_after_commit
+from ..uploads import UploadedFile, read_upload_form
+from ..passwords import PasswordPoolBusy, RETRY_AFTER_SECONDS, get_password_pool, get_bcrypt_rounds
 
 # --- Konfigurasi Direktori Upload Foto Profil ---
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -16,32 +22,31 @@ BACKEND_BACKEND_DIR = os.path.dirname(CURRENT_DIR)
 PROFILE_PIC_UPLOAD_DIR = os.path.join(BACKEND_BACKEND_DIR, 'static', 'profile_pics')
 os.makedirs(PROFILE_PIC_UPLOAD_DIR, exist_ok=True)
 
-def _save_profile_photo(photo_file_storage):
-    """Helper function untuk menyimpan foto profil."""
+# Foto profil disimpan berdasarkan hash isinya (lihat backend/storage.py)
+PROFILE_PIC_STORAGE = BlobStorage(PROFILE_PIC_UPLOAD_DIR, 'profile_pics')
+
+def _save_profile_photo(photo_file_storage, dbsession):
+    """Helper function untuk menyimpan foto profil (dedup per isi + referensi)."""
+    if isinstance(photo_file_storage, UploadedFile): # Sudah di-stream ke PROFILE_PIC_STORAGE
+        acquire_blob(dbsession, photo_file_storage.path)
+        photo_file_storage.acquired = True
+        photo_file_storage.ensure_stored() # File dedup bisa terhapus reaper sebelum acquire_blob
+        return photo_file_storage.path
     if (photo_file_storage is not None and
             hasattr(photo_file_storage, 'filename') and
             photo_file_storage.filename):
         _, ext = os.path.splitext(photo_file_storage.filename)
-        unique_filename = f"{uuid.uuid4()}{ext}"
-        output_path = os.path.join(PROFILE_PIC_UPLOAD_DIR, unique_filename)
         photo_file_storage.file.seek(0)
-        with open(output_path, 'wb') as output_f:
-            shutil.copyfileobj(photo_file_storage.file, output_f)
-        return 'profile_pics/' + unique_filename # Simpan path relatif
+        photo_path = PROFILE_PIC_STORAGE.put(photo_file_storage.file, ext,
+                                             acquire=lambda path: acquire_blob(dbsession, path))
+        return photo_path # Simpan path relatif
     return None
 
-def _delete_profile_photo(photo_path):
-    """Helper function untuk menghapus foto profil."""
-    if photo_path:
-        actual_filename = photo_path.replace('profile_pics/', '', 1)
-        full_path = os.path.join(PROFILE_PIC_UPLOAD_DIR, actual_filename)
-        if os.path.exists(full_path):
-            try:
-                os.remove(full_path)
-                return True
-            except OSError as e:
-                print(f"Error deleting profile photo {full_path}: {e}")
-                return False
+def _delete_profile_photo(photo_path, dbsession, request):
+    """Helper function untuk melepas foto profil; file dihapus setelah commit jika tidak dipakai lagi."""
+    if photo_path and release_blob(dbsession, photo_path) == 0:
+        delete_file_after_commit(request, PROFILE_PIC_STORAGE, photo_path)
+        return True
     return False
 
 # --- Fungsi untuk memeriksa otorisasi (Contoh) ---
@@ -56,6 +61,13 @@ def check_authorization(request, required_user_id):
     
     return True
 
+def _password_pool_busy_response():
+    """503 cepat ketika pool bcrypt penuh, alih-alih membuat request mengantre."""
+    return HTTPServiceUnavailable(
+        json_body={'error': 'Server is busy, please try again shortly.'},
+        headers={'Retry-After': str(RETRY_AFTER_SECONDS)},
+    )
+
 @view_defaults(renderer='json')
 class UserViews:
     def __init__(self, request):
@@ -66,12 +78,13 @@ class UserViews:
     @view_config(route_name='api_signup', request_method='POST')
     def signup_view(self):
         try:
-            username = self.request.POST.get('username')
-            email = self.request.POST.get('email')
-            password = self.request.POST.get('password')
-            confirm_password = self.request.POST.get('confirm_password')
-            bio = self.request.POST.get('bio', None)
-            foto_profil_storage = self.request.POST.get('foto_profil')
+            form = read_upload_form(self.request, {'foto_profil': PROFILE_PIC_STORAGE})
+            username = form.get('username')
+            email = form.get('email')
+            password = form.get('password')
+            confirm_password = form.get('confirm_password')
+            bio = form.get('bio', None)
+            foto_profil_storage = form.get('foto_profil')
 
             if not all([username, email, password, confirm_password]):
                 return HTTPBadRequest(json_body={'error': 'Username, email, password, and confirm password are required.'})
@@ -79,18 +92,21 @@ class UserViews:
             if password != confirm_password:
                 return HTTPBadRequest(json_body={'error': 'Passwords do not match.'})
 
-            profile_photo_path = _save_profile_photo(foto_profil_storage)
-
             new_user = User(
                 username=username,
                 email=email,
                 bio=bio,
-                profile_photo=profile_photo_path
             )
-            new_user.set_password(password)
+            # Hash dulu: _save_profile_photo menulis ke tabel blobs (lock tulis SQLite),
+            # yang akan tertahan selama bcrypt jika urutannya dibalik
+            new_user.set_password(password, pool=get_password_pool(self.request),
+                                  rounds=get_bcrypt_rounds(self.request))
+            profile_photo_path = _save_profile_photo(foto_profil_storage, self.dbsession)
+            new_user.profile_photo = profile_photo_path
 
             self.dbsession.add(new_user)
             self.dbsession.flush() # flush untuk mendapatkan ID user
+            generate_derivatives_after_commit(self.request, PROFILE_PIC_STORAGE, profile_photo_path)
 
             # --- *** LOGIN OTOMATIS & BUAT SESSION SETELAH SIGNUP *** ---
             session = self.request.session
@@ -103,6 +119,13 @@ class UserViews:
                 'user': new_user.to_dict(request=self.request)
             })
 
+        except (HTTPBadRequest, HTTPRequestEntityTooLarge, HTTPUnsupportedMediaType) as upload_error:
+            return upload_error # Form / upload ditolak oleh read_upload_form
+
+        except PasswordPoolBusy:
+            # Foto belum disimpan; upload yang belum dipakai dibuang oleh read_upload_form
+            return _password_pool_busy_response()
+
         except sqlalchemy.exc.IntegrityError:
             self.dbsession.rollback()
             return HTTPConflict(json_body={'error': 'Username or email already exists.'})
@@ -126,10 +149,19 @@ class UserViews:
                 return HTTPBadRequest(json_body={'error': 'Email and password are required.'})
 
             user = self.dbsession.query(User).filter_by(email=email).first()
+            pool = get_password_pool(self.request)
 
-            if not user or not user.check_password(password):
+            if not user or not user.check_password(password, pool=pool):
                 return HTTPUnauthorized(json_body={'error': 'Invalid email or password.'})
 
+            # Hash dengan cost lama di-upgrade ke auth.bcrypt_rounds (ikut transaksi request ini)
+            rounds = get_bcrypt_rounds(self.request)
+            if user.password_needs_rehash(rounds):
+                try:
+                    user.set_password(password, pool=pool, rounds=rounds)
+                except PasswordPoolBusy:
+                    pass # Login tetap berhasil; rehash dicoba lagi di login berikutnya
+
             # --- *** INILAH MODIFIKASINYA: BUAT SESSION! *** ---
             session = self.request.session
             session['user_id'] = user.id  # Simpan ID user ke session
@@ -140,6 +172,8 @@ class UserViews:
                 'message': 'Login successful!',
                 'user': user.to_dict(request=self.request)
             })
+        except PasswordPoolBusy:
+            return _password_pool_busy_response()
         except Exception as e:
             print(f"Error during login: {e}")
             import traceback
@@ -170,9 +204,10 @@ class UserViews:
         """Memeriksa apakah pengguna memiliki session yang valid."""
         if 'user_id' in self.request.session:
             user_id = self.request.session['user_id']
-            user = self.dbsession.query(User).get(user_id)
-            if user:
-                 return HTTPOk(json_body={'isAuthenticated': True, 'user': user.to_dict(request=self.request)})
+            # Profil dari cache per proses; request.user (query) hanya saat miss
+            profile = cached_user_profile(self.request, user_id, lambda: self.request.user)
+            if profile:
+                 return HTTPOk(json_body={'isAuthenticated': True, 'user': profile})
         return HTTPOk(json_body={'isAuthenticated': False, 'user': None})
 
 
@@ -203,24 +238,29 @@ class UserViews:
             check_authorization(self.request, user_id_to_update)
             # -----------------------------------------------
 
-            user = self.dbsession.query(User).get(user_id_to_update)
+            user = self.request.user # Sama dengan user_id_to_update setelah check_authorization
 
             if not user:
                 return HTTPNotFound(json_body={'error': 'User not found'})
 
-            user.username = self.request.POST.get('username', user.username)
-            user.email = self.request.POST.get('email', user.email)
-            user.bio = self.request.POST.get('bio', user.bio)
+            form = read_upload_form(self.request, {'foto_profil': PROFILE_PIC_STORAGE})
+            user.username = form.get('username', user.username)
+            user.email = form.get('email', user.email)
+            user.bio = form.get('bio', user.bio)
 
-            foto_profil_storage = self.request.POST.get('foto_profil')
+            foto_profil_storage = form.get('foto_profil')
             if (foto_profil_storage is not None and
                     hasattr(foto_profil_storage, 'filename') and
                     foto_profil_storage.filename):
-                if user.profile_photo:
-                    _delete_profile_photo(user.profile_photo)
-                user.profile_photo = _save_profile_photo(foto_profil_storage)
+                old_photo_path = user.profile_photo
+                # Simpan dulu: upload ulang foto yang sama tidak sempat menghapus file-nya
+                user.profile_photo = _save_profile_photo(foto_profil_storage, self.dbsession)
+                if old_photo_path:
+                    _delete_profile_photo(old_photo_path, self.dbsession, self.request)
+                generate_derivatives_after_commit(self.request, PROFILE_PIC_STORAGE, user.profile_photo)
 
             self.dbsession.flush()
+            invalidate_user_after_commit(self.request, user.id)
 
             return HTTPOk(json_body={
                 'message': 'Profile updated successfully!',
@@ -228,6 +268,8 @@ class UserViews:
             })
         except (HTTPUnauthorized, HTTPForbidden) as auth_error:
             return auth_error # Kembalikan error otorisasi/autentikasi
+        except (HTTPBadRequest, HTTPRequestEntityTooLarge, HTTPUnsupportedMediaType) as upload_error:
+            return upload_error # Form / upload ditolak oleh read_upload_form
         except sqlalchemy.exc.IntegrityError:
             self.dbsession.rollback()
             return HTTPConflict(json_body={'error': 'Username or email might already exist.'})
@@ -246,16 +288,17 @@ class UserViews:
             check_authorization(self.request, user_id_to_delete)
             # -----------------------------------------------
 
-            user = self.dbsession.query(User).get(user_id_to_delete)
+            user = self.request.user # Sama dengan user_id_to_delete setelah check_authorization
 
             if not user:
                 return HTTPNotFound(json_body={'error': 'User not found'})
 
             if user.profile_photo:
-                _delete_profile_photo(user.profile_photo)
+                _delete_profile_photo(user.profile_photo, self.dbsession, self.request)
 
             self.dbsession.delete(user)
             self.dbsession.flush()
+            invalidate_user_after_commit(self.request, user_id_to_delete)
             
             # Hapus session juga saat delete
             self.request.session.invalidate()
@@ -0,0 +1,80 @@
+"""
+Benchmark latensi TitleIndex.complete() (endpoint /api/movies/autocomplete)
+untuk input per ketukan: prefix valid dan input dengan salah ketik.
+
+Jalankan dari folder backend:
+
+    env/bin/python benchmarks/bench_autocomplete.py --titles 100000
+
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+
+from backend.autocomplete import TitleIndex
+
+WORDS = ['dark', 'silent', 'broken', 'golden', 'lost', 'hidden', 'last', 'crimson',
+         'frozen', 'wild', 'electric', 'midnight', 'knight', 'city', 'river', 'empire',
+         'dream', 'garden', 'signal', 'harbor', 'mountain', 'witness', 'machine', 'kingdom',
+         'shadow', 'voyage', 'storm', 'letter', 'return', 'rises', 'begins', 'forever']
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--titles', type=int, default=100000,
+                        help='Jumlah judul sintetis di index (default: 100000)')
+    parser.add_argument('--queries', type=int, default=20000,
+                        help='Jumlah query per skenario (default: 20000)')
+    return parser.parse_args(argv[1:])
+
+
+def make_typo(rng, text):
+    """Tukar dua huruf bersebelahan, seperti salah ketik umum."""
+    if len(text) < 3:
+        return text
+    i = rng.randrange(len(text) - 1)
+    return text[:i] + text[i + 1] + text[i] + text[i + 2:]
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def measure(index, queries):
+    samples = []
+    for q in queries:
+        start = time.perf_counter()
+        index.complete(q, limit=10)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main(argv=sys.argv):
+    args = parse_args(argv)
+    rng = random.Random(7)
+    titles = [' '.join(rng.choice(WORDS).title() for _ in range(rng.randint(1, 4))) + f' {i}'
+              for i in range(args.titles)]
+
+    index = TitleIndex()
+    start = time.perf_counter()
+    index.build(enumerate(titles, start=1))
+    print(f'build {args.titles} judul: {(time.perf_counter() - start) * 1000:.0f} ms')
+
+    sampled = [rng.choice(titles) for _ in range(args.queries)]
+    scenarios = [
+        ('prefix (ketikan)', [t[:rng.randint(1, min(len(t), 12))] for t in sampled]),
+        ('salah ketik', [make_typo(rng, t.rsplit(' ', 1)[0].lower()) for t in sampled]),
+    ]
+    print(f'{"skenario":<18} {"p50 (us)":>9} {"p99 (us)":>9} {"max (us)":>9}')
+    for label, queries in scenarios:
+        samples = measure(index, queries)
+        print(f'{label:<18} {statistics.median(samples) * 1e6:9.1f}'
+              f' {percentile(samples, 99) * 1e6:9.1f} {max(samples) * 1e6:9.1f}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,60 @@
+"""
+Latensi hash bcrypt per cost di mesin ini, untuk memilih ``auth.bcrypt_rounds``.
+Setiap login dan signup membayar satu kali latensi ini (di pool password atau
+thread waitress), jadi pilih cost tertinggi yang masih di bawah target.
+
+Jalankan dari folder backend:
+
+    env/bin/python benchmarks/bench_bcrypt_cost.py --min-rounds 10 --max-rounds 14 --target-ms 250
+
+"""
+import argparse
+import statistics
+import sys
+import time
+
+from backend.models.user import hash_password, verify_password
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--min-rounds', type=int, default=10,
+                        help='Cost terendah yang diukur (default: 10)')
+    parser.add_argument('--max-rounds', type=int, default=14,
+                        help='Cost tertinggi yang diukur (default: 14)')
+    parser.add_argument('--samples', type=int, default=5,
+                        help='Jumlah hash per cost (default: 5)')
+    parser.add_argument('--target-ms', type=float, default=250,
+                        help='Target latensi per login dalam ms (default: 250)')
+    return parser.parse_args(argv[1:])
+
+
+def main(argv=sys.argv):
+    args = parse_args(argv)
+    suggested = None
+    print(f'{"rounds":>6} {"hash ms":>9} {"verify ms":>10} {"logins/s/core":>14}')
+    for rounds in range(args.min_rounds, args.max_rounds + 1):
+        hash_samples, verify_samples = [], []
+        for _ in range(args.samples):
+            start = time.perf_counter()
+            hashed = hash_password('Password123!', rounds)
+            hash_samples.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            verify_password('Password123!', hashed)
+            verify_samples.append(time.perf_counter() - start)
+        hash_ms = statistics.median(hash_samples) * 1000
+        verify_ms = statistics.median(verify_samples) * 1000
+        if verify_ms <= args.target_ms:
+            suggested = rounds
+        print(f'{rounds:6d} {hash_ms:9.1f} {verify_ms:10.1f} {1000 / verify_ms:14.1f}')
+        if hash_ms > args.target_ms * 4:
+            break # Cost berikutnya dua kali lebih lambat lagi; tidak perlu diukur
+    if suggested is None:
+        print(f'\nTidak ada cost yang memenuhi target {args.target_ms:g} ms.')
+    else:
+        print(f'\nSaran: auth.bcrypt_rounds = {suggested} (target {args.target_ms:g} ms per login)')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""
+Microbenchmark latensi preflight ``OPTIONS /api/movies`` lewat aplikasi WSGI:
+tween CORS (``backend/cors.py``) dibanding cara lama, yaitu route catch-all
+``/api/{catch_all:.*}`` + subscriber NewRequest yang menambah header di setiap
+respons (direkonstruksi di sini karena sudah dihapus dari aplikasi).
+
+Jalankan dari folder backend:
+
+    env/bin/python benchmarks/bench_cors_preflight.py --requests 20000
+
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from pyramid.config import Configurator
+from pyramid.events import NewRequest
+from pyramid.request import Request
+from pyramid.response import Response
+from sqlalchemy import create_engine
+
+from backend import main as make_app
+from backend.models.meta import Base
+
+ORIGIN = 'http://localhost:5173'
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=20000,
+                        help='Jumlah preflight per skenario (default: 20000)')
+    return parser.parse_args(argv[1:])
+
+
+def legacy_app(settings):
+    """Aplikasi dengan penanganan CORS versi lama (sebelum tween)."""
+    def options_view(request):
+        return Response(status_code=204)
+
+    def add_cors_headers_response_callback(event):
+        def cors_headers(request, response):
+            response.headers.update({
+                'Access-Control-Allow-Origin': ORIGIN,
+                'Access-Control-Allow-Methods': 'POST,GET,DELETE,PUT,OPTIONS',
+                'Access-Control-Allow-Headers': 'Origin, Content-Type, Accept, Authorization',
+                'Access-Control-Allow-Credentials': 'true',
+                'Access-Control-Max-Age': '1728000',
+            })
+        event.request.add_response_callback(cors_headers)
+
+    with Configurator(settings=settings) as config:
+        config.include('pyramid_jinja2')
+        config.include('backend.sessions')
+        config.include('backend.models')
+        config.include('backend.cache')
+        config.include('backend.routes')
+        config.add_route('cors_preflight_catch_all', '/api/{catch_all:.*}', request_method='OPTIONS')
+        config.add_view(options_view, route_name='cors_preflight_catch_all')
+        config.add_subscriber(add_cors_headers_response_callback, NewRequest)
+    return config.make_wsgi_app()
+
+
+def measure(app, requests):
+    environ = Request.blank('/api/movies', method='OPTIONS', headers={
+        'Origin': ORIGIN, 'Access-Control-Request-Method': 'POST',
+        'Access-Control-Request-Headers': 'content-type'}).environ
+    samples = []
+    for _ in range(requests):
+        request = Request(dict(environ))
+        start = time.perf_counter()
+        response = request.get_response(app)
+        samples.append(time.perf_counter() - start)
+        assert response.status_code == 204 and response.headers['Access-Control-Allow-Origin'] == ORIGIN
+    return samples
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def main(argv=sys.argv):
+    args = parse_args(argv)
+    db_url = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='filmfy-bench-'), 'cors.sqlite')}"
+    engine = create_engine(db_url)
+    Base.metadata.create_all(engine)
+    engine.dispose()
+    settings = {'sqlalchemy.url': db_url, 'session.backend': 'memory', 'session.secret': 'bench'}
+
+    print(f'{"scenario":<26} {"p50 us":>8} {"p99 us":>8} {"req/s":>8}')
+    for label, app in [('route catch-all (lama)', legacy_app(settings)),
+                       ('tween CORS', make_app({}, **settings))]:
+        measure(app, 500) # Pemanasan
+        samples = measure(app, args.requests)
+        print(f'{label:<26} {statistics.median(samples) * 1e6:8.1f} '
+              f'{percentile(samples, 99) * 1e6:8.1f} {len(samples) / sum(samples):8.0f}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
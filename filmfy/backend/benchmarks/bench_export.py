@@ -0,0 +1,85 @@
+"""
+Benchmark export katalog (GET /api/export/movies, ``export_catalog``):
+throughput, ukuran output, dan puncak memori Python (tracemalloc) per format
+untuk memastikan memori tetap konstan terhadap jumlah baris.
+
+Jalankan dari folder backend:
+
+    env/bin/python benchmarks/bench_export.py --rows 1000000
+
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from backend.export import EXPORT_FORMATS, iter_export, iter_gzip
+from backend.models.meta import Base
+
+GENRES = ['Action', 'Drama', 'Comedy', 'Horror', 'Sci-Fi', 'Thriller', 'Romance', 'Animation']
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1000000,
+                        help='Jumlah movie sintetis (default: 1000000)')
+    parser.add_argument('--db', default=None,
+                        help='Path file SQLite (default: file sementara)')
+    return parser.parse_args(argv[1:])
+
+
+def seed(engine, rows, batch_size=50000):
+    rng = random.Random(42)
+    with engine.begin() as connection:
+        for start in range(0, rows, batch_size):
+            connection.execute(text(
+                'INSERT INTO movies (title, genre, release_year, rating)'
+                ' VALUES (:title, :genre, :release_year, :rating)'), [
+                {
+                    'title': f'Movie {i}',
+                    'genre': rng.choice(GENRES),
+                    'release_year': rng.randint(1950, 2025),
+                    'rating': rng.randint(1, 10),
+                }
+                for i in range(start, min(start + batch_size, rows))
+            ])
+
+
+def export_size(engine, fmt, gzip):
+    with Session(engine) as session:
+        chunks = iter_export(session, 'movies', fmt)
+        return sum(len(chunk) for chunk in (iter_gzip(chunks) if gzip else chunks))
+
+
+def main(argv=sys.argv):
+    args = parse_args(argv)
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix='filmfy-bench-'), 'export.sqlite')
+    engine = create_engine(f'sqlite:///{db_path}')
+    Base.metadata.create_all(engine)
+    seed(engine, args.rows)
+
+    print(f'{"format":<16} {"rows/s":>10} {"MB":>8} {"peak KB":>8}')
+    for fmt in EXPORT_FORMATS:
+        for gzip in (False, True):
+            start = time.perf_counter()
+            size = export_size(engine, fmt, gzip)
+            elapsed = time.perf_counter() - start
+            # Putaran kedua khusus memori: tracemalloc memperlambat alokasi
+            tracemalloc.start()
+            export_size(engine, fmt, gzip)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            label = fmt + ('+gzip' if gzip else '')
+            print(f'{label:<16} {args.rows / elapsed:10,.0f} {size / 1e6:8.1f} {peak // 1024:8d}')
+    engine.dispose()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,165 @@
+"""
+Benchmark latensi GET /api/movies (``list_movies``) selama badai login:
+banyak klien memanggil POST /api/login bersamaan sementara satu klien
+mengukur p50/p99 listing movie. Dibandingkan bcrypt inline di thread
+waitress (``password.executor = none``) dengan pool worker terbatas
+(``backend.passwords``), yang menolak kelebihan login dengan 503.
+
+Aplikasi dijalankan dengan waitress di proses yang sama (port acak),
+database SQLite sementara, cache respons dimatikan.
+
+Jalankan dari folder backend:
+
+    env/bin/python benchmarks/bench_login_storm.py --clients 16 --seconds 10
+
+"""
+import argparse
+import http.client
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine, text
+from waitress.server import create_server
+
+from backend import main as make_app
+from backend.models.meta import Base
+from backend.models.user import hash_password
+
+PASSWORD = 'Password123!'
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--clients', type=int, default=16,
+                        help='Jumlah klien login bersamaan (default: 16)')
+    parser.add_argument('--seconds', type=float, default=10,
+                        help='Durasi tiap skenario dalam detik (default: 10)')
+    parser.add_argument('--threads', type=int, default=8,
+                        help='Jumlah thread waitress (default: 8)')
+    parser.add_argument('--workers', type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help='Worker pool password (default: setengah jumlah CPU)')
+    parser.add_argument('--max-pending', type=int, default=None,
+                        help='Antrean pool password (default: 2 x workers)')
+    return parser.parse_args(argv[1:])
+
+
+def seed(db_path, users):
+    engine = create_engine(f'sqlite:///{db_path}')
+    Base.metadata.create_all(engine)
+    hashed = hash_password(PASSWORD) # Satu hash dipakai semua user agar seeding cepat
+    with engine.begin() as connection:
+        connection.execute(text(
+            'INSERT INTO movies (title, genre, release_year, rating)'
+            ' VALUES (:title, :genre, :release_year, :rating)'), [
+            {'title': f'Movie {i}', 'genre': 'Drama', 'release_year': 1950 + i % 75, 'rating': i % 10 + 1}
+            for i in range(5000)
+        ])
+        connection.execute(text(
+            'INSERT INTO users (username, email, hashed_password)'
+            ' VALUES (:username, :email, :hashed_password)'), [
+            {'username': f'user{i}', 'email': f'user{i}@example.com', 'hashed_password': hashed}
+            for i in range(users)
+        ])
+    engine.dispose()
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def login_storm(port, client_id, stop, statuses):
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    body = json.dumps({'email': f'user{client_id}@example.com', 'password': PASSWORD})
+    while not stop.is_set():
+        connection.request('POST', '/api/login', body, {'Content-Type': 'application/json'})
+        response = connection.getresponse()
+        response.read()
+        statuses.append(response.status)
+        if response.status == 503:
+            stop.wait(float(response.getheader('Retry-After', 1))) # Klien yang sopan mundur
+    connection.close()
+
+
+def probe_listing(port, seconds):
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    samples = []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        connection.request('GET', '/api/movies?limit=20')
+        response = connection.getresponse()
+        response.read()
+        samples.append(time.perf_counter() - start)
+        assert response.status == 200, response.status
+    connection.close()
+    return samples
+
+
+def run_scenario(settings, args, storm):
+    app = make_app({}, **settings)
+    server = create_server(app, host='127.0.0.1', port=0, threads=args.threads)
+    port = server.effective_port
+    server_thread = threading.Thread(target=server.run, daemon=True)
+    server_thread.start()
+
+    stop = threading.Event()
+    statuses = []
+    clients = [threading.Thread(target=login_storm, args=(port, i, stop, statuses))
+               for i in range(args.clients if storm else 0)]
+    for client in clients:
+        client.start()
+    try:
+        samples = probe_listing(port, args.seconds)
+    finally:
+        stop.set()
+        for client in clients:
+            client.join()
+        # Hentikan thread worker waitress; loop asyncore (daemon) dibiarkan idle
+        # karena menutup socket dari thread lain membuat select() gagal.
+        server.task_dispatcher.shutdown()
+        pool = app.registry.get('password_pool')
+        if pool is not None:
+            pool.shutdown()
+    return samples, statuses
+
+
+def main(argv=sys.argv):
+    args = parse_args(argv)
+    logging.getLogger('waitress').setLevel(logging.CRITICAL) # "Task queue depth" memang disengaja di sini
+    db_path = os.path.join(tempfile.mkdtemp(prefix='filmfy-bench-'), 'storm.sqlite')
+    seed(db_path, args.clients)
+    base = {
+        'sqlalchemy.url': f'sqlite:///{db_path}',
+        'session.type': 'memory',
+        'session.key': 'filmfy_bench',
+        'session.secret': 'bench',
+    }
+    pool_settings = {'password.executor': 'thread', 'password.workers': str(args.workers)}
+    if args.max_pending is not None:
+        pool_settings['password.max_pending'] = str(args.max_pending)
+    scenarios = [
+        ('idle', {'password.executor': 'none'}, False),
+        ('storm, inline', {'password.executor': 'none'}, True),
+        ('storm, pool', pool_settings, True),
+    ]
+
+    print(f'{"scenario":<16} {"list p50 ms":>12} {"list p99 ms":>12} {"logins/s":>9} {"503/s":>7}')
+    for label, extra, storm in scenarios:
+        samples, statuses = run_scenario(dict(base, **extra), args, storm)
+        ok = sum(1 for status in statuses if status == 200)
+        busy = sum(1 for status in statuses if status == 503)
+        print(f'{label:<16} {statistics.median(samples) * 1000:12.2f} '
+              f'{percentile(samples, 99) * 1000:12.2f} '
+              f'{ok / args.seconds:9.1f} {busy / args.seconds:7.1f}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
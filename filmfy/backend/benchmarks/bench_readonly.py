@@ -0,0 +1,81 @@
+"""
+Benchmark request per detik untuk GET publik yang dideklarasikan
+``readonly=True`` di routes.py (``/api/movies`` dan ``/api/movies/{id}``):
+lewat pyramid_tm + pyramid_retry + zope.sqlalchemy seperti sebelumnya,
+dibanding mode read-only (session biasa, tanpa transaksi zope).
+
+Mode "tm" dipaksa dengan mengisi ``filmfy.readonly = False`` di environ,
+sehingga aplikasi yang sama dipakai untuk kedua skenario. Cache respons
+dimatikan agar setiap request benar-benar menyentuh database.
+
+Jalankan dari folder backend:
+
+    env/bin/python benchmarks/bench_readonly.py --requests 3000
+
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from webtest import TestApp
+
+from backend import main as make_app
+from backend.models import READONLY_ENVIRON_KEY
+from backend.models.meta import Base
+from backend.models.movie import Movie
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=3000,
+                        help='Jumlah request per skenario (default: 3000)')
+    parser.add_argument('--movies', type=int, default=200,
+                        help='Jumlah film di database sementara (default: 200)')
+    return parser.parse_args(argv[1:])
+
+
+def seed(db_url, count):
+    engine = create_engine(db_url)
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all(Movie(title=f'Film {i:05d}', genre='Drama', release_year=1950 + i % 70,
+                              rating=i % 10) for i in range(count))
+        session.commit()
+    engine.dispose()
+
+
+def run(app, paths, requests, extra_environ):
+    start = time.perf_counter()
+    for i in range(requests):
+        app.get(paths[i % len(paths)], extra_environ=extra_environ)
+    return time.perf_counter() - start
+
+
+def main(argv=sys.argv):
+    args = parse_args(argv)
+    db_url = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='filmfy-bench-'), 'readonly.sqlite')}"
+    seed(db_url, args.movies)
+    app = TestApp(make_app({}, **{
+        'sqlalchemy.url': db_url,
+        'session.backend': 'memory',
+        'session.secret': 'bench',
+        'cache.backend': 'none',
+    }))
+
+    print(f'{"endpoint":<18} {"mode":<10} {"req/s":>8} {"us/req":>8}')
+    for label, paths in [('/api/movies', ['/api/movies']),
+                         ('/api/movies/{id}', [f'/api/movies/{i}' for i in range(1, 101)])]:
+        for mode, extra_environ in [('tm', {READONLY_ENVIRON_KEY: False}), ('read-only', {})]:
+            run(app, paths, 200, extra_environ) # Pemanasan
+            elapsed = run(app, paths, args.requests, extra_environ)
+            print(f'{label:<18} {mode:<10} {args.requests / elapsed:8.0f} '
+                  f'{elapsed / args.requests * 1e6:8.0f}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
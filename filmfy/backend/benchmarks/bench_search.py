@@ -0,0 +1,128 @@
+"""
+Benchmark GET /api/movies/search: FTS5 (search_catalog) vs scan
+``LIKE '%q%'`` pada katalog sintetis SQLite.
+
+Jalankan dari folder backend (default 1 juta baris, butuh ~1 menit untuk seed):
+
+    env/bin/python benchmarks/bench_search.py --rows 1000000
+
+"""
+import argparse
+import importlib.util
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from backend.models.meta import Base
+from backend.models.search import search_catalog, search_tokens
+
+FTS_MIGRATION_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'backend', 'alembic', 'versions', '20261018_36fd07580362.py')
+
+ADJECTIVES = ['Dark', 'Silent', 'Broken', 'Golden', 'Lost', 'Hidden', 'Last', 'Crimson',
+              'Frozen', 'Wild', 'Electric', 'Midnight', 'Savage', 'Quiet', 'Burning', 'Hollow']
+NOUNS = ['Knight', 'City', 'River', 'Empire', 'Dream', 'Garden', 'Signal', 'Harbor',
+         'Mountain', 'Witness', 'Machine', 'Kingdom', 'Shadow', 'Voyage', 'Storm', 'Letter']
+GENRES = ['Action', 'Drama', 'Comedy', 'Horror', 'Sci-Fi', 'Thriller', 'Romance', 'Animation']
+
+# (label, query): kata umum, kombinasi dua kata, dan kata langka
+QUERIES = [
+    ('umum', 'dark'),
+    ('dua kata', 'golden harbor'),
+    ('langka', 'zyzzyva'),
+]
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1000000,
+                        help='Jumlah movie sintetis (default: 1000000)')
+    parser.add_argument('--limit', type=int, default=50,
+                        help='Ukuran halaman hasil (default: 50)')
+    parser.add_argument('--repeat', type=int, default=20,
+                        help='Jumlah pengulangan per query (default: 20)')
+    parser.add_argument('--db', default=None,
+                        help='Path file SQLite (default: file sementara)')
+    return parser.parse_args(argv[1:])
+
+
+def run_fts_migration(connection):
+    spec = importlib.util.spec_from_file_location('fts_migration', FTS_MIGRATION_PATH)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+    with Operations.context(MigrationContext.configure(connection)):
+        migration.upgrade()
+
+
+def seed(engine, rows, batch_size=50000):
+    rng = random.Random(42)
+    with engine.begin() as connection:
+        for start in range(0, rows, batch_size):
+            connection.execute(text(
+                'INSERT INTO movies (title, genre, release_year, rating)'
+                ' VALUES (:title, :genre, :release_year, :rating)'), [
+                {
+                    'title': f'{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {i}',
+                    'genre': rng.choice(GENRES),
+                    'release_year': rng.randint(1950, 2025),
+                    'rating': rng.randint(1, 10),
+                }
+                for i in range(start, min(start + batch_size, rows))
+            ])
+        # Satu judul langka untuk query 'langka'
+        connection.execute(text("INSERT INTO movies (title, genre) VALUES ('Zyzzyva Returns', 'Drama')"))
+        # Trigger + rebuild index FTS dijalankan setelah data ada (lebih cepat untuk bulk)
+        run_fts_migration(connection)
+
+
+def like_scan(session, q, limit):
+    pattern = f'%{q}%'
+    return session.execute(text(
+        'SELECT id, title, genre, release_year, rating, poster_path FROM movies'
+        ' WHERE title LIKE :pattern OR genre LIKE :pattern'
+        ' ORDER BY title, id LIMIT :limit'), {'pattern': pattern, 'limit': limit}).all()
+
+
+def timed(func, repeat):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), result
+
+
+def main(argv=sys.argv):
+    args = parse_args(argv)
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix='filmfy-bench-'), 'search.sqlite')
+    engine = create_engine(f'sqlite:///{db_path}')
+    Base.metadata.create_all(engine)
+
+    start = time.perf_counter()
+    seed(engine, args.rows)
+    print(f'seed {args.rows} baris + index FTS: {time.perf_counter() - start:.1f} s ({db_path})')
+    print(f'{"query":<24} {"FTS5 (ms)":>10} {"LIKE (ms)":>10} {"speedup":>8}  hasil FTS/LIKE')
+
+    with Session(engine) as session:
+        for label, q in QUERIES:
+            tokens = search_tokens(q)
+            fts_time, fts_rows = timed(lambda: search_catalog(session, tokens, args.limit), args.repeat)
+            like_time, like_rows = timed(lambda: like_scan(session, q, args.limit), args.repeat)
+            print(f'{label + ": " + q:<24} {fts_time * 1000:10.2f} {like_time * 1000:10.2f}'
+                  f' {like_time / fts_time:7.1f}x  {len(fts_rows)}/{len(like_rows)}')
+    engine.dispose()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""
+Benchmark serialisasi GET /api/movies: instance ORM + to_dict() vs
+query kolom (MOVIE_COLUMNS) + Movie.row_to_dict().
+
+Jalankan dari folder backend:
+
+    env/bin/python benchmarks/bench_serialization.py --rows 50000
+
+"""
+import argparse
+import json
+import sys
+import time
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from backend.models.meta import Base
+from backend.models.movie import Movie, MOVIE_COLUMNS
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=20000,
+                        help='Jumlah movie sintetis di database (default: 20000)')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Jumlah pengulangan, hasil terbaik yang dilaporkan (default: 5)')
+    return parser.parse_args(argv[1:])
+
+
+def seed(engine, rows):
+    with Session(engine) as session:
+        session.execute(Movie.__table__.insert(), [
+            {
+                'title': f'Movie {i:07d}',
+                'genre': ('Action', 'Drama', 'Comedy', 'Horror')[i % 4],
+                'release_year': 1950 + i % 75,
+                'rating': i % 10 + 1,
+                'poster_path': f'postersMovie/{i}.png' if i % 3 else None,
+            }
+            for i in range(rows)
+        ])
+        session.commit()
+
+
+def serialize_orm(engine, request):
+    with Session(engine) as session:
+        movies = session.query(Movie).order_by(Movie.title).all()
+        return json.dumps([movie.to_dict(request=request) for movie in movies])
+
+
+def serialize_columns(engine, request):
+    with Session(engine) as session:
+        rows = session.query(*MOVIE_COLUMNS).order_by(Movie.title).all()
+        return json.dumps([Movie.row_to_dict(row, request=request) for row in rows])
+
+
+def best_of(func, repeat, *args):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main(argv=sys.argv):
+    args = parse_args(argv)
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    seed(engine, args.rows)
+    request = SimpleNamespace(application_url='http://localhost:6543')
+
+    orm_time, orm_body = best_of(serialize_orm, args.repeat, engine, request)
+    col_time, col_body = best_of(serialize_columns, args.repeat, engine, request)
+
+    if orm_body != col_body:
+        print('ERROR: output JSON kedua jalur berbeda!')
+        return 1
+
+    print(f'rows: {args.rows}  (best of {args.repeat})')
+    print(f'ORM + to_dict        : {orm_time * 1000:9.1f} ms  {orm_time / args.rows * 1e6:6.2f} us/row')
+    print(f'kolom + row_to_dict  : {col_time * 1000:9.1f} ms  {col_time / args.rows * 1e6:6.2f} us/row')
+    print(f'speedup              : {orm_time / col_time:9.2f}x  (JSON byte-identik)')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,75 @@
+"""
+Benchmark request per detik GET /api/check_auth (session yang sudah login)
+untuk setiap backend session (``session.backend``, lihat backend/sessions.py),
+termasuk Beaker berbasis file seperti development.ini sebelumnya.
+
+Aplikasi dipanggil langsung sebagai WSGI lewat WebTest (tanpa HTTP) dengan
+database SQLite sementara, sehingga selisihnya murni biaya session.
+
+Jalankan dari folder backend:
+
+    env/bin/python benchmarks/bench_sessions.py --requests 5000
+
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from webtest import TestApp
+
+from backend import main as make_app
+from backend.models.meta import Base
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=5000,
+                        help='Jumlah request check_auth per backend (default: 5000)')
+    return parser.parse_args(argv[1:])
+
+
+def backends(workdir):
+    return [
+        ('beaker file', {'session.backend': 'beaker', 'session.type': 'file',
+                         'session.data_dir': os.path.join(workdir, 'beaker', 'data'),
+                         'session.lock_dir': os.path.join(workdir, 'beaker', 'lock')}),
+        ('memory', {'session.backend': 'memory'}),
+        ('sqlite', {'session.backend': 'sqlite',
+                    'session.sqlite_path': os.path.join(workdir, 'sessions.sqlite')}),
+        ('cookie', {'session.backend': 'cookie'}),
+    ]
+
+
+def main(argv=sys.argv):
+    args = parse_args(argv)
+    workdir = tempfile.mkdtemp(prefix='filmfy-bench-')
+    db_url = f"sqlite:///{os.path.join(workdir, 'sessions-bench.sqlite')}"
+    engine = create_engine(db_url)
+    Base.metadata.create_all(engine)
+    engine.dispose()
+    base = {
+        'sqlalchemy.url': db_url,
+        'session.key': 'filmfy_bench',
+        'session.secret': 'bench',
+        'auth.bcrypt_rounds': '4', # Signup bukan yang diukur
+    }
+
+    print(f'{"backend":<12} {"req/s":>8} {"us/req":>8}')
+    for i, (label, extra) in enumerate(backends(workdir)):
+        app = TestApp(make_app({}, **dict(base, **extra)))
+        app.post('/api/signup', {'username': f'bench{i}', 'email': f'bench{i}@example.com',
+                                 'password': 'x', 'confirm_password': 'x'})
+        assert app.get('/api/check_auth').json['isAuthenticated']
+        start = time.perf_counter()
+        for _ in range(args.requests):
+            app.get('/api/check_auth')
+        elapsed = time.perf_counter() - start
+        print(f'{label:<12} {args.requests / elapsed:8.0f} {elapsed / args.requests * 1e6:8.0f}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
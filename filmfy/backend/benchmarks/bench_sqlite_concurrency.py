@@ -0,0 +1,161 @@
+"""
+Benchmark throughput campuran baca/tulis ke SQLite lewat waitress: sejumlah
+klien pembaca memanggil GET /api/movies/{id} sementara klien penulis (sudah
+login) memanggil POST /api/movies/{id} untuk mengubah rating. Dibandingkan
+engine bawaan (rollback journal, PRAGMA default) dengan profil produksi
+``sqlite.*`` di production.ini (WAL, synchronous=NORMAL, mmap, cache, busy
+timeout).
+
+Aplikasi dijalankan dengan waitress di proses yang sama (port acak),
+database SQLite sementara, cache respons dimatikan.
+
+Jalankan dari folder backend:
+
+    env/bin/python benchmarks/bench_sqlite_concurrency.py --readers 8 --writers 2 --seconds 10
+
+"""
+import argparse
+import http.client
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlencode
+
+from sqlalchemy import create_engine, text
+from waitress.server import create_server
+
+from backend import main as make_app
+from backend.models.meta import Base
+from backend.models.user import hash_password
+
+PASSWORD = 'Password123!'
+MOVIES = 1000
+
+PRODUCTION_PROFILE = {
+    'sqlite.journal_mode': 'wal',
+    'sqlite.synchronous': 'normal',
+    'sqlite.cache_size': '-65536',
+    'sqlite.mmap_size': '268435456',
+    'sqlite.busy_timeout': '5000',
+}
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--readers', type=int, default=8,
+                        help='Jumlah klien pembaca (default: 8)')
+    parser.add_argument('--writers', type=int, default=2,
+                        help='Jumlah klien penulis (default: 2)')
+    parser.add_argument('--seconds', type=float, default=10,
+                        help='Durasi tiap skenario dalam detik (default: 10)')
+    parser.add_argument('--threads', type=int, default=8,
+                        help='Jumlah thread waitress (default: 8)')
+    return parser.parse_args(argv[1:])
+
+
+def seed(db_path, writers):
+    engine = create_engine(f'sqlite:///{db_path}')
+    Base.metadata.create_all(engine)
+    hashed = hash_password(PASSWORD, rounds=4) # Login bukan yang diukur
+    with engine.begin() as connection:
+        connection.execute(text(
+            'INSERT INTO movies (title, genre, release_year, rating)'
+            ' VALUES (:title, :genre, :release_year, :rating)'), [
+            {'title': f'Movie {i}', 'genre': 'Drama', 'release_year': 1950 + i % 75, 'rating': i % 10 + 1}
+            for i in range(MOVIES)
+        ])
+        connection.execute(text(
+            'INSERT INTO users (username, email, hashed_password)'
+            ' VALUES (:username, :email, :hashed_password)'), [
+            {'username': f'writer{i}', 'email': f'writer{i}@example.com', 'hashed_password': hashed}
+            for i in range(writers)
+        ])
+    engine.dispose()
+
+
+def reader(port, client_id, stop, results):
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    i = client_id
+    while not stop.is_set():
+        i = (i * 7919 + 1) % MOVIES
+        connection.request('GET', f'/api/movies/{i + 1}')
+        response = connection.getresponse()
+        response.read()
+        results.append(('read', response.status))
+    connection.close()
+
+
+def writer(port, client_id, stop, results):
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    connection.request('POST', '/api/login', json.dumps(
+        {'email': f'writer{client_id}@example.com', 'password': PASSWORD}),
+        {'Content-Type': 'application/json'})
+    response = connection.getresponse()
+    response.read()
+    assert response.status == 200, response.status
+    cookie = response.getheader('Set-Cookie').split(';', 1)[0]
+    i = client_id
+    while not stop.is_set():
+        i = (i * 104729 + 3) % MOVIES
+        connection.request('POST', f'/api/movies/{i + 1}', urlencode({'rating': i % 10 + 1}), {
+            'Content-Type': 'application/x-www-form-urlencoded', 'Cookie': cookie})
+        response = connection.getresponse()
+        response.read()
+        results.append(('write', response.status))
+    connection.close()
+
+
+def run_scenario(settings, args):
+    app = make_app({}, **settings)
+    server = create_server(app, host='127.0.0.1', port=0, threads=args.threads)
+    port = server.effective_port
+    threading.Thread(target=server.run, daemon=True).start()
+
+    stop = threading.Event()
+    results = []
+    clients = ([threading.Thread(target=reader, args=(port, i, stop, results))
+                for i in range(args.readers)]
+               + [threading.Thread(target=writer, args=(port, i, stop, results))
+                  for i in range(args.writers)])
+    for client in clients:
+        client.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for client in clients:
+        client.join()
+    # Lihat bench_login_storm.py: hanya thread worker waitress yang dihentikan
+    server.task_dispatcher.shutdown()
+    return results
+
+
+def main(argv=sys.argv):
+    args = parse_args(argv)
+    logging.getLogger('waitress').setLevel(logging.CRITICAL)
+    scenarios = [('default', {}), ('production profile', PRODUCTION_PROFILE)]
+
+    print(f'{"scenario":<20} {"reads/s":>8} {"writes/s":>9} {"errors":>7}')
+    for label, extra in scenarios:
+        db_path = os.path.join(tempfile.mkdtemp(prefix='filmfy-bench-'), 'concurrency.sqlite')
+        seed(db_path, args.writers)
+        settings = {
+            'sqlalchemy.url': f'sqlite:///{db_path}',
+            'session.backend': 'memory',
+            'session.secret': 'bench',
+            'cache.backend': 'none',
+            'password.executor': 'none',
+            **extra,
+        }
+        results = run_scenario(settings, args)
+        reads = sum(1 for kind, status in results if kind == 'read' and status == 200)
+        writes = sum(1 for kind, status in results if kind == 'write' and status == 200)
+        errors = sum(1 for _, status in results if status != 200)
+        print(f'{label:<20} {reads / args.seconds:8.0f} {writes / args.seconds:9.0f} {errors:7d}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""
+Benchmark cache ``/static/``: ``add_static_view(cache_max_age=3600)`` lama
+dibanding ``StaticAssetView`` (``backend/static_assets.py``).
+
+Satu browser dengan cache HTTP membuka halaman berisi ``theme.css`` dan
+sejumlah poster setiap ``--interval`` menit selama ``--hours`` jam (jam
+disimulasikan). Respons yang masih segar diambil dari cache; yang basi
+direvalidasi dengan ``If-None-Match`` / ``If-Modified-Since``. Diukur:
+jumlah request ke server, jumlah 304, byte body yang dikirim, dan waktu
+server untuk semua request itu.
+
+Jalankan dari folder backend:
+
+    env/bin/python benchmarks/bench_static.py --posters 24 --hours 24 --interval 10
+
+"""
+import argparse
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from pyramid.config import Configurator
+from pyramid.request import Request
+
+from backend.static_assets import StaticAssetView, precompress
+from backend.storage import STATIC_DIR
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--posters', type=int, default=24,
+                        help='Jumlah poster per halaman (default: 24)')
+    parser.add_argument('--poster-kb', type=int, default=120,
+                        help='Ukuran poster dalam KB (default: 120)')
+    parser.add_argument('--hours', type=float, default=24,
+                        help='Lama simulasi dalam jam (default: 24)')
+    parser.add_argument('--interval', type=float, default=10,
+                        help='Menit antar buka halaman (default: 10)')
+    return parser.parse_args(argv[1:])
+
+
+def make_static_dir(posters, poster_kb):
+    static_dir = tempfile.mkdtemp(prefix='bench-static-')
+    shutil.copy(os.path.join(STATIC_DIR, 'theme.css'), static_dir)
+    precompress(os.path.join(static_dir, 'theme.css'))
+    paths = ['theme.css']
+    for _ in range(posters):
+        data = os.urandom(poster_kb * 1024)
+        digest = hashlib.sha256(data).hexdigest()
+        shard = os.path.join(static_dir, 'postersMovie', digest[:2], digest[2:4])
+        os.makedirs(shard, exist_ok=True)
+        with open(os.path.join(shard, digest + '.jpg'), 'wb') as poster:
+            poster.write(data)
+        paths.append(f'postersMovie/{digest[:2]}/{digest[2:4]}/{digest}.jpg')
+    return static_dir, paths
+
+
+def legacy_app(static_dir):
+    with Configurator() as config:
+        config.add_static_view('static', static_dir, cache_max_age=3600)
+    return config.make_wsgi_app()
+
+
+def static_assets_app(static_dir):
+    with Configurator() as config:
+        config.add_route('static', '/static/*subpath')
+        config.add_view(StaticAssetView(static_dir, content_encodings=['br', 'gzip']), route_name='static')
+    return config.make_wsgi_app()
+
+
+def browse(app, paths, hours, interval):
+    """Simulasi browser; kembalikan (request, 304, byte body, detik di server)."""
+    cache = {} # path -> (segar sampai, etag, last-modified)
+    requests = not_modified = body_bytes = 0
+    server_time = 0.0
+    now = 0.0
+    while now < hours * 3600:
+        for path in paths:
+            entry = cache.get(path)
+            if entry is not None and now < entry[0]:
+                continue # Masih segar: tanpa request
+            headers = {'Accept-Encoding': 'gzip, deflate, br'}
+            if entry is not None:
+                if entry[1]:
+                    headers['If-None-Match'] = entry[1]
+                if entry[2]:
+                    headers['If-Modified-Since'] = entry[2]
+            request = Request.blank(f'/static/{path}', headers=headers)
+            start = time.perf_counter()
+            response = request.get_response(app)
+            body = response.body
+            server_time += time.perf_counter() - start
+            requests += 1
+            body_bytes += len(body)
+            if response.status_code == 304:
+                not_modified += 1
+            max_age = response.cache_control.max_age or 0
+            cache[path] = (now + max_age, response.headers.get('ETag'),
+                           response.headers.get('Last-Modified') or (entry[2] if entry else None))
+        now += interval * 60
+    return requests, not_modified, body_bytes, server_time
+
+
+def main(argv=sys.argv):
+    args = parse_args(argv)
+    static_dir, paths = make_static_dir(args.posters, args.poster_kb)
+    try:
+        views = int(args.hours * 60 / args.interval)
+        print(f'{views} page view(s) x {len(paths)} asset(s) over {args.hours:g} h')
+        for name, factory in (('legacy', legacy_app), ('immutable', static_assets_app)):
+            requests, not_modified, body_bytes, server_time = browse(
+                factory(static_dir), paths, args.hours, args.interval)
+            print(f'{name:<10} requests {requests:6d}   304 {not_modified:6d}   '
+                  f'body {body_bytes / (1024 * 1024):8.2f} MB   server {server_time * 1000:8.1f} ms')
+    finally:
+        shutil.rmtree(static_dir)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,163 @@
+"""
+Microbenchmark intake upload poster: cara lama (``request.POST`` WebOb +
+``BlobStorage.put``) dibanding ``read_upload_form`` yang men-stream body
+multipart langsung ke folder storage (``backend/uploads.py``).
+
+``wsgi.input`` adalah file di disk yang tidak bisa di-seek, seperti buffer
+body waitress untuk request besar. Diukur: waktu per upload, puncak memori
+Python (tracemalloc), dan byte yang ditulis ke disk di luar file akhirnya.
+
+Jalankan dari folder backend:
+
+    env/bin/python benchmarks/bench_uploads.py --size-mb 8 --uploads 20
+
+"""
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from pyramid.request import Request
+
+from backend.storage import BlobStorage
+from backend.uploads import UPLOAD_LIMITS_REGISTRY_KEY, UploadLimits, read_upload_form
+
+BOUNDARY = '----filmfyBenchBoundary'
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size-mb', type=float, default=8,
+                        help='Ukuran poster per upload dalam MB (default: 8)')
+    parser.add_argument('--uploads', type=int, default=20,
+                        help='Jumlah upload per skenario (default: 20)')
+    return parser.parse_args(argv[1:])
+
+
+def write_body(path, size):
+    """Body multipart berisi field judul + satu PNG acak berukuran ``size`` byte."""
+    with open(path, 'wb') as body:
+        body.write((f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="title"\r\n\r\n'
+                    f'Bench\r\n--{BOUNDARY}\r\nContent-Disposition: form-data; name="poster"; '
+                    f'filename="poster.png"\r\nContent-Type: image/png\r\n\r\n').encode())
+        body.write(b'\x89PNG\r\n\x1a\n')
+        remaining = size - 8
+        while remaining > 0:
+            chunk = os.urandom(min(remaining, 1024 * 1024))
+            body.write(chunk)
+            remaining -= len(chunk)
+        body.write(f'\r\n--{BOUNDARY}--\r\n'.encode())
+    return os.path.getsize(path)
+
+
+def make_request(body_file, length, limits):
+    request = Request.blank('/api/movies', method='POST')
+    request.environ.pop('webob.is_body_seekable', None) # Seperti input dari server WSGI
+    request.environ['wsgi.input'] = body_file
+    request.environ['CONTENT_LENGTH'] = str(length)
+    request.environ['CONTENT_TYPE'] = f'multipart/form-data; boundary={BOUNDARY}'
+    request.registry = {UPLOAD_LIMITS_REGISTRY_KEY: limits}
+    return request
+
+
+def legacy_intake(request, storage):
+    poster = request.POST['poster']
+    poster.file.seek(0)
+    return storage.put(poster.file, os.path.splitext(poster.filename)[1])
+
+
+def streaming_intake(request, storage):
+    return read_upload_form(request, {'poster': storage})['poster'].path
+
+
+class TempWrites:
+    """Hitung byte yang ditulis ke file sementara (tempfile) selama benchmark."""
+
+    def __init__(self):
+        self.bytes = 0
+
+    def __enter__(self):
+        self._originals = (tempfile.TemporaryFile, tempfile.NamedTemporaryFile)
+        counter = self
+
+        def counting(factory):
+            def make(*args, **kwargs):
+                handle = factory(*args, **kwargs)
+                write = handle.write
+
+                def counted_write(data):
+                    counter.bytes += len(data)
+                    return write(data)
+
+                try:
+                    handle.write = counted_write
+                except AttributeError: # _TemporaryFileWrapper / file biasa
+                    handle = _Wrapped(handle, counted_write)
+                return handle
+            return make
+
+        tempfile.TemporaryFile = counting(tempfile.TemporaryFile)
+        tempfile.NamedTemporaryFile = counting(tempfile.NamedTemporaryFile)
+        return self
+
+    def __exit__(self, *exc):
+        tempfile.TemporaryFile, tempfile.NamedTemporaryFile = self._originals
+
+
+class _Wrapped:
+    def __init__(self, handle, write):
+        self._handle = handle
+        self.write = write
+
+    def __getattr__(self, name):
+        return getattr(self._handle, name)
+
+    def __iter__(self):
+        return iter(self._handle)
+
+
+def run(name, intake, body_path, length, uploads, limits):
+    workdir = tempfile.mkdtemp(prefix='bench-uploads-')
+    storage = BlobStorage(os.path.join(workdir, 'postersMovie'), 'postersMovie')
+    timings = []
+    peak = 0
+    with TempWrites() as writes:
+        for _ in range(uploads):
+            with open(body_path, 'rb') as body_file:
+                request = make_request(body_file, length, limits)
+                tracemalloc.start()
+                start = time.perf_counter()
+                intake(request, storage)
+                timings.append(time.perf_counter() - start)
+                peak = max(peak, tracemalloc.get_traced_memory()[1])
+                tracemalloc.stop()
+            storage.delete(storage.relative_path(next(
+                os.path.join(d, f) for d, _, fs in os.walk(storage.root) for f in fs)))
+    shutil.rmtree(workdir)
+    print(f'{name:<10} p50 {statistics.median(timings) * 1000:8.1f} ms   '
+          f'max {max(timings) * 1000:8.1f} ms   peak mem {peak / (1024 * 1024):7.2f} MB   '
+          f'temp writes {writes.bytes / uploads / (1024 * 1024):7.2f} MB/upload')
+
+
+def main(argv=sys.argv):
+    args = parse_args(argv)
+    size = int(args.size_mb * 1024 * 1024)
+    limits = UploadLimits(max_size=size + 1, max_body_size=size + 1024 * 1024)
+    fd, body_path = tempfile.mkstemp(prefix='bench-upload-body-')
+    os.close(fd)
+    try:
+        length = write_body(body_path, size)
+        print(f'{args.uploads} upload(s) of {args.size_mb:g} MB')
+        run('legacy', legacy_intake, body_path, length, args.uploads, limits)
+        run('streaming', streaming_intake, body_path, length, args.uploads, limits)
+    finally:
+        os.remove(body_path)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
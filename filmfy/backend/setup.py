@@ -10,8 +10,9 @@ with open(os.path.join(here, 'CHANGES.txt')) as f:
 
 requires = [
     'alembic',
+    'Pillow',
     'plaster_pastedeploy',
-    'pyramid >= 1.9',
+    'pyramid >= 2.0', # static_view content_encodings (backend/static_assets.py)
     'pyramid_debugtoolbar',
     'pyramid_jinja2',
     'pyramid_retry',
@@ -48,6 +49,7 @@ setup(
     zip_safe=False,
     extras_require={
         'testing': tests_require,
+        'brotli': ['brotli'], # Varian .br dari compress_static_assets
     },
     install_requires=requires,
     entry_points={
@@ -56,6 +58,12 @@ setup(
         ],
         'console_scripts': [
             'initialize_backend_db = backend.scripts.initialize_db:main',
+            'rebuild_movie_facets = backend.scripts.rebuild_facets:main',
+            'import_movies = backend.scripts.import_movies:main',
+            'export_catalog = backend.scripts.export_catalog:main',
+            'expire_sessions = backend.scripts.expire_sessions:main',
+            'generate_image_derivatives = backend.scripts.generate_derivatives:main',
+            'compress_static_assets = backend.scripts.compress_static:main',
         ],
     },
 )
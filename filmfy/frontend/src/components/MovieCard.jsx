@@ -11,14 +11,22 @@ export default function MovieCard({
 }) {
   const imageUrl =
     movie.poster_url || "https://placehold.co/300x400?text=No+Image";
+  // Versi kecil dari backend: { "image/webp": "url 160w, url 320w", ... }
+  const srcset = movie.poster_srcset || {};
 
   return (
     <div className="bg-white rounded-xl shadow-md overflow-hidden hover:shadow-lg transition w-full max-w-xs mx-auto text-black">
-      <img
-        src={imageUrl}
-        alt={movie.title}
-        className="w-full h-60 object-cover"
-      />
+      <picture>
+        {Object.entries(srcset).map(([type, srcSet]) => (
+          <source key={type} type={type} srcSet={srcSet} sizes="320px" />
+        ))}
+        <img
+          src={imageUrl}
+          alt={movie.title}
+          loading="lazy"
+          className="w-full h-60 object-cover"
+        />
+      </picture>
       <div className="p-4">
         <h3 className="text-xl font-semibold text-gray-900">{movie.title}</h3>
         <p className="text-sm text-gray-600">
@@ -73,7 +73,8 @@ export function MoviesProvider({ children }) {
     setLoading(true);
     setError(null);
     try {
-      const response = await axios.get("/movies");
+      // ?all=1 : ambil seluruh katalog (default endpoint sekarang ter-paginasi)
+      const response = await axios.get("/movies", { params: { all: 1 } });
       setMovies(Array.isArray(response.data) ? response.data : []);
     } catch (e) {
       console.error("Failed to fetch movies:", e);